@@ -0,0 +1,101 @@
+# --- Peringatan parkir terlalu lama: min-heap tenggat per kendaraan aktif ---
+import datetime # untuk tenggat dan waktu sekarang
+import heapq # untuk tenggat terdekat dalam O(log n)
+from collections import namedtuple # untuk satu peringatan
+
+Peringatan = namedtuple("Peringatan", "nopol jenis waktu_masuk tenggat pesan tingkat")
+
+# Batas bawaan per jenis: (lama parkir, pesan), urut dari yang paling singkat
+BATAS_BAWAAN = {
+    "Mobil": ((datetime.timedelta(hours=12), "Menginap (lebih dari 12 jam)"),
+              (datetime.timedelta(days=3), "Diduga ditinggal (lebih dari 3 hari)")),
+    "Motor": ((datetime.timedelta(hours=12), "Menginap (lebih dari 12 jam)"),
+              (datetime.timedelta(days=3), "Diduga ditinggal (lebih dari 3 hari)")),
+}
+
+
+class AlarmParkir:
+    """
+    Tenggat peringatan kendaraan aktif di satu min-heap (tenggat, urutan, nopol, waktu masuk, tingkat).
+    Setiap kendaraan hanya punya satu entri: tenggat batas berikutnya. `periksa` hanya mengambil
+    entri yang sudah lewat, jadi tidak ada pemindaian seluruh kendaraan aktif setiap detik.
+    Checkout tidak mencari entri di heap (penghapusan malas): entri yang waktu masuknya tidak lagi
+    cocok dengan kendaraan aktif dibuang saat muncul di puncak heap.
+    """
+
+    def __init__(self, batas=None):
+        self.batas = BATAS_BAWAAN if batas is None else batas
+        self._heap = []
+        self._urutan = 0
+        self._aktif = {} # nopol -> waktu masuk
+        self.peringatan = {} # nopol -> Peringatan terakhir, untuk daftar di tab Peringatan
+
+    def __len__(self):
+        return len(self._aktif)
+
+    def reset(self, kendaraan_terparkir):
+        """
+        Bangun ulang heap (O(n)) dari {nopol: {'jenis', 'waktu_masuk'}}, mis. saat start atau sinkron
+        dari server. Peringatan kendaraan yang masih parkir tetap ada dan tidak dilaporkan ulang.
+        """
+        lama, self.peringatan = self.peringatan, {}
+        self._heap = []
+        self._aktif = {}
+        for nopol, data in kendaraan_terparkir.items():
+            waktu_masuk = data['waktu_masuk']
+            self._aktif[nopol] = waktu_masuk
+            tingkat = 0
+            peringatan = lama.get(nopol)
+            if peringatan is not None and peringatan.waktu_masuk == waktu_masuk:
+                self.peringatan[nopol] = peringatan
+                tingkat = peringatan.tingkat + 1
+            self._dorong(nopol, data['jenis'], waktu_masuk, tingkat, tumpuk=False)
+        heapq.heapify(self._heap)
+
+    def _dorong(self, nopol, jenis, waktu_masuk, tingkat, tumpuk=True):
+        daftar = self.batas.get(jenis, ())
+        if tingkat >= len(daftar):
+            return
+        self._urutan += 1
+        entri = (waktu_masuk + daftar[tingkat][0], self._urutan, nopol, jenis, waktu_masuk, tingkat)
+        if tumpuk:
+            heapq.heappush(self._heap, entri)
+        else:
+            self._heap.append(entri)
+
+    def masuk(self, nopol, jenis, waktu_masuk):
+        self._aktif[nopol] = waktu_masuk
+        self.peringatan.pop(nopol, None)
+        self._dorong(nopol, jenis, waktu_masuk, 0)
+
+    def keluar(self, nopol):
+        self._aktif.pop(nopol, None)
+        self.peringatan.pop(nopol, None)
+        # Entri basi dibuang sekaligus jika sudah jauh lebih banyak daripada kendaraan aktif
+        if len(self._heap) > 2 * len(self._aktif) + 64:
+            self._heap = [entri for entri in self._heap if self._aktif.get(entri[2]) == entri[4]]
+            heapq.heapify(self._heap)
+
+    def periksa(self, sekarang=None):
+        """Peringatan yang tenggatnya sudah lewat sejak pemeriksaan sebelumnya (urut tenggat)."""
+        sekarang = sekarang or datetime.datetime.now()
+        hasil = []
+        heap = self._heap
+        while heap and heap[0][0] <= sekarang:
+            tenggat, _, nopol, jenis, waktu_masuk, tingkat = heapq.heappop(heap)
+            if self._aktif.get(nopol) != waktu_masuk:
+                continue # sudah checkout (atau masuk lagi dengan waktu lain)
+            # Batas yang sudah terlewati semuanya (mis. setelah aplikasi lama mati) cukup dilaporkan yang tertinggi
+            daftar_batas = self.batas[jenis]
+            while tingkat + 1 < len(daftar_batas) and waktu_masuk + daftar_batas[tingkat + 1][0] <= sekarang:
+                tingkat += 1
+                tenggat = waktu_masuk + daftar_batas[tingkat][0]
+            peringatan = Peringatan(nopol, jenis, waktu_masuk, tenggat, daftar_batas[tingkat][1], tingkat)
+            self.peringatan[nopol] = peringatan
+            hasil.append(peringatan)
+            self._dorong(nopol, jenis, waktu_masuk, tingkat + 1)
+        return hasil
+
+    def daftar(self):
+        """Kendaraan yang sedang diperingatkan, paling lama parkir di depan."""
+        return sorted(self.peringatan.values(), key=lambda p: p.waktu_masuk)
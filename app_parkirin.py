@@ -1,17 +1,31 @@
 # --- Mengimpor pustaka-pustaka yang dibutuhkan ---
 import customtkinter as ctk # untuk membuat aplikasi GUI dengan tampilan modern
 import datetime # untuk bekerja dengan tanggal dan waktu
-import math # untuk operasi matematika (perhitungan)
+import tkinter # kanvas untuk grafik okupansi
 from tkinter import messagebox, StringVar # untuk menampilkan pesan kesalahan atau informasi pada pengguna
-from PIL import Image # untuk memanggil gambar
 import json # untuk menangani file json (membaca, mengedit, dan menyimpan data format JSON)
 import os # untuk berinteraksi dengan sistem operasi
+import sys # untuk membaca argumen --profile
+import time # untuk mengukur waktu start sampai jendela tampil
+import threading # untuk menghitung laporan di luar thread Tk
+from collections import Counter, deque # untuk menghitung widget per jenis di tab Diagnostik dan antrian hasil laporan
+from penyimpanan_parkirin import JurnalRiwayat, LogKendaraanAktif, RiwayatBertahap, UrutanID, iter_array_json # untuk menyimpan riwayat dan kendaraan aktif secara append-only
+from engine_parkirin import ParkingEngine, ParkirError, ParkirPenuh, WaktuTidakValid, TARIF_MOTOR, TARIF_MOBIL, DENDA_TIKET_HILANG, tarif_bawaan # logika parkir tanpa GUI
+from tarif_parkirin import TabelTarif # untuk membaca tarif dari tarif.json
+from penulis_parkirin import PenulisLatar # untuk menulis ke disk di luar thread Tk
+from gambar_parkirin import CacheGambar # untuk gambar yang sudah didekode dan diperkecil
+from metrik_parkirin import METRIK, diukur # untuk mengukur waktu operasi (tab Diagnostik)
+from penjadwal_parkirin import PenjadwalRefresh # untuk menggabungkan pembaruan tampilan per frame
+# Modul yang jarang dipakai (laporan/NumPy, SQLite, partisi, klien server) baru diimpor saat dibutuhkan,
+# agar jendela pertama lebih cepat tampil di kios
 
 # --- Path Absolut untuk Aset-Aset ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PATH_MOBIL = os.path.join(BASE_DIR, "assets", "cctv_mobil.jpg")
 PATH_MOTOR = os.path.join(BASE_DIR, "assets", "cctv_motor.jpg")
 PATH_BG_MENU = os.path.join(BASE_DIR, "assets", "gambar_main.png")
+UKURAN_BG_MENU = (360, 50)
+UKURAN_CCTV = (400, 250)
 
 # --- Komponen Kustom Spinbox ---
 class CTkSpinbox(ctk.CTkFrame):
@@ -67,58 +81,479 @@ class CTkSpinbox(ctk.CTkFrame):
         self.add_button.configure(state=state)
         self.subtract_button.configure(state=state)
 
+# --- Komponen Kustom Daftar Virtual ---
+class DaftarVirtual(ctk.CTkFrame):
+    """
+    Daftar bergulir yang hanya membuat widget untuk baris yang terlihat.
+    Baris diambil lewat `ambil_baris(indeks)` sehingga biaya render tidak bergantung jumlah data.
+    """
+    def __init__(self, *args,
+                 kolom: tuple = (),
+                 bobot: tuple = (),
+                 ambil_baris=None,
+                 jumlah_baris=None,
+                 teks_kosong: str = "-- Tidak ada data --",
+                 tinggi_baris: int = 34,
+                 muat_lagi=None,
+                 **kwargs):
+
+        super().__init__(*args, **kwargs)
+        self.kolom = kolom
+        self.bobot = bobot or (1,) * len(kolom)
+        self.ambil_baris = ambil_baris
+        self.jumlah_baris = jumlah_baris
+        self.muat_lagi = muat_lagi # dipanggil saat mendekati akhir data yang sudah dimuat; True jika data bertambah
+        self.tinggi_baris = tinggi_baris
+        self.offset = 0
+        self.jumlah_terlihat = 20
+        self.pool = [] # daftar (frame, labels, teks_terakhir) yang dipakai ulang saat menggulir
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.grid(row=0, column=0, padx=5, pady=(2, 5), sticky="ew")
+        self._atur_kolom(header)
+        for i, judul in enumerate(kolom):
+            ctk.CTkLabel(header, text=judul, font=ctk.CTkFont(weight="bold"), anchor="w").grid(row=0, column=i, sticky="ew")
+
+        self.isi = ctk.CTkFrame(self, fg_color="transparent")
+        self.isi.grid(row=1, column=0, sticky="nsew")
+        self.isi.grid_columnconfigure(0, weight=1)
+        self.label_kosong = ctk.CTkLabel(self.isi, text=teks_kosong, text_color="gray")
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.gulir)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+
+        self.isi.bind("<Configure>", self._on_resize)
+        self._ikat_roda(self.isi)
+
+    def _atur_kolom(self, frame):
+        for i, bobot in enumerate(self.bobot):
+            frame.grid_columnconfigure(i, weight=bobot)
+
+    def _ikat_roda(self, widget):
+        widget.bind("<MouseWheel>", self._on_roda)
+        widget.bind("<Button-4>", lambda e: self.gulir("scroll", -3, "units"))
+        widget.bind("<Button-5>", lambda e: self.gulir("scroll", 3, "units"))
+
+    def _on_roda(self, event):
+        self.gulir("scroll", -3 if event.delta > 0 else 3, "units")
+
+    def _on_resize(self, event):
+        jumlah = max(1, event.height // self.tinggi_baris + 1)
+        if jumlah != self.jumlah_terlihat:
+            self.jumlah_terlihat = jumlah
+            self.refresh()
+
+    def _buat_baris(self):
+        frame = ctk.CTkFrame(self.isi, height=self.tinggi_baris - 6)
+        self._atur_kolom(frame)
+        labels = []
+        for i in range(len(self.kolom)):
+            label = ctk.CTkLabel(frame, text="", anchor="w")
+            label.grid(row=0, column=i, sticky="ew")
+            self._ikat_roda(label)
+            labels.append(label)
+        self._ikat_roda(frame)
+        baris = [frame, labels, None]
+        self.pool.append(baris)
+        return baris
+
+    def gulir(self, aksi, nilai, satuan=None):
+        total = self.jumlah_baris()
+        if aksi == "moveto":
+            offset = int(float(nilai) * total)
+        elif satuan == "pages":
+            offset = self.offset + int(nilai) * self.jumlah_terlihat
+        else:
+            offset = self.offset + int(nilai)
+        offset = max(0, min(offset, total - self.jumlah_terlihat + 1))
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+
+    def sisip_di_atas(self, jumlah: int = 1):
+        # Jika pengguna sedang melihat bagian bawah, geser offset agar baris yang dilihat tidak berpindah
+        if self.offset > 0:
+            self.offset += jumlah
+        self.refresh()
+
+    @diukur("DaftarVirtual.refresh")
+    def refresh(self):
+        total = self.jumlah_baris()
+        while self.muat_lagi is not None and self.offset + 2 * self.jumlah_terlihat >= total and self.muat_lagi():
+            total = self.jumlah_baris()
+        self.offset = max(0, min(self.offset, total - 1))
+        if total == 0:
+            self.label_kosong.grid(row=0, column=0, pady=10)
+        else:
+            self.label_kosong.grid_remove()
+
+        for k in range(self.jumlah_terlihat):
+            indeks = self.offset + k
+            if indeks >= total:
+                if k < len(self.pool):
+                    self.pool[k][0].grid_remove()
+                continue
+            baris = self.pool[k] if k < len(self.pool) else self._buat_baris()
+            teks = tuple(self.ambil_baris(indeks))
+            if teks != baris[2]:
+                for label, nilai in zip(baris[1], teks):
+                    label.configure(text=nilai)
+                baris[2] = teks
+            baris[0].grid(row=k + 1, column=0, padx=5, pady=3, sticky="ew")
+        for baris in self.pool[self.jumlah_terlihat:]:
+            baris[0].grid_remove()
+
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.jumlah_terlihat) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+# --- Dialog yang dibangun sekali lalu dipakai ulang ---
+class DialogTetap(ctk.CTkToplevel):
+    """
+    Toplevel yang disembunyikan (withdraw) saat ditutup, bukan dihancurkan; transaksi berikutnya
+    hanya mengganti isi teks/gambar lalu menampilkannya lagi (deiconify).
+    Waktu dari `tampilkan_jendela` sampai jendela benar-benar tampil dicatat sebagai metrik `dialog.<nama>`.
+    """
+    def __init__(self, master, nama, judul, ukuran, **kwargs):
+        super().__init__(master, **kwargs)
+        self.withdraw()
+        self.nama = nama
+        self._mulai = None
+        self.title(judul)
+        self.geometry(ukuran)
+        self.transient(master)
+        self.protocol("WM_DELETE_WINDOW", self.sembunyikan)
+        self.bind("<Map>", self._on_map)
+
+    def tampilkan_jendela(self):
+        self._mulai = time.perf_counter()
+        self.deiconify()
+        self.lift()
+
+    def _on_map(self, event):
+        # <Map> juga dikirim untuk setiap widget anak; yang diukur hanya jendela dialognya
+        if event.widget is not self:
+            return
+        if self._mulai is not None:
+            METRIK.catat(f"dialog.{self.nama}", time.perf_counter() - self._mulai, self._mulai)
+            self._mulai = None
+        try:
+            self.grab_set()
+        except tkinter.TclError:
+            pass # jendela lain sedang memegang grab
+
+    def sembunyikan(self):
+        self.grab_release()
+        self.withdraw()
+
+
+class DialogTiket(DialogTetap):
+    """Tiket virtual setelah check-in berhasil."""
+    def __init__(self, master):
+        super().__init__(master, "tiket", "Konfirmasi Tiket", "500x650")
+        self.resizable(False, False)
+        main_frame = ctk.CTkFrame(self)
+        main_frame.pack(expand=True, fill="both", padx=20, pady=20)
+        ctk.CTkLabel(main_frame, text="Check-in Berhasil!", font=master.font(size=24, weight="bold")).pack(pady=(10, 20))
+
+        image_container = ctk.CTkFrame(main_frame, corner_radius=10, border_width=2)
+        image_container.pack(pady=10, padx=20, fill="x")
+        # Hanya salah satu yang di-pack per transaksi: gambar CCTV atau pesan gagal memuat
+        self.label_gambar = ctk.CTkLabel(image_container, text="")
+        self.label_gagal = ctk.CTkLabel(image_container, text="", text_color="gray", height=250, wraplength=380, font=master.font(size=14))
+
+        ticket_info_frame = ctk.CTkFrame(main_frame, corner_radius=10, fg_color=("#EEEEEE", "#333333"))
+        ticket_info_frame.pack(pady=20, padx=20, fill="x")
+        ctk.CTkLabel(ticket_info_frame, text="--- TIKET PARKIR VIRTUAL ---", font=master.font(size=14, weight="bold")).pack(pady=(15, 10))
+        self.label_info = ctk.CTkLabel(ticket_info_frame, text="", font=("Consolas", 14), justify="left")
+        self.label_info.pack(pady=10, padx=20, anchor="w")
+        ctk.CTkLabel(ticket_info_frame, text="--- Harap simpan bukti ini ---", font=master.font(size=12, slant="italic"), text_color="gray").pack(pady=(5, 15))
+
+        ctk.CTkLabel(main_frame, text="Terima Kasih & Selamat Jalan!", font=master.font(size=14)).pack(pady=(0, 20))
+        ctk.CTkButton(main_frame, text="OK", command=self.sembunyikan, width=150, height=40, font=master.font(size=14, weight="bold")).pack(pady=10, side="bottom")
+
+    def tampilkan(self, info_tiket, gambar=None, pesan_gagal=None):
+        """`gambar` CTkImage CCTV atau `pesan_gagal` jika gambar tidak bisa dimuat; keduanya None = tanpa gambar."""
+        self.label_info.configure(text=info_tiket)
+        if gambar is not None:
+            self.label_gagal.pack_forget()
+            self.label_gambar.configure(image=gambar)
+            self.label_gambar.pack(pady=10, padx=10)
+        elif pesan_gagal is not None:
+            self.label_gambar.pack_forget()
+            self.label_gagal.configure(text=pesan_gagal)
+            self.label_gagal.pack(pady=10, padx=10)
+        else:
+            self.label_gambar.pack_forget()
+            self.label_gagal.pack_forget()
+        self.tampilkan_jendela()
+
+
+class DialogPembayaran(DialogTetap):
+    """Rincian biaya checkout dan pilihan metode bayar; `konfirmasi(metode)` dipanggil saat tombol ditekan."""
+    def __init__(self, master):
+        super().__init__(master, "pembayaran", "Konfirmasi Pembayaran", "450x350")
+        self.konfirmasi = None
+        self.label_info = ctk.CTkLabel(self, text="", font=("Consolas", 14), justify="left")
+        self.label_info.pack(pady=20, padx=20)
+
+        self.metode_bayar_var = StringVar(master=self, value="Cash")
+        radio_frame = ctk.CTkFrame(self, fg_color="transparent")
+        radio_frame.pack(pady=10)
+        ctk.CTkRadioButton(radio_frame, text="Tunai (Cash)", variable=self.metode_bayar_var, value="Cash").pack(side="left", padx=10)
+        ctk.CTkRadioButton(radio_frame, text="Cashless (E-Money)", variable=self.metode_bayar_var, value="E-Money").pack(side="left", padx=10)
+        ctk.CTkButton(self, text="Konfirmasi & Selesaikan Transaksi", command=self._on_konfirmasi).pack(pady=20, padx=20)
+
+    def tampilkan(self, info, konfirmasi):
+        self.label_info.configure(text=info)
+        self.metode_bayar_var.set("Cash")
+        self.konfirmasi = konfirmasi
+        self.tampilkan_jendela()
+
+    def _on_konfirmasi(self):
+        konfirmasi, self.konfirmasi = self.konfirmasi, None
+        self.sembunyikan()
+        if konfirmasi is not None:
+            konfirmasi(self.metode_bayar_var.get())
+
 # --- Konfigurasi Aplikasi ---
-TARIF_MOTOR = { "jam_pertama": 3000, "per_jam_berikutnya": 2000 }
-TARIF_MOBIL = { "jam_pertama": 5000, "per_jam_berikutnya": 4000 }
-DENDA_TIKET_HILANG = 50000
+# Tarif bawaan dan denda didefinisikan di engine_parkirin.py; tarif.json (jika ada) menggantikan tarif bawaan
+NAMA_FILE_TARIF = os.path.join(BASE_DIR, "tarif.json")
 NAMA_FILE_RIWAYAT = os.path.join(BASE_DIR, "history", "riwayat_parkir.json")
+# "jurnal": checkout hanya menambah satu baris ke riwayat_parkir.jsonl (dikompaksi di latar belakang)
+# "json"  : setiap checkout menulis ulang seluruh riwayat_parkir.json
+# "sqlite": riwayat dan kendaraan aktif disimpan di parkirin.db (terindeks, aktif tetap ada setelah restart)
+# "partisi": seperti jurnal, tetapi riwayat dipisah per SATUAN_PARTISI di FOLDER_PARTISI; periode yang sudah
+#            lewat diarsipkan (gzip). riwayat_parkir.json lama dipindahkan otomatis saat pertama kali dipakai.
+# "biner" : riwayat disimpan sebagai record lebar tetap di NAMA_FILE_BINER (+ tabel string .str) yang bisa
+#           dibaca proses lain lewat mmap; riwayat_parkir.json lama dikonversi otomatis saat pertama kali dipakai.
+MODE_PENYIMPANAN = "jurnal"
+FOLDER_PARTISI = os.path.join(BASE_DIR, "history", "partisi")
+SATUAN_PARTISI = "bulan"
+NAMA_FILE_DB = os.path.join(BASE_DIR, "history", "parkirin.db")
+NAMA_FILE_BINER = os.path.join(BASE_DIR, "history", "riwayat_parkir.bin")
+NAMA_FILE_AKTIF = os.path.join(BASE_DIR, "history", "kendaraan_aktif.json")
+NAMA_FILE_URUTAN = os.path.join(BASE_DIR, "history", "riwayat_parkir.seq")
+# Penyimpanan ditulis oleh thread latar belakang (mode jurnal/sqlite).
+# "grup"  : event ditulis segera, fsync sekali per INTERVAL_FSYNC detik untuk semua event (cepat di SD card)
+# "setiap": setiap event di-fsync sebelum event berikutnya (tidak ada event yang hilang saat listrik padam)
+MODE_DURABILITAS = "grup"
+INTERVAL_FSYNC = 0.5
+# Seberapa sering thread Tk memeriksa kabar (error/selesai) dari thread penulis
+INTERVAL_KABAR_MS = 250
+# Seberapa sering thread Tk memeriksa hasil thread laporan
+INTERVAL_LAPORAN_MS = 50
+# Jumlah tombol saran nopol yang ditampilkan di bawah input checkout
+JUMLAH_SARAN = 3
+# 0 = satu gerbang. Jika beberapa gerbang berbagi penyimpanan, isi dengan jumlah id yang dipesan per blok.
+UKURAN_BLOK_ID = 0
+# Mode gerbang: isi dengan alamat server_parkirin.py (mis. "http://127.0.0.1:8765") agar semua gerbang
+# memakai kendaraan aktif dan riwayat yang sama. None = aplikasi menyimpan state sendiri.
+ALAMAT_SERVER = None
+# Seberapa sering daftar kendaraan dan riwayat diambil ulang dari server (perubahan dari gerbang lain)
+INTERVAL_SINKRON_MS = 3000
+# Hasil --profile / tombol di tab Diagnostik (tab dibuka dengan Ctrl+Shift+D)
+NAMA_FILE_PROFIL = os.path.join(BASE_DIR, "history", "parkirin.prof")
+NAMA_FILE_JEJAK = os.path.join(BASE_DIR, "history", "parkirin_trace.json")
+# Target start di kios: median waktu sampai jendela tampil (detik) dan jumlah widget Tk sebelum tampil.
+# Diperiksa oleh benchmarks/bench_startup.py; batas widget juga diperiksa unittest.
+TARGET_START_DETIK = 1.5
+BATAS_WIDGET_AWAL = 170
+# Kapasitas lahan per jenis; check-in ditolak ("PENUH") jika sudah tercapai. None = tidak dibatasi.
+# Dalam mode gerbang kapasitas diatur di server (--kapasitas).
+KAPASITAS_PARKIR = {"Mobil": None, "Motor": None}
+# Pilihan rentang grafik di tab Okupansi (menit); paling lama 24 jam disimpan di memori
+RENTANG_GRAFIK_OKUPANSI = {"1 Jam": 60, "4 Jam": 240, "24 Jam": 1440}
+WARNA_OKUPANSI = {"Mobil": "#1f6aa5", "Motor": "#e07b00"}
+# Check-in/checkout hanya menandai tampilan yang berubah; daftar, riwayat, status dan okupansi digambar ulang
+# paling banyak sekian kali per detik, berapa pun jumlah transaksi di antaranya (mis. banyak gerbang sekaligus)
+MAKS_REFRESH_PER_DETIK = 30
+# Peringatan kendaraan yang parkir terlalu lama: {jenis: ((lama parkir, pesan), ...)}; None = BATAS_BAWAAN
+# di alarm_parkirin.py (menginap > 12 jam, diduga ditinggal > 3 hari). Diperiksa setiap detik oleh update_clock.
+BATAS_ALARM = None
 
 class App(ctk.CTk):
-    def __init__(self):
+    def __init__(self, profil=False):
+        self.waktu_mulai = time.perf_counter()
+        self.menit_grafik = None
+        self._font = {}
+        self.dialog = {}
         super().__init__()
+        # --profile: cProfile dan trace aktif sejak awal, disimpan saat jendela ditutup
+        self.profil = profil
+        if profil:
+            METRIK.mulai_profil()
+            METRIK.mulai_jejak()
         self.title("Sistem Parkir Gambir")
         self.geometry("1200x800")
         ctk.set_appearance_mode("System")
         ctk.set_default_color_theme("blue")
-        self.kendaraan_terparkir = {}
-        self.riwayat_parkir = self.muat_riwayat_dari_json()
-        self.last_parkir_id = self.inisialisasi_id_terakhir()
+        self.penulis = PenulisLatar(mode=MODE_DURABILITAS, interval=INTERVAL_FSYNC)
+        self._thread_laporan = None
+        self._hasil_laporan = deque()
+        if ALAMAT_SERVER:
+            # State parkir dipegang server; aplikasi tidak menyimpan apa pun ke disk
+            from klien_parkirin import EngineJarak, KlienParkir
+            self.penyimpanan = self.penyimpanan_aktif = None
+            self.engine = EngineJarak(KlienParkir(ALAMAT_SERVER), batas_alarm=BATAS_ALARM)
+        else:
+            self.penyimpanan = self.buat_penyimpanan()
+            self.penyimpanan_aktif = self.buat_penyimpanan_aktif()
+            # Dalam mode testing id tidak diambil dari file urutan milik aplikasi yang sebenarnya
+            urutan_id = None if os.environ.get('IS_TESTING') else UrutanID(NAMA_FILE_URUTAN)
+            tarif = None if os.environ.get('IS_TESTING') else TabelTarif.dari_file(
+                NAMA_FILE_TARIF, tarif_bawaan(), saat_gagal=lambda pesan: messagebox.showwarning("Tarif", pesan))
+            self.engine = ParkingEngine(self.muat_riwayat_dari_json(), penyimpanan=self.penulis.bungkus(self.penyimpanan),
+                                        penyimpanan_aktif=self.penulis.bungkus(self.penyimpanan_aktif),
+                                        urutan_id=urutan_id, ukuran_blok_id=UKURAN_BLOK_ID, tarif=tarif,
+                                        kapasitas=KAPASITAS_PARKIR, batas_alarm=BATAS_ALARM)
+        self.cache_gambar = CacheGambar(skala=ctk.ScalingTracker.get_widget_scaling(self))
         self.frame_kiri = ctk.CTkFrame(self, width=400, border_width=2, fg_color=ctk.ThemeManager.theme["CTkFrame"]["fg_color"])
         self.frame_kiri.place(relx=0.02, rely=0.04, relwidth=0.35, relheight=0.92)
         self.frame_kanan = ctk.CTkFrame(self, border_width=2)
         self.frame_kanan.place(relx=0.38, rely=0.04, relwidth=0.6, relheight=0.75)
         self.status_box = ctk.CTkTextbox(self, height=100, font=("Consolas", 12), border_width=2)
         self.status_box.place(relx=0.38, rely=0.805, relwidth=0.6, relheight=0.155)
+        self.penjadwal = PenjadwalRefresh(self, MAKS_REFRESH_PER_DETIK)
+        self.penjadwal.daftar("aktif", self.refresh_aktif)
+        self.penjadwal.daftar("okupansi", lambda _: self.update_okupansi())
+        self.penjadwal.daftar("riwayat", self.refresh_riwayat)
+        self.penjadwal.daftar("peringatan", lambda _: self.refresh_peringatan())
+        self.penjadwal.daftar("status", lambda pesan: self.tulis_status(pesan[-1]))
         self.setup_left_panel()
         self.setup_right_panel()
         self.update_daftar_kendaraan()
-        self.update_riwayat()
         self.update_clock()
+        self.periksa_penulis()
+        if ALAMAT_SERVER:
+            self.after(INTERVAL_SINKRON_MS, self.sinkron_server)
+        # Riwayat dirender setelah jendela digambar pertama kali: idle pertama menjalankan
+        # penggambaran yang sudah diantrekan, baru kemudian timer 0 ms memanggil setelah_tampil
+        self.after_idle(self.after, 0, self.setelah_tampil)
+        self.bind("<Control-Shift-D>", lambda event: self.tampilkan_diagnostik())
+        self.bind("<Control-Shift-d>", lambda event: self.tampilkan_diagnostik())
+        if profil:
+            self.tampilkan_diagnostik()
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+    def buat_penyimpanan(self):
+        if MODE_PENYIMPANAN == "jurnal":
+            # fsync diatur oleh PenulisLatar sesuai MODE_DURABILITAS
+            return JurnalRiwayat(NAMA_FILE_RIWAYAT, fsync_setiap=0)
+        if MODE_PENYIMPANAN == "partisi":
+            from partisi_parkirin import RiwayatPartisi
+            return RiwayatPartisi(FOLDER_PARTISI, satuan=SATUAN_PARTISI, fsync_setiap=0, path_lama=NAMA_FILE_RIWAYAT)
+        if MODE_PENYIMPANAN == "sqlite":
+            from sqlite_parkirin import PenyimpananSQLite
+            return PenyimpananSQLite(NAMA_FILE_DB)
+        if MODE_PENYIMPANAN == "biner":
+            from biner_parkirin import RiwayatBiner
+            return RiwayatBiner(NAMA_FILE_BINER, fsync_setiap=0, path_lama=NAMA_FILE_RIWAYAT)
+        return None
+
+    def buat_penyimpanan_aktif(self):
+        # Dalam mode testing kendaraan aktif tidak dipulihkan, agar tes tidak saling memengaruhi
+        if os.environ.get('IS_TESTING'):
+            return None
+        if MODE_PENYIMPANAN == "sqlite":
+            return self.penyimpanan
+        return LogKendaraanAktif(NAMA_FILE_AKTIF, fsync_setiap=0)
+
+    def setelah_tampil(self):
+        METRIK.catat("start.tampil_pertama", time.perf_counter() - self.waktu_mulai)
+        self.update_riwayat()
+        # Dialog tiket dan pembayaran dibangun sekarang (tersembunyi), bukan saat transaksi pertama
+        self.ambil_dialog(DialogTiket)
+        self.ambil_dialog(DialogPembayaran)
+        # Gambar CCTV didekode di latar belakang agar dialog tiket pertama tidak tertahan
+        if not os.environ.get('IS_TESTING'):
+            self.cache_gambar.muat_latar([(PATH_MOBIL, UKURAN_CCTV), (PATH_MOTOR, UKURAN_CCTV)])
+
+    def font(self, size=None, weight="normal", slant="roman"):
+        """CTkFont yang dipakai bersama oleh semua widget dengan ukuran dan gaya yang sama."""
+        kunci = (size, weight, slant)
+        if kunci not in self._font:
+            self._font[kunci] = ctk.CTkFont(size=size, weight=weight, slant=slant)
+        return self._font[kunci]
+
+    def ambil_dialog(self, kelas):
+        """Dialog `kelas` dari pool; dibangun sekali, lalu hanya disembunyikan dan ditampilkan ulang."""
+        dialog = self.dialog.get(kelas)
+        if dialog is None or not dialog.winfo_exists():
+            dialog = self.dialog[kelas] = kelas(self)
+        return dialog
+
+    def on_closing(self):
+        # Pastikan jurnal/database dan id terakhir sudah ditulis ke disk sebelum jendela ditutup
+        self.engine.tutup()
+        self.penulis.tutup()
+        if self.profil:
+            self.simpan_profil()
+            METRIK.hentikan_profil()
+        if self.penyimpanan is not None:
+            self.penyimpanan.tutup()
+        if self.penyimpanan_aktif is not None and self.penyimpanan_aktif is not self.penyimpanan:
+            self.penyimpanan_aktif.tutup()
+        self.destroy()
+
+    # State parkir disimpan di engine; properti ini menjaga nama atribut lama tetap bisa dipakai
+    @property
+    def kendaraan_terparkir(self):
+        return self.engine.kendaraan_terparkir
+
+    @kendaraan_terparkir.setter
+    def kendaraan_terparkir(self, nilai):
+        self.engine.kendaraan_terparkir = nilai
+
+    @property
+    def riwayat_parkir(self):
+        return self.engine.riwayat_parkir
+
+    @riwayat_parkir.setter
+    def riwayat_parkir(self, nilai):
+        self.engine.riwayat_parkir = nilai
+
+    @property
+    def last_parkir_id(self):
+        return self.engine.last_parkir_id
+
+    @last_parkir_id.setter
+    def last_parkir_id(self, nilai):
+        self.engine.last_parkir_id = nilai
 
     def inisialisasi_id_terakhir(self):
-        if not self.riwayat_parkir:
-            return 0
-        max_id = max(item.get('id', 0) for item in self.riwayat_parkir)
-        # print(f"Inisialisasi ID terakhir ke: {max_id}")
-        return max_id
+        return self.engine.inisialisasi_id_terakhir()
 
+    @diukur()
     def muat_riwayat_dari_json(self):
+        if self.penyimpanan is not None:
+            try:
+                return self.penyimpanan.muat()
+            except (json.JSONDecodeError, KeyError, ValueError):
+                return []
         if not os.path.exists(NAMA_FILE_RIWAYAT):
             # print("File riwayat tidak ditemukan. Memulai dengan riwayat kosong.")
             return []
         try:
-            with open(NAMA_FILE_RIWAYAT, 'r') as f:
-                data_mentah = json.load(f)
-                for item in data_mentah:
-                    item['waktu_masuk'] = datetime.datetime.fromisoformat(item['waktu_masuk'])
-                    item['waktu_keluar'] = datetime.datetime.fromisoformat(item['waktu_keluar'])
-                # print(f"Berhasil memuat {len(data_mentah)} data riwayat dari {NAMA_FILE_RIWAYAT}")
-                return data_mentah
+            # Hanya halaman pertama yang dibaca sekarang; sisanya dibaca saat daftar riwayat digulir
+            return RiwayatBertahap(iter_array_json(NAMA_FILE_RIWAYAT))
         except (json.JSONDecodeError, KeyError, FileNotFoundError) as e:
             # print(f"Error membaca file JSON: {e}. Memulai dengan riwayat kosong.")
             return []
 
-    def simpan_riwayat_ke_json(self):
+    @diukur()
+    def simpan_riwayat_ke_json(self, entry_baru=None):
+        # Mode gerbang: transaksi sudah disimpan server saat checkout
+        if ALAMAT_SERVER:
+            return
+        # Mode jurnal/sqlite: cukup tambahkan transaksi baru, tanpa menulis ulang seluruh riwayat
+        if entry_baru is not None and self.penyimpanan is not None:
+            self.engine.simpan_checkout(entry_baru)
+            return
+
         data_untuk_disimpan = []
         for item in self.riwayat_parkir:
             item_copy = item.copy()
@@ -132,6 +567,8 @@ class App(ctk.CTk):
         with open(NAMA_FILE_RIWAYAT, 'w') as f:
             json.dump(data_untuk_disimpan, f, indent=4)
         # print(f"Riwayat berhasil disimpan ke {NAMA_FILE_RIWAYAT}")
+        if entry_baru is not None:
+            self.engine.simpan_checkout(entry_baru)
 
     def setup_left_panel(self):
         self.frame_kiri.grid_rowconfigure(0, weight=0)
@@ -139,7 +576,7 @@ class App(ctk.CTk):
         self.frame_kiri.grid_columnconfigure(0, weight=1)
         self.frame_kiri.configure(fg_color="black")
 
-        self.label_waktu = ctk.CTkLabel(self.frame_kiri, text="", font=ctk.CTkFont(size=18, weight="bold"), text_color="white")
+        self.label_waktu = ctk.CTkLabel(self.frame_kiri, text="", font=self.font(size=18, weight="bold"), text_color="white")
         self.label_waktu.grid(row=0, column=0, padx=20, pady=(30, 10), sticky="ew")
 
         action_area_container = ctk.CTkFrame(self.frame_kiri, corner_radius=10, border_width=0, fg_color="black")
@@ -156,16 +593,16 @@ class App(ctk.CTk):
         # Memuat gambar latar belakang menu, kecuali dalam mode testing
         if not os.environ.get('IS_TESTING'):
             try:
-                menu_bg_image = ctk.CTkImage(Image.open(PATH_BG_MENU), size=(360, 50))
+                menu_bg_image = self.cache_gambar.ambil(PATH_BG_MENU, UKURAN_BG_MENU)
                 menu_bg_label = ctk.CTkLabel(image_top_frame, text="", image=menu_bg_image)
                 menu_bg_label.pack(expand=True, fill="both", padx=10, pady=(0, 15))
             except Exception as e:
                 # print(f"Gagal memuat gambar menu: {e}")
-                fallback_label_img = ctk.CTkLabel(image_top_frame, text="[Gagal Memuat Gambar Menu]", text_color="gray", font=ctk.CTkFont(size=14))
+                fallback_label_img = ctk.CTkLabel(image_top_frame, text="[Gagal Memuat Gambar Menu]", text_color="gray", font=self.font(size=14))
                 fallback_label_img.pack(pady=20, padx=20)
         else:
             # Jika dalam mode testing, tampilkan label pengganti secara langsung
-            fallback_label_img = ctk.CTkLabel(image_top_frame, text="[Mode Testing - Gambar Dinonaktifkan]", text_color="gray", font=ctk.CTkFont(size=14))
+            fallback_label_img = ctk.CTkLabel(image_top_frame, text="[Mode Testing - Gambar Dinonaktifkan]", text_color="gray", font=self.font(size=14))
             fallback_label_img.pack(pady=20, padx=20)
 
 
@@ -173,7 +610,7 @@ class App(ctk.CTk):
         self.checkin_frame = ctk.CTkFrame(action_area_container, fg_color="black")
         self.checkout_frame = ctk.CTkFrame(action_area_container, fg_color="black")
 
-        button_font = ctk.CTkFont(size=16, weight="bold")
+        button_font = self.font(size=16, weight="bold")
         ctk.CTkButton(self.main_selection_frame, text="MASUKKAN KENDARAAN (CHECK-IN)", command=self.show_checkin_view, height=200, font=button_font, fg_color="blue", text_color="white").pack(pady=(10, 15), fill="x", expand=True)
         ctk.CTkButton(self.main_selection_frame, text="KELUARKAN KENDARAAN (CHECK-OUT)", command=self.show_checkout_view, height=200, font=button_font, fg_color="red", text_color="white", hover_color="darkred").pack(pady=(10, 15), fill="x", expand=True)
 
@@ -181,14 +618,13 @@ class App(ctk.CTk):
         self.checkin_frame.grid(row=1, column=0, sticky="nsew", padx=20, pady=(10, 10))
         self.checkout_frame.grid(row=1, column=0, sticky="nsew", padx=20, pady=(10, 10))
 
-        self.populate_checkin_frame()
-        self.populate_checkout_frame()
+        # Isi form check-in/checkout baru dibangun saat pertama kali dibuka (lihat show_checkin_view)
         self.show_main_view()
 
     def populate_checkin_frame(self):
         wrapper = ctk.CTkFrame(self.checkin_frame, fg_color=("#dbdbdb", "#2b2b2b"), corner_radius=8)
         wrapper.pack(expand=True, fill="both", pady=(5, 5), padx=0)
-        ctk.CTkLabel(wrapper, text="Check-in Kendaraan", font=ctk.CTkFont(size=20, weight="bold")).pack(pady=(10,15), padx=20, fill="x")
+        ctk.CTkLabel(wrapper, text="Check-in Kendaraan", font=self.font(size=20, weight="bold")).pack(pady=(10,15), padx=20, fill="x")
         ctk.CTkLabel(wrapper, text="Nomor Polisi", anchor="w").pack(anchor="w", padx=20)
         nopol_frame_in = ctk.CTkFrame(wrapper, fg_color="transparent")
         nopol_frame_in.pack(fill="x", padx=20, pady=(0, 15))
@@ -204,18 +640,33 @@ class App(ctk.CTk):
     def populate_checkout_frame(self):
         wrapper = ctk.CTkFrame(self.checkout_frame, fg_color="transparent", corner_radius=8)
         wrapper.pack(expand=True, fill="both", pady=0, padx=0)
-        ctk.CTkLabel(wrapper, text="Proses Keluar", font=ctk.CTkFont(size=20, weight="bold"), text_color="white").pack(pady=(10,10), padx=20, fill="x")
+        ctk.CTkLabel(wrapper, text="Proses Keluar", font=self.font(size=20, weight="bold"), text_color="white").pack(pady=(10,10), padx=20, fill="x")
         ctk.CTkLabel(wrapper, text="Nomor Polisi", anchor="w", text_color="white").pack(anchor="w", padx=20, pady=(10,0))
-        nopol_frame_out = ctk.CTkFrame(wrapper, fg_color="transparent")
-        nopol_frame_out.pack(fill="x", padx=20, pady=5)
-        self.entry_nopol_out_1 = ctk.CTkEntry(nopol_frame_out, placeholder_text="B"); self.entry_nopol_out_1.pack(side="left", padx=(0,5), fill="x", expand=True)
-        self.entry_nopol_out_2 = ctk.CTkEntry(nopol_frame_out, placeholder_text="1234"); self.entry_nopol_out_2.pack(side="left", padx=5, fill="x", expand=True)
-        self.entry_nopol_out_3 = ctk.CTkEntry(nopol_frame_out, placeholder_text="XYZ"); self.entry_nopol_out_3.pack(side="left", padx=(5,0), fill="x", expand=True)
+        self.nopol_frame_out = ctk.CTkFrame(wrapper, fg_color="transparent")
+        self.nopol_frame_out.pack(fill="x", padx=20, pady=5)
+        self.entry_nopol_out_1 = ctk.CTkEntry(self.nopol_frame_out, placeholder_text="B"); self.entry_nopol_out_1.pack(side="left", padx=(0,5), fill="x", expand=True)
+        self.entry_nopol_out_2 = ctk.CTkEntry(self.nopol_frame_out, placeholder_text="1234"); self.entry_nopol_out_2.pack(side="left", padx=5, fill="x", expand=True)
+        self.entry_nopol_out_3 = ctk.CTkEntry(self.nopol_frame_out, placeholder_text="XYZ"); self.entry_nopol_out_3.pack(side="left", padx=(5,0), fill="x", expand=True)
+        # Saran nopol kendaraan yang sedang parkir, diperbarui setiap kali petugas mengetik
+        self.frame_saran = ctk.CTkFrame(wrapper, fg_color="transparent")
+        self.saran_checkout = []
+        self.tombol_saran = [ctk.CTkButton(self.frame_saran, text="", height=24, fg_color="gray30", command=lambda i=i: self.pilih_saran(i))
+                             for i in range(JUMLAH_SARAN)]
+        for entry in (self.entry_nopol_out_1, self.entry_nopol_out_2, self.entry_nopol_out_3):
+            entry.bind("<KeyRelease>", self.update_saran_checkout)
         self.manual_time_var = ctk.StringVar(value="off")
         self.manual_time_check = ctk.CTkCheckBox(wrapper, text="Gunakan Waktu Keluar Manual", variable=self.manual_time_var, onvalue="on", offvalue="off", command=self.toggle_manual_time_widgets, text_color="white")
         self.manual_time_check.pack(anchor="w", padx=20, pady=(15, 5))
         self.manual_time_frame = ctk.CTkFrame(wrapper, fg_color="transparent")
         self.manual_time_frame.pack(fill="x", padx=20, pady=5)
+        self.check_denda_var = ctk.StringVar(value="off")
+        self.check_denda = ctk.CTkCheckBox(wrapper, text="Tiket Hilang? (Denda Berlaku)", variable=self.check_denda_var, onvalue="on", offvalue="off", text_color="white")
+        self.check_denda.pack(pady=15, padx=20, anchor="w")
+        ctk.CTkButton(wrapper, text="Hitung Biaya & Tampilkan Rincian", command=self.event_checkout, fg_color="#D32F2F", hover_color="#B71C1C", height=40).pack(pady=10, padx=20, fill="x")
+        ctk.CTkButton(wrapper, text="Kembali", command=self.show_main_view, fg_color="gray").pack(pady=(0,10), padx=20, fill="x")
+
+    def populate_manual_time_frame(self):
+        # Enam spinbox waktu manual jarang dipakai, jadi baru dibuat saat kotak centangnya pertama kali dipilih
         now = datetime.datetime.now()
         date_frame = ctk.CTkFrame(self.manual_time_frame, fg_color="transparent"); date_frame.pack(fill="x", pady=(0, 5))
         ctk.CTkLabel(date_frame, text="Tgl/Bln/Thn:", width=80, text_color="white").pack(side="left")
@@ -227,12 +678,6 @@ class App(ctk.CTk):
         self.spin_jam_out = CTkSpinbox(time_frame, min_value=0, max_value=23, start_value=now.hour); self.spin_jam_out.pack(side="left", padx=5, fill="x", expand=True)
         self.spin_mnt_out = CTkSpinbox(time_frame, min_value=0, max_value=59, start_value=now.minute); self.spin_mnt_out.pack(side="left", padx=5, fill="x", expand=True)
         self.spin_dtk_out = CTkSpinbox(time_frame, min_value=0, max_value=59, start_value=now.second); self.spin_dtk_out.pack(side="left", padx=5, fill="x", expand=True)
-        self.toggle_manual_time_widgets()
-        self.check_denda_var = ctk.StringVar(value="off")
-        self.check_denda = ctk.CTkCheckBox(wrapper, text="Tiket Hilang? (Denda Berlaku)", variable=self.check_denda_var, onvalue="on", offvalue="off", text_color="white")
-        self.check_denda.pack(pady=15, padx=20, anchor="w")
-        ctk.CTkButton(wrapper, text="Hitung Biaya & Tampilkan Rincian", command=self.event_checkout, fg_color="#D32F2F", hover_color="#B71C1C", height=40).pack(pady=10, padx=20, fill="x")
-        ctk.CTkButton(wrapper, text="Kembali", command=self.show_main_view, fg_color="gray").pack(pady=(0,10), padx=20, fill="x")
 
     def show_main_view(self): 
         self.checkin_frame.grid_remove()
@@ -240,23 +685,29 @@ class App(ctk.CTk):
         self.main_selection_frame.grid()
     
     def show_checkin_view(self): 
+        if not hasattr(self, 'entry_nopol_in_1'):
+            self.populate_checkin_frame()
         self.main_selection_frame.grid_remove()
         self.checkout_frame.grid_remove()
         self.checkin_frame.grid()
     
     def show_checkout_view(self): 
+        if not hasattr(self, 'entry_nopol_out_1'):
+            self.populate_checkout_frame()
         self.main_selection_frame.grid_remove()
         self.checkin_frame.grid_remove()
         self.checkout_frame.grid()
     
+    @diukur()
     def event_checkin(self):
         nopol = self.get_nopol_from_entries(self.entry_nopol_in_1, self.entry_nopol_in_2, self.entry_nopol_in_3)
-        if not nopol: return messagebox.showerror("Error", "Nomor polisi harus diisi lengkap!")
-        if nopol in self.kendaraan_terparkir: return messagebox.showerror("Error", f"Kendaraan {nopol} sudah terparkir.")
-        
         jenis = self.opsi_jenis.get()
-        waktu_masuk = datetime.datetime.now()
-        self.kendaraan_terparkir[nopol] = {'jenis': jenis, 'waktu_masuk': waktu_masuk}
+        try:
+            waktu_masuk = self.engine.checkin(nopol, jenis)['waktu_masuk']
+        except ParkirPenuh as e:
+            return messagebox.showwarning("PENUH", str(e))
+        except ParkirError as e:
+            return messagebox.showerror("Error", str(e))
         
         tiket_virtual = (f"   Nomor Polisi    : {nopol}\n"
                          f"   Jenis Kendaraan : {jenis}\n\n"
@@ -264,46 +715,28 @@ class App(ctk.CTk):
         
         gambar_path = PATH_MOBIL if jenis == "Mobil" else PATH_MOTOR
         self.buka_dialog_checkin_sukses_modern(tiket_virtual, gambar_path)
-        self.tulis_status(f"✅ Check-in sukses: {nopol} ({waktu_masuk.strftime('%H:%M:%S')})")
-        self.update_daftar_kendaraan()
+        self.penjadwal.tandai("status", f"✅ Check-in sukses: {nopol} ({waktu_masuk.strftime('%H:%M:%S')})")
+        self.penjadwal.tandai("aktif", (nopol, True))
+        self.penjadwal.tandai("okupansi")
         self.entry_nopol_in_1.delete(0, 'end'); self.entry_nopol_in_2.delete(0, 'end'); self.entry_nopol_in_3.delete(0, 'end')
         self.show_main_view()
 
+    @diukur()
     def buka_dialog_checkin_sukses_modern(self, info_tiket, path_gambar):
-        dialog = ctk.CTkToplevel(self)
-        dialog.title("Konfirmasi Tiket")
-        dialog.geometry("500x650")
-        dialog.transient(self); dialog.grab_set(); dialog.resizable(False, False)
-        
-        main_frame = ctk.CTkFrame(dialog)
-        main_frame.pack(expand=True, fill="both", padx=20, pady=20)
-        
-        ctk.CTkLabel(main_frame, text="Check-in Berhasil!", font=ctk.CTkFont(size=24, weight="bold")).pack(pady=(10, 20))
-        
-        image_container = ctk.CTkFrame(main_frame, corner_radius=10, border_width=2)
-        image_container.pack(pady=10, padx=20, fill="x")
-        
+        gambar = pesan_gagal = None
         if not os.environ.get('IS_TESTING'):
             try:
-                image_ctk = ctk.CTkImage(Image.open(path_gambar), size=(400, 250))
-                image_label = ctk.CTkLabel(image_container, text="", image=image_ctk)
-                image_label.pack(pady=10, padx=10)
-            except Exception as e:
-                error_text = f"Gagal memuat gambar:\n{path_gambar}"
-                error_label = ctk.CTkLabel(image_container, text=error_text, text_color="gray", height=250, wraplength=380, font=ctk.CTkFont(size=14))
-                error_label.pack(pady=10, padx=10)
-
-        ticket_info_frame = ctk.CTkFrame(main_frame, corner_radius=10, fg_color=("#EEEEEE", "#333333"))
-        ticket_info_frame.pack(pady=20, padx=20, fill="x")
-        ctk.CTkLabel(ticket_info_frame, text="--- TIKET PARKIR VIRTUAL ---", font=ctk.CTkFont(size=14, weight="bold")).pack(pady=(15, 10))
-        ctk.CTkLabel(ticket_info_frame, text=info_tiket, font=("Consolas", 14), justify="left").pack(pady=10, padx=20, anchor="w")
-        ctk.CTkLabel(ticket_info_frame, text="--- Harap simpan bukti ini ---", font=ctk.CTkFont(size=12, slant="italic"), text_color="gray").pack(pady=(5, 15))
-        
-        ctk.CTkLabel(main_frame, text="Terima Kasih & Selamat Jalan!", font=ctk.CTkFont(size=14)).pack(pady=(0, 20))
-        ctk.CTkButton(main_frame, text="OK", command=dialog.destroy, width=150, height=40, font=ctk.CTkFont(size=14, weight="bold")).pack(pady=10, side="bottom")
+                gambar = self.cache_gambar.ambil(path_gambar, UKURAN_CCTV)
+            except Exception:
+                pesan_gagal = f"Gagal memuat gambar:\n{path_gambar}"
+        self.ambil_dialog(DialogTiket).tampilkan(info_tiket, gambar, pesan_gagal)
 
     def toggle_manual_time_widgets(self):
         state = "normal" if self.manual_time_var.get() == "on" else "disabled"
+        if not hasattr(self, 'spin_tgl_out'):
+            if state == "disabled":
+                return
+            self.populate_manual_time_frame()
         for spinbox in [self.spin_tgl_out, self.spin_bln_out, self.spin_thn_out, self.spin_jam_out, self.spin_mnt_out, self.spin_dtk_out]:
             spinbox.configure_state(state)
 
@@ -318,37 +751,39 @@ class App(ctk.CTk):
             messagebox.showerror("Error Waktu", f"Tanggal tidak valid: {tgl}/{bln}/{thn}.")
             return None
     
+    @diukur()
     def event_checkout(self):
         nopol = self.get_nopol_from_entries(self.entry_nopol_out_1, self.entry_nopol_out_2, self.entry_nopol_out_3)
         if not nopol: return messagebox.showerror("Error", "Nomor polisi checkout harus diisi!")
-        if nopol not in self.kendaraan_terparkir: return messagebox.showerror("Error", f"Kendaraan {nopol} tidak ditemukan.")
+        if nopol not in self.kendaraan_terparkir:
+            pesan = f"Kendaraan {nopol} tidak ditemukan."
+            saran = self.engine.saran_nopol(nopol, JUMLAH_SARAN)
+            if saran:
+                pesan += f"\nMungkin maksud Anda: {', '.join(saran)}"
+            return messagebox.showerror("Error", pesan)
         
         waktu_keluar_aktual = self.get_checkout_time()
         if waktu_keluar_aktual is None: return
         
-        data_parkir = self.kendaraan_terparkir[nopol]
-        waktu_masuk = data_parkir['waktu_masuk']
-        
-        if waktu_keluar_aktual < waktu_masuk: return messagebox.showerror("Error Waktu", "Waktu keluar tidak boleh lebih awal dari waktu masuk.")
-        
         is_denda = self.check_denda_var.get() == "on"
-        total_biaya, info_pembayaran, status_checkout = 0, "", ""
+        try:
+            rincian = self.engine.quote(nopol, waktu_keluar_aktual, tiket_hilang=is_denda)
+        except WaktuTidakValid as e:
+            return messagebox.showerror("Error Waktu", str(e))
+        except ParkirError as e:
+            return messagebox.showerror("Error", str(e))
+
+        waktu_masuk = rincian['waktu_masuk']
+        status_checkout, total_biaya, total_jam = rincian['status'], rincian['total_biaya'], rincian['total_jam']
         
         if is_denda:
-            status_checkout, total_biaya = "Denda Tiket Hilang", DENDA_TIKET_HILANG
             info_pembayaran = f"-- Rincian Denda --\n\n Nopol: {nopol}\n Status: {status_checkout}\n\n TOTAL DENDA : Rp {total_biaya:10,.0f}"
         else:
-            status_checkout = "Lunas"
-            durasi = waktu_keluar_aktual - waktu_masuk
-            total_jam = math.ceil(durasi.total_seconds() / 3600)
-            if total_jam < 1: total_jam = 1
-            
-            hari, sisa_detik = divmod(int(durasi.total_seconds()), 86400)
+            hari, sisa_detik = divmod(int(rincian['durasi'].total_seconds()), 86400)
             jam, sisa_detik = divmod(sisa_detik, 3600)
             menit, _ = divmod(sisa_detik, 60)
             durasi_str = f"{hari} hari, {jam} jam, {menit} menit"
             
-            total_biaya = self.hitung_biaya(data_parkir['jenis'], total_jam)
             info_pembayaran = (f"-- Rincian Pembayaran --\n\n"
                                f"Nopol         : {nopol}\n"
                                f"Waktu Masuk   : {waktu_masuk.strftime('%d-%b %H:%M')}\n"
@@ -361,52 +796,53 @@ class App(ctk.CTk):
         
         self.buka_dialog_pembayaran(nopol, info_pembayaran, total_biaya, status_checkout, waktu_keluar_aktual)
 
+    @diukur()
+    def update_saran_checkout(self, event=None):
+        teks = " ".join(entry.get().strip() for entry in (self.entry_nopol_out_1, self.entry_nopol_out_2, self.entry_nopol_out_3)).strip()
+        self.saran_checkout = self.engine.saran_nopol(teks, JUMLAH_SARAN) if teks else []
+        for i, tombol in enumerate(self.tombol_saran):
+            if i < len(self.saran_checkout):
+                tombol.configure(text=self.saran_checkout[i])
+                tombol.pack(side="left", padx=(0, 5), fill="x", expand=True)
+            else:
+                tombol.pack_forget()
+        if self.saran_checkout:
+            self.frame_saran.pack(fill="x", padx=20, pady=(0, 5), after=self.nopol_frame_out)
+        else:
+            self.frame_saran.pack_forget()
+
+    def pilih_saran(self, indeks):
+        bagian = self.saran_checkout[indeks].split(" ", 2)
+        for entry, teks in zip((self.entry_nopol_out_1, self.entry_nopol_out_2, self.entry_nopol_out_3), bagian + ["", ""]):
+            entry.delete(0, 'end')
+            entry.insert(0, teks)
+        self.saran_checkout = []
+        self.update_saran_checkout()
+
+    @diukur()
     def buka_dialog_pembayaran(self, nopol, info, biaya, status, waktu_keluar_valid):
-        dialog = ctk.CTkToplevel(self)
-        dialog.title("Konfirmasi Pembayaran")
-        dialog.transient(self)
-        dialog.grab_set()
-        dialog.geometry("450x350")
-        
-        ctk.CTkLabel(dialog, text=info, font=("Consolas", 14), justify="left").pack(pady=20, padx=20)
-        
-        metode_bayar_var = StringVar(value="Cash")
-        radio_frame = ctk.CTkFrame(dialog, fg_color="transparent"); 
-        radio_frame.pack(pady=10)
-        
-        ctk.CTkRadioButton(radio_frame, text="Tunai (Cash)", variable=metode_bayar_var, value="Cash").pack(side="left", padx=10)
-        ctk.CTkRadioButton(radio_frame, text="Cashless (E-Money)", variable=metode_bayar_var, value="E-Money").pack(side="left", padx=10)
-        
-        konfirmasi = lambda: (self.proses_pembayaran_final(nopol, biaya, metode_bayar_var.get(), status, waktu_keluar_valid), dialog.destroy())
-        ctk.CTkButton(dialog, text="Konfirmasi & Selesaikan Transaksi", command=konfirmasi).pack(pady=20, padx=20)
+        self.ambil_dialog(DialogPembayaran).tampilkan(
+            info, lambda metode: self.proses_pembayaran_final(nopol, biaya, metode, status, waktu_keluar_valid))
 
+    @diukur()
     def proses_pembayaran_final(self, nopol, total_biaya, metode, status, waktu_keluar):
-        self.last_parkir_id += 1
-        data_lama = self.kendaraan_terparkir[nopol]
-        
-        riwayat_entry = {
-            'id': self.last_parkir_id,
-            'nopol': nopol, 
-            'jenis': data_lama['jenis'], 
-            'waktu_masuk': data_lama['waktu_masuk'], 
-            'waktu_keluar': waktu_keluar, 
-            'total_biaya': total_biaya, 
-            'status': status,
-            'metode_bayar': metode
-        }
-
-        self.riwayat_parkir.insert(0, riwayat_entry)
-        self.simpan_riwayat_ke_json()
-        del self.kendaraan_terparkir[nopol]
-        
-        self.tulis_status(f"✅ Checkout {nopol} selesai. Status: {status}. Bayar: Rp {total_biaya:,.0f} ({metode})")
+        try:
+            riwayat_entry = self.engine.selesaikan_checkout(nopol, total_biaya, metode, status, waktu_keluar)
+        except ParkirError as e:
+            # Mis. kendaraan sudah dikeluarkan lewat gerbang lain atau server tidak bisa dihubungi
+            return messagebox.showerror("Error", str(e))
+        self.simpan_riwayat_ke_json(riwayat_entry)
         
-        self.update_daftar_kendaraan(); 
-        self.update_riwayat()
+        self.penjadwal.tandai("status", f"✅ Checkout {nopol} selesai. Status: {status}. Bayar: Rp {total_biaya:,.0f} ({metode})")
+        self.penjadwal.tandai("aktif", (nopol, False))
+        self.penjadwal.tandai("okupansi")
+        self.penjadwal.tandai("peringatan")
+        self.penjadwal.tandai("riwayat", 1)
         
         self.entry_nopol_out_1.delete(0, 'end'); 
         self.entry_nopol_out_2.delete(0, 'end'); 
         self.entry_nopol_out_3.delete(0, 'end')
+        self.update_saran_checkout()
         self.check_denda.deselect()
         self.manual_time_check.deselect()
         self.toggle_manual_time_widgets()
@@ -416,19 +852,296 @@ class App(ctk.CTk):
         self.frame_kanan.grid_columnconfigure(0, weight=1)
         self.frame_kanan.grid_rowconfigure(0, weight=1)
         
-        tabview = ctk.CTkTabview(self.frame_kanan)
-        tabview.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
+        self.tabview = ctk.CTkTabview(self.frame_kanan, command=self.on_ganti_tab)
+        self.tabview.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
         
-        tab_aktif = tabview.add("Parkir Aktif")
-        tab_riwayat = tabview.add("Riwayat Parkir")
+        tab_aktif = self.tabview.add("Parkir Aktif")
+        tab_riwayat = self.tabview.add("Riwayat Parkir")
+        tab_laporan = self.tabview.add("Laporan")
+        # Isi dua tab ini dibangun saat tab pertama kali dibuka (populate_okupansi, populate_peringatan)
+        self.tabview.add("Okupansi")
+        self.tabview.add("Peringatan")
         
+        self.label_okupansi = ctk.CTkLabel(tab_aktif, text="", font=self.font(size=14, weight="bold"), anchor="w")
+        self.label_okupansi.pack(fill="x", padx=10, pady=(5, 0))
         self.scroll_aktif = ctk.CTkScrollableFrame(tab_aktif); self.scroll_aktif.pack(expand=True, fill="both", padx=5, pady=5)
-        self.scroll_riwayat = ctk.CTkScrollableFrame(tab_riwayat); self.scroll_riwayat.pack(expand=True, fill="both", padx=5, pady=5)
+        self.entry_cari_riwayat = ctk.CTkEntry(tab_riwayat, placeholder_text="Cari nopol di riwayat lalu tekan Enter")
+        self.entry_cari_riwayat.pack(fill="x", padx=5, pady=(5, 0))
+        self.entry_cari_riwayat.bind("<Return>", self.cari_riwayat)
+        self.daftar_riwayat = DaftarVirtual(tab_riwayat,
+                                            kolom=("ID", "No. Pol", "Waktu Keluar", "Total Biaya", "Status", "Metode"),
+                                            bobot=(1, 3, 3, 3, 2, 2),
+                                            ambil_baris=self.format_baris_riwayat,
+                                            jumlah_baris=lambda: len(self.riwayat_parkir),
+                                            muat_lagi=self.muat_halaman_riwayat,
+                                            teks_kosong="-- Riwayat masih kosong --")
+        self.daftar_riwayat.pack(expand=True, fill="both", padx=5, pady=5)
+
+        laporan_atas = ctk.CTkFrame(tab_laporan, fg_color="transparent"); laporan_atas.pack(fill="x", padx=5, pady=5)
+        self.rentang_laporan = ctk.CTkSegmentedButton(laporan_atas, values=["Hari Ini", "7 Hari", "30 Hari", "Semua"])
+        self.rentang_laporan.set("30 Hari")
+        self.rentang_laporan.pack(side="left")
+        ctk.CTkButton(laporan_atas, text="Hitung Laporan", command=self.update_laporan, width=140).pack(side="right")
+        self.box_laporan = ctk.CTkTextbox(tab_laporan, font=("Consolas", 12), state="disabled")
+        self.box_laporan.pack(expand=True, fill="both", padx=5, pady=5)
         
         self.tulis_status("Selamat Datang di Sistem Parkir Gambir !\n---")
 
+    def on_ganti_tab(self):
+        if self.tabview.get() == "Okupansi":
+            if not hasattr(self, 'kanvas_okupansi'):
+                self.populate_okupansi()
+            self.gambar_okupansi()
+        elif self.tabview.get() == "Peringatan":
+            if not hasattr(self, 'daftar_alarm'):
+                self.populate_peringatan()
+            self.refresh_peringatan()
+
+    def populate_peringatan(self):
+        self.peringatan_tampil = []
+        self.daftar_alarm = DaftarVirtual(self.tabview.tab("Peringatan"),
+                                          kolom=("No. Pol", "Jenis", "Waktu Masuk", "Lama Parkir", "Peringatan"),
+                                          bobot=(2, 1, 2, 2, 4),
+                                          ambil_baris=self.format_baris_peringatan,
+                                          jumlah_baris=lambda: len(self.peringatan_tampil),
+                                          teks_kosong="-- Tidak ada kendaraan yang parkir terlalu lama --")
+        self.daftar_alarm.pack(expand=True, fill="both", padx=5, pady=5)
+
+    def refresh_peringatan(self):
+        # Daftar hanya disalin dari AlarmParkir saat tabnya sedang dilihat
+        if hasattr(self, 'daftar_alarm') and self.tabview.get() == "Peringatan":
+            self.peringatan_tampil = self.engine.alarm.daftar()
+            self.daftar_alarm.refresh()
+
+    def format_baris_peringatan(self, indeks):
+        peringatan = self.peringatan_tampil[indeks]
+        jam = int((datetime.datetime.now() - peringatan.waktu_masuk).total_seconds() // 3600)
+        return (peringatan.nopol, peringatan.jenis, peringatan.waktu_masuk.strftime('%d-%b %H:%M'),
+                f"{jam // 24} hari {jam % 24} jam", peringatan.pesan)
+
+    def periksa_alarm(self, sekarang):
+        # Hanya tenggat yang sudah lewat yang diambil dari heap; tidak memindai kendaraan aktif
+        baru = self.engine.alarm.periksa(sekarang)
+        if not baru:
+            return
+        baris = [f"{p.nopol} ({p.jenis}, masuk {p.waktu_masuk.strftime('%d-%b %H:%M')}): {p.pesan}" for p in baru[:5]]
+        if len(baru) > 5:
+            baris.append(f"... dan {len(baru) - 5} kendaraan lain (lihat tab Peringatan)")
+        self.penjadwal.tandai("status", f"⏰ {len(baru)} peringatan parkir baru:\n" + "\n".join(baris))
+        self.penjadwal.tandai("peringatan")
+
+    def populate_okupansi(self):
+        tab = self.tabview.tab("Okupansi")
+        self.rentang_okupansi = ctk.CTkSegmentedButton(tab, values=list(RENTANG_GRAFIK_OKUPANSI),
+                                                       command=lambda _: self.gambar_okupansi())
+        self.rentang_okupansi.set("1 Jam")
+        self.rentang_okupansi.pack(anchor="w", padx=5, pady=5)
+        self.kanvas_okupansi = tkinter.Canvas(tab, highlightthickness=0,
+                                              bg=self._apply_appearance_mode(self.tabview.cget("fg_color")))
+        self.kanvas_okupansi.pack(expand=True, fill="both", padx=5, pady=5)
+        self.kanvas_okupansi.bind("<Configure>", lambda event: self.gambar_okupansi())
+
+    @diukur()
+    def update_okupansi(self):
+        # Dibaca dari penghitung engine (O(1)), bukan dengan menghitung daftar kendaraan aktif
+        bagian, ada_penuh = [], False
+        for jenis, o in self.engine.okupansi.ringkasan().items():
+            if o['kapasitas'] is None:
+                bagian.append(f"{jenis} {o['terisi']}")
+            elif o['terisi'] >= o['kapasitas']:
+                bagian.append(f"{jenis} {o['terisi']}/{o['kapasitas']} PENUH")
+                ada_penuh = True
+            else:
+                bagian.append(f"{jenis} {o['terisi']}/{o['kapasitas']}")
+        self.label_okupansi.configure(text="Terisi: " + " · ".join(bagian),
+                                      text_color="red" if ada_penuh else ctk.ThemeManager.theme["CTkLabel"]["text_color"])
+        if hasattr(self, 'kanvas_okupansi') and self.tabview.get() == "Okupansi":
+            self.gambar_okupansi()
+
+    @diukur()
+    def gambar_okupansi(self):
+        """Grafik garis okupansi per jenis dari ring buffer engine (tidak memindai kendaraan atau riwayat)."""
+        kanvas = self.kanvas_okupansi
+        kanvas.delete("all")
+        lebar, tinggi = kanvas.winfo_width(), kanvas.winfo_height()
+        if lebar < 50 or tinggi < 50:
+            return # belum ditata
+        okupansi = self.engine.okupansi
+        deret = okupansi.deret(RENTANG_GRAFIK_OKUPANSI[self.rentang_okupansi.get()])
+        kapasitas = [k for k in okupansi.kapasitas.values() if k is not None]
+        puncak = max([1] + kapasitas + [max(nilai.values(), default=0) for _, nilai in deret])
+        kiri, kanan, atas, bawah = 40, lebar - 10, 25, tinggi - 25
+        warna_teks = self._apply_appearance_mode(ctk.ThemeManager.theme["CTkLabel"]["text_color"])
+
+        def y(nilai):
+            return bawah - (bawah - atas) * nilai / puncak
+        kanvas.create_line(kiri, atas, kiri, bawah, kanan, bawah, fill="gray")
+        kanvas.create_text(kiri - 5, y(puncak), text=str(puncak), anchor="e", fill=warna_teks)
+        kanvas.create_text(kiri - 5, bawah, text="0", anchor="e", fill=warna_teks)
+        kanvas.create_text(kiri, bawah + 5, text=deret[0][0].strftime('%H:%M'), anchor="nw", fill=warna_teks)
+        kanvas.create_text(kanan, bawah + 5, text=deret[-1][0].strftime('%H:%M'), anchor="ne", fill=warna_teks)
+        langkah = (kanan - kiri) / max(1, len(deret) - 1)
+        for i, (jenis, warna) in enumerate(WARNA_OKUPANSI.items()):
+            if okupansi.kapasitas.get(jenis) is not None:
+                kanvas.create_line(kiri, y(okupansi.kapasitas[jenis]), kanan, y(okupansi.kapasitas[jenis]), fill=warna, dash=(4, 3))
+            titik = []
+            for j, (_, nilai) in enumerate(deret):
+                titik += (kiri + j * langkah, y(nilai.get(jenis, 0)))
+            if len(titik) >= 4:
+                kanvas.create_line(*titik, fill=warna, width=2)
+            kanvas.create_text(kiri + 10 + i * 110, atas - 15, text=f"■ {jenis} {okupansi.terisi.get(jenis, 0)}",
+                               anchor="w", fill=warna)
+
+    @diukur()
+    def cari_riwayat(self, event=None):
+        teks = self.entry_cari_riwayat.get().strip()
+        if not teks:
+            return
+        hasil = self.engine.cari_nopol_riwayat(teks)
+        if hasil:
+            self.tulis_status(f"🔍 Nopol di riwayat yang cocok dengan '{teks}':\n{', '.join(hasil)}")
+        else:
+            self.tulis_status(f"🔍 Tidak ada nopol di riwayat yang cocok dengan '{teks}'.")
+
+    def sumber_laporan(self, awal):
+        """
+        Fungsi tanpa argumen yang mengembalikan riwayat untuk laporan; dipanggil di thread laporan,
+        jadi tidak boleh membaca objek yang sedang diubah thread Tk.
+        """
+        riwayat, penyimpanan = self.riwayat_parkir, self.penyimpanan
+
+        def dari_disk():
+            self.penulis.tunggu()
+            # Mode partisi: hanya arsip yang beririsan dengan rentang laporan yang dibuka
+            return penyimpanan.rentang(awal) if hasattr(penyimpanan, 'rentang') else penyimpanan.muat()
+
+        if hasattr(penyimpanan, 'rentang'):
+            return dari_disk
+        if hasattr(riwayat, 'salin') and getattr(riwayat, 'selesai', True):
+            # Riwayat sudah dimuat penuh: salinan kolom dibuat di sini (cepat), agregasinya di thread laporan
+            salinan = riwayat.salin()
+            return lambda: salinan
+        if isinstance(riwayat, list):
+            salinan = list(riwayat)
+            return lambda: salinan
+        if penyimpanan is not None:
+            # Riwayat bertahap/SQLite: dibaca ulang dari disk di thread laporan, tanpa menyentuh daftar yang tampil
+            return dari_disk
+        # Mode server: koneksi sendiri, karena koneksi engine dipakai thread Tk
+        from klien_parkirin import KlienParkir, RiwayatJarak
+        return lambda: RiwayatJarak(KlienParkir(ALAMAT_SERVER))
+
+    @diukur()
+    def update_laporan(self):
+        # Laporan hanya dihitung saat diminta, karena seluruh riwayat harus dibaca; perhitungannya
+        # berjalan di thread sendiri dan hasilnya diambil periksa_laporan lewat after()
+        if self._thread_laporan is not None and self._thread_laporan.is_alive():
+            return
+        from laporan_parkirin import buat_laporan, format_laporan # NumPy baru diimpor di sini
+        hari_ini = datetime.datetime.combine(datetime.date.today(), datetime.time())
+        rentang = {"Hari Ini": 1, "7 Hari": 7, "30 Hari": 30}.get(self.rentang_laporan.get())
+        awal = hari_ini - datetime.timedelta(days=rentang - 1) if rentang else None
+        sumber = self.sumber_laporan(awal)
+
+        def hitung():
+            try:
+                self._hasil_laporan.append((format_laporan(buat_laporan(sumber(), awal=awal)), None))
+            except Exception as e:
+                self._hasil_laporan.append((None, e))
+
+        self.tulis_laporan("Menghitung laporan...")
+        self._thread_laporan = threading.Thread(target=hitung, daemon=True, name="laporan-parkirin")
+        self._thread_laporan.start()
+        self.after(INTERVAL_LAPORAN_MS, self.periksa_laporan)
+
+    def periksa_laporan(self):
+        # Hasil dari thread laporan hanya ditulis ke widget di thread Tk
+        if not self._hasil_laporan:
+            self.after(INTERVAL_LAPORAN_MS, self.periksa_laporan)
+            return
+        teks, galat = self._hasil_laporan.popleft()
+        self.tulis_laporan(teks if galat is None else f"⚠️ Gagal menghitung laporan: {galat}")
+
+    def tulis_laporan(self, teks):
+        self.box_laporan.configure(state="normal")
+        self.box_laporan.delete("0.0", "end")
+        self.box_laporan.insert("0.0", teks)
+        self.box_laporan.configure(state="disabled")
+
+    def tampilkan_diagnostik(self):
+        # Tab tersembunyi: baru dibuat saat Ctrl+Shift+D ditekan atau aplikasi dijalankan dengan --profile
+        if not hasattr(self, 'box_diagnostik'):
+            tab = self.tabview.add("Diagnostik")
+            tombol = ctk.CTkFrame(tab, fg_color="transparent"); tombol.pack(fill="x", padx=5, pady=5)
+            ctk.CTkButton(tombol, text="Segarkan", command=self.update_diagnostik, width=110).pack(side="left")
+            ctk.CTkButton(tombol, text="Reset", command=lambda: (METRIK.reset(), self.update_diagnostik()), width=80).pack(side="left", padx=5)
+            ctk.CTkButton(tombol, text="Simpan Profil & Trace", command=self.simpan_profil, width=170).pack(side="right")
+            ctk.CTkButton(tombol, text="Mulai Profil", command=self.mulai_profil, width=110).pack(side="right", padx=5)
+            self.box_diagnostik = ctk.CTkTextbox(tab, font=("Consolas", 12), state="disabled")
+            self.box_diagnostik.pack(expand=True, fill="both", padx=5, pady=5)
+        self.tabview.set("Diagnostik")
+        self.update_diagnostik()
+
+    def hitung_widget(self):
+        """Jumlah widget Tk per kelas, mulai dari jendela utama (termasuk dialog yang masih terbuka)."""
+        jumlah = Counter()
+        tumpukan = [self]
+        while tumpukan:
+            widget = tumpukan.pop()
+            jumlah[type(widget).__name__] += 1
+            tumpukan.extend(widget.winfo_children())
+        return jumlah
+
+    def update_diagnostik(self):
+        widget = self.hitung_widget()
+        teks = (f"Kendaraan aktif : {len(self.kendaraan_terparkir):,}\n"
+                f"Riwayat dimuat  : {len(self.riwayat_parkir):,}\n"
+                f"Widget          : {sum(widget.values()):,} "
+                f"({', '.join(f'{nama} {n}' for nama, n in widget.most_common(4))})\n"
+                f"Penulis         : {self.penulis.metrik()}\n"
+                f"Profil          : {'aktif' if METRIK.profil is not None else 'tidak aktif'}\n\n"
+                + METRIK.format_ringkasan())
+        self.box_diagnostik.configure(state="normal")
+        self.box_diagnostik.delete("0.0", "end")
+        self.box_diagnostik.insert("0.0", teks)
+        self.box_diagnostik.configure(state="disabled")
+
+    def mulai_profil(self):
+        METRIK.mulai_profil()
+        METRIK.mulai_jejak()
+        self.update_diagnostik()
+
+    def simpan_profil(self):
+        if not METRIK.simpan_profil(NAMA_FILE_PROFIL):
+            return self.tulis_status("📈 Profil belum dimulai (tekan Mulai Profil atau jalankan dengan --profile).")
+        METRIK.simpan_jejak(NAMA_FILE_JEJAK)
+        self.tulis_status(f"📈 cProfile disimpan ke {NAMA_FILE_PROFIL}\n📈 Trace disimpan ke {NAMA_FILE_JEJAK}")
+
+    def periksa_penulis(self):
+        # Kabar dari thread penulis hanya diproses di thread Tk
+        for galat in self.penulis.jalankan_kabar():
+            self.tulis_status(f"⚠️ Gagal menyimpan ke disk: {galat}")
+        self.after(INTERVAL_KABAR_MS, self.periksa_penulis)
+
+    def sinkron_server(self):
+        # Kendaraan yang masuk/keluar lewat gerbang lain ikut tampil di daftar
+        try:
+            if self.engine.segarkan():
+                self.penjadwal.tandai("aktif")
+                self.penjadwal.tandai("peringatan")
+                self.penjadwal.tandai("riwayat")
+        except ParkirError as e:
+            self.tulis_status(f"⚠️ {e}")
+        self.after(INTERVAL_SINKRON_MS, self.sinkron_server)
+
     def update_clock(self): 
-        self.label_waktu.configure(text=datetime.datetime.now().strftime("%A, %d %B %Y | %H:%M:%S"))
+        sekarang = datetime.datetime.now()
+        self.label_waktu.configure(text=sekarang.strftime("%A, %d %B %Y | %H:%M:%S"))
+        self.periksa_alarm(sekarang)
+        # Grafik okupansi yang sedang dilihat digeser setiap pergantian menit
+        if sekarang.minute != self.menit_grafik and hasattr(self, 'kanvas_okupansi') and self.tabview.get() == "Okupansi":
+            self.menit_grafik = sekarang.minute
+            self.gambar_okupansi()
         self.after(1000, self.update_clock)
 
     def get_nopol_from_entries(self, p1, p2, p3):
@@ -440,85 +1153,113 @@ class App(ctk.CTk):
         nopol = f"{part1} {part2} {part3}".upper()
         return nopol
     
-    def hitung_biaya(self, jenis, total_jam): 
-        tarif = TARIF_MOBIL if jenis == 'Mobil' else TARIF_MOTOR
-        return tarif['jam_pertama'] if total_jam <= 1 else tarif['jam_pertama'] + (total_jam - 1) * tarif['per_jam_berikutnya']
+    def hitung_biaya(self, jenis, total_jam, waktu_masuk): 
+        return self.engine.hitung_biaya(jenis, total_jam, waktu_masuk)
     
     def tulis_status(self, pesan): 
+        # Pesan langsung menggantikan pesan transaksi yang belum sempat ditampilkan
+        self.penjadwal.buang("status")
         self.status_box.configure(state="normal")
         self.status_box.delete("0.0", "end")
         self.status_box.insert("0.0", pesan)
         self.status_box.configure(state="disabled")
     
+    @diukur()
     def update_daftar_kendaraan(self):
+        # Bangun ulang penuh; hanya dipakai saat start. Check-in/checkout memakai tambah/hapus_baris_aktif.
         for widget in self.scroll_aktif.winfo_children(): 
             widget.destroy()
-        
-        if not self.kendaraan_terparkir: 
-            ctk.CTkLabel(self.scroll_aktif, text="-- Tidak ada kendaraan aktif --", text_color="gray").pack(pady=10)
+        self.baris_aktif = {}
+
+        self.label_aktif_kosong = ctk.CTkLabel(self.scroll_aktif, text="-- Tidak ada kendaraan aktif --", text_color="gray")
+        self.header_aktif = ctk.CTkFrame(self.scroll_aktif, fg_color="transparent")
+        self.header_aktif.grid_columnconfigure((0, 1, 2), weight=1)
+        ctk.CTkLabel(self.header_aktif, text="No. Pol", font=self.font(weight="bold")).grid(row=0, column=0)
+        ctk.CTkLabel(self.header_aktif, text="Jenis", font=self.font(weight="bold")).grid(row=0, column=1)
+        ctk.CTkLabel(self.header_aktif, text="Waktu Masuk", font=self.font(weight="bold")).grid(row=0, column=2)
+        self.label_aktif_kosong.pack(pady=10)
+
+        # Waktu masuk selalu bertambah, jadi urutan dict sudah urut dari yang paling lama
+        for nopol in self.kendaraan_terparkir:
+            self.tambah_baris_aktif(nopol)
+        self.update_okupansi()
+
+    def refresh_aktif(self, perubahan):
+        """Dipanggil penjadwal dengan [(nopol, masuk)] sejak refresh terakhir; None = bangun ulang penuh."""
+        if None in perubahan:
+            return self.update_daftar_kendaraan()
+        # Hanya keadaan terakhir setiap nopol yang digambar (masuk lalu keluar sebelum refresh = tidak ada baris),
+        # diurutkan menurut perubahan terakhirnya agar kendaraan yang masuk paling akhir tetap di atas
+        terakhir, pernah_keluar = {}, set()
+        for nopol, masuk in perubahan:
+            terakhir.pop(nopol, None)
+            terakhir[nopol] = masuk
+            if not masuk:
+                pernah_keluar.add(nopol)
+        for nopol, masuk in terakhir.items():
+            # Keluar lalu masuk lagi: baris lama (waktu masuk dan posisi lama) diganti baris baru
+            if not masuk or nopol in pernah_keluar:
+                self.hapus_baris_aktif(nopol)
+            if masuk and nopol not in self.baris_aktif:
+                self.tambah_baris_aktif(nopol)
+
+    def refresh_riwayat(self, perubahan):
+        """Dipanggil penjadwal dengan jumlah baris baru di atas riwayat; None = render ulang."""
+        if None in perubahan:
+            self.update_riwayat()
         else:
-            header = ctk.CTkFrame(self.scroll_aktif, fg_color="transparent")
-            header.pack(fill="x", padx=5)
-            header.grid_columnconfigure((0, 1, 2), weight=1)
-            
-            ctk.CTkLabel(header, text="No. Pol", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0)
-            ctk.CTkLabel(header, text="Jenis", font=ctk.CTkFont(weight="bold")).grid(row=0, column=1)
-            ctk.CTkLabel(header, text="Waktu Masuk", font=ctk.CTkFont(weight="bold")).grid(row=0, column=2)
-
-            for nopol, data in sorted(self.kendaraan_terparkir.items(), key=lambda item: item[1]['waktu_masuk'], reverse=True):
-                item = ctk.CTkFrame(self.scroll_aktif); item.pack(fill="x", padx=5, pady=3)
-                item.grid_columnconfigure((0, 1, 2), weight=1)
-                ctk.CTkLabel(item, text=nopol).grid(row=0, column=0)
-                ctk.CTkLabel(item, text=data['jenis']).grid(row=0, column=1)
-                ctk.CTkLabel(item, text=data['waktu_masuk'].strftime('%d-%b %H:%M:%S')).grid(row=0, column=2)
+            self.daftar_riwayat.sisip_di_atas(sum(perubahan))
+
+    @diukur()
+    def tambah_baris_aktif(self, nopol):
+        data = self.kendaraan_terparkir[nopol]
+        if not self.baris_aktif:
+            self.label_aktif_kosong.pack_forget()
+            self.header_aktif.pack(fill="x", padx=5)
+
+        item = ctk.CTkFrame(self.scroll_aktif)
+        item.grid_columnconfigure((0, 1, 2), weight=1)
+        ctk.CTkLabel(item, text=nopol).grid(row=0, column=0)
+        ctk.CTkLabel(item, text=data['jenis']).grid(row=0, column=1)
+        ctk.CTkLabel(item, text=data['waktu_masuk'].strftime('%d-%b %H:%M:%S')).grid(row=0, column=2)
+
+        # Kendaraan terbaru tampil paling atas, tepat di bawah header
+        if self.baris_aktif:
+            item.pack(fill="x", padx=5, pady=3, before=next(reversed(self.baris_aktif.values())))
+        else:
+            item.pack(fill="x", padx=5, pady=3)
+        self.baris_aktif[nopol] = item
+
+    @diukur()
+    def hapus_baris_aktif(self, nopol):
+        item = self.baris_aktif.pop(nopol, None)
+        if item is not None:
+            item.destroy()
+        if not self.baris_aktif:
+            self.header_aktif.pack_forget()
+            self.label_aktif_kosong.pack(pady=10)
     
+    @diukur()
     def update_riwayat(self):
-        for widget in self.scroll_riwayat.winfo_children(): widget.destroy()
-        
-        if not self.riwayat_parkir:
-            ctk.CTkLabel(self.scroll_riwayat, text="-- Riwayat masih kosong --", text_color="gray").pack(pady=10)
-            return
-        
-        header = ctk.CTkFrame(self.scroll_riwayat, fg_color="transparent")
-        header.pack(fill="x", padx=5, pady=(2,5))
-        header.grid_columnconfigure(0, weight=1)
-        header.grid_columnconfigure(1, weight=3)
-        header.grid_columnconfigure(2, weight=3)
-        header.grid_columnconfigure(3, weight=3)
-        header.grid_columnconfigure(4, weight=2)
-        header.grid_columnconfigure(5, weight=2)
-
-        ctk.CTkLabel(header, text="ID", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, sticky="w")
-        ctk.CTkLabel(header, text="No. Pol", font=ctk.CTkFont(weight="bold")).grid(row=0, column=1, sticky="w")
-        ctk.CTkLabel(header, text="Waktu Keluar", font=ctk.CTkFont(weight="bold")).grid(row=0, column=2, sticky="w")
-        ctk.CTkLabel(header, text="Total Biaya", font=ctk.CTkFont(weight="bold")).grid(row=0, column=3, sticky="w")
-        ctk.CTkLabel(header, text="Status", font=ctk.CTkFont(weight="bold")).grid(row=0, column=4, sticky="w")
-        ctk.CTkLabel(header, text="Metode", font=ctk.CTkFont(weight="bold")).grid(row=0, column=5, sticky="w")
-
-        for data in self.riwayat_parkir:
-            item = ctk.CTkFrame(self.scroll_riwayat)
-            item.pack(fill="x", padx=5, pady=3)
-            item.grid_columnconfigure(0, weight=1)
-            item.grid_columnconfigure(1, weight=3)
-            item.grid_columnconfigure(2, weight=3)
-            item.grid_columnconfigure(3, weight=3)
-            item.grid_columnconfigure(4, weight=2)
-            item.grid_columnconfigure(5, weight=2)
-            
-            id_val = data.get('id', '-')
-            nopol_val = data.get('nopol', '-')
-            waktu_keluar_val = data.get('waktu_keluar').strftime('%d-%b %H:%M') if data.get('waktu_keluar') else '-'
-            biaya_val = f"Rp {data.get('total_biaya', 0):,.0f}"
-            status_val = data.get('status', '-')
-            metode_val = data.get('metode_bayar', '-')
-
-            ctk.CTkLabel(item, text=id_val, anchor="w").grid(row=0, column=0, sticky="ew")
-            ctk.CTkLabel(item, text=nopol_val, anchor="w").grid(row=0, column=1, sticky="ew")
-            ctk.CTkLabel(item, text=waktu_keluar_val, anchor="w").grid(row=0, column=2, sticky="ew")
-            ctk.CTkLabel(item, text=biaya_val, anchor="w").grid(row=0, column=3, sticky="ew")
-            ctk.CTkLabel(item, text=status_val, anchor="w").grid(row=0, column=4, sticky="ew")
-            ctk.CTkLabel(item, text=metode_val, anchor="w").grid(row=0, column=5, sticky="ew")
+        self.daftar_riwayat.refresh()
+
+    @diukur()
+    def muat_halaman_riwayat(self):
+        # Riwayat bertahap (file JSON) dibaca per halaman saat pengguna menggulir mendekati akhir
+        riwayat = self.riwayat_parkir
+        if hasattr(riwayat, 'muat_berikutnya') and not riwayat.selesai:
+            return riwayat.muat_berikutnya() > 0
+        return False
+
+    def format_baris_riwayat(self, indeks):
+        data = self.riwayat_parkir[indeks]
+        return (str(data.get('id', '-')),
+                data.get('nopol', '-'),
+                data.get('waktu_keluar').strftime('%d-%b %H:%M') if data.get('waktu_keluar') else '-',
+                f"Rp {data.get('total_biaya', 0):,.0f}",
+                data.get('status', '-'),
+                data.get('metode_bayar', '-'))
 
 if __name__ == "__main__":
-    app = App()
+    app = App(profil="--profile" in sys.argv)
     app.mainloop()
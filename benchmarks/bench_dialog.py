@@ -0,0 +1,72 @@
+# --- Latensi buka dialog tiket/pembayaran: dibangun per transaksi vs diambil dari pool ---
+# Jalankan: python benchmarks/bench_dialog.py [--ulang 30]
+# Latensi diukur dari pemanggilan sampai event <Map> jendela dialog (dialog benar-benar tampil); butuh display.
+# Belum ada angka hasil ukur yang tercatat: jalankan di mesin dengan display dan catat p50/p99 di sini.
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def tunggu_tampil(app, dialog):
+    while dialog._mulai is not None:
+        app.update()
+
+
+def ukur(app, kelas, isi, ulang, pool):
+    """Histogram waktu buka dialog; `pool=False` meniru cara lama (Toplevel baru lalu dihancurkan)."""
+    from metrik_parkirin import METRIK
+    METRIK.reset()
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        dialog = app.ambil_dialog(kelas) if pool else kelas(app)
+        isi(dialog)
+        if not pool:
+            # Waktu membangun widget ikut dihitung, seperti buka_dialog_* sebelum ada pool
+            dialog._mulai = mulai
+        tunggu_tampil(app, dialog)
+        nama = f"dialog.{dialog.nama}"
+        if pool:
+            dialog.sembunyikan()
+        else:
+            dialog.destroy()
+        app.update()
+    return METRIK.histogram[nama]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latensi buka dialog Parkirin")
+    parser.add_argument("--ulang", type=int, default=30)
+    args = parser.parse_args()
+
+    import tkinter
+    import app_parkirin
+    with tempfile.TemporaryDirectory() as folder:
+        app_parkirin.NAMA_FILE_RIWAYAT = os.path.join(folder, "riwayat_parkir.json")
+        app_parkirin.NAMA_FILE_AKTIF = os.path.join(folder, "kendaraan_aktif.json")
+        app_parkirin.NAMA_FILE_URUTAN = os.path.join(folder, "riwayat_parkir.seq")
+        try:
+            app = app_parkirin.App()
+        except tkinter.TclError as e:
+            print(f"tidak ada display: {e}")
+            return
+        app.update()
+        gambar = app.cache_gambar.ambil(app_parkirin.PATH_MOBIL, app_parkirin.UKURAN_CCTV)
+        skenario = {
+            "tiket": (app_parkirin.DialogTiket, lambda d: d.tampilkan("   Nomor Polisi    : B 1234 XYZ", gambar)),
+            "pembayaran": (app_parkirin.DialogPembayaran, lambda d: d.tampilkan("-- Rincian Pembayaran --", lambda metode: None)),
+        }
+        print(f"Buka dialog ({args.ulang}x), dari pemanggilan sampai jendela tampil:")
+        for nama, (kelas, isi) in skenario.items():
+            baru = ukur(app, kelas, isi, args.ulang, pool=False)
+            pool = ukur(app, kelas, isi, args.ulang, pool=True)
+            print(f"  {nama:<11} dibangun ulang: p50 {baru.persentil(0.5) * 1000:7.1f} ms  p99 {baru.persentil(0.99) * 1000:7.1f} ms"
+                  f"   | pool: p50 {pool.persentil(0.5) * 1000:7.1f} ms  p99 {pool.persentil(0.99) * 1000:7.1f} ms")
+        app.on_closing()
+
+
+if __name__ == "__main__":
+    main()
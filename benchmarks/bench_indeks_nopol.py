@@ -0,0 +1,55 @@
+# --- Benchmark: saran nomor polisi saat checkout ---
+# Jalankan: python benchmarks/bench_indeks_nopol.py [jumlah_nopol]
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indeks_parkirin import IndeksNopol # noqa: E402
+
+WILAYAH = ("B", "D", "F", "AB", "AD", "L", "N", "DK", "BK", "H")
+
+
+def buat_nopol(jumlah):
+    random.seed(7)
+    hasil = set()
+    while len(hasil) < jumlah:
+        akhiran = "".join(random.choices(string.ascii_uppercase, k=random.randint(1, 3)))
+        hasil.add(f"{random.choice(WILAYAH)} {random.randint(1, 9999)} {akhiran}")
+    return list(hasil)
+
+
+def salah_ketik(nopol):
+    huruf = list(nopol.replace(" ", ""))
+    i = random.randrange(len(huruf))
+    huruf[i] = random.choice(string.ascii_uppercase + string.digits)
+    return "".join(huruf)
+
+
+def ukur(nama, indeks, daftar_teks, fungsi):
+    mulai = time.perf_counter()
+    ketemu = sum(1 for teks in daftar_teks if fungsi(indeks, teks))
+    rata = (time.perf_counter() - mulai) / len(daftar_teks)
+    print(f"  {nama:<28}: {rata * 1e6:8.1f} us/pencarian ({ketemu}/{len(daftar_teks)} ada hasil)")
+
+
+def main():
+    jumlah = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    daftar = buat_nopol(jumlah)
+    mulai = time.perf_counter()
+    indeks = IndeksNopol(daftar)
+    print(f"Indeks {jumlah:,} nopol dibangun dalam {time.perf_counter() - mulai:.2f} s")
+
+    sampel = random.sample(daftar, 1000)
+    ukur("awalan (3 huruf)", indeks, [n.replace(" ", "")[:3] for n in sampel], lambda i, t: i.awalan(t))
+    ukur("mirip (1 salah ketik)", indeks, [salah_ketik(n) for n in sampel], lambda i, t: i.mirip(t))
+    ukur("saran (nopol lengkap)", indeks, sampel, lambda i, t: i.saran(t))
+    ukur("scan linear (pembanding)", daftar, [n.replace(" ", "")[:3] for n in sampel[:50]],
+         lambda d, t: [n for n in d if n.replace(" ", "").startswith(t)][:5])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# --- Benchmark: waktu restart dengan banyak tiket terbuka ---
+# Jalankan: python benchmarks/bench_restart_aktif.py [jumlah_tiket] [jumlah_event_tambahan]
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from penyimpanan_parkirin import LogKendaraanAktif # noqa: E402
+from sqlite_parkirin import PenyimpananSQLite # noqa: E402
+
+
+def isi(penyimpanan, jumlah_tiket, jumlah_event):
+    awal = datetime.datetime(2024, 6, 24, 6, 0, 0)
+    # Churn: kendaraan yang masuk lalu keluar lagi, menambah panjang riwayat event
+    for i in range(jumlah_event):
+        nopol = f"X {i} CHURN"
+        penyimpanan.catat_masuk(nopol, {'jenis': "Motor", 'waktu_masuk': awal})
+        penyimpanan.catat_keluar(nopol)
+    for i in range(jumlah_tiket):
+        penyimpanan.catat_masuk(f"B {i} TST", {'jenis': "Mobil" if i % 3 else "Motor", 'waktu_masuk': awal + datetime.timedelta(seconds=i)})
+    penyimpanan.tutup()
+
+
+def ukur_restart(buat, jumlah_tiket, ulang=5):
+    terbaik = float("inf")
+    for _ in range(ulang):
+        penyimpanan = buat()
+        mulai = time.perf_counter()
+        aktif = penyimpanan.muat_aktif()
+        terbaik = min(terbaik, time.perf_counter() - mulai)
+        penyimpanan.tutup()
+        assert len(aktif) == jumlah_tiket
+    return terbaik
+
+
+def main():
+    jumlah_tiket = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    jumlah_event = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path_log = os.path.join(tmpdir, "kendaraan_aktif.json")
+        path_db = os.path.join(tmpdir, "parkirin.db")
+        # fsync per event dimatikan hanya supaya pengisian data benchmark cepat
+        isi(LogKendaraanAktif(path_log, fsync_setiap=10**9), jumlah_tiket, jumlah_event)
+        isi(PenyimpananSQLite(path_db), jumlah_tiket, jumlah_event)
+
+        hasil_log = ukur_restart(lambda: LogKendaraanAktif(path_log), jumlah_tiket)
+        hasil_db = ukur_restart(lambda: PenyimpananSQLite(path_db), jumlah_tiket)
+
+    print(f"Tiket terbuka: {jumlah_tiket}, event churn sebelumnya: {jumlah_event}")
+    print(f"  snapshot + log : {hasil_log * 1000:8.2f} ms")
+    print(f"  sqlite         : {hasil_db * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# --- Uji beban: server parkir dengan banyak gerbang sekaligus ---
+# Jalankan: python benchmarks/bench_server.py [jumlah_koneksi] [detik] [jurnal|sqlite|memori]
+# Server dijalankan sebagai proses terpisah; setiap koneksi keep-alive mengulang check-in, quote dan checkout.
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def permintaan(metode, path, data=None):
+    badan = json.dumps(data).encode() if data is not None else b""
+    return (f"{metode} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(badan)}\r\n\r\n").encode() + badan
+
+
+async def kirim(reader, writer, data):
+    writer.write(data)
+    kepala = await reader.readuntil(b"\r\n\r\n")
+    panjang = 0
+    for baris in kepala.split(b"\r\n"):
+        if baris.lower().startswith(b"content-length:"):
+            panjang = int(baris.split(b":", 1)[1])
+    await reader.readexactly(panjang)
+    return int(kepala.split(b" ", 2)[1])
+
+
+async def gerbang(nomor, port, batas_waktu, latensi, gagal):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    putaran = 0
+    while time.perf_counter() < batas_waktu:
+        nopol = f"G{nomor} {putaran} UJI"
+        for data in (permintaan("POST", "/checkin", {'nopol': nopol, 'jenis': "Mobil" if putaran % 2 else "Motor"}),
+                     permintaan("POST", "/quote", {'nopol': nopol}),
+                     permintaan("POST", "/checkout", {'nopol': nopol, 'metode': "Cash"}),
+                     permintaan("GET", f"/saran?teks=G{nomor}+{putaran}")):
+            mulai = time.perf_counter()
+            if await kirim(reader, writer, data) != 200:
+                gagal.append(nopol)
+            latensi.append(time.perf_counter() - mulai)
+        putaran += 1
+    writer.close()
+
+
+async def uji(port, jumlah_koneksi, detik):
+    latensi, gagal = [], []
+    mulai = time.perf_counter()
+    await asyncio.gather(*(gerbang(i, port, mulai + detik, latensi, gagal) for i in range(jumlah_koneksi)))
+    return latensi, gagal, time.perf_counter() - mulai
+
+
+def main():
+    jumlah_koneksi = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    detik = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    mode = sys.argv[3] if len(sys.argv) > 3 else "jurnal"
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server = subprocess.Popen([sys.executable, os.path.join(BASE_DIR, "server_parkirin.py"), "--port", "0",
+                                   "--data", tmpdir, "--penyimpanan", mode],
+                                  stdout=subprocess.PIPE, text=True)
+        try:
+            # Baris pertama: "Server parkir berjalan di http://127.0.0.1:<port>"
+            port = int(server.stdout.readline().rsplit(":", 1)[1])
+            latensi, gagal, durasi = asyncio.run(uji(port, jumlah_koneksi, detik))
+        finally:
+            server.terminate()
+            server.wait()
+
+    latensi.sort()
+    persen = lambda p: latensi[min(len(latensi) - 1, int(len(latensi) * p))] * 1000
+    print(f"Mode {mode}, {jumlah_koneksi} koneksi, {durasi:.1f} s")
+    print(f"  permintaan     : {len(latensi):,} ({len(gagal)} gagal)")
+    print(f"  throughput     : {len(latensi) / durasi:,.0f} permintaan/s")
+    print(f"  latensi p50/p99: {persen(0.5):.2f} / {persen(0.99):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# --- Waktu start aplikasi: impor modul, jendela tampil pertama, riwayat selesai dirender ---
+# Jalankan: python benchmarks/bench_startup.py [--ulang 5] [--riwayat 100000] [--target 1.5]
+# Setiap start dijalankan di proses baru (cold start modul Python); butuh display.
+# Keluar dengan kode 1 jika median waktu sampai jendela tampil melebihi --target detik.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def jalankan_anak(folder):
+    """Satu cold start; hasil dicetak sebagai satu baris JSON."""
+    mulai = time.perf_counter()
+    import tkinter
+    import app_parkirin
+    from metrik_parkirin import METRIK
+    impor = time.perf_counter()
+    # Semua file aplikasi diarahkan ke folder sementara yang sudah berisi riwayat
+    app_parkirin.NAMA_FILE_RIWAYAT = os.path.join(folder, "riwayat_parkir.json")
+    app_parkirin.NAMA_FILE_AKTIF = os.path.join(folder, "kendaraan_aktif.json")
+    app_parkirin.NAMA_FILE_URUTAN = os.path.join(folder, "riwayat_parkir.seq")
+    try:
+        app = app_parkirin.App()
+    except tkinter.TclError as e:
+        print(json.dumps({"dilewati": f"tidak ada display: {e}"}))
+        return
+    dibuat = time.perf_counter()
+    widget_awal = sum(app.hitung_widget().values())
+    jeda_hitung = time.perf_counter() - dibuat
+    # Tata letak dan penggambaran pertama berjalan sebagai idle task; timer setelah_tampil belum
+    app.update_idletasks()
+    tampil = time.perf_counter() - jeda_hitung
+    while "start.tampil_pertama" not in METRIK.histogram:
+        app.update()
+    app.update_idletasks()
+    selesai = time.perf_counter() - jeda_hitung
+    widget = sum(app.hitung_widget().values())
+    app.on_closing()
+    app.destroy()
+    print(json.dumps({"impor_s": impor - mulai, "app_s": dibuat - impor, "tampil_s": tampil - mulai,
+                      "riwayat_s": selesai - mulai, "widget_awal": widget_awal, "widget_setelah_riwayat": widget}))
+
+
+def siapkan_riwayat(folder, jumlah):
+    from benchmarks.bench_suite import buat_riwayat
+    from lalu_lintas_parkirin import buat_lalu_lintas
+    from penyimpanan_parkirin import riwayat_ke_json, tulis_json_atomik
+    tulis_json_atomik(os.path.join(folder, "riwayat_parkir.json"),
+                      [riwayat_ke_json(item) for item in buat_riwayat(buat_lalu_lintas(jumlah))] if jumlah else [])
+
+
+def main():
+    from app_parkirin import BATAS_WIDGET_AWAL, TARGET_START_DETIK
+    parser = argparse.ArgumentParser(description="Waktu start aplikasi Parkirin")
+    parser.add_argument("--ulang", type=int, default=5)
+    parser.add_argument("--riwayat", type=int, default=100_000, help="jumlah baris riwayat di disk")
+    parser.add_argument("--target", type=float, default=TARGET_START_DETIK, help="batas median waktu sampai jendela tampil (detik)")
+    parser.add_argument("--anak", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.anak:
+        return jalankan_anak(args.anak)
+
+    with tempfile.TemporaryDirectory() as folder:
+        siapkan_riwayat(folder, args.riwayat)
+        hasil = []
+        for _ in range(args.ulang):
+            proses = subprocess.run([sys.executable, os.path.abspath(__file__), "--anak", folder],
+                                    capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            if proses.returncode != 0:
+                sys.exit(proses.stderr.strip() or "start gagal")
+            baris = json.loads(proses.stdout.strip().splitlines()[-1])
+            if "dilewati" in baris:
+                print(baris["dilewati"])
+                return
+            hasil.append(baris)
+
+    median = {kunci: statistics.median(h[kunci] for h in hasil) for kunci in hasil[0]}
+    print(f"Start aplikasi ({args.ulang}x, riwayat {args.riwayat:,} baris), median:")
+    print(f"  impor modul            : {median['impor_s'] * 1000:8.1f} ms")
+    print(f"  App() dibuat           : {median['app_s'] * 1000:8.1f} ms")
+    print(f"  jendela tampil pertama : {median['tampil_s'] * 1000:8.1f} ms  (target {args.target * 1000:.0f} ms)")
+    print(f"  riwayat dirender       : {median['riwayat_s'] * 1000:8.1f} ms")
+    print(f"  widget sebelum tampil  : {median['widget_awal']:8.0f}     (batas {BATAS_WIDGET_AWAL})")
+    print(f"  widget setelah riwayat : {median['widget_setelah_riwayat']:8.0f}")
+    sys.exit(1 if median['tampil_s'] > args.target or median['widget_awal'] > BATAS_WIDGET_AWAL else 0)
+
+
+if __name__ == "__main__":
+    main()
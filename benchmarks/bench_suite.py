@@ -0,0 +1,235 @@
+# --- Rangkaian benchmark dengan lalu lintas sintetis (hasil JSON untuk mendeteksi regresi) ---
+# Jalankan: python benchmarks/bench_suite.py [--skala 1k,10k,100k] [--skenario engine,jurnal,...]
+#                                            [--keluaran hasil.json] [--banding baseline.json] [--toleransi 0.3]
+# Setiap (skenario, skala) dijalankan di proses terpisah agar memori puncaknya tidak tercampur.
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine_parkirin import DENDA_TIKET_HILANG, ParkingEngine # noqa: E402
+from kolom_parkirin import RiwayatKolom # noqa: E402
+from lalu_lintas_parkirin import buat_lalu_lintas, urutan_event # noqa: E402
+from metrik_parkirin import Histogram # noqa: E402
+
+try:
+    import resource # memori puncak proses (Linux/macOS)
+except ImportError:
+    resource = None
+
+SKALA = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+SKENARIO = {}
+
+
+def skenario(nama):
+    def daftar(fungsi):
+        SKENARIO[nama] = fungsi
+        return fungsi
+    return daftar
+
+
+def hasil_ukur(histogram, durasi, **tambahan):
+    return dict(operasi=histogram.jumlah, durasi_s=durasi,
+                throughput_per_s=histogram.jumlah / durasi if durasi else 0.0,
+                p50_ms=histogram.persentil(0.5) * 1000, p99_ms=histogram.persentil(0.99) * 1000,
+                maks_ms=histogram.maks * 1000, **tambahan)
+
+
+def ukur_setiap(daftar, fungsi):
+    """Panggil fungsi(x) untuk setiap x dan catat latensinya."""
+    histogram = Histogram()
+    perf = time.perf_counter
+    mulai = perf()
+    for x in daftar:
+        t = perf()
+        fungsi(x)
+        histogram.catat(perf() - t)
+    return histogram, perf() - mulai
+
+
+def buat_riwayat(kunjungan):
+    """Baris riwayat (terbaru di depan) untuk setiap kunjungan, tanpa memutar ulang engine."""
+    tarif = ParkingEngine().tarif
+    urut = sorted(kunjungan, key=lambda k: k.waktu_keluar)
+    riwayat = [{'id': i, 'nopol': k.nopol, 'jenis': k.jenis, 'waktu_masuk': k.waktu_masuk, 'waktu_keluar': k.waktu_keluar,
+                'total_biaya': DENDA_TIKET_HILANG if k.tiket_hilang else tarif.harga(k.jenis, k.waktu_masuk, k.waktu_keluar),
+                'status': "Denda Tiket Hilang" if k.tiket_hilang else "Lunas", 'metode_bayar': k.metode_bayar}
+               for i, k in enumerate(urut, 1)]
+    riwayat.reverse()
+    return riwayat
+
+
+@skenario("engine")
+def bench_engine(jumlah, tmpdir):
+    """Check-in dan checkout (quote + riwayat) di memori, satu event per latensi."""
+    engine = ParkingEngine(RiwayatKolom())
+    event = urutan_event(buat_lalu_lintas(jumlah))
+
+    def jalankan(item):
+        jenis, k = item
+        if jenis == "masuk":
+            engine.checkin(k.nopol, k.jenis, k.waktu_masuk)
+        else:
+            engine.checkout(k.nopol, k.metode_bayar, k.waktu_keluar, k.tiket_hilang)
+    histogram, durasi = ukur_setiap(event, jalankan)
+    return hasil_ukur(histogram, durasi, riwayat=len(engine.riwayat_parkir))
+
+
+@skenario("jurnal")
+def bench_jurnal(jumlah, tmpdir):
+    """JurnalRiwayat.tambah per checkout (fsync oleh PenulisLatar, di sini sekali di akhir)."""
+    from penyimpanan_parkirin import JurnalRiwayat
+    riwayat = buat_riwayat(buat_lalu_lintas(jumlah))
+    riwayat.reverse()
+    jurnal = JurnalRiwayat(os.path.join(tmpdir, "riwayat_parkir.json"), fsync_setiap=0)
+    histogram, durasi = ukur_setiap(riwayat, jurnal.tambah)
+    jurnal.tutup()
+    return hasil_ukur(histogram, durasi)
+
+
+@skenario("sqlite")
+def bench_sqlite(jumlah, tmpdir):
+    """PenyimpananSQLite.tambah per checkout."""
+    from sqlite_parkirin import PenyimpananSQLite
+    riwayat = buat_riwayat(buat_lalu_lintas(jumlah))
+    riwayat.reverse()
+    db = PenyimpananSQLite(os.path.join(tmpdir, "parkirin.db"))
+    histogram, durasi = ukur_setiap(riwayat, db.tambah)
+    db.tutup()
+    return hasil_ukur(histogram, durasi)
+
+
+@skenario("simpan_json")
+def bench_simpan_json(jumlah, tmpdir):
+    """App.simpan_riwayat_ke_json mode "json" (tulis ulang penuh), diulang 3 kali."""
+    import app_parkirin
+    app_parkirin.NAMA_FILE_RIWAYAT = os.path.join(tmpdir, "riwayat_parkir.json")
+    app = SimpleNamespace(riwayat_parkir=buat_riwayat(buat_lalu_lintas(jumlah)), penyimpanan=None)
+    histogram, durasi = ukur_setiap(range(3), lambda _: app_parkirin.App.simpan_riwayat_ke_json(app))
+    return hasil_ukur(histogram, durasi, ukuran_file_mb=os.path.getsize(app_parkirin.NAMA_FILE_RIWAYAT) / 2**20)
+
+
+@skenario("muat_riwayat")
+def bench_muat_riwayat(jumlah, tmpdir):
+    """Start aplikasi: halaman pertama riwayat (p50/p99 dari 3 kali start) dan muat penuh."""
+    from penyimpanan_parkirin import JurnalRiwayat, riwayat_ke_json, tulis_json_atomik
+    path = os.path.join(tmpdir, "riwayat_parkir.json")
+    tulis_json_atomik(path, [riwayat_ke_json(item) for item in buat_riwayat(buat_lalu_lintas(jumlah))])
+    histogram, durasi = ukur_setiap(range(3), lambda _: len(JurnalRiwayat(path).muat()))
+    mulai = time.perf_counter()
+    riwayat = JurnalRiwayat(path).muat()
+    riwayat.muat_semua()
+    return hasil_ukur(histogram, durasi, muat_penuh_s=time.perf_counter() - mulai, riwayat=len(riwayat))
+
+
+@skenario("render")
+def bench_render(jumlah, tmpdir):
+    """DaftarVirtual (tab Riwayat): refresh setelah menggulir ke 200 posisi acak."""
+    import tkinter
+    import customtkinter as ctk
+    import app_parkirin
+    try:
+        root = ctk.CTk()
+    except tkinter.TclError as e:
+        return {"dilewati": f"tidak ada display: {e}"}
+    riwayat = RiwayatKolom(buat_riwayat(buat_lalu_lintas(jumlah)))
+    sumber = SimpleNamespace(riwayat_parkir=riwayat)
+    daftar = app_parkirin.DaftarVirtual(root, kolom=("ID", "No. Pol", "Waktu Keluar", "Total Biaya", "Status", "Metode"),
+                                        ambil_baris=lambda i: app_parkirin.App.format_baris_riwayat(sumber, i),
+                                        jumlah_baris=lambda: len(riwayat))
+    daftar.pack(expand=True, fill="both")
+    root.geometry("900x700")
+    root.update()
+    acak = random.Random(1)
+
+    def gulir(_):
+        daftar.gulir("moveto", acak.random())
+        root.update_idletasks()
+    histogram, durasi = ukur_setiap(range(200), gulir)
+    widget = len(daftar.pool)
+    root.destroy()
+    return hasil_ukur(histogram, durasi, widget_baris=widget)
+
+
+def jalankan_anak(nama, jumlah):
+    """Dijalankan di proses anak: satu skenario, hasil dicetak sebagai satu baris JSON."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        mulai = time.perf_counter()
+        hasil = SKENARIO[nama](jumlah, tmpdir)
+        hasil["total_s"] = time.perf_counter() - mulai
+    if resource is not None:
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux melaporkan KB, macOS byte; termasuk data lalu lintas yang dibangkitkan
+        hasil["memori_puncak_mb"] = maxrss / (2**20 if sys.platform == "darwin" else 2**10)
+    print(json.dumps(hasil))
+
+
+def banding(hasil, path_baseline, toleransi):
+    """Daftar regresi: throughput turun atau p99 naik lebih dari `toleransi` dibanding baseline."""
+    with open(path_baseline) as f:
+        baseline = {(h["skenario"], h["skala"]): h for h in json.load(f)["hasil"]}
+    regresi = []
+    for h in hasil:
+        lama = baseline.get((h["skenario"], h["skala"]))
+        if lama is None or any(kunci in h or kunci in lama for kunci in ("dilewati", "galat")):
+            continue
+        if h["throughput_per_s"] < lama["throughput_per_s"] * (1 - toleransi):
+            regresi.append(f"{h['skenario']} {h['skala']}: throughput {lama['throughput_per_s']:,.0f} -> {h['throughput_per_s']:,.0f}/s")
+        if h["p99_ms"] > lama["p99_ms"] * (1 + toleransi):
+            regresi.append(f"{h['skenario']} {h['skala']}: p99 {lama['p99_ms']:.3f} -> {h['p99_ms']:.3f} ms")
+    return regresi
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Parkirin dengan lalu lintas sintetis")
+    parser.add_argument("--skala", default="1k,10k,100k", help="daftar skala: " + ",".join(SKALA))
+    parser.add_argument("--skenario", default=",".join(SKENARIO), help="daftar skenario: " + ",".join(SKENARIO))
+    parser.add_argument("--keluaran", help="tulis hasil ke file JSON")
+    parser.add_argument("--banding", help="file JSON hasil sebelumnya; keluar dengan kode 1 jika ada regresi")
+    parser.add_argument("--toleransi", type=float, default=0.3)
+    parser.add_argument("--anak", nargs=2, metavar=("SKENARIO", "JUMLAH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.anak:
+        return jalankan_anak(args.anak[0], int(args.anak[1]))
+
+    hasil = []
+    for nama_skala in args.skala.lower().split(","):
+        for nama in args.skenario.split(","):
+            proses = subprocess.run([sys.executable, os.path.abspath(__file__), "--anak", nama, str(SKALA[nama_skala])],
+                                    capture_output=True, text=True)
+            if proses.returncode == 0:
+                baris = json.loads(proses.stdout.strip().splitlines()[-1])
+            else:
+                baris = {"galat": proses.stderr.strip().splitlines()[-1] if proses.stderr.strip() else "gagal"}
+            baris = dict(skenario=nama, skala=nama_skala, **baris)
+            hasil.append(baris)
+            if "throughput_per_s" in baris:
+                print(f"{nama:<13}{nama_skala:>5}: {baris['throughput_per_s']:>12,.0f} op/s  p50 {baris['p50_ms']:8.3f} ms  "
+                      f"p99 {baris['p99_ms']:8.3f} ms  memori {baris.get('memori_puncak_mb', 0):7.1f} MB", flush=True)
+            else:
+                print(f"{nama:<13}{nama_skala:>5}: {baris.get('dilewati') or baris.get('galat')}", flush=True)
+
+    laporan = {"waktu": datetime.datetime.now().isoformat(timespec="seconds"),
+               "mesin": {"python": platform.python_version(), "platform": platform.platform(), "cpu": os.cpu_count()},
+               "hasil": hasil}
+    if args.keluaran:
+        with open(args.keluaran, "w") as f:
+            json.dump(laporan, f, indent=2)
+    if args.banding:
+        regresi = banding(hasil, args.banding, args.toleransi)
+        for pesan in regresi:
+            print(f"REGRESI {pesan}")
+        sys.exit(1 if regresi else 0)
+
+
+if __name__ == "__main__":
+    main()
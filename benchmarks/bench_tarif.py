@@ -0,0 +1,76 @@
+# --- Benchmark: menghitung ulang harga banyak parkir sekaligus ---
+# Jalankan: python benchmarks/bench_tarif.py [jumlah_parkir]
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine_parkirin import TARIF_MOBIL, TARIF_MOTOR, ParkingEngine, tarif_bawaan # noqa: E402
+from kolom_parkirin import ke_epoch # noqa: E402
+from tarif_parkirin import TabelTarif, muat_numpy # noqa: E402
+
+np = muat_numpy()
+
+# Contoh tarif dengan periode malam, jam sibuk, batas harian dan biaya inap
+TARIF_SIMULASI = {
+    "Motor": {"jam_pertama": 3000, "per_jam_berikutnya": 2000, "maks_harian": 20000, "tarif_inap": 5000,
+              "periode": [{"mulai": "22:00", "selesai": "06:00", "per_jam": 1000}]},
+    "Mobil": {"jam_pertama": 5000, "per_jam_berikutnya": 4000, "maks_harian": 50000, "tarif_inap": 10000,
+              "periode": [{"mulai": "07:00", "selesai": "09:30", "per_jam": 6000},
+                          {"mulai": "22:00", "selesai": "06:00", "per_jam": 2000}]},
+}
+
+
+def buat_data(jumlah):
+    random.seed(42)
+    awal = datetime.datetime(2024, 1, 1)
+    jenis, masuk, keluar = [], [], []
+    for _ in range(jumlah):
+        waktu_masuk = awal + datetime.timedelta(seconds=random.randrange(90 * 86400))
+        jenis.append(random.choice(("Mobil", "Motor")))
+        masuk.append(waktu_masuk)
+        keluar.append(waktu_masuk + datetime.timedelta(seconds=int(random.expovariate(1 / 10800))))
+    return jenis, masuk, keluar
+
+
+def biaya_lama(jenis, total_jam):
+    # Rumus per panggilan sebelum TabelTarif (hanya jam pertama + jam berikutnya)
+    tarif = TARIF_MOBIL if jenis == 'Mobil' else TARIF_MOTOR
+    return tarif['jam_pertama'] if total_jam <= 1 else tarif['jam_pertama'] + (total_jam - 1) * tarif['per_jam_berikutnya']
+
+
+def ukur(nama, fungsi):
+    mulai = time.perf_counter()
+    hasil = fungsi()
+    print(f"  {nama:<34}: {time.perf_counter() - mulai:8.3f} s")
+    return hasil
+
+
+def main():
+    jumlah = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    jenis, masuk, keluar = buat_data(jumlah)
+    masuk_epoch = [ke_epoch(w) for w in masuk]
+    keluar_epoch = [ke_epoch(w) for w in keluar]
+    engine = ParkingEngine()
+    tabel = TabelTarif(tarif_bawaan())
+    simulasi = TabelTarif(TARIF_SIMULASI)
+
+    print(f"Jumlah parkir: {jumlah:,}")
+    lama = ukur("per panggilan (rumus lama)",
+                lambda: [biaya_lama(j, engine.hitung_total_jam(m, k)) for j, m, k in zip(jenis, masuk, keluar)])
+    baru = ukur("per panggilan (TabelTarif.harga)", lambda: [tabel.harga(j, m, k) for j, m, k in zip(jenis, masuk, keluar)])
+    batch = ukur("harga_batch" + (" (NumPy)" if np is not None else " (tanpa NumPy)"),
+                 lambda: tabel.harga_batch(jenis, masuk_epoch, keluar_epoch))
+    assert lama == baru == list(batch)
+    ukur("per panggilan tarif simulasi", lambda: [simulasi.harga(j, m, k) for j, m, k in zip(jenis, masuk, keluar)])
+    if np is not None:
+        # Data yang sudah berbentuk array (mis. kolom RiwayatKolom) tidak perlu dikonversi dari list
+        jenis, masuk_epoch, keluar_epoch = np.array(jenis), np.array(masuk_epoch), np.array(keluar_epoch)
+    ukur("harga_batch tarif simulasi", lambda: simulasi.harga_batch(jenis, masuk_epoch, keluar_epoch))
+
+
+if __name__ == "__main__":
+    main()
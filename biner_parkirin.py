@@ -0,0 +1,370 @@
+# --- Riwayat parkir biner: record lebar tetap + tabel string, bisa dibaca lewat mmap oleh proses lain ---
+# Jalankan: python biner_parkirin.py ke-biner history/riwayat_parkir.json history/riwayat_parkir.bin
+#           python biner_parkirin.py ke-json history/riwayat_parkir.bin riwayat_parkir.json
+#
+# Format file .bin (versi 2, little-endian):
+#   header 16 byte : b"PARKIRIN", versi (uint16), ukuran record (uint16), cadangan (uint32)
+#   record 48 byte : id, waktu_masuk, waktu_keluar, total_biaya (int64; waktu dalam detik epoch),
+#                    nopol (uint32), jenis, status, metode_bayar (uint8), 1 byte padding,
+#                    mikro_masuk, mikro_keluar (uint32; sisa mikrodetik waktu masuk/keluar)
+# Record urut id naik (ditambah di akhir file); jumlah record = (ukuran file - 16) // 48, sisa byte
+# di akhir (record yang sedang ditulis) diabaikan. Kode nopol/jenis/status/metode menunjuk ke tabel
+# string .str di samping file .bin: satu baris JSON ["kolom", "nilai"] per nilai baru, kode = urutan
+# kemunculan per kolom. Kode jenis/status/metode awal sama dengan RiwayatKolom dan tidak ditulis ke tabel.
+import argparse # untuk membaca argumen baris perintah
+import json # untuk tabel string dan konversi dari/ke JSON
+import mmap # pembaca memetakan file tanpa menyalin
+import os # untuk berinteraksi dengan sistem operasi
+import struct # untuk record lebar tetap
+import threading # tambah dipanggil thread penulis, dibaca thread Tk
+from array import array # kolom tanpa numpy
+
+from kolom_parkirin import JENIS_AWAL, METODE_AWAL, STATUS_AWAL, KamusKode, dari_epoch, pecah_epoch
+from penyimpanan_parkirin import JurnalRiwayat, RiwayatBertahap
+
+try:
+    import numpy as np # opsional: kolom dibaca sebagai view numpy.memmap tanpa salinan
+except ImportError:
+    np = None
+
+MAGIC = b"PARKIRIN"
+# Versi 1 (record 40 byte) hanya menyimpan detik sehingga mikrodetik waktu transaksi hilang; file versi 1 ditolak
+VERSI = 2
+HEADER = struct.Struct("<8sHHI")
+RECORD = struct.Struct("<qqqqIBBBxII")
+KOLOM_BINER = ('id', 'waktu_masuk', 'waktu_keluar', 'total_biaya', 'nopol', 'jenis', 'status', 'metode_bayar',
+               'mikro_masuk', 'mikro_keluar')
+KOLOM_STRING = ('nopol', 'jenis', 'status', 'metode_bayar')
+TIPE_ARRAY = {'id': 'q', 'waktu_masuk': 'q', 'waktu_keluar': 'q', 'total_biaya': 'q',
+              'nopol': 'I', 'jenis': 'B', 'status': 'B', 'metode_bayar': 'B', 'mikro_masuk': 'I', 'mikro_keluar': 'I'}
+# Record per blok saat membalik urutan (konversi dari JSON yang terbaru di depan)
+RECORD_PER_BLOK = 4096
+
+
+def path_string(path):
+    """Tabel string di samping file biner, mis. riwayat_parkir.bin -> riwayat_parkir.str."""
+    return os.path.splitext(path)[0] + ".str"
+
+
+def dtype_record():
+    """numpy dtype yang sama persis dengan RECORD, untuk numpy.memmap / numpy.frombuffer."""
+    return np.dtype([('id', '<i8'), ('waktu_masuk', '<i8'), ('waktu_keluar', '<i8'), ('total_biaya', '<i8'),
+                     ('nopol', '<u4'), ('jenis', 'u1'), ('status', 'u1'), ('metode_bayar', 'u1'), ('_', 'V1'),
+                     ('mikro_masuk', '<u4'), ('mikro_keluar', '<u4')])
+
+
+def _kamus_awal():
+    return {'nopol': KamusKode(), 'jenis': KamusKode(JENIS_AWAL),
+            'status': KamusKode(STATUS_AWAL), 'metode_bayar': KamusKode(METODE_AWAL)}
+
+
+def _baca_string(path, kamus, posisi=0):
+    """Tambahkan nilai baru dari tabel string mulai `posisi` byte; kembalikan posisi baris utuh terakhir."""
+    if not os.path.exists(path):
+        return posisi
+    with open(path, 'rb') as f:
+        f.seek(posisi)
+        for baris in f:
+            if not baris.endswith(b"\n"):
+                break # baris terakhir belum selesai ditulis
+            try:
+                kolom, nilai = json.loads(baris)
+            except ValueError:
+                break
+            kamus[kolom].kode_dari(nilai)
+            posisi += len(baris)
+    return posisi
+
+
+class BacaBiner:
+    """
+    Pembaca file riwayat biner lewat mmap (baca-saja), aman dipakai selagi aplikasi menambah record.
+    `segarkan()` memetakan ulang file jika sudah bertambah. `kolom(nama)` mengembalikan satu kolom
+    urut id naik: view numpy.memmap tanpa salinan jika numpy terpasang, atau `array` jika tidak.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.path_string = path_string(path)
+        self.kamus = _kamus_awal()
+        self._posisi_string = 0
+        self._mmap = None
+        self.jumlah = 0
+        self.segarkan()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.tutup()
+
+    def __len__(self):
+        return self.jumlah
+
+    def segarkan(self):
+        """Baca record dan string yang ditambahkan sejak pemanggilan sebelumnya; kembalikan jumlah record."""
+        ukuran = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        jumlah = max(0, (ukuran - HEADER.size) // RECORD.size)
+        if jumlah != self.jumlah or self._mmap is None:
+            self.tutup()
+            if ukuran >= HEADER.size:
+                with open(self.path, 'rb') as f:
+                    self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, versi, ukuran_record, _ = HEADER.unpack_from(self._mmap)
+                if magic != MAGIC or versi != VERSI or ukuran_record != RECORD.size:
+                    self.tutup()
+                    raise ValueError(f"Bukan file riwayat biner versi {VERSI}: {self.path}")
+            self.jumlah = jumlah
+        # String ditulis sebelum record yang memakainya, jadi dibaca setelah jumlah record ditentukan
+        self._posisi_string = _baca_string(self.path_string, self.kamus, self._posisi_string)
+        return self.jumlah
+
+    def record(self, indeks):
+        """Tuple mentah (urutan KOLOM_BINER) record ke-`indeks` (0 = terlama)."""
+        if not 0 <= indeks < self.jumlah:
+            raise IndexError("indeks record di luar jangkauan")
+        return RECORD.unpack_from(self._mmap, HEADER.size + indeks * RECORD.size)
+
+    def baris(self, indeks):
+        """Record ke-`indeks` sebagai baris riwayat mentah (waktu sebagai string ISO)."""
+        return self._ke_baris(self.record(indeks))
+
+    def _ke_baris(self, record):
+        id_parkir, masuk, keluar, biaya, nopol, jenis, status, metode, mikro_masuk, mikro_keluar = record
+        kamus = self.kamus
+        return {'id': id_parkir, 'nopol': kamus['nopol'].nilai[nopol], 'jenis': kamus['jenis'].nilai[jenis],
+                'waktu_masuk': dari_epoch(masuk, mikro_masuk).isoformat(),
+                'waktu_keluar': dari_epoch(keluar, mikro_keluar).isoformat(),
+                'total_biaya': biaya, 'status': kamus['status'].nilai[status], 'metode_bayar': kamus['metode_bayar'].nilai[metode]}
+
+    def iter_terbaru(self):
+        """Generator baris mentah dari record terakhir ke yang pertama (terbaru di depan)."""
+        for indeks in range(self.jumlah - 1, -1, -1):
+            yield self.baris(indeks)
+
+    def kolom(self, nama):
+        """Satu kolom (kode untuk nopol/jenis/status/metode, detik epoch untuk waktu, sisa mikrodetik di mikro_*), urut id naik."""
+        if nama not in TIPE_ARRAY:
+            raise KeyError(nama)
+        if np is not None:
+            return self.tabel()[nama]
+        if not self.jumlah:
+            return array(TIPE_ARRAY[nama])
+        posisi = KOLOM_BINER.index(nama)
+        with memoryview(self._mmap) as data:
+            isi = data[HEADER.size:HEADER.size + self.jumlah * RECORD.size]
+            hasil = array(TIPE_ARRAY[nama], (record[posisi] for record in RECORD.iter_unpack(isi)))
+            isi.release()
+        return hasil
+
+    def tabel(self):
+        """Seluruh record sebagai numpy.memmap berdtype `dtype_record()` (butuh numpy)."""
+        if np is None:
+            raise RuntimeError("numpy tidak terpasang")
+        if not self.jumlah:
+            return np.zeros(0, dtype=dtype_record())
+        return np.memmap(self.path, dtype=dtype_record(), mode='r', offset=HEADER.size, shape=(self.jumlah,))
+
+    def tutup(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+class RiwayatBiner:
+    """
+    Penyimpanan riwayat dalam format biner (lihat komentar di awal file) dengan antarmuka yang sama
+    dengan JurnalRiwayat, jadi bisa dibungkus PenulisLatar. Checkout menambah satu record 48 byte
+    (dan satu baris tabel string jika nopol baru); tidak ada kompaksi. fsync per `fsync_setiap`
+    record, 0 berarti hanya saat `flush`. Jika file belum ada dan `path_lama` (riwayat_parkir.json)
+    ada, riwayat lama dikonversi sekali saat dibuka.
+    """
+
+    def __init__(self, path, fsync_setiap=20, path_lama=None):
+        self.path = path
+        self.path_string = path_string(path)
+        self.fsync_setiap = fsync_setiap
+        self._lock = threading.Lock()
+        self._file = None
+        self._file_string = None
+        self._belum_fsync = 0
+        self.kamus = None
+        if path_lama is not None and not os.path.exists(path) and os.path.exists(path_lama):
+            json_ke_biner(path_lama, path)
+
+    def _buka(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.kamus = _kamus_awal()
+        # Sisa tulisan yang terputus (baris string atau record setengah jadi) dipotong sebelum menambah
+        posisi = _baca_string(self.path_string, self.kamus)
+        self._file_string = open(self.path_string, 'ab')
+        self._file_string.truncate(posisi)
+        self._file = open(self.path, 'ab')
+        ukuran = self._file.tell()
+        if ukuran >= HEADER.size:
+            with open(self.path, 'rb') as f:
+                magic, versi, ukuran_record, _ = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or versi != VERSI or ukuran_record != RECORD.size:
+                self._file.close()
+                self._file_string.close()
+                self._file = self._file_string = None
+                raise ValueError(f"Bukan file riwayat biner versi {VERSI}: {self.path}")
+        if ukuran < HEADER.size:
+            self._file.truncate(0)
+            self._file.write(HEADER.pack(MAGIC, VERSI, RECORD.size, 0))
+        else:
+            self._file.truncate(ukuran - (ukuran - HEADER.size) % RECORD.size)
+
+    def _kode(self, kolom, nilai):
+        kamus = self.kamus[kolom]
+        kode = kamus.kode.get(nilai)
+        if kode is None:
+            kode = kamus.kode_dari(nilai)
+            self._file_string.write(json.dumps([kolom, nilai]).encode() + b"\n")
+        return kode
+
+    def _rekam(self, entry):
+        masuk, mikro_masuk = pecah_epoch(entry['waktu_masuk'])
+        keluar, mikro_keluar = pecah_epoch(entry['waktu_keluar'])
+        return RECORD.pack(entry['id'], masuk, keluar,
+                           int(entry['total_biaya']), self._kode('nopol', entry['nopol']), self._kode('jenis', entry['jenis']),
+                           self._kode('status', entry['status']), self._kode('metode_bayar', entry['metode_bayar']),
+                           mikro_masuk, mikro_keluar)
+
+    def tambah_banyak(self, daftar_entry):
+        with self._lock:
+            if self._file is None:
+                self._buka()
+            data = [self._rekam(entry) for entry in daftar_entry]
+            # String baru harus sampai di file sebelum record yang memakai kodenya
+            self._file_string.flush()
+            self._file.write(b"".join(data))
+            self._file.flush()
+            self._belum_fsync += len(data)
+            if self.fsync_setiap and self._belum_fsync >= self.fsync_setiap:
+                self._fsync()
+        return len(data)
+
+    def tambah(self, entry):
+        """Tambahkan satu transaksi sebagai record di akhir file."""
+        self.tambah_banyak((entry,))
+
+    def sisipkan_batch(self, daftar_batch):
+        """Impor banyak batch (urut id naik); record cukup ditambahkan, tanpa menulis ulang file."""
+        return sum(self.tambah_banyak(batch) for batch in daftar_batch)
+
+    def _fsync(self):
+        if self._file is not None and self._belum_fsync:
+            os.fsync(self._file_string.fileno())
+            os.fsync(self._file.fileno())
+            self._belum_fsync = 0
+
+    def flush(self):
+        with self._lock:
+            self._fsync()
+
+    def tutup(self):
+        with self._lock:
+            self._fsync()
+            if self._file is not None:
+                self._file.close()
+                self._file_string.close()
+                self._file = self._file_string = None
+
+    def iter_riwayat(self):
+        """Generator riwayat mentah (terbaru di depan), dibaca dari belakang file lewat mmap."""
+        if not os.path.exists(self.path):
+            return
+        with BacaBiner(self.path) as baca:
+            yield from baca.iter_terbaru()
+
+    def muat(self):
+        return RiwayatBertahap(self.iter_riwayat())
+
+    def id_terakhir(self):
+        if not os.path.exists(self.path):
+            return 0
+        with BacaBiner(self.path) as baca:
+            return baca.record(len(baca) - 1)[0] if len(baca) else 0
+
+
+def json_ke_biner(path_json, path_biner):
+    """
+    Konversi riwayat JSON (snapshot + jurnal, terbaru di depan) ke format biner, dibaca bertahap.
+    Record ditulis dulu sesuai urutan baca ke file sementara, lalu dibalik per blok menjadi urut id naik.
+    Kembalikan jumlah record.
+    """
+    path_tmp = path_biner + ".tmp"
+    path_balik = path_biner + ".balik"
+    for path in (path_tmp, path_string(path_tmp)):
+        if os.path.exists(path):
+            os.remove(path)
+    penulis = RiwayatBiner(path_tmp, fsync_setiap=0)
+    try:
+        jumlah = penulis.sisipkan_batch(_per_blok(JurnalRiwayat(path_json).iter_riwayat()))
+        penulis.tutup()
+        # Balik urutan record: blok dibaca dari akhir file, record di dalam blok dibalik
+        with open(path_tmp, 'rb') as sumber, open(path_balik, 'wb') as tujuan:
+            tujuan.write(sumber.read(HEADER.size) or HEADER.pack(MAGIC, VERSI, RECORD.size, 0))
+            akhir = jumlah
+            while akhir > 0:
+                awal = max(0, akhir - RECORD_PER_BLOK)
+                sumber.seek(HEADER.size + awal * RECORD.size)
+                blok = sumber.read((akhir - awal) * RECORD.size)
+                tujuan.write(b"".join(blok[i:i + RECORD.size] for i in range(len(blok) - RECORD.size, -1, -RECORD.size)))
+                akhir = awal
+            tujuan.flush()
+            os.fsync(tujuan.fileno())
+        os.replace(path_string(path_tmp), path_string(path_biner))
+        os.replace(path_balik, path_biner)
+    finally:
+        for path in (path_tmp, path_balik, path_string(path_tmp)):
+            if os.path.exists(path):
+                os.remove(path)
+    return jumlah
+
+
+def _per_blok(sumber):
+    blok = []
+    for item in sumber:
+        blok.append(item)
+        if len(blok) >= RECORD_PER_BLOK:
+            yield blok
+            blok = []
+    if blok:
+        yield blok
+
+
+def biner_ke_json(path_biner, path_json):
+    """Tulis riwayat biner sebagai array JSON (terbaru di depan), format yang sama dengan riwayat_parkir.json."""
+    jumlah = 0
+    path_tmp = path_json + ".tmp"
+    with BacaBiner(path_biner) as baca, open(path_tmp, 'w') as f:
+        f.write("[")
+        for item in baca.iter_terbaru():
+            f.write((",\n" if jumlah else "\n") + json.dumps(item))
+            jumlah += 1
+        f.write("\n]")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path_tmp, path_json)
+    return jumlah
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Konversi riwayat parkir JSON <-> biner (mmap)")
+    perintah = parser.add_subparsers(dest="perintah", required=True)
+    for nama, bantuan in (("ke-biner", "riwayat_parkir.json -> .bin + .str"), ("ke-json", ".bin + .str -> riwayat_parkir.json")):
+        p = perintah.add_parser(nama, help=bantuan)
+        p.add_argument("sumber")
+        p.add_argument("tujuan")
+    args = parser.parse_args(argv)
+    if args.perintah == "ke-biner":
+        jumlah = json_ke_biner(args.sumber, args.tujuan)
+    else:
+        jumlah = biner_ke_json(args.sumber, args.tujuan)
+    print(f"{jumlah:,} baris riwayat ditulis ke {args.tujuan}")
+
+
+if __name__ == "__main__":
+    main()
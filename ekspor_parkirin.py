@@ -0,0 +1,270 @@
+# --- Ekspor/impor riwayat parkir massal (CSV dan JSON Lines), dibaca dan ditulis per chunk ---
+# Jalankan: python ekspor_parkirin.py ekspor riwayat.csv [--dari 2024-06-01] [--sampai 2024-06-30] [--jenis Mobil]
+#           python ekspor_parkirin.py impor riwayat_lama.jsonl [--lewati-galat]
+# Impor menulis langsung ke file penyimpanan, jadi jalankan saat aplikasi dan server parkir ditutup.
+import argparse # untuk membaca argumen baris perintah
+import csv # untuk format CSV
+import datetime # untuk filter tanggal dan validasi waktu
+import gzip # untuk file .csv.gz / .jsonl.gz
+import json # untuk format JSON Lines
+import os # untuk path file penyimpanan
+
+from biner_parkirin import RiwayatBiner # riwayat biner (record lebar tetap)
+from engine_parkirin import JENIS_KENDARAAN # jenis yang boleh diimpor
+from partisi_parkirin import RiwayatPartisi # riwayat per bulan dengan arsip gzip
+from penyimpanan_parkirin import JurnalRiwayat, UrutanID, riwayat_ke_json # penyimpanan riwayat
+from sqlite_parkirin import KOLOM_RIWAYAT, PenyimpananSQLite # penyimpanan SQLite dan urutan kolom
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FORMAT = ("csv", "jsonl")
+UKURAN_CHUNK = 10_000
+# Galat validasi yang disimpan untuk ditampilkan; sisanya hanya dihitung
+BATAS_GALAT = 100
+
+
+def tebak_format(path):
+    """'csv' atau 'jsonl' dari akhiran file (.csv, .jsonl, .ndjson, boleh ditambah .gz)."""
+    nama = path.lower()
+    if nama.endswith(".gz"):
+        nama = nama[:-3]
+    if nama.endswith(".csv"):
+        return "csv"
+    if nama.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    raise ValueError(f"Format file tidak dikenal: {path} (pakai .csv atau .jsonl)")
+
+
+def _buka(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def saring(riwayat_mentah, awal=None, akhir=None, jenis=None):
+    """Baris riwayat mentah dengan awal <= waktu_keluar < akhir dan jenis yang cocok (generator)."""
+    for item in riwayat_mentah:
+        if jenis is not None and item['jenis'] != jenis:
+            continue
+        if awal is not None or akhir is not None:
+            keluar = item['waktu_keluar']
+            if isinstance(keluar, str):
+                keluar = datetime.datetime.fromisoformat(keluar)
+            if (awal is not None and keluar < awal) or (akhir is not None and keluar >= akhir):
+                continue
+        yield item
+
+
+def _chunk(sumber, ukuran):
+    chunk = []
+    for item in sumber:
+        chunk.append(item)
+        if len(chunk) >= ukuran:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def ekspor(riwayat_mentah, path, format=None, awal=None, akhir=None, jenis=None, ukuran_chunk=UKURAN_CHUNK):
+    """
+    Tulis riwayat (iterable baris mentah, mis. `iter_riwayat()` penyimpanan) ke CSV atau JSON Lines.
+    Baris dibaca dan ditulis per `ukuran_chunk`, jadi memori tetap kecil berapapun panjang riwayat.
+    Kembalikan jumlah baris yang ditulis.
+    """
+    format = format or tebak_format(path)
+    jumlah = 0
+    path_tmp = path + ".tmp" + (".gz" if path.endswith(".gz") else "")
+    with _buka(path_tmp, 'w') as f:
+        if format == "csv":
+            penulis = csv.writer(f)
+            penulis.writerow(KOLOM_RIWAYAT)
+        for chunk in _chunk(saring(riwayat_mentah, awal, akhir, jenis), ukuran_chunk):
+            chunk = [riwayat_ke_json(item) for item in chunk]
+            if format == "csv":
+                penulis.writerows([item.get(kolom) for kolom in KOLOM_RIWAYAT] for item in chunk)
+            else:
+                f.write("".join(json.dumps({kolom: item.get(kolom) for kolom in KOLOM_RIWAYAT}) + "\n" for item in chunk))
+            jumlah += len(chunk)
+    os.replace(path_tmp, path)
+    return jumlah
+
+
+def baca_file(path, format=None):
+    """Generator baris (dict) dari file CSV atau JSON Lines; baris JSON yang rusak menjadi None."""
+    format = format or tebak_format(path)
+    with _buka(path, 'r') as f:
+        if format == "csv":
+            yield from csv.DictReader(f)
+            return
+        for baris in f:
+            baris = baris.strip()
+            if not baris:
+                continue
+            try:
+                yield json.loads(baris)
+            except json.JSONDecodeError:
+                yield None
+
+
+def validasi(baris):
+    """
+    Ubah satu baris impor menjadi entri riwayat (tanpa id, waktu sebagai datetime).
+    Raise ValueError jika baris tidak valid.
+    """
+    if not isinstance(baris, dict):
+        raise ValueError("baris bukan objek JSON yang valid")
+    nopol = str(baris.get('nopol') or "").strip().upper()
+    if not nopol:
+        raise ValueError("nopol kosong")
+    jenis = str(baris.get('jenis') or "").strip().capitalize()
+    if jenis not in JENIS_KENDARAAN:
+        raise ValueError(f"jenis tidak dikenal: {baris.get('jenis')!r}")
+    try:
+        waktu_masuk = datetime.datetime.fromisoformat(str(baris.get('waktu_masuk')))
+        waktu_keluar = datetime.datetime.fromisoformat(str(baris.get('waktu_keluar')))
+    except ValueError:
+        raise ValueError("waktu masuk/keluar bukan format ISO (YYYY-MM-DDTHH:MM:SS)") from None
+    if waktu_keluar < waktu_masuk:
+        raise ValueError("waktu keluar lebih awal dari waktu masuk")
+    try:
+        total_biaya = int(baris.get('total_biaya'))
+    except (TypeError, ValueError):
+        raise ValueError(f"total biaya bukan bilangan bulat: {baris.get('total_biaya')!r}") from None
+    if total_biaya < 0:
+        raise ValueError("total biaya negatif")
+    return {'nopol': nopol, 'jenis': jenis, 'waktu_masuk': waktu_masuk, 'waktu_keluar': waktu_keluar,
+            'total_biaya': total_biaya, 'status': str(baris.get('status') or "Lunas"),
+            'metode_bayar': str(baris.get('metode_bayar') or "Cash")}
+
+
+def _entri_valid(path, format, galat):
+    # Baris file dimulai dari 1; baris CSV ke-1 adalah header
+    awal = 2 if format == "csv" else 1
+    for nomor, baris in enumerate(baca_file(path, format), start=awal):
+        try:
+            yield validasi(baris)
+        except ValueError as e:
+            galat['jumlah'] += 1
+            if len(galat['daftar']) < BATAS_GALAT:
+                galat['daftar'].append(f"baris {nomor}: {e}")
+
+
+def _id_terakhir(penyimpanan):
+    if hasattr(penyimpanan, 'id_terakhir'):
+        return penyimpanan.id_terakhir()
+    # Riwayat jurnal/partisi terbaru di depan: id terbesar ada di baris pertama
+    pertama = next(iter(penyimpanan.iter_riwayat()), None)
+    return pertama.get('id', 0) if pertama else 0
+
+
+def impor(path, penyimpanan, urutan_id=None, format=None, ukuran_batch=UKURAN_CHUNK, lewati_galat=False):
+    """
+    Impor riwayat dari CSV/JSON Lines ke `penyimpanan` (JurnalRiwayat, RiwayatPartisi, RiwayatBiner atau PenyimpananSQLite).
+
+    Putaran pertama hanya memvalidasi; jika ada baris tidak valid dan `lewati_galat` False, tidak ada
+    yang ditulis. Putaran kedua membaca ulang file per `ukuran_batch` baris, memesan id satu blok per
+    batch dari `urutan_id` (di atas id yang sudah ada), lalu menulis batch sekaligus. File tidak pernah
+    dimuat seluruhnya ke memori. Kembalikan ringkasan {'diimpor', 'dilewati', 'galat', 'id_awal', 'id_akhir'}.
+    """
+    format = format or tebak_format(path)
+    galat = {'jumlah': 0, 'daftar': []}
+    jumlah = 0
+    waktu_keluar_maks = None
+    for entry in _entri_valid(path, format, galat):
+        jumlah += 1
+        if waktu_keluar_maks is None or entry['waktu_keluar'] > waktu_keluar_maks:
+            waktu_keluar_maks = entry['waktu_keluar']
+    if galat['jumlah'] and not lewati_galat:
+        raise ValueError(f"{galat['jumlah']} baris tidak valid, tidak ada yang diimpor:\n" + "\n".join(galat['daftar']))
+
+    id_berikutnya = _id_terakhir(penyimpanan) + 1
+    rentang_id = []
+
+    def batch_dengan_id():
+        nonlocal id_berikutnya
+        for batch in _chunk(_entri_valid(path, format, {'jumlah': 0, 'daftar': []}), ukuran_batch):
+            if urutan_id is not None:
+                id_berikutnya = urutan_id.alokasi(len(batch), minimal=id_berikutnya)
+            for i, entry in enumerate(batch):
+                entry['id'] = id_berikutnya + i
+            rentang_id.append((batch[0]['id'], batch[-1]['id']))
+            id_berikutnya += len(batch)
+            yield batch
+
+    if isinstance(penyimpanan, PenyimpananSQLite):
+        for batch in batch_dengan_id():
+            penyimpanan.tambah_banyak(batch)
+    elif isinstance(penyimpanan, RiwayatPartisi):
+        penyimpanan.sisipkan_batch(batch_dengan_id(), waktu_keluar_maks)
+    else:
+        penyimpanan.sisipkan_batch(batch_dengan_id())
+    return {'diimpor': jumlah, 'dilewati': galat['jumlah'], 'galat': galat['daftar'],
+            'id_awal': rentang_id[0][0] if rentang_id else None, 'id_akhir': rentang_id[-1][1] if rentang_id else None}
+
+
+def buka_penyimpanan(direktori, mode):
+    """Penyimpanan riwayat dan UrutanID di `direktori`, dengan nama file yang sama dengan aplikasi dan server."""
+    if mode == "sqlite":
+        penyimpanan = PenyimpananSQLite(os.path.join(direktori, "parkirin.db"))
+    elif mode == "jurnal":
+        penyimpanan = JurnalRiwayat(os.path.join(direktori, "riwayat_parkir.json"))
+    elif mode == "partisi":
+        penyimpanan = RiwayatPartisi(os.path.join(direktori, "partisi"), path_lama=os.path.join(direktori, "riwayat_parkir.json"))
+    elif mode == "biner":
+        penyimpanan = RiwayatBiner(os.path.join(direktori, "riwayat_parkir.bin"), path_lama=os.path.join(direktori, "riwayat_parkir.json"))
+    else:
+        raise ValueError(f"Mode penyimpanan tidak dikenal: {mode}")
+    return penyimpanan, UrutanID(os.path.join(direktori, "riwayat_parkir.seq"))
+
+
+def _tanggal(teks):
+    return datetime.datetime.fromisoformat(teks)
+
+
+def _sampai(teks):
+    # Batas akhir eksklusif; tanggal tanpa jam berarti sampai akhir hari itu
+    waktu = datetime.datetime.fromisoformat(teks)
+    return waktu + datetime.timedelta(days=1) if len(teks) <= 10 else waktu
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ekspor/impor riwayat parkir (CSV atau JSON Lines)")
+    parser.add_argument("--data", default=os.path.join(BASE_DIR, "history"), help="folder penyimpanan")
+    parser.add_argument("--penyimpanan", choices=("jurnal", "partisi", "sqlite", "biner"), default="jurnal")
+    parser.add_argument("--format", choices=FORMAT, help="bawaan: dari akhiran file")
+    perintah = parser.add_subparsers(dest="perintah", required=True)
+    p_ekspor = perintah.add_parser("ekspor", help="tulis riwayat ke file")
+    p_ekspor.add_argument("file")
+    p_ekspor.add_argument("--dari", type=_tanggal, help="waktu keluar mulai, mis. 2024-06-01")
+    p_ekspor.add_argument("--sampai", type=_sampai, help="waktu keluar sampai (tanggal saja: termasuk hari itu)")
+    p_ekspor.add_argument("--jenis", choices=JENIS_KENDARAAN)
+    p_impor = perintah.add_parser("impor", help="tambahkan riwayat dari file (aplikasi dan server harus ditutup)")
+    p_impor.add_argument("file")
+    p_impor.add_argument("--lewati-galat", action="store_true", help="impor baris yang valid saja")
+    args = parser.parse_args(argv)
+
+    penyimpanan, urutan_id = buka_penyimpanan(args.data, args.penyimpanan)
+    try:
+        if args.perintah == "ekspor":
+            # Partisi hanya membuka arsip yang beririsan dengan rentang tanggal
+            if isinstance(penyimpanan, RiwayatPartisi):
+                sumber = penyimpanan.iter_riwayat(args.dari, args.sampai)
+            else:
+                sumber = penyimpanan.iter_riwayat()
+            jumlah = ekspor(sumber, args.file, args.format, args.dari, args.sampai, args.jenis)
+            print(f"{jumlah:,} baris riwayat ditulis ke {args.file}")
+        else:
+            try:
+                hasil = impor(args.file, penyimpanan, urutan_id, args.format, lewati_galat=args.lewati_galat)
+            except ValueError as e:
+                parser.exit(1, f"{e}\n")
+            for pesan in hasil['galat']:
+                print(f"dilewati: {pesan}")
+            rentang = f" (id {hasil['id_awal']}-{hasil['id_akhir']})" if hasil['diimpor'] else ""
+            print(f"{hasil['diimpor']:,} baris diimpor{rentang}, {hasil['dilewati']:,} dilewati")
+    finally:
+        penyimpanan.tutup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# --- Inti logika parkir tanpa GUI ---
+import datetime # untuk bekerja dengan tanggal dan waktu
+import math # untuk operasi matematika (perhitungan)
+from alarm_parkirin import AlarmParkir # tenggat peringatan kendaraan yang parkir terlalu lama
+from indeks_parkirin import IndeksNopol # untuk saran nomor polisi (awalan dan salah ketik)
+from okupansi_parkirin import Okupansi # penghitung kendaraan aktif per jenis dan kapasitas
+from tarif_parkirin import TabelTarif # tarif yang sudah dikompilasi (periode, batas harian, biaya inap)
+
+# --- Konfigurasi Tarif ---
+TARIF_MOTOR = { "jam_pertama": 3000, "per_jam_berikutnya": 2000 }
+TARIF_MOBIL = { "jam_pertama": 5000, "per_jam_berikutnya": 4000 }
+DENDA_TIKET_HILANG = 50000
+JENIS_KENDARAAN = ("Mobil", "Motor")
+
+
+def tarif_bawaan():
+    """Konfigurasi TabelTarif dari konstanta di atas (dipakai jika tarif.json tidak ada)."""
+    return {"Motor": dict(TARIF_MOTOR), "Mobil": dict(TARIF_MOBIL)}
+
+
+class ParkirError(Exception):
+    """Kesalahan yang pesannya bisa langsung ditampilkan ke petugas."""
+
+
+class WaktuTidakValid(ParkirError):
+    """Waktu keluar tidak masuk akal (mis. lebih awal dari waktu masuk)."""
+
+
+class ParkirPenuh(ParkirError):
+    """Kapasitas parkir untuk jenis kendaraan tersebut sudah terisi semua."""
+
+
+class ParkingEngine:
+    """
+    Check-in, perhitungan biaya dan checkout tanpa ketergantungan pada Tk.
+    `penyimpanan` (opsional) adalah objek dengan method `tambah(entry)`, mis. JurnalRiwayat.
+    `penyimpanan_aktif` (opsional) mencatat kendaraan aktif lewat `catat_masuk`, `catat_keluar`
+    dan `muat_aktif`, agar kendaraan yang sedang parkir tetap ada setelah restart.
+    `urutan_id` (opsional, UrutanID) menyimpan id terakhir; jika `ukuran_blok_id` > 0 id diambil
+    per blok dari urutan tersebut sehingga beberapa gerbang bisa berbagi satu penyimpanan.
+    `tarif` (opsional, TabelTarif) menggantikan tarif bawaan TARIF_MOTOR/TARIF_MOBIL.
+    `indeks_aktif` dan `indeks_riwayat` (IndeksNopol) dipakai untuk mencari nomor polisi tanpa memindai data.
+    `kapasitas` (opsional) {jenis: jumlah maksimum}; check-in ditolak dengan ParkirPenuh jika sudah penuh.
+    Jumlah kendaraan per jenis dan deret okupansi per menit ada di `okupansi` (Okupansi).
+    `batas_alarm` (opsional) {jenis: ((lama parkir, pesan), ...)} untuk `alarm` (AlarmParkir); bawaan BATAS_BAWAAN.
+    """
+
+    def __init__(self, riwayat_parkir=None, penyimpanan=None, penyimpanan_aktif=None, urutan_id=None, ukuran_blok_id=0, tarif=None,
+                 kapasitas=None, batas_alarm=None):
+        self.tarif = tarif if tarif is not None else TabelTarif(tarif_bawaan())
+        self.okupansi = Okupansi(kapasitas, JENIS_KENDARAAN)
+        self.alarm = AlarmParkir(batas_alarm)
+        self.penyimpanan_aktif = penyimpanan_aktif
+        self.kendaraan_terparkir = penyimpanan_aktif.muat_aktif() if penyimpanan_aktif is not None else {}
+        self.riwayat_parkir = riwayat_parkir if riwayat_parkir is not None else []
+        self.penyimpanan = penyimpanan
+        if ukuran_blok_id > 0 and urutan_id is None:
+            raise ValueError("ukuran_blok_id > 0 membutuhkan urutan_id (UrutanID bersama)")
+        self.urutan_id = urutan_id
+        self.ukuran_blok_id = ukuran_blok_id
+        self._blok_id = iter(())
+        self.last_parkir_id = self.inisialisasi_id_terakhir()
+
+    @property
+    def kendaraan_terparkir(self):
+        return self._kendaraan_terparkir
+
+    @kendaraan_terparkir.setter
+    def kendaraan_terparkir(self, nilai):
+        self._kendaraan_terparkir = nilai
+        self.indeks_aktif = IndeksNopol(nilai)
+        self.okupansi.reset(nilai)
+        self.alarm.reset(nilai)
+
+    @property
+    def riwayat_parkir(self):
+        return self._riwayat_parkir
+
+    @riwayat_parkir.setter
+    def riwayat_parkir(self, nilai):
+        self._riwayat_parkir = nilai
+        # Indeks riwayat baru dibangun saat pertama kali dicari
+        self._indeks_riwayat = None
+        self._jumlah_nopol_terindeks = 0
+
+    @property
+    def indeks_riwayat(self):
+        if self._indeks_riwayat is None:
+            self._indeks_riwayat = IndeksNopol()
+            riwayat = self.riwayat_parkir
+            if hasattr(riwayat, 'db'):
+                # RiwayatSQLite: nopol lama diambil sekali lewat indeks nopol di database
+                self._indeks_riwayat.tambah_banyak(riwayat.db.daftar_nopol())
+            elif not hasattr(riwayat, 'kamus'):
+                self._indeks_riwayat.tambah_banyak(item['nopol'] for item in riwayat if 'nopol' in item)
+        self.perbarui_indeks_riwayat()
+        return self._indeks_riwayat
+
+    def perbarui_indeks_riwayat(self):
+        """Indeks nopol riwayat yang baru dimuat (mis. halaman berikutnya dari RiwayatBertahap)."""
+        kamus = getattr(self.riwayat_parkir, 'kamus', None)
+        if self._indeks_riwayat is not None and kamus is not None:
+            # RiwayatKolom sudah menyimpan setiap nopol sekali; cukup indeks nopol yang baru muncul
+            nilai = kamus['nopol'].nilai
+            self._indeks_riwayat.tambah_banyak(nilai[self._jumlah_nopol_terindeks:])
+            self._jumlah_nopol_terindeks = len(nilai)
+
+    def inisialisasi_id_terakhir(self):
+        id_urutan = self.urutan_id.baca() if self.urutan_id is not None else 0
+        # Riwayat yang dibaca bertahap (mis. RiwayatSQLite) tahu id terakhirnya tanpa dipindai.
+        # RiwayatBertahap hanya tahu id terbesar di halaman yang sudah dimuat: cukup untuk satu gerbang
+        # (id naik monoton); dengan blok id beberapa gerbang, UrutanID yang memegang id terbesar
+        if hasattr(self.riwayat_parkir, 'id_terakhir'):
+            return max(id_urutan, self.riwayat_parkir.id_terakhir())
+        if not self.riwayat_parkir:
+            return id_urutan
+        return max(id_urutan, max(item.get('id', 0) for item in self.riwayat_parkir))
+
+    def id_berikutnya(self):
+        if self.urutan_id is None or self.ukuran_blok_id <= 0:
+            self.last_parkir_id += 1
+            return self.last_parkir_id
+        id_baru = next(self._blok_id, None)
+        if id_baru is None:
+            awal = self.urutan_id.alokasi(self.ukuran_blok_id, minimal=self.last_parkir_id + 1)
+            self._blok_id = iter(range(awal, awal + self.ukuran_blok_id))
+            id_baru = next(self._blok_id)
+        self.last_parkir_id = max(self.last_parkir_id, id_baru)
+        return id_baru
+
+    def tutup(self):
+        # Satu gerbang: id terakhir cukup ditulis saat aplikasi ditutup (saat start diambil maksimum dengan riwayat)
+        if self.urutan_id is not None:
+            self.urutan_id.pastikan_minimal(self.last_parkir_id)
+
+    def hitung_biaya(self, jenis, total_jam, waktu_masuk):
+        """
+        Harga `total_jam` jam parkir yang dimulai `waktu_masuk`, lewat TabelTarif.harga seperti checkout.
+        Waktu masuk wajib: dengan periode, batas harian atau biaya inap, harga bergantung pada jam mulai.
+        """
+        return self.tarif.harga(jenis, waktu_masuk, waktu_masuk + datetime.timedelta(hours=total_jam))
+
+    @staticmethod
+    def hitung_total_jam(waktu_masuk, waktu_keluar):
+        """Durasi dibulatkan ke atas per jam, minimal satu jam."""
+        return max(1, math.ceil((waktu_keluar - waktu_masuk).total_seconds() / 3600))
+
+    def checkin(self, nopol, jenis, waktu_masuk=None):
+        if not nopol:
+            raise ParkirError("Nomor polisi harus diisi lengkap!")
+        if nopol in self.kendaraan_terparkir:
+            raise ParkirError(f"Kendaraan {nopol} sudah terparkir.")
+        if jenis not in JENIS_KENDARAAN:
+            raise ParkirError(f"Jenis kendaraan tidak dikenal: {jenis}")
+        if self.okupansi.penuh(jenis):
+            raise ParkirPenuh(f"Parkir {jenis} PENUH ({self.okupansi.terisi[jenis]}/{self.okupansi.kapasitas[jenis]}).")
+        data = {'jenis': jenis, 'waktu_masuk': waktu_masuk or datetime.datetime.now()}
+        self.kendaraan_terparkir[nopol] = data
+        self.indeks_aktif.tambah(nopol)
+        self.okupansi.masuk(jenis, data['waktu_masuk'])
+        self.alarm.masuk(nopol, jenis, data['waktu_masuk'])
+        if self.penyimpanan_aktif is not None:
+            self.penyimpanan_aktif.catat_masuk(nopol, data)
+        return data
+
+    def quote(self, nopol, waktu_keluar=None, tiket_hilang=False):
+        """Hitung rincian biaya checkout tanpa mengubah state."""
+        if nopol not in self.kendaraan_terparkir:
+            raise ParkirError(f"Kendaraan {nopol} tidak ditemukan.")
+        data_parkir = self.kendaraan_terparkir[nopol]
+        waktu_masuk = data_parkir['waktu_masuk']
+        waktu_keluar = waktu_keluar or datetime.datetime.now()
+        if waktu_keluar < waktu_masuk:
+            raise WaktuTidakValid("Waktu keluar tidak boleh lebih awal dari waktu masuk.")
+
+        rincian = {'nopol': nopol, 'jenis': data_parkir['jenis'], 'waktu_masuk': waktu_masuk,
+                   'waktu_keluar': waktu_keluar, 'durasi': waktu_keluar - waktu_masuk}
+        if tiket_hilang:
+            rincian.update(status="Denda Tiket Hilang", total_jam=None, total_biaya=DENDA_TIKET_HILANG)
+        else:
+            total_jam = self.hitung_total_jam(waktu_masuk, waktu_keluar)
+            rincian.update(status="Lunas", total_jam=total_jam, total_biaya=self.tarif.harga(data_parkir['jenis'], waktu_masuk, waktu_keluar))
+        return rincian
+
+    def selesaikan_checkout(self, nopol, total_biaya, metode, status, waktu_keluar):
+        """Pindahkan kendaraan dari daftar aktif ke riwayat (riwayat belum disimpan ke disk)."""
+        if nopol not in self.kendaraan_terparkir:
+            raise ParkirError(f"Kendaraan {nopol} tidak ditemukan.")
+        id_parkir = self.id_berikutnya()
+        data_lama = self.kendaraan_terparkir.pop(nopol)
+        riwayat_entry = {
+            'id': id_parkir,
+            'nopol': nopol,
+            'jenis': data_lama['jenis'],
+            'waktu_masuk': data_lama['waktu_masuk'],
+            'waktu_keluar': waktu_keluar,
+            'total_biaya': total_biaya,
+            'status': status,
+            'metode_bayar': metode
+        }
+        self.riwayat_parkir.insert(0, riwayat_entry)
+        self.indeks_aktif.hapus(nopol)
+        self.okupansi.keluar(data_lama['jenis'], waktu_keluar)
+        self.alarm.keluar(nopol)
+        if self._indeks_riwayat is not None:
+            self._indeks_riwayat.tambah(nopol)
+        return riwayat_entry
+
+    def saran_nopol(self, teks, batas=5):
+        """Saran nomor polisi kendaraan yang sedang parkir (awalan lalu salah ketik)."""
+        return self.indeks_aktif.saran(teks, batas)
+
+    def siapkan_pencarian_riwayat(self):
+        """Muat penuh riwayat bertahap dan bangun indeks nopol riwayat."""
+        if hasattr(self.riwayat_parkir, 'muat_semua'):
+            self.riwayat_parkir.muat_semua()
+        return self.indeks_riwayat
+
+    def cari_nopol_riwayat(self, teks, batas=10):
+        """Nomor polisi di riwayat yang cocok dengan teks; riwayat bertahap dimuat penuh saat pertama kali dicari."""
+        return self.siapkan_pencarian_riwayat().saran(teks, batas)
+
+    def riwayat_nopol(self, nopol, batas=None, muat_semua=True):
+        """
+        Riwayat satu kendaraan (terbaru di depan), lewat kolom kode nopol atau indeks SQLite jika ada.
+        `muat_semua=False`: riwayat bertahap hanya dicari di halaman yang sudah dimuat.
+        """
+        riwayat = self.riwayat_parkir
+        if hasattr(riwayat, 'muat_berikutnya'):
+            return riwayat.cari_nopol(nopol, batas, muat=muat_semua)
+        if hasattr(riwayat, 'cari_nopol'):
+            return riwayat.cari_nopol(nopol, batas)
+        cocok = [item for item in riwayat if item.get('nopol') == nopol]
+        return cocok if batas is None else cocok[:batas]
+
+    def simpan_checkout(self, riwayat_entry):
+        # Riwayat ditulis dulu, baru kendaraan dihapus dari catatan aktif, agar crash di antaranya tidak menghilangkan transaksi
+        if self.penyimpanan is not None:
+            self.penyimpanan.tambah(riwayat_entry)
+        if self.penyimpanan_aktif is not None:
+            self.penyimpanan_aktif.catat_keluar(riwayat_entry['nopol'])
+
+    def checkout(self, nopol, metode="Cash", waktu_keluar=None, tiket_hilang=False):
+        rincian = self.quote(nopol, waktu_keluar, tiket_hilang)
+        riwayat_entry = self.selesaikan_checkout(nopol, rincian['total_biaya'], metode, rincian['status'], rincian['waktu_keluar'])
+        self.simpan_checkout(riwayat_entry)
+        return riwayat_entry
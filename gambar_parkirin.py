@@ -0,0 +1,75 @@
+# --- Cache gambar: dekode dan perkecil gambar sekali, di luar thread Tk ---
+import threading # untuk mendekode gambar di latar belakang
+from collections import OrderedDict # untuk cache LRU
+
+import customtkinter as ctk # untuk CTkImage
+from PIL import Image # untuk membuka dan memperkecil gambar
+
+# Pillow >= 9.1 memindahkan konstanta resample ke Image.Resampling
+LANCZOS = getattr(Image, "Resampling", Image).LANCZOS
+
+
+def dekode_gambar(path, ukuran):
+    """Buka gambar dan perkecil ke `ukuran` piksel (lebar, tinggi); aman dipanggil dari thread mana pun."""
+    with Image.open(path) as gambar:
+        return gambar.resize(ukuran, LANCZOS)
+
+
+class CacheGambar:
+    """
+    Cache LRU berisi CTkImage yang sudah diperkecil, dengan kunci (path, ukuran).
+
+    `muat_latar` mendekode gambar di thread latar belakang (hanya PIL, tanpa Tk). CTkImage tetap
+    dibuat di thread Tk saat `ambil` dipanggil, dan objek yang sama dipakai ulang oleh setiap dialog,
+    sehingga PhotoImage hasil skala CustomTkinter juga ikut tersimpan.
+    `skala` adalah skala widget (HiDPI); gambar langsung diperkecil ke ukuran piksel akhirnya.
+    """
+
+    def __init__(self, maks=16, skala=1.0):
+        self.maks = maks
+        self.skala = skala
+        self._cache = OrderedDict()
+        self._hasil_latar = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _ukuran_piksel(self, ukuran):
+        return (round(ukuran[0] * self.skala), round(ukuran[1] * self.skala))
+
+    def muat_latar(self, daftar):
+        """Dekode daftar (path, ukuran) di thread latar belakang."""
+        daftar = [(path, tuple(ukuran)) for path, ukuran in daftar]
+        self._thread = threading.Thread(target=self._dekode_semua, args=(daftar,), daemon=True)
+        self._thread.start()
+
+    def _dekode_semua(self, daftar):
+        for kunci in daftar:
+            try:
+                hasil = dekode_gambar(kunci[0], self._ukuran_piksel(kunci[1]))
+            except Exception as e:
+                # Disimpan agar `ambil` melempar ulang di thread Tk dan pemanggil menampilkan pesan gagal
+                hasil = e
+            with self._lock:
+                self._hasil_latar[kunci] = hasil
+
+    def tunggu(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def ambil(self, path, ukuran):
+        """CTkImage untuk (path, ukuran); didekode langsung jika belum dimuat di latar belakang."""
+        kunci = (path, tuple(ukuran))
+        gambar = self._cache.get(kunci)
+        if gambar is not None:
+            self._cache.move_to_end(kunci)
+            return gambar
+        with self._lock:
+            hasil = self._hasil_latar.pop(kunci, None)
+        if hasil is None:
+            hasil = dekode_gambar(path, self._ukuran_piksel(kunci[1]))
+        elif isinstance(hasil, Exception):
+            raise hasil
+        gambar = self._cache[kunci] = ctk.CTkImage(hasil, size=kunci[1])
+        if len(self._cache) > self.maks:
+            self._cache.popitem(last=False)
+        return gambar
@@ -0,0 +1,167 @@
+# --- Indeks nomor polisi untuk pencarian awalan dan pencarian mirip (salah ketik) ---
+import bisect # untuk pencarian awalan pada daftar kunci yang terurut
+from collections import Counter # untuk menghitung trigram yang sama
+
+
+def normalisasi_nopol(nopol):
+    """'b 1234 xyz' dan 'B1234XYZ' menjadi kunci yang sama: 'B1234XYZ'."""
+    return "".join(nopol.split()).upper()
+
+
+def trigram(kunci):
+    teks = f"^{kunci}$"
+    return {teks[i:i + 3] for i in range(len(teks) - 2)}
+
+
+def pola_bit(teks):
+    """Bitmask posisi setiap huruf pada teks, dipakai ulang oleh jarak_edit untuk banyak kandidat."""
+    pola = {}
+    for i, huruf in enumerate(teks):
+        pola[huruf] = pola.get(huruf, 0) | (1 << i)
+    return pola
+
+
+def jarak_edit(a, b, pola=None, maks=None):
+    """
+    Jarak Levenshtein antara a dan b dengan algoritma bit-paralel Myers/Hyyro:
+    satu kolom matriks DP dihitung sebagai beberapa operasi bit pada int, bukan len(a) sel.
+    Jika `maks` diisi, perhitungan berhenti lebih awal dan mengembalikan maks + 1 begitu jaraknya pasti > maks.
+    """
+    if not a:
+        return len(b)
+    pola = pola if pola is not None else pola_bit(a)
+    masker = (1 << len(a)) - 1
+    atas = 1 << (len(a) - 1)
+    pv, mv, skor = masker, 0, len(a)
+    # Setiap huruf b berikutnya menurunkan skor paling banyak 1
+    sisa = len(b) if maks is not None else None
+    for huruf in b:
+        eq = pola.get(huruf, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & masker)
+        mh = pv & xh
+        if ph & atas:
+            skor += 1
+        elif mh & atas:
+            skor -= 1
+        ph = ((ph << 1) | 1) & masker
+        mh = (mh << 1) & masker
+        pv = mh | (~(xv | ph) & masker)
+        mv = ph & xv
+        if sisa is not None:
+            sisa -= 1
+            if skor - sisa > maks:
+                return maks + 1
+    return skor
+
+
+class IndeksNopol:
+    """
+    Indeks nomor polisi yang bisa ditambah/dihapus satu per satu.
+
+    Pencarian awalan memakai daftar kunci yang terurut (bisect), setara dengan menelusuri trie
+    tetapi tanpa satu dict per simpul. Pencarian mirip memakai indeks trigram: kandidat adalah kunci
+    yang paling banyak berbagi trigram dengan teks, lalu diperiksa dengan jarak_edit.
+    """
+    # Trigram yang terlalu umum (mis. '^B1') tidak banyak menyaring, jadi dilewati
+    MAKS_POSTING = 5000
+
+    def __init__(self, daftar_nopol=()):
+        self.kunci = []
+        self.nopol = {}
+        self._id = {}
+        self._kunci_id = []
+        self._posting = {}
+        self.tambah_banyak(daftar_nopol)
+
+    def __len__(self):
+        return len(self.kunci)
+
+    def __contains__(self, nopol):
+        return normalisasi_nopol(nopol) in self.nopol
+
+    def _daftarkan(self, kunci):
+        # Posting trigram tidak pernah dihapus; kunci yang sudah dihapus disaring saat pencarian
+        if kunci not in self._id:
+            self._id[kunci] = len(self._kunci_id)
+            self._kunci_id.append(kunci)
+            for tg in trigram(kunci):
+                self._posting.setdefault(tg, []).append(self._id[kunci])
+
+    def tambah(self, nopol):
+        kunci = normalisasi_nopol(nopol)
+        if not kunci:
+            return
+        if kunci not in self.nopol:
+            self._daftarkan(kunci)
+            bisect.insort(self.kunci, kunci)
+        self.nopol[kunci] = nopol
+
+    def tambah_banyak(self, daftar_nopol):
+        jumlah_awal = len(self.nopol)
+        for nopol in daftar_nopol:
+            kunci = normalisasi_nopol(nopol)
+            if kunci:
+                self._daftarkan(kunci)
+                self.nopol[kunci] = nopol
+        if len(self.nopol) != jumlah_awal:
+            self.kunci = sorted(self.nopol)
+
+    def hapus(self, nopol):
+        kunci = normalisasi_nopol(nopol)
+        if self.nopol.pop(kunci, None) is not None:
+            del self.kunci[bisect.bisect_left(self.kunci, kunci)]
+
+    def awalan(self, teks, batas=5):
+        awal = normalisasi_nopol(teks)
+        hasil = []
+        for i in range(bisect.bisect_left(self.kunci, awal), len(self.kunci)):
+            if len(hasil) >= batas or not self.kunci[i].startswith(awal):
+                break
+            hasil.append(self.nopol[self.kunci[i]])
+        return hasil
+
+    def mirip(self, teks, batas=5, maks_jarak=2):
+        """Nomor polisi dengan jarak edit <= maks_jarak, yang paling mirip lebih dulu."""
+        kunci = normalisasi_nopol(teks)
+        if len(kunci) < 3:
+            return []
+        posting = sorted((self._posting[tg] for tg in trigram(kunci) if tg in self._posting), key=len)
+        if not posting:
+            return []
+        dipakai = [p for p in posting if len(p) <= self.MAKS_POSTING] or posting[:1]
+        hitung = Counter()
+        for p in dipakai:
+            hitung.update(p)
+        # Satu edit merusak paling banyak tiga trigram, jadi kandidat minimal berbagi sebanyak ini
+        ambang = max(1, len(dipakai) - 3 * maks_jarak)
+        pola = pola_bit(kunci)
+        hasil, per_jarak = [], [0] * (maks_jarak + 1)
+        # Semua kandidat di atas ambang diurutkan, bukan dipotong ke sejumlah tetap: kunci yang benar bisa
+        # berada di bawah banyak kunci lain (mis. yang jauh lebih panjang) yang berbagi lebih banyak trigram
+        kandidat = sorted(((jumlah, id_kunci) for id_kunci, jumlah in hitung.items() if jumlah >= ambang), reverse=True)
+        for jumlah, id_kunci in kandidat:
+            if len(hasil) >= batas:
+                # Kandidat yang kehilangan m trigram berjarak minimal ceil(m / 3); berhenti jika sudah
+                # ada `batas` hasil yang lebih dekat dari itu
+                jarak_minimal = -(-(len(dipakai) - jumlah) // 3)
+                if sum(per_jarak[:jarak_minimal]) >= batas:
+                    break
+            calon = self._kunci_id[id_kunci]
+            if calon in self.nopol and abs(len(calon) - len(kunci)) <= maks_jarak:
+                jarak = jarak_edit(kunci, calon, pola, maks_jarak)
+                if jarak <= maks_jarak:
+                    hasil.append((jarak, calon))
+                    per_jarak[jarak] += 1
+        hasil.sort()
+        return [self.nopol[calon] for _, calon in hasil[:batas]]
+
+    def saran(self, teks, batas=5):
+        """Saran untuk kolom input: hasil awalan lebih dulu, lalu hasil yang mirip."""
+        hasil = self.awalan(teks, batas)
+        if len(hasil) < batas:
+            for nopol in self.mirip(teks, batas):
+                if nopol not in hasil:
+                    hasil.append(nopol)
+        return hasil[:batas]
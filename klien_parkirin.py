@@ -0,0 +1,274 @@
+# --- Klien server parkir: aplikasi gerbang memakai state parkir yang dipegang server_parkirin.py ---
+import datetime # untuk konversi waktu dari string ISO
+import http.client # untuk koneksi HTTP keep-alive ke server
+import json # untuk badan permintaan dan respons
+from collections.abc import Mapping # antarmuka dict untuk daftar kendaraan aktif
+from urllib.parse import urlencode, urlsplit # untuk alamat server dan query string
+
+from engine_parkirin import JENIS_KENDARAAN, ParkirError, ParkirPenuh, WaktuTidakValid # error yang sama dengan engine lokal
+from alarm_parkirin import AlarmParkir # peringatan parkir terlalu lama dihitung di setiap gerbang
+from okupansi_parkirin import Okupansi # salinan lokal okupansi untuk label dan grafik
+
+KOLOM_WAKTU = ('waktu_masuk', 'waktu_keluar')
+# POST tanpa efek samping; selain ini (dan GET) permintaan tidak dikirim ulang setelah koneksi putus,
+# karena server mungkin sudah memprosesnya (mis. checkout tercatat dua kali)
+POST_IDEMPOTEN = frozenset({"/quote"})
+_KELAS_ERROR = {'ParkirError': ParkirError, 'WaktuTidakValid': WaktuTidakValid, 'ParkirPenuh': ParkirPenuh}
+
+
+def dari_json(data):
+    """Kebalikan server_parkirin.ke_json: string ISO menjadi datetime, `durasi` (detik) menjadi timedelta."""
+    for kolom in KOLOM_WAKTU:
+        if data.get(kolom):
+            data[kolom] = datetime.datetime.fromisoformat(data[kolom])
+    if data.get('durasi') is not None:
+        data['durasi'] = datetime.timedelta(seconds=data['durasi'])
+    return data
+
+
+class KlienParkir:
+    """Klien HTTP untuk ServerParkir; satu koneksi keep-alive yang dipakai ulang untuk semua permintaan."""
+
+    def __init__(self, alamat, timeout=5.0):
+        url = urlsplit(alamat)
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.timeout = timeout
+        self._koneksi = None
+
+    def _minta(self, metode, path, data=None, **query):
+        bisa_diulang = metode == "GET" or (metode == "POST" and path in POST_IDEMPOTEN)
+        query = {k: v for k, v in query.items() if v is not None}
+        if query:
+            path += "?" + urlencode(query)
+        badan = json.dumps(data) if data is not None else None
+        header = {"Content-Type": "application/json"} if badan is not None else {}
+        for percobaan in range(2):
+            if self._koneksi is None:
+                self._koneksi = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self._koneksi.request(metode, path, body=badan, headers=header)
+                respons = self._koneksi.getresponse()
+                hasil = json.loads(respons.read())
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError) as e:
+                # Koneksi keep-alive yang lama diputus server (mis. server restart): sambung ulang sekali
+                self.tutup()
+                if not bisa_diulang:
+                    raise ParkirError(f"Koneksi ke server parkir terputus: {e}. Permintaan tidak dikirim ulang; "
+                                      "periksa apakah transaksi sudah tercatat") from e
+                if percobaan:
+                    raise ParkirError(f"Koneksi ke server parkir terputus: {e}") from e
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                self.tutup()
+                raise ParkirError(f"Server parkir tidak bisa dihubungi: {e}") from e
+        if respons.status >= 400:
+            raise _KELAS_ERROR.get(hasil.get('jenis'), ParkirError)(hasil.get('error', f"HTTP {respons.status}"))
+        return hasil
+
+    def tutup(self):
+        if self._koneksi is not None:
+            self._koneksi.close()
+            self._koneksi = None
+
+    @staticmethod
+    def _waktu(nilai):
+        return nilai.isoformat() if nilai is not None else None
+
+    def status(self):
+        return self._minta("GET", "/status")
+
+    def kendaraan(self, nopol=None):
+        """Kendaraan aktif {nopol: {'jenis', 'waktu_masuk'}}; jika `nopol` diisi, hanya kendaraan itu."""
+        hasil = self._minta("GET", "/kendaraan", nopol=nopol)['kendaraan']
+        return {data.pop('nopol'): dari_json(data) for data in hasil}
+
+    def checkin(self, nopol, jenis, waktu_masuk=None):
+        data = self._minta("POST", "/checkin", {'nopol': nopol, 'jenis': jenis, 'waktu_masuk': self._waktu(waktu_masuk)})
+        data.pop('nopol', None)
+        return dari_json(data)
+
+    def quote(self, nopol, waktu_keluar=None, tiket_hilang=False):
+        return dari_json(self._minta("POST", "/quote", {'nopol': nopol, 'waktu_keluar': self._waktu(waktu_keluar),
+                                                        'tiket_hilang': tiket_hilang}))
+
+    def checkout(self, nopol, metode="Cash", waktu_keluar=None, tiket_hilang=False):
+        return dari_json(self._minta("POST", "/checkout", {'nopol': nopol, 'metode': metode,
+                                                           'waktu_keluar': self._waktu(waktu_keluar),
+                                                           'tiket_hilang': tiket_hilang}))
+
+    def riwayat(self, offset=0, batas=50, nopol=None):
+        """Dict {'jumlah', 'lengkap', 'riwayat'}; `riwayat` berisi baris dengan waktu sebagai datetime."""
+        hasil = self._minta("GET", "/riwayat", offset=offset, batas=batas, nopol=nopol)
+        hasil['riwayat'] = [dari_json(item) for item in hasil['riwayat']]
+        return hasil
+
+    def saran(self, teks, batas=5, sumber="aktif"):
+        return self._minta("GET", "/saran", teks=teks, batas=batas, sumber=sumber)['saran']
+
+    def biaya(self, jenis, total_jam, waktu_masuk):
+        return self._minta("GET", "/biaya", jenis=jenis, jam=total_jam, masuk=waktu_masuk.isoformat())['biaya']
+
+    def okupansi(self, menit=60):
+        """Dict {'terisi', 'kapasitas', 'deret'}; `deret` berisi (waktu, {jenis: n}) dengan waktu sebagai datetime."""
+        hasil = self._minta("GET", "/okupansi", menit=menit)
+        hasil['deret'] = [(datetime.datetime.fromisoformat(waktu), nilai) for waktu, nilai in hasil['deret']]
+        return hasil
+
+
+class KendaraanJarak(Mapping):
+    """
+    Daftar kendaraan aktif di server dengan antarmuka dict.
+    Salinan lokal diperbarui lewat `segarkan`; nopol yang belum ada di salinan (mis. masuk lewat
+    gerbang lain) ditanyakan langsung ke server.
+    """
+
+    def __init__(self, klien):
+        self.klien = klien
+        self._data = {}
+        self.segarkan()
+
+    def segarkan(self):
+        """Ambil ulang seluruh daftar; True jika isinya berubah."""
+        baru = self.klien.kendaraan()
+        berubah = list(baru) != list(self._data)
+        self._data = baru
+        return berubah
+
+    def _cari(self, nopol):
+        if nopol not in self._data:
+            self._data.update(self.klien.kendaraan(nopol))
+        return self._data.get(nopol)
+
+    def __contains__(self, nopol):
+        return self._cari(nopol) is not None
+
+    def __getitem__(self, nopol):
+        data = self._cari(nopol)
+        if data is None:
+            raise KeyError(nopol)
+        return data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def simpan(self, nopol, data):
+        self._data[nopol] = data
+
+    def buang(self, nopol):
+        self._data.pop(nopol, None)
+
+
+class RiwayatJarak:
+    """Riwayat di server (terbaru di depan), dimuat per halaman seperti RiwayatBertahap."""
+    UKURAN_HALAMAN = 200
+
+    def __init__(self, klien):
+        self.klien = klien
+        self.segarkan()
+
+    def segarkan(self):
+        """Buang halaman yang sudah dimuat lalu baca ulang halaman pertama; True jika jumlahnya berubah."""
+        jumlah_lama = len(getattr(self, 'data', ()))
+        self.data = []
+        self.selesai = False
+        self.muat_berikutnya()
+        return len(self.data) != jumlah_lama
+
+    def muat_berikutnya(self, jumlah=None):
+        if self.selesai:
+            return 0
+        hasil = self.klien.riwayat(len(self.data), jumlah or self.UKURAN_HALAMAN)
+        self.data.extend(hasil['riwayat'])
+        self.selesai = not hasil['riwayat'] or (hasil['lengkap'] and len(self.data) >= hasil['jumlah'])
+        return len(hasil['riwayat'])
+
+    def muat_semua(self):
+        while not self.selesai:
+            self.muat_berikutnya()
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, indeks):
+        return self.data[indeks]
+
+    def __iter__(self):
+        self.muat_semua()
+        return iter(self.data)
+
+    def insert(self, indeks, entry):
+        self.data.insert(indeks, entry)
+
+
+class EngineJarak:
+    """
+    Pengganti ParkingEngine untuk App saat state parkir dipegang server (ALAMAT_SERVER).
+    Method dan atributnya sama dengan ParkingEngine, tetapi setiap perubahan dikirim ke server.
+    """
+
+    def __init__(self, klien, batas_alarm=None):
+        self.klien = klien
+        self.kendaraan_terparkir = KendaraanJarak(klien)
+        self.riwayat_parkir = RiwayatJarak(klien)
+        self.alarm = AlarmParkir(batas_alarm)
+        self.alarm.reset(self.kendaraan_terparkir)
+        status = self.klien.status()
+        self.last_parkir_id = status['id_terakhir']
+        # Kapasitas dipegang server (yang juga menolak check-in saat penuh); salinan ini untuk label dan grafik
+        self.okupansi = Okupansi({jenis: o['kapasitas'] for jenis, o in status.get('okupansi', {}).items()}, JENIS_KENDARAAN)
+        self.okupansi.reset(self.kendaraan_terparkir)
+
+    def inisialisasi_id_terakhir(self):
+        return self.klien.status()['id_terakhir']
+
+    def segarkan(self):
+        """Ambil ulang kendaraan aktif dan halaman pertama riwayat (perubahan dari gerbang lain)."""
+        aktif_berubah = self.kendaraan_terparkir.segarkan()
+        riwayat_berubah = self.riwayat_parkir.segarkan()
+        if aktif_berubah:
+            self.okupansi.reset(self.kendaraan_terparkir)
+            self.alarm.reset(self.kendaraan_terparkir)
+        return aktif_berubah or riwayat_berubah
+
+    def tutup(self):
+        self.klien.tutup()
+
+    def hitung_biaya(self, jenis, total_jam, waktu_masuk):
+        return self.klien.biaya(jenis, total_jam, waktu_masuk)
+
+    def checkin(self, nopol, jenis, waktu_masuk=None):
+        data = self.klien.checkin(nopol, jenis, waktu_masuk)
+        self.kendaraan_terparkir.simpan(nopol, data)
+        self.okupansi.masuk(jenis, data['waktu_masuk'])
+        self.alarm.masuk(nopol, jenis, data['waktu_masuk'])
+        return data
+
+    def quote(self, nopol, waktu_keluar=None, tiket_hilang=False):
+        return self.klien.quote(nopol, waktu_keluar, tiket_hilang)
+
+    def selesaikan_checkout(self, nopol, total_biaya, metode, status, waktu_keluar):
+        # Server menghitung ulang biaya dengan waktu keluar yang sama dan langsung menyimpan transaksi
+        riwayat_entry = self.klien.checkout(nopol, metode, waktu_keluar, tiket_hilang=status == "Denda Tiket Hilang")
+        self.kendaraan_terparkir.buang(nopol)
+        self.okupansi.keluar(riwayat_entry['jenis'], riwayat_entry['waktu_keluar'])
+        self.alarm.keluar(nopol)
+        self.riwayat_parkir.insert(0, riwayat_entry)
+        self.last_parkir_id = max(self.last_parkir_id, riwayat_entry['id'])
+        return riwayat_entry
+
+    def simpan_checkout(self, riwayat_entry):
+        pass # sudah disimpan server saat selesaikan_checkout
+
+    def checkout(self, nopol, metode="Cash", waktu_keluar=None, tiket_hilang=False):
+        rincian = self.quote(nopol, waktu_keluar, tiket_hilang)
+        return self.selesaikan_checkout(nopol, rincian['total_biaya'], metode, rincian['status'], rincian['waktu_keluar'])
+
+    def saran_nopol(self, teks, batas=5):
+        return self.klien.saran(teks, batas)
+
+    def cari_nopol_riwayat(self, teks, batas=10):
+        return self.klien.saran(teks, batas, sumber="riwayat")
@@ -0,0 +1,200 @@
+# --- Riwayat parkir dalam bentuk kolom (hemat memori) ---
+import datetime # untuk konversi waktu masuk/keluar
+from array import array # untuk kolom angka yang ringkas
+from collections.abc import Mapping # untuk tampilan baris yang berperilaku seperti dict
+
+KOLOM_RIWAYAT = ('id', 'nopol', 'jenis', 'waktu_masuk', 'waktu_keluar', 'total_biaya', 'status', 'metode_bayar')
+EPOCH = datetime.datetime(1970, 1, 1)
+
+# Kode awal untuk kolom kategori; nilai lain ditambahkan otomatis saat pertama kali muncul
+JENIS_AWAL = ("Mobil", "Motor")
+STATUS_AWAL = ("Lunas", "Denda Tiket Hilang")
+METODE_AWAL = ("Cash", "E-Money")
+
+# Tipe array per kolom: q = int64, B = uint8, I = uint32
+TIPE_KOLOM = {'id': 'q', 'nopol': 'I', 'jenis': 'B', 'waktu_masuk': 'q', 'waktu_keluar': 'q',
+              'total_biaya': 'q', 'status': 'B', 'metode_bayar': 'B'}
+# Sisa mikrodetik waktu (0..999999, uint32) disimpan terpisah, agar kolom detik tetap dipakai laporan/tarif
+# dan penulisan ulang riwayat (mode "json") tidak memotong waktu asli
+KOLOM_MIKRO = {'waktu_masuk': 'mikro_masuk', 'waktu_keluar': 'mikro_keluar'}
+
+
+def ke_epoch(waktu):
+    """Detik sejak 1970-01-01 untuk datetime naif (waktu lokal, tanpa konversi zona waktu)."""
+    if isinstance(waktu, str):
+        waktu = datetime.datetime.fromisoformat(waktu)
+    return (waktu - EPOCH) // datetime.timedelta(seconds=1)
+
+
+def dari_epoch(detik, mikro=0):
+    return EPOCH + datetime.timedelta(seconds=detik, microseconds=mikro)
+
+
+def pecah_epoch(waktu):
+    """(detik epoch, sisa mikrodetik) untuk datetime naif atau string ISO."""
+    if isinstance(waktu, str):
+        waktu = datetime.datetime.fromisoformat(waktu)
+    selisih = waktu - EPOCH
+    return selisih // datetime.timedelta(seconds=1), selisih.microseconds
+
+
+class KamusKode:
+    """Memetakan string ke kode kecil dan sebaliknya (string yang sama hanya disimpan sekali)."""
+
+    def __init__(self, nilai_awal=()):
+        self.nilai = []
+        self.kode = {}
+        for nilai in nilai_awal:
+            self.kode_dari(nilai)
+
+    def kode_dari(self, nilai):
+        kode = self.kode.get(nilai)
+        if kode is None:
+            kode = self.kode[nilai] = len(self.nilai)
+            self.nilai.append(nilai)
+        return kode
+
+    def __len__(self):
+        return len(self.nilai)
+
+
+class BarisKolom(Mapping):
+    """Tampilan baca-saja satu baris RiwayatKolom; dipakai seperti dict biasa."""
+    __slots__ = ('_riwayat', '_segmen', '_posisi')
+
+    def __init__(self, riwayat, segmen, posisi):
+        self._riwayat = riwayat
+        self._segmen = segmen
+        self._posisi = posisi
+
+    def __getitem__(self, kunci):
+        if kunci not in TIPE_KOLOM:
+            raise KeyError(kunci)
+        nilai = self._segmen[kunci][self._posisi]
+        if kunci in KOLOM_MIKRO:
+            return dari_epoch(nilai, self._segmen[KOLOM_MIKRO[kunci]][self._posisi])
+        kamus = self._riwayat.kamus.get(kunci)
+        return kamus.nilai[nilai] if kamus is not None else nilai
+
+    def __iter__(self):
+        return iter(KOLOM_RIWAYAT)
+
+    def __len__(self):
+        return len(KOLOM_RIWAYAT)
+
+    def copy(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"BarisKolom({self.copy()!r})"
+
+
+class RiwayatKolom:
+    """
+    Riwayat (terbaru di depan) yang disimpan sebagai kolom `array`: waktu dalam detik epoch,
+    biaya dalam rupiah bulat, jenis/status/metode sebagai kode, dan nopol di-intern.
+
+    Ada dua segmen agar penambahan di kedua ujung O(1) amortisasi:
+    `baru` berisi checkout sesi ini (urut kronologis), `lama` berisi riwayat yang dimuat
+    dari penyimpanan (urut dari terbaru ke terlama).
+    """
+
+    def __init__(self, data=()):
+        self.kamus = {'nopol': KamusKode(), 'jenis': KamusKode(JENIS_AWAL),
+                      'status': KamusKode(STATUS_AWAL), 'metode_bayar': KamusKode(METODE_AWAL)}
+        self.baru = self._segmen_kosong()
+        self.lama = self._segmen_kosong()
+        self._id_maks = 0
+        for entry in data:
+            self.tambah_lama(entry)
+
+    @staticmethod
+    def _segmen_kosong():
+        segmen = {kolom: array(tipe) for kolom, tipe in TIPE_KOLOM.items()}
+        segmen.update((kolom, array('I')) for kolom in KOLOM_MIKRO.values())
+        return segmen
+
+    def _tambah(self, segmen, entry):
+        segmen['id'].append(entry['id'])
+        segmen['nopol'].append(self.kamus['nopol'].kode_dari(entry['nopol']))
+        segmen['jenis'].append(self.kamus['jenis'].kode_dari(entry['jenis']))
+        for kolom, kolom_mikro in KOLOM_MIKRO.items():
+            detik, mikro = pecah_epoch(entry[kolom])
+            segmen[kolom].append(detik)
+            segmen[kolom_mikro].append(mikro)
+        segmen['total_biaya'].append(int(entry['total_biaya']))
+        segmen['status'].append(self.kamus['status'].kode_dari(entry['status']))
+        segmen['metode_bayar'].append(self.kamus['metode_bayar'].kode_dari(entry['metode_bayar']))
+        self._id_maks = max(self._id_maks, entry['id'])
+
+    def salin(self):
+        """Salinan lepas (kolom dan kamus disalin), mis. untuk dibaca thread lain selagi riwayat ini terus ditambah."""
+        salinan = RiwayatKolom()
+        for nama, kamus in self.kamus.items():
+            salinan.kamus[nama].nilai = list(kamus.nilai)
+            salinan.kamus[nama].kode = dict(kamus.kode)
+        salinan.baru = {kolom: nilai[:] for kolom, nilai in self.baru.items()}
+        salinan.lama = {kolom: nilai[:] for kolom, nilai in self.lama.items()}
+        salinan._id_maks = self._id_maks
+        return salinan
+
+    def tambah_lama(self, entry):
+        """Tambahkan baris yang lebih lama dari semua baris yang sudah ada (dipakai saat memuat)."""
+        self._tambah(self.lama, entry)
+
+    def insert(self, indeks, entry):
+        if indeks != 0:
+            raise ValueError("RiwayatKolom hanya mendukung penambahan di depan")
+        self._tambah(self.baru, entry)
+
+    def id_terakhir(self):
+        return self._id_maks
+
+    def __len__(self):
+        return len(self.baru['id']) + len(self.lama['id'])
+
+    def __getitem__(self, indeks):
+        if indeks < 0:
+            indeks += len(self)
+        jumlah_baru = len(self.baru['id'])
+        if 0 <= indeks < jumlah_baru:
+            return BarisKolom(self, self.baru, jumlah_baru - 1 - indeks)
+        if jumlah_baru <= indeks < len(self):
+            return BarisKolom(self, self.lama, indeks - jumlah_baru)
+        raise IndexError("indeks riwayat di luar jangkauan")
+
+    def __iter__(self):
+        for posisi in range(len(self.baru['id']) - 1, -1, -1):
+            yield BarisKolom(self, self.baru, posisi)
+        for posisi in range(len(self.lama['id'])):
+            yield BarisKolom(self, self.lama, posisi)
+
+    def cari_nopol(self, nopol, batas=None):
+        """
+        Baris dengan nopol tertentu (terbaru di depan), paling banyak `batas`. Nopol dicari sebagai kode di
+        kolom `nopol` dengan array.index (pemindaian di C), dan nopol yang belum pernah tercatat langsung kosong.
+        """
+        kode = self.kamus['nopol'].kode.get(nopol)
+        hasil = []
+        if kode is None:
+            return hasil
+        # `baru` urut kronologis, jadi dibalik agar yang terbaru ditemukan lebih dulu
+        for segmen, terbalik in ((self.baru, True), (self.lama, False)):
+            kolom = segmen['nopol']
+            if terbalik:
+                kolom = kolom[::-1]
+            posisi = 0
+            while batas is None or len(hasil) < batas:
+                try:
+                    posisi = kolom.index(kode, posisi)
+                except ValueError:
+                    break
+                hasil.append(BarisKolom(self, segmen, len(kolom) - 1 - posisi if terbalik else posisi))
+                posisi += 1
+        return hasil
+
+    def kolom(self, nama):
+        """Satu kolom mentah (kode/epoch) untuk seluruh riwayat, urut dari terlama ke terbaru."""
+        hasil = array(TIPE_KOLOM[nama], reversed(self.lama[nama]))
+        hasil.extend(self.baru[nama])
+        return hasil
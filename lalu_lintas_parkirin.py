@@ -0,0 +1,93 @@
+# --- Lalu lintas sintetis: kedatangan jam sibuk, campuran mobil/motor dan tiket hilang ---
+import datetime # untuk waktu masuk dan keluar
+import heapq # untuk melepas nopol yang kendaraannya sudah keluar
+import math # untuk distribusi durasi parkir
+import random # generator acak dengan seed agar hasil bisa diulang
+from collections import namedtuple # untuk satu kunjungan parkir
+
+Kunjungan = namedtuple("Kunjungan", "nopol jenis waktu_masuk waktu_keluar tiket_hilang metode_bayar")
+
+WILAYAH = ("B", "D", "F", "AB", "AD", "L", "N", "DK", "BK", "H")
+
+# Bobot kedatangan per jam (00..23): puncak pagi 07-09 dan sore 16-18
+KEDATANGAN_PER_JAM = (1, 1, 1, 1, 2, 4, 8, 16, 18, 12, 8, 8, 9, 8, 8, 10, 14, 16, 12, 8, 5, 3, 2, 1)
+
+
+class PolaLaluLintas:
+    """
+    Parameter lalu lintas satu lokasi parkir.
+    Durasi parkir berdistribusi log-normal dengan median `median_jam` per jenis; sebaran `sigma`.
+    """
+
+    def __init__(self, kendaraan_per_hari=2000, porsi_motor=0.65, peluang_tiket_hilang=0.005,
+                 porsi_cashless=0.3, median_jam=None, sigma=0.8, kedatangan_per_jam=KEDATANGAN_PER_JAM):
+        self.kendaraan_per_hari = kendaraan_per_hari
+        self.porsi_motor = porsi_motor
+        self.peluang_tiket_hilang = peluang_tiket_hilang
+        self.porsi_cashless = porsi_cashless
+        self.median_jam = median_jam or {"Motor": 1.5, "Mobil": 2.5}
+        self.sigma = sigma
+        self.kedatangan_per_jam = kedatangan_per_jam
+
+
+def buat_nopol(acak, jumlah):
+    hasil = set()
+    while len(hasil) < jumlah:
+        akhiran = "".join(acak.choices("ABCDEFGHIJKLMNOPRSTUVWXYZ", k=acak.randint(1, 3)))
+        hasil.add(f"{acak.choice(WILAYAH)} {acak.randint(1, 9999)} {akhiran}")
+    return sorted(hasil)
+
+
+def buat_lalu_lintas(jumlah, pola=None, mulai=datetime.datetime(2024, 1, 1), seed=42):
+    """
+    `jumlah` kunjungan (urut waktu masuk) mulai tanggal `mulai`. Seed yang sama selalu
+    menghasilkan data yang sama. Nopol dipakai ulang (pelanggan tetap), tetapi satu nopol
+    tidak pernah parkir dua kali pada waktu yang sama.
+    """
+    pola = pola or PolaLaluLintas()
+    acak = random.Random(seed)
+    jumlah_hari = max(1, math.ceil(jumlah / pola.kendaraan_per_hari))
+    jam = acak.choices(range(24), weights=pola.kedatangan_per_jam, k=jumlah)
+    # int(random() * n) jauh lebih cepat daripada randrange untuk jutaan kunjungan
+    rnd = acak.random
+    detik_masuk = sorted(int(rnd() * jumlah_hari) * 86400 + j * 3600 + int(rnd() * 3600) for j in jam)
+
+    nopol_bebas = buat_nopol(acak, max(10, jumlah // 3))
+    terpakai = [] # heap (detik keluar, nopol)
+    median_detik = {jenis: jam * 3600 for jenis, jam in pola.median_jam.items()}
+    hasil = []
+    for detik in detik_masuk:
+        while terpakai and terpakai[0][0] <= detik:
+            nopol_bebas.append(heapq.heappop(terpakai)[1])
+        if not nopol_bebas:
+            nopol_bebas.extend(buat_nopol(acak, 10))
+        i = int(rnd() * len(nopol_bebas))
+        nopol_bebas[i], nopol_bebas[-1] = nopol_bebas[-1], nopol_bebas[i]
+        nopol = nopol_bebas.pop()
+
+        jenis = "Motor" if rnd() < pola.porsi_motor else "Mobil"
+        durasi = max(60, int(median_detik[jenis] * math.exp(acak.gauss(0, pola.sigma))))
+        heapq.heappush(terpakai, (detik + durasi, nopol))
+        waktu_masuk = mulai + datetime.timedelta(seconds=detik)
+        hasil.append(Kunjungan(nopol, jenis, waktu_masuk, waktu_masuk + datetime.timedelta(seconds=durasi),
+                               rnd() < pola.peluang_tiket_hilang,
+                               "E-Money" if rnd() < pola.porsi_cashless else "Cash"))
+    return hasil
+
+
+def urutan_event(daftar_kunjungan):
+    """Event ('masuk'/'keluar', kunjungan) urut waktu, siap diputar ulang ke ParkingEngine."""
+    event = [(k.waktu_masuk, 1, i, "masuk") for i, k in enumerate(daftar_kunjungan)]
+    event += [(k.waktu_keluar, 0, i, "keluar") for i, k in enumerate(daftar_kunjungan)]
+    # Pada detik yang sama, keluar didahulukan agar nopol yang dipakai ulang sudah bebas
+    event.sort()
+    return [(jenis, daftar_kunjungan[i]) for _, _, i, jenis in event]
+
+
+def putar_ulang(engine, daftar_kunjungan):
+    """Jalankan semua check-in dan checkout ke `engine` (mis. ParkingEngine atau EngineJarak)."""
+    for jenis, k in urutan_event(daftar_kunjungan):
+        if jenis == "masuk":
+            engine.checkin(k.nopol, k.jenis, k.waktu_masuk)
+        else:
+            engine.checkout(k.nopol, k.metode_bayar, k.waktu_keluar, k.tiket_hilang)
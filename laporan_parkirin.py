@@ -0,0 +1,178 @@
+# --- Laporan pendapatan dan okupansi dari riwayat parkir ---
+import datetime # untuk mengubah nomor hari menjadi tanggal
+
+from kolom_parkirin import RiwayatKolom, TIPE_KOLOM, EPOCH
+
+try:
+    import numpy as np # opsional: agregasi per kelompok dijalankan sebagai operasi array
+except ImportError:
+    np = None
+
+STATUS_TIKET_HILANG = "Denda Tiket Hilang"
+KOLOM_LAPORAN = ('jenis', 'status', 'metode_bayar', 'waktu_masuk', 'waktu_keluar', 'total_biaya')
+DTYPE_KOLOM = {'q': 'int64', 'B': 'uint8', 'I': 'uint32'}
+
+
+def _sebagai_kolom(riwayat):
+    """Pastikan riwayat berbentuk RiwayatKolom yang sudah dimuat seluruhnya."""
+    if hasattr(riwayat, 'muat_semua'):
+        riwayat.muat_semua()
+    if isinstance(riwayat, RiwayatKolom):
+        return riwayat
+    return RiwayatKolom(riwayat)
+
+
+def _kolom_numpy(riwayat, nama):
+    # Urutan baris tidak penting untuk agregasi, jadi kedua segmen cukup digabung
+    dtype = DTYPE_KOLOM[TIPE_KOLOM[nama]]
+    return np.concatenate((np.frombuffer(riwayat.lama[nama], dtype=dtype) if len(riwayat.lama[nama]) else np.zeros(0, dtype),
+                           np.frombuffer(riwayat.baru[nama], dtype=dtype) if len(riwayat.baru[nama]) else np.zeros(0, dtype)))
+
+
+def _laporan_kosong():
+    return {'jumlah_transaksi': 0, 'total_pendapatan': 0, 'tiket_hilang': 0, 'rata_durasi_menit': 0.0,
+            'rata_durasi_per_jenis': {}, 'per_jam': [0] * 24, 'per_jam_jenis': [{} for _ in range(24)],
+            'per_jam_metode': [{} for _ in range(24)], 'harian': []}
+
+
+def _laporan_numpy(riwayat, awal, akhir):
+    kol = {nama: _kolom_numpy(riwayat, nama) for nama in KOLOM_LAPORAN}
+    if awal is not None or akhir is not None:
+        keluar = kol['waktu_keluar']
+        pilih = np.ones(len(keluar), dtype=bool)
+        if awal is not None:
+            pilih &= keluar >= (awal - EPOCH).total_seconds()
+        if akhir is not None:
+            pilih &= keluar < (akhir - EPOCH).total_seconds()
+        kol = {nama: nilai[pilih] for nama, nilai in kol.items()}
+    if not len(kol['total_biaya']):
+        return _laporan_kosong()
+
+    jenis_nilai = riwayat.kamus['jenis'].nilai
+    metode_nilai = riwayat.kamus['metode_bayar'].nilai
+    kode_hilang = riwayat.kamus['status'].kode.get(STATUS_TIKET_HILANG, -1)
+    biaya = kol['total_biaya'].astype(np.float64)
+    durasi = (kol['waktu_keluar'] - kol['waktu_masuk']).astype(np.float64) / 60
+    hilang = kol['status'] == kode_hilang
+
+    # Hari dinomori relatif terhadap hari pertama agar bincount cukup O(n), tanpa sort
+    hari = kol['waktu_keluar'] // 86400
+    hari_awal = int(hari.min())
+    hari_rel = hari - hari_awal
+    jumlah_hari = int(hari_rel.max()) + 1
+    n_jenis, n_metode = len(jenis_nilai), len(metode_nilai)
+
+    pendapatan_hari = np.bincount(hari_rel, weights=biaya, minlength=jumlah_hari)
+    transaksi_hari = np.bincount(hari_rel, minlength=jumlah_hari)
+    hilang_hari = np.bincount(hari_rel, weights=hilang, minlength=jumlah_hari)
+    per_jenis = np.bincount(hari_rel * n_jenis + kol['jenis'], weights=biaya, minlength=jumlah_hari * n_jenis).reshape(jumlah_hari, n_jenis)
+    per_metode = np.bincount(hari_rel * n_metode + kol['metode_bayar'], weights=biaya, minlength=jumlah_hari * n_metode).reshape(jumlah_hari, n_metode)
+    jam = (kol['waktu_keluar'] % 86400) // 3600
+    per_jam = np.bincount(jam, weights=biaya, minlength=24)
+    per_jam_jenis = np.bincount(jam * n_jenis + kol['jenis'], weights=biaya, minlength=24 * n_jenis).reshape(24, n_jenis)
+    per_jam_metode = np.bincount(jam * n_metode + kol['metode_bayar'], weights=biaya, minlength=24 * n_metode).reshape(24, n_metode)
+
+    durasi_jenis = np.bincount(kol['jenis'], weights=durasi, minlength=n_jenis)
+    jumlah_jenis = np.bincount(kol['jenis'], minlength=n_jenis)
+
+    harian = []
+    for i in np.flatnonzero(transaksi_hari):
+        harian.append({
+            'tanggal': (EPOCH + datetime.timedelta(days=hari_awal + int(i))).date(),
+            'transaksi': int(transaksi_hari[i]),
+            'pendapatan': int(pendapatan_hari[i]),
+            'per_jenis': {jenis_nilai[k]: int(per_jenis[i, k]) for k in range(n_jenis) if per_jenis[i, k]},
+            'per_metode': {metode_nilai[k]: int(per_metode[i, k]) for k in range(n_metode) if per_metode[i, k]},
+            'tiket_hilang': int(hilang_hari[i]),
+        })
+    return {
+        'jumlah_transaksi': int(len(biaya)),
+        'total_pendapatan': int(biaya.sum()),
+        'tiket_hilang': int(hilang.sum()),
+        'rata_durasi_menit': float(durasi.mean()),
+        'rata_durasi_per_jenis': {jenis_nilai[k]: float(durasi_jenis[k] / jumlah_jenis[k]) for k in range(n_jenis) if jumlah_jenis[k]},
+        'per_jam': [int(nilai) for nilai in per_jam],
+        'per_jam_jenis': [{jenis_nilai[k]: int(per_jam_jenis[j, k]) for k in range(n_jenis) if per_jam_jenis[j, k]} for j in range(24)],
+        'per_jam_metode': [{metode_nilai[k]: int(per_jam_metode[j, k]) for k in range(n_metode) if per_jam_metode[j, k]} for j in range(24)],
+        'harian': harian,
+    }
+
+
+def _laporan_python(riwayat, awal, akhir):
+    # Cadangan jika NumPy tidak terpasang: hasil sama, hanya lebih lambat
+    harian, per_jam = {}, [0] * 24
+    per_jam_jenis, per_jam_metode = [{} for _ in range(24)], [{} for _ in range(24)]
+    total = jumlah = hilang = 0
+    durasi_total, durasi_jenis = 0.0, {}
+    for item in riwayat:
+        keluar, masuk = item['waktu_keluar'], item['waktu_masuk']
+        if (awal is not None and keluar < awal) or (akhir is not None and keluar >= akhir):
+            continue
+        biaya, jenis, metode = int(item['total_biaya']), item['jenis'], item['metode_bayar']
+        is_hilang = item['status'] == STATUS_TIKET_HILANG
+        durasi = (keluar - masuk).total_seconds() / 60
+        hari = harian.setdefault(keluar.date(), {'tanggal': keluar.date(), 'transaksi': 0, 'pendapatan': 0,
+                                                 'per_jenis': {}, 'per_metode': {}, 'tiket_hilang': 0})
+        hari['transaksi'] += 1
+        hari['pendapatan'] += biaya
+        hari['per_jenis'][jenis] = hari['per_jenis'].get(jenis, 0) + biaya
+        hari['per_metode'][metode] = hari['per_metode'].get(metode, 0) + biaya
+        hari['tiket_hilang'] += is_hilang
+        per_jam[keluar.hour] += biaya
+        per_jam_jenis[keluar.hour][jenis] = per_jam_jenis[keluar.hour].get(jenis, 0) + biaya
+        per_jam_metode[keluar.hour][metode] = per_jam_metode[keluar.hour].get(metode, 0) + biaya
+        total += biaya
+        jumlah += 1
+        hilang += is_hilang
+        durasi_total += durasi
+        jumlah_durasi = durasi_jenis.setdefault(jenis, [0.0, 0])
+        jumlah_durasi[0] += durasi
+        jumlah_durasi[1] += 1
+    if not jumlah:
+        return _laporan_kosong()
+    for hari in harian.values():
+        hari['per_jenis'] = {k: v for k, v in hari['per_jenis'].items() if v}
+        hari['per_metode'] = {k: v for k, v in hari['per_metode'].items() if v}
+    return {
+        'jumlah_transaksi': jumlah,
+        'total_pendapatan': total,
+        'tiket_hilang': hilang,
+        'rata_durasi_menit': durasi_total / jumlah,
+        'rata_durasi_per_jenis': {jenis: d / n for jenis, (d, n) in durasi_jenis.items()},
+        'per_jam': per_jam,
+        'per_jam_jenis': [{k: v for k, v in jam.items() if v} for jam in per_jam_jenis],
+        'per_jam_metode': [{k: v for k, v in jam.items() if v} for jam in per_jam_metode],
+        'harian': [harian[tanggal] for tanggal in sorted(harian)],
+    }
+
+
+def buat_laporan(riwayat, awal=None, akhir=None):
+    """
+    Ringkasan pendapatan harian dan per jam (masing-masing per jenis dan metode bayar),
+    jumlah tiket hilang dan rata-rata durasi untuk riwayat dengan awal <= waktu_keluar < akhir.
+    """
+    if np is None:
+        return _laporan_python(riwayat, awal, akhir)
+    return _laporan_numpy(_sebagai_kolom(riwayat), awal, akhir)
+
+
+def format_laporan(laporan, maks_hari=31):
+    baris = [f"Jumlah transaksi   : {laporan['jumlah_transaksi']:,}",
+             f"Total pendapatan   : Rp {laporan['total_pendapatan']:,.0f}",
+             f"Tiket hilang       : {laporan['tiket_hilang']:,}",
+             f"Rata-rata durasi   : {laporan['rata_durasi_menit']:.0f} menit"]
+    for jenis, menit in laporan['rata_durasi_per_jenis'].items():
+        baris.append(f"  - {jenis:<15}: {menit:.0f} menit")
+    baris.append("")
+    baris.append("Pendapatan per jam (waktu keluar):")
+    for jam, nilai in enumerate(laporan['per_jam']):
+        if nilai:
+            rincian = ", ".join(f"{k} Rp {v:,.0f}" for k, v in {**laporan['per_jam_jenis'][jam], **laporan['per_jam_metode'][jam]}.items())
+            baris.append(f"  {jam:02d}:00  Rp {nilai:>14,.0f}  {rincian}")
+    baris.append("")
+    baris.append(f"Pendapatan harian ({min(maks_hari, len(laporan['harian']))} hari terakhir):")
+    for hari in laporan['harian'][-maks_hari:]:
+        rincian = ", ".join(f"{k} Rp {v:,.0f}" for k, v in {**hari['per_jenis'], **hari['per_metode']}.items())
+        baris.append(f"  {hari['tanggal'].strftime('%d-%b-%Y')}  Rp {hari['pendapatan']:>12,.0f}  "
+                     f"({hari['transaksi']} trx, {hari['tiket_hilang']} hilang) {rincian}")
+    return "\n".join(baris)
@@ -0,0 +1,179 @@
+# --- Metrik kinerja: waktu operasi (histogram latensi), penghitung, cProfile dan file trace ---
+import cProfile # untuk profil fungsi lengkap (--profile)
+import collections # untuk buffer trace yang dibatasi
+import functools # untuk dekorator yang mempertahankan nama fungsi
+import json # untuk menulis file trace
+import math # untuk menentukan ember histogram
+import os # untuk membuat folder file hasil
+import threading # untuk id thread di file trace
+import time # untuk mengukur durasi
+
+EMBER_PER_OKTAF = 8
+
+
+class Histogram:
+    """
+    Histogram latensi dengan ember logaritmik (8 ember per kelipatan dua), sehingga memorinya tetap
+    walau jutaan durasi dicatat. Persentil dibaca dari batas atas ember (galat relatif <= 1/8).
+    """
+
+    def __init__(self):
+        self.ember = collections.Counter()
+        self.jumlah = 0
+        self.total = 0.0
+        self.maks = 0.0
+
+    def catat(self, detik):
+        self.jumlah += 1
+        self.total += detik
+        if detik > self.maks:
+            self.maks = detik
+        if detik > 0:
+            mantisa, eksponen = math.frexp(detik)
+            self.ember[eksponen * EMBER_PER_OKTAF + int((mantisa - 0.5) * 2 * EMBER_PER_OKTAF)] += 1
+        else:
+            self.ember[None] += 1
+
+    @staticmethod
+    def batas_atas(kunci):
+        eksponen, sub = divmod(kunci, EMBER_PER_OKTAF)
+        return math.ldexp(0.5 + (sub + 1) / (2 * EMBER_PER_OKTAF), eksponen)
+
+    def persentil(self, p):
+        """Durasi (detik) yang tidak dilampaui oleh proporsi `p` (0..1) dari semua catatan."""
+        if not self.jumlah:
+            return 0.0
+        target = max(1, math.ceil(p * self.jumlah))
+        terkumpul = self.ember.get(None, 0)
+        if terkumpul >= target:
+            return 0.0
+        for kunci in sorted(k for k in self.ember if k is not None):
+            terkumpul += self.ember[kunci]
+            if terkumpul >= target:
+                return min(self.batas_atas(kunci), self.maks)
+        return self.maks
+
+    def rata(self):
+        return self.total / self.jumlah if self.jumlah else 0.0
+
+
+class PencatatMetrik:
+    """
+    Kumpulan histogram per nama operasi dan penghitung sederhana.
+    `ukur(nama)` (context manager) dan `diukur(nama)` (dekorator) hanya menambah dua panggilan
+    perf_counter per operasi. Jika `jejak` aktif, setiap operasi juga dicatat sebagai event
+    trace (format Chrome/Perfetto) di buffer yang dibatasi `maks_jejak`.
+    """
+
+    def __init__(self, maks_jejak=100_000):
+        self.histogram = {}
+        self.penghitung = collections.Counter()
+        self.jejak = None
+        self.maks_jejak = maks_jejak
+        self.profil = None
+        self._awal = time.perf_counter()
+
+    def catat(self, nama, detik, mulai=None):
+        histogram = self.histogram.get(nama)
+        if histogram is None:
+            histogram = self.histogram[nama] = Histogram()
+        histogram.catat(detik)
+        if self.jejak is not None and mulai is not None:
+            self.jejak.append({"name": nama, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+                               "ts": (mulai - self._awal) * 1e6, "dur": detik * 1e6})
+
+    def ukur(self, nama):
+        return _Pengukur(self, nama)
+
+    def diukur(self, nama=None):
+        """Dekorator: setiap panggilan fungsi dicatat dengan nama `nama` (bawaan: nama fungsi)."""
+        def dekorator(fungsi):
+            label = nama or fungsi.__name__
+
+            @functools.wraps(fungsi)
+            def pembungkus(*args, **kwargs):
+                mulai = time.perf_counter()
+                try:
+                    return fungsi(*args, **kwargs)
+                finally:
+                    self.catat(label, time.perf_counter() - mulai, mulai)
+            return pembungkus
+        return dekorator
+
+    def tambah(self, nama, jumlah=1):
+        self.penghitung[nama] += jumlah
+
+    def reset(self):
+        self.histogram.clear()
+        self.penghitung.clear()
+        if self.jejak is not None:
+            self.jejak.clear()
+
+    def ringkasan(self):
+        """{nama: {'jumlah', 'p50_ms', 'p99_ms', 'maks_ms', 'total_ms'}}, urut dari total waktu terbesar."""
+        hasil = {}
+        for nama, h in sorted(self.histogram.items(), key=lambda item: item[1].total, reverse=True):
+            hasil[nama] = {'jumlah': h.jumlah, 'p50_ms': h.persentil(0.5) * 1000, 'p99_ms': h.persentil(0.99) * 1000,
+                           'maks_ms': h.maks * 1000, 'total_ms': h.total * 1000}
+        return hasil
+
+    def format_ringkasan(self):
+        baris = [f"{'Operasi':<32}{'Jumlah':>8}{'p50 ms':>10}{'p99 ms':>10}{'Maks ms':>10}{'Total ms':>11}"]
+        for nama, m in self.ringkasan().items():
+            baris.append(f"{nama:<32}{m['jumlah']:>8}{m['p50_ms']:>10.2f}{m['p99_ms']:>10.2f}{m['maks_ms']:>10.2f}{m['total_ms']:>11.1f}")
+        if self.penghitung:
+            baris.append("")
+            baris.extend(f"{nama:<32}{jumlah:>8}" for nama, jumlah in sorted(self.penghitung.items()))
+        return "\n".join(baris)
+
+    # --- Trace dan cProfile ---
+    def mulai_jejak(self):
+        if self.jejak is None:
+            self.jejak = collections.deque(maxlen=self.maks_jejak)
+
+    def simpan_jejak(self, path):
+        """Tulis event trace (buka di chrome://tracing atau ui.perfetto.dev)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": list(self.jejak or ()), "displayTimeUnit": "ms"}, f)
+
+    def mulai_profil(self):
+        if self.profil is None:
+            self.profil = cProfile.Profile()
+            self.profil.enable()
+
+    def simpan_profil(self, path):
+        """Tulis statistik cProfile (baca dengan `python -m pstats <path>` atau snakeviz)."""
+        if self.profil is None:
+            return False
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.profil.disable()
+        self.profil.dump_stats(path)
+        self.profil.enable()
+        return True
+
+    def hentikan_profil(self):
+        if self.profil is not None:
+            self.profil.disable()
+            self.profil = None
+
+
+class _Pengukur:
+    __slots__ = ("pencatat", "nama", "mulai")
+
+    def __init__(self, pencatat, nama):
+        self.pencatat = pencatat
+        self.nama = nama
+
+    def __enter__(self):
+        self.mulai = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.pencatat.catat(self.nama, time.perf_counter() - self.mulai, self.mulai)
+        return False
+
+
+# Pencatat bersama untuk aplikasi; modul lain cukup memakai `diukur` / `METRIK.ukur`
+METRIK = PencatatMetrik()
+diukur = METRIK.diukur
@@ -0,0 +1,94 @@
+# --- Okupansi parkir: penghitung kendaraan aktif per jenis, kapasitas, dan deret per menit ---
+import datetime # untuk waktu setiap menit di deret
+from array import array # untuk ring buffer yang ringkas
+
+from kolom_parkirin import dari_epoch, ke_epoch # menit dihitung dari detik epoch
+
+MENIT_DISIMPAN = 24 * 60
+
+
+class Okupansi:
+    """
+    Jumlah kendaraan aktif per jenis, diperbarui O(1) setiap check-in dan checkout.
+
+    `kapasitas` {jenis: jumlah maksimum}; jenis yang tidak ada atau bernilai None tidak dibatasi.
+    Okupansi puncak setiap menit disimpan di ring buffer (`menit_disimpan` slot per jenis), jadi
+    grafik beberapa jam terakhir dibaca tanpa memindai kendaraan aktif atau riwayat.
+    Event dengan waktu di masa depan (mis. waktu keluar manual yang salah ketik) dicatat pada `sekarang()`,
+    agar tidak menggeser menit terakhir ring buffer melewati jam dinding.
+    """
+
+    def __init__(self, kapasitas=None, jenis=("Mobil", "Motor"), menit_disimpan=MENIT_DISIMPAN,
+                 sekarang=datetime.datetime.now):
+        self.kapasitas = {j: kapasitas.get(j) for j in jenis} if kapasitas else dict.fromkeys(jenis)
+        self.terisi = dict.fromkeys(jenis, 0)
+        self.menit_disimpan = menit_disimpan
+        self.sekarang = sekarang
+        self._deret = {j: array('i', bytes(4 * menit_disimpan)) for j in jenis}
+        self._menit_terakhir = None
+        self._nilai_terakhir = {}
+
+    def reset(self, kendaraan_terparkir, waktu=None):
+        """Hitung ulang dari {nopol: {'jenis', ...}}; hanya saat start atau sinkron dari server."""
+        self.terisi = dict.fromkeys(self.terisi, 0)
+        for data in kendaraan_terparkir.values():
+            self.terisi[data['jenis']] = self.terisi.get(data['jenis'], 0) + 1
+        self._catat(waktu)
+
+    def penuh(self, jenis):
+        batas = self.kapasitas.get(jenis)
+        return batas is not None and self.terisi.get(jenis, 0) >= batas
+
+    def sisa(self, jenis):
+        """Sisa tempat untuk `jenis`, atau None jika tidak dibatasi."""
+        batas = self.kapasitas.get(jenis)
+        return None if batas is None else max(0, batas - self.terisi.get(jenis, 0))
+
+    def masuk(self, jenis, waktu=None):
+        self.terisi[jenis] = self.terisi.get(jenis, 0) + 1
+        self._catat(waktu)
+
+    def keluar(self, jenis, waktu=None):
+        self.terisi[jenis] = max(0, self.terisi.get(jenis, 0) - 1)
+        self._catat(waktu)
+
+    def _catat(self, waktu):
+        menit_sekarang = ke_epoch(self.sekarang()) // 60
+        menit = menit_sekarang if waktu is None else min(ke_epoch(waktu) // 60, menit_sekarang)
+        n = self.menit_disimpan
+        if self._menit_terakhir is None:
+            self._menit_terakhir = menit
+        elif menit > self._menit_terakhir:
+            # Menit tanpa event memakai okupansi setelah event terakhir (paling banyak satu putaran ring buffer)
+            for m in range(max(self._menit_terakhir + 1, menit - n + 1), menit + 1):
+                for jenis, deret in self._deret.items():
+                    deret[m % n] = self._nilai_terakhir.get(jenis, 0)
+            self._menit_terakhir = menit
+        # Waktu yang lebih lama dari menit terakhir (mis. waktu keluar manual) dicatat di menit terakhir
+        posisi = self._menit_terakhir % n
+        for jenis, deret in self._deret.items():
+            deret[posisi] = max(deret[posisi], self.terisi.get(jenis, 0))
+        self._nilai_terakhir = dict(self.terisi)
+
+    def deret(self, jumlah_menit=60, sampai=None):
+        """
+        [(waktu awal menit, {jenis: okupansi puncak})] untuk `jumlah_menit` menit terakhir sampai `sampai`
+        (bawaan: sekarang), urut dari yang paling lama. Menit setelah event terakhir memakai okupansi saat ini.
+        """
+        akhir = ke_epoch(sampai or self.sekarang()) // 60
+        jumlah_menit = min(jumlah_menit, self.menit_disimpan)
+        n = self.menit_disimpan
+        hasil = []
+        for menit in range(akhir - jumlah_menit + 1, akhir + 1):
+            if self._menit_terakhir is None or menit > self._menit_terakhir:
+                nilai = dict(self.terisi)
+            elif menit <= self._menit_terakhir - n:
+                nilai = dict.fromkeys(self._deret, 0)
+            else:
+                nilai = {jenis: deret[menit % n] for jenis, deret in self._deret.items()}
+            hasil.append((dari_epoch(menit * 60), nilai))
+        return hasil
+
+    def ringkasan(self):
+        """{jenis: {'terisi', 'kapasitas'}} untuk label status dan endpoint /status."""
+        return {jenis: {'terisi': self.terisi[jenis], 'kapasitas': self.kapasitas.get(jenis)} for jenis in self.terisi}
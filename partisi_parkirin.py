@@ -0,0 +1,255 @@
+# --- Riwayat berpartisi waktu: partisi aktif (jurnal) + arsip gzip per bulan/hari + manifest ---
+import datetime # untuk kunci dan rentang waktu partisi
+import gzip # untuk arsip partisi yang sudah ditutup
+import json # untuk manifest dan isi arsip
+import os # untuk berinteraksi dengan sistem operasi
+import threading # manifest dibaca thread Tk dan diubah thread penulis
+
+from kolom_parkirin import RiwayatKolom # hasil query rentang
+from penyimpanan_parkirin import JurnalRiwayat, RiwayatBertahap, iter_array_json, tulis_json_atomik
+
+FORMAT_KUNCI = {"bulan": "%Y-%m", "hari": "%Y-%m-%d"}
+NAMA_MANIFEST = "manifest.json"
+
+
+def kunci_partisi(waktu, satuan="bulan"):
+    """Nama partisi untuk sebuah waktu, mis. '2024-06' (bulan) atau '2024-06-30' (hari)."""
+    if isinstance(waktu, str):
+        waktu = datetime.datetime.fromisoformat(waktu)
+    return waktu.strftime(FORMAT_KUNCI[satuan])
+
+
+class _PenulisArray:
+    """Tulis array JSON objek demi objek (opsional gzip) sambil mencatat ringkasan untuk manifest."""
+
+    def __init__(self, path, kompres):
+        self.path = path
+        self._path_tmp = path + ".tmp"
+        self._raw = open(self._path_tmp, 'wb')
+        self._file = gzip.GzipFile(fileobj=self._raw, mode='wb', compresslevel=6) if kompres else self._raw
+        self._file.write(b"[")
+        self.jumlah = 0
+        self.id_min = self.id_maks = None
+        self.waktu_awal = self.waktu_akhir = None
+        self.total_biaya = 0
+
+    def tulis(self, item):
+        self._file.write((",\n" if self.jumlah else "\n").encode() + json.dumps(item).encode())
+        self.jumlah += 1
+        id_item = item.get('id', 0)
+        self.id_min = id_item if self.id_min is None else min(self.id_min, id_item)
+        self.id_maks = id_item if self.id_maks is None else max(self.id_maks, id_item)
+        waktu = datetime.datetime.fromisoformat(item['waktu_keluar'])
+        self.waktu_awal = waktu if self.waktu_awal is None else min(self.waktu_awal, waktu)
+        self.waktu_akhir = waktu if self.waktu_akhir is None else max(self.waktu_akhir, waktu)
+        self.total_biaya += item.get('total_biaya', 0)
+
+    def selesai(self):
+        self._file.write(b"\n]")
+        if self._file is not self._raw:
+            self._file.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+        os.replace(self._path_tmp, self.path)
+        return {'file': os.path.basename(self.path), 'jumlah': self.jumlah, 'id_min': self.id_min, 'id_maks': self.id_maks,
+                'waktu_awal': self.waktu_awal.isoformat() if self.waktu_awal else None,
+                'waktu_akhir': self.waktu_akhir.isoformat() if self.waktu_akhir else None,
+                'total_biaya': self.total_biaya}
+
+
+class RiwayatPartisi:
+    """
+    Riwayat yang dibagi per bulan (atau per hari) di dalam satu folder.
+
+    Partisi yang sedang berjalan adalah JurnalRiwayat biasa (riwayat-2024-06.json + .jsonl).
+    Saat transaksi pertama periode berikutnya masuk, partisi itu ditutup: isinya ditulis ke
+    riwayat-2024-06.json.gz dan dicatat di manifest.json (jumlah, rentang id dan waktu keluar).
+    Saat start hanya partisi aktif yang dibaca; arsip baru dibuka saat riwayat digulir sampai
+    ke sana, dan query rentang (`rentang`) hanya membuka arsip yang rentang waktunya beririsan.
+    Antarmuka tulisnya sama dengan JurnalRiwayat, jadi bisa dibungkus PenulisLatar.
+    """
+
+    def __init__(self, folder, satuan="bulan", fsync_setiap=20, ambang_kompaksi=5000, path_lama=None,
+                 sekarang=datetime.datetime.now):
+        if satuan not in FORMAT_KUNCI:
+            raise ValueError(f"Satuan partisi tidak dikenal: {satuan}")
+        self.folder = folder
+        self.satuan = satuan
+        self.fsync_setiap = fsync_setiap
+        self.ambang_kompaksi = ambang_kompaksi
+        self.path_manifest = os.path.join(folder, NAMA_MANIFEST)
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+        if os.path.exists(self.path_manifest):
+            with open(self.path_manifest, 'r') as f:
+                self.manifest = json.load(f)
+            # Satuan folder yang sudah ada tidak bisa diganti tanpa migrasi ulang
+            self.satuan = self.manifest['satuan']
+        else:
+            self.manifest = {'versi': 1, 'satuan': satuan, 'aktif': kunci_partisi(sekarang(), satuan), 'arsip': []}
+            if path_lama is not None:
+                self._migrasi(path_lama)
+            self._tulis_manifest()
+        self.aktif = self._buka(self.manifest['aktif'])
+
+    # --- File dan manifest ---
+    def _path(self, kunci, arsip=False):
+        return os.path.join(self.folder, f"riwayat-{kunci}.json" + (".gz" if arsip else ""))
+
+    def _buka(self, kunci):
+        return JurnalRiwayat(self._path(kunci), fsync_setiap=self.fsync_setiap, ambang_kompaksi=self.ambang_kompaksi)
+
+    def _tulis_manifest(self):
+        tulis_json_atomik(self.path_manifest, self.manifest, indent=2)
+
+    @property
+    def kunci_aktif(self):
+        return self.manifest['aktif']
+
+    def daftar_arsip(self):
+        """Ringkasan partisi yang sudah ditutup (terbaru di depan)."""
+        with self._lock:
+            return list(self.manifest['arsip'])
+
+    def _migrasi(self, path_lama):
+        """
+        Pecah riwayat lama (satu JurnalRiwayat, terbaru di depan) menjadi partisi, dibaca bertahap.
+        Partisi baru dimulai saat kunci baris lebih lama dari partisi yang sedang ditulis, sehingga
+        baris yang sedikit tidak berurutan (mis. waktu keluar manual) tetap ikut partisi yang sama.
+        """
+        penulis = kunci = None
+        for item in JurnalRiwayat(path_lama).iter_riwayat():
+            kunci_item = kunci_partisi(item['waktu_keluar'], self.satuan)
+            if penulis is None or kunci_item < kunci:
+                if penulis is None:
+                    # Partisi terbaru menjadi partisi aktif (tidak dikompres)
+                    self.manifest['aktif'] = kunci_item
+                    penulis = _PenulisArray(self._path(kunci_item), kompres=False)
+                else:
+                    self._catat_arsip(kunci, penulis)
+                    penulis = _PenulisArray(self._path(kunci_item, arsip=True), kompres=True)
+                kunci = kunci_item
+            penulis.tulis(item)
+        if penulis is not None:
+            self._catat_arsip(kunci, penulis)
+
+    def _catat_arsip(self, kunci, penulis):
+        ringkasan = penulis.selesai()
+        if penulis.path.endswith(".gz"):
+            self.manifest['arsip'].append(dict(kunci=kunci, **ringkasan))
+
+    # --- Tulis ---
+    def tambah(self, entry):
+        kunci = kunci_partisi(entry['waktu_keluar'], self.satuan)
+        # Transaksi dengan waktu keluar lebih lama (koreksi manual) tetap masuk partisi aktif;
+        # rentang waktu di manifest dihitung dari isi partisi saat ditutup
+        if kunci > self.kunci_aktif:
+            self.rollover(kunci)
+        self.aktif.tambah(entry)
+
+    def tambah_banyak(self, daftar_entry):
+        """Seperti `tambah` untuk beberapa transaksi; baris sebelum rollover ditulis sekaligus ke partisi aktif."""
+        kumpulan = []
+        for entry in daftar_entry:
+            kunci = kunci_partisi(entry['waktu_keluar'], self.satuan)
+            if kunci > self.kunci_aktif:
+                if kumpulan:
+                    self.aktif.tambah_banyak(kumpulan)
+                    kumpulan = []
+                self.rollover(kunci)
+            kumpulan.append(entry)
+        if kumpulan:
+            self.aktif.tambah_banyak(kumpulan)
+
+    def sisipkan_batch(self, daftar_batch, waktu_keluar_maks=None):
+        """
+        Impor banyak baris ke partisi aktif (lihat JurnalRiwayat.sisipkan_batch). Jika `waktu_keluar_maks`
+        lebih baru dari partisi aktif, rollover dulu; baris yang lebih lama tetap masuk partisi aktif seperti `tambah`.
+        """
+        if waktu_keluar_maks is not None:
+            kunci = kunci_partisi(waktu_keluar_maks, self.satuan)
+            if kunci > self.kunci_aktif:
+                self.rollover(kunci)
+        return self.aktif.sisipkan_batch(daftar_batch)
+
+    def rollover(self, kunci_baru):
+        """Tutup partisi aktif menjadi arsip gzip lalu mulai partisi `kunci_baru`."""
+        lama, kunci_lama = self.aktif, self.kunci_aktif
+        lama.tutup()
+        penulis = _PenulisArray(self._path(kunci_lama, arsip=True), kompres=True)
+        for item in lama.iter_riwayat():
+            penulis.tulis(item)
+        ringkasan = penulis.selesai()
+        with self._lock:
+            arsip = list(self.manifest['arsip'])
+            if ringkasan['jumlah']:
+                arsip.insert(0, dict(kunci=kunci_lama, **ringkasan))
+            # Manifest baru ditulis setelah arsip lengkap; jika crash sebelumnya, partisi lama tetap aktif
+            self.manifest = dict(self.manifest, aktif=kunci_baru, arsip=arsip)
+            self._tulis_manifest()
+            self.aktif = self._buka(kunci_baru)
+        sampah = [lama.path_snapshot, lama.path_jurnal, lama.path_segel]
+        if not ringkasan['jumlah']:
+            sampah.append(penulis.path)
+        for path in sampah:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except PermissionError:
+                # Windows: file masih dibaca bertahap oleh daftar riwayat; tidak lagi dipakai setelah start berikutnya
+                pass
+
+    def flush(self):
+        self.aktif.flush()
+
+    def kompaksi(self, tunggu=False):
+        self.aktif.kompaksi(tunggu)
+
+    def tutup(self):
+        self.aktif.tutup()
+
+    # --- Baca ---
+    def iter_riwayat(self, awal=None, akhir=None):
+        """
+        Generator riwayat mentah (terbaru di depan): partisi aktif, lalu arsip dari yang terbaru.
+        Jika `awal`/`akhir` diisi, hanya arsip dari `partisi_untuk` yang dibuka (baris tidak disaring).
+        """
+        # Partisi aktif dan daftar arsip diambil bersamaan agar rollover di tengah jalan tidak menggandakan baris
+        with self._lock:
+            aktif, arsip = self.aktif, list(self.manifest['arsip'])
+        yield from aktif.iter_riwayat()
+        for ringkasan in self._beririsan(arsip, awal, akhir):
+            yield from iter_array_json(os.path.join(self.folder, ringkasan['file']), buka=gzip.open)
+
+    def muat(self):
+        """Saat start hanya halaman pertama partisi aktif yang dibaca; arsip dibuka saat digulir sampai ke sana."""
+        return RiwayatBertahap(self.iter_riwayat())
+
+    def partisi_untuk(self, awal=None, akhir=None):
+        """Arsip yang rentang waktu keluarnya beririsan dengan awal <= waktu_keluar < akhir."""
+        return self._beririsan(self.daftar_arsip(), awal, akhir)
+
+    @staticmethod
+    def _beririsan(arsip, awal, akhir):
+        hasil = []
+        for ringkasan in arsip:
+            if awal is not None and datetime.datetime.fromisoformat(ringkasan['waktu_akhir']) < awal:
+                continue
+            if akhir is not None and datetime.datetime.fromisoformat(ringkasan['waktu_awal']) >= akhir:
+                continue
+            hasil.append(ringkasan)
+        return hasil
+
+    def rentang(self, awal=None, akhir=None):
+        """
+        RiwayatKolom (terbaru di depan) berisi baris dengan awal <= waktu_keluar < akhir.
+        Hanya partisi aktif dan arsip dari `partisi_untuk` yang dibaca, mis. untuk laporan 7 hari.
+        """
+        hasil = RiwayatKolom()
+        for item in self.iter_riwayat(awal, akhir):
+            keluar = datetime.datetime.fromisoformat(item['waktu_keluar'])
+            if (awal is None or keluar >= awal) and (akhir is None or keluar < akhir):
+                hasil.tambah_lama(item)
+        return hasil
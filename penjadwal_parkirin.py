@@ -0,0 +1,62 @@
+# --- Penjadwal refresh UI: banyak perubahan model digabung menjadi satu pembaruan per frame ---
+import time # untuk membatasi jumlah refresh per detik
+
+from metrik_parkirin import METRIK # jumlah refresh dan perubahan yang digabung (tab Diagnostik)
+
+
+class PenjadwalRefresh:
+    """
+    Tampilan (daftar aktif, riwayat, status, ...) didaftarkan dengan `daftar(nama, fungsi)`.
+    Perubahan model cukup `tandai(nama, data)`; semua tampilan yang kotor diperbarui sekali di
+    `flush`, yang dijadwalkan lewat `after_idle` milik `widget` dan paling sering `maks_per_detik`
+    kali per detik. `fungsi` menerima daftar semua `data` sejak flush terakhir (urut waktu).
+    Semua method dipanggil dari thread Tk.
+    """
+
+    def __init__(self, widget, maks_per_detik=30):
+        self.widget = widget
+        self.interval = 1.0 / maks_per_detik
+        self._tampilan = {}
+        self._kotor = {}
+        self._jadwal = None
+        self._flush_terakhir = None
+
+    def daftar(self, nama, fungsi):
+        self._tampilan[nama] = fungsi
+
+    def tandai(self, nama, data=None):
+        self._kotor.setdefault(nama, []).append(data)
+        if self._jadwal is None:
+            jeda = 0.0 if self._flush_terakhir is None else self.interval - (time.perf_counter() - self._flush_terakhir)
+            if jeda > 0:
+                self._jadwal = self.widget.after(max(1, int(jeda * 1000)), self._dari_jadwal)
+            else:
+                self._jadwal = self.widget.after_idle(self._dari_jadwal)
+
+    def buang(self, nama):
+        """Lupakan perubahan `nama` yang belum ditampilkan (mis. status yang sudah ditimpa langsung)."""
+        self._kotor.pop(nama, None)
+
+    @property
+    def kotor(self):
+        return bool(self._kotor)
+
+    def _dari_jadwal(self):
+        self._jadwal = None
+        self.flush()
+
+    def flush(self):
+        """Perbarui semua tampilan yang kotor sekarang (juga dipanggil langsung, mis. oleh tes)."""
+        if self._jadwal is not None:
+            self.widget.after_cancel(self._jadwal)
+            self._jadwal = None
+        kotor, self._kotor = self._kotor, {}
+        if not kotor:
+            return
+        self._flush_terakhir = time.perf_counter()
+        METRIK.tambah("refresh.perubahan", sum(len(data) for data in kotor.values()))
+        with METRIK.ukur("refresh"):
+            # Urutan pendaftaran dipertahankan, mis. daftar aktif sebelum label okupansi
+            for nama, fungsi in self._tampilan.items():
+                if nama in kotor:
+                    fungsi(kotor[nama])
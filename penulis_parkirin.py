@@ -0,0 +1,221 @@
+# --- Penulis latar belakang: penyimpanan ke disk tanpa menahan thread Tk ---
+import collections # untuk antrian kabar ke thread Tk
+import queue # untuk antrian tulis yang dibatasi
+import threading # untuk thread penulis
+import time # untuk mengukur latensi dan jadwal fsync
+
+# "setiap": setiap event langsung di-fsync sebelum event berikutnya ditulis
+# "grup"  : event ditulis segera, fsync dilakukan sekali untuk semua event dalam `interval` detik
+MODE_SETIAP = "setiap"
+MODE_GRUP = "grup"
+
+_BERHENTI = object()
+
+
+class PenulisLatar:
+    """
+    Satu thread yang menjalankan semua operasi tulis secara berurutan dari antrian terbatas.
+
+    Event yang menumpuk diambil sekaligus lalu ditulis dalam satu putaran: dalam mode grup, semua checkout
+    ke penyimpanan yang sama ditulis dengan satu `tambah_banyak`, dan setiap penyimpanan
+    yang tersentuh cukup di-fsync sekali (method `flush`). Hasil (termasuk error) dikabarkan lewat
+    `jalankan_kabar`, yang dipanggil dari thread Tk dengan `after()`.
+    """
+
+    def __init__(self, mode=MODE_GRUP, maks_antrian=1000, interval=0.5):
+        if mode not in (MODE_SETIAP, MODE_GRUP):
+            raise ValueError(f"Mode durabilitas tidak dikenal: {mode}")
+        self.mode = mode
+        self.interval = interval
+        self._antrian = queue.Queue(maks_antrian)
+        self._kabar = collections.deque()
+        self._proksi = {}
+        self._metrik = {'operasi': 0, 'batch': 0, 'fsync': 0, 'gagal': 0, 'antrian_maks': 0,
+                        'latensi_total': 0.0, 'latensi_maks': 0.0, 'durasi_tulis_total': 0.0}
+        self._lock_metrik = threading.Lock()
+        self._thread = threading.Thread(target=self._jalan, daemon=True, name="penulis-parkirin")
+        self._thread.start()
+
+    def bungkus(self, penyimpanan):
+        """Proksi penyimpanan yang menulis lewat thread ini; pembacaan tetap langsung."""
+        if penyimpanan is None:
+            return None
+        if id(penyimpanan) not in self._proksi:
+            self._proksi[id(penyimpanan)] = PenyimpananLatar(self, penyimpanan)
+        return self._proksi[id(penyimpanan)]
+
+    def kirim(self, target, nama_metode, *args, selesai=None):
+        """
+        Antrekan `target.nama_metode(*args)`. Jika antrian penuh, pemanggil menunggu (backpressure).
+        `selesai(galat)` dipanggil di thread Tk setelah operasi ditulis; galat None jika berhasil.
+        """
+        self._antrian.put((target, nama_metode, args, selesai, time.perf_counter()))
+        kedalaman = self._antrian.qsize()
+        with self._lock_metrik:
+            self._metrik['antrian_maks'] = max(self._metrik['antrian_maks'], kedalaman)
+
+    def bisa_menerima(self, jumlah=1):
+        """
+        True jika `jumlah` operasi bisa diantrekan tanpa menunggu. Pasti benar jika hanya satu thread yang
+        mengirim (mis. event loop server), karena thread penulis hanya mengurangi isi antrian.
+        """
+        maks = self._antrian.maxsize
+        return maks <= 0 or maks - self._antrian.qsize() >= jumlah
+
+    def _fsync(self, kotor):
+        """fsync setiap penyimpanan yang sudah ditulis sejak fsync terakhir."""
+        for target in kotor.values():
+            try:
+                target.flush()
+            except Exception as e:
+                self._kabar.append((None, e))
+        if kotor:
+            with self._lock_metrik:
+                self._metrik['fsync'] += 1
+        kotor.clear()
+
+    def _kelompokkan(self, batch):
+        """
+        (target, nama_metode, args, operasi asal) untuk setiap pemanggilan. Dalam mode grup, setiap `tambah`
+        digabung ke `tambah_banyak` pertama untuk penyimpanan yang sama di putaran ini (satu kali tulis untuk
+        banyak checkout). Riwayat hanya pernah ditulis lebih awal, tidak pernah setelah `catat_keluar` nopol
+        yang sama; operasi lain pada penyimpanan itu (mis. `sisipkan_batch`) menutup kelompoknya.
+        """
+        kelompok = []
+        terbuka = {} # id(target) -> (daftar entry, daftar operasi) kelompok tambah_banyak yang masih bisa ditambah
+        for op in batch:
+            target, nama_metode, args = op[:3]
+            if self.mode == MODE_GRUP and nama_metode == 'tambah' and hasattr(target, 'tambah_banyak'):
+                if id(target) in terbuka:
+                    daftar_entry, daftar_op = terbuka[id(target)]
+                    daftar_entry.append(args[0])
+                    daftar_op.append(op)
+                else:
+                    terbuka[id(target)] = ([args[0]], [op])
+                    kelompok.append((target, 'tambah_banyak', (terbuka[id(target)][0],), terbuka[id(target)][1]))
+                continue
+            if nama_metode not in ('catat_masuk', 'catat_keluar'):
+                terbuka.pop(id(target), None)
+            kelompok.append((target, nama_metode, args, [op]))
+        return kelompok
+
+    def _jalan(self):
+        kotor = {}
+        batas_fsync = None
+        while True:
+            timeout = None if batas_fsync is None else max(0.0, batas_fsync - time.monotonic())
+            try:
+                batch = [self._antrian.get(timeout=timeout)]
+            except queue.Empty:
+                # Waktu grup habis: fsync semua yang sudah ditulis
+                self._fsync(kotor)
+                batas_fsync = None
+                continue
+            # Gabungkan semua event yang sudah menunggu ke dalam satu putaran tulis
+            while True:
+                try:
+                    batch.append(self._antrian.get_nowait())
+                except queue.Empty:
+                    break
+
+            mulai = time.perf_counter()
+            berhenti = _BERHENTI in batch
+            latensi = []
+            gagal = 0
+            for target, nama_metode, args, kumpulan in self._kelompokkan(op for op in batch if op is not _BERHENTI):
+                galat = None
+                try:
+                    getattr(target, nama_metode)(*args)
+                except Exception as e:
+                    galat = e
+                    gagal += len(kumpulan)
+                if hasattr(target, 'flush'):
+                    kotor[id(target)] = target
+                if self.mode == MODE_SETIAP:
+                    self._fsync(kotor)
+                for _, _, _, selesai, waktu_kirim in kumpulan:
+                    latensi.append(time.perf_counter() - waktu_kirim)
+                    if selesai is not None or galat is not None:
+                        self._kabar.append((selesai, galat))
+            if berhenti:
+                self._fsync(kotor)
+            if not kotor:
+                batas_fsync = None
+            elif batas_fsync is None:
+                batas_fsync = time.monotonic() + self.interval
+
+            with self._lock_metrik:
+                m = self._metrik
+                m['batch'] += 1
+                m['operasi'] += len(latensi)
+                m['gagal'] += gagal
+                m['latensi_total'] += sum(latensi)
+                m['latensi_maks'] = max([m['latensi_maks']] + latensi)
+                m['durasi_tulis_total'] += time.perf_counter() - mulai
+            for _ in batch:
+                self._antrian.task_done()
+            if berhenti:
+                return
+
+    def tunggu(self):
+        """Tunggu sampai semua operasi yang sudah diantrekan selesai ditulis."""
+        self._antrian.join()
+
+    def tutup(self):
+        """Tulis dan fsync sisa antrian, lalu hentikan thread."""
+        if self._thread.is_alive():
+            self._antrian.put(_BERHENTI)
+            self._thread.join()
+
+    def jalankan_kabar(self):
+        """
+        Jalankan callback `selesai` yang sudah siap (panggil dari thread Tk).
+        Mengembalikan daftar error dari operasi yang tidak punya callback.
+        """
+        galat_lain = []
+        while self._kabar:
+            selesai, galat = self._kabar.popleft()
+            if selesai is not None:
+                selesai(galat)
+            elif galat is not None:
+                galat_lain.append(galat)
+        return galat_lain
+
+    def metrik(self):
+        with self._lock_metrik:
+            m = dict(self._metrik)
+        return {
+            'mode': self.mode,
+            'antrian': self._antrian.qsize(),
+            'antrian_maks': m['antrian_maks'],
+            'operasi': m['operasi'],
+            'batch': m['batch'],
+            'fsync': m['fsync'],
+            'gagal': m['gagal'],
+            'latensi_rata_ms': m['latensi_total'] / m['operasi'] * 1000 if m['operasi'] else 0.0,
+            'latensi_maks_ms': m['latensi_maks'] * 1000,
+            'durasi_tulis_rata_ms': m['durasi_tulis_total'] / m['batch'] * 1000 if m['batch'] else 0.0,
+        }
+
+
+class PenyimpananLatar:
+    """Proksi penyimpanan: operasi tulis lewat PenulisLatar, pembacaan diteruskan langsung."""
+
+    def __init__(self, penulis, penyimpanan):
+        self.penulis = penulis
+        self.penyimpanan = penyimpanan
+
+    def tambah(self, entry):
+        self.penulis.kirim(self.penyimpanan, 'tambah', entry)
+
+    def tambah_banyak(self, daftar_entry):
+        self.penulis.kirim(self.penyimpanan, 'tambah_banyak', list(daftar_entry))
+
+    def catat_masuk(self, nopol, data):
+        self.penulis.kirim(self.penyimpanan, 'catat_masuk', nopol, dict(data))
+
+    def catat_keluar(self, nopol):
+        self.penulis.kirim(self.penyimpanan, 'catat_keluar', nopol)
+
+    def __getattr__(self, nama):
+        return getattr(self.penyimpanan, nama)
@@ -0,0 +1,501 @@
+# --- Penyimpanan riwayat parkir (snapshot JSON + jurnal append-only) ---
+import contextlib # untuk membuat context manager kunci file
+import datetime # untuk konversi waktu masuk/keluar
+import itertools # untuk membaca baris terdepan snapshot
+import json # untuk membaca dan menulis data format JSON
+import os # untuk berinteraksi dengan sistem operasi
+import threading # untuk menjalankan kompaksi di latar belakang
+from kolom_parkirin import RiwayatKolom # untuk menyimpan riwayat yang dimuat secara ringkas
+
+try:
+    import fcntl # kunci file antar-proses (Linux/macOS)
+    msvcrt = None
+except ImportError:
+    fcntl = None
+    import msvcrt # kunci file antar-proses (Windows)
+
+KOLOM_WAKTU = ('waktu_masuk', 'waktu_keluar')
+# Karakter di antara objek array JSON yang dilewati iter_array_json
+PEMISAH_ARRAY = frozenset(' \t\r\n,')
+
+
+def riwayat_ke_json(item):
+    """Salin satu baris riwayat dengan waktu diubah menjadi string ISO."""
+    item_copy = dict(item)
+    for kolom in KOLOM_WAKTU:
+        nilai = item_copy.get(kolom)
+        if isinstance(nilai, datetime.datetime):
+            item_copy[kolom] = nilai.isoformat()
+    return item_copy
+
+
+def iter_array_json(path, ukuran_chunk=1 << 16, buka=open):
+    """
+    Baca array JSON (mis. riwayat_parkir.json) objek demi objek tanpa memuat seluruh file.
+    `buka` bisa diganti gzip.open untuk arsip terkompresi.
+    """
+    with buka(path, 'rt') as f:
+        yield from iter_array_berkas(f, ukuran_chunk)
+
+
+def iter_array_berkas(f, ukuran_chunk=1 << 16):
+    """Seperti iter_array_json untuk file teks yang sudah dibuka; file tidak ditutup di sini."""
+    decoder = json.JSONDecoder()
+    buffer = f.read(ukuran_chunk).lstrip()
+    if not buffer.startswith('['):
+        raise json.JSONDecodeError("File riwayat bukan array JSON", buffer, 0)
+    # Buffer tidak dipotong per objek (itu menyalin sisa chunk setiap kali); cukup indeks yang maju
+    posisi = 1
+    habis = False
+    while True:
+        while posisi < len(buffer) and buffer[posisi] in PEMISAH_ARRAY:
+            posisi += 1
+        if posisi < len(buffer) and buffer[posisi] == ']':
+            return
+        try:
+            if posisi >= len(buffer):
+                raise json.JSONDecodeError("Array JSON terpotong", buffer, posisi)
+            item, posisi = decoder.raw_decode(buffer, posisi)
+        except json.JSONDecodeError:
+            # Objek terpotong di batas chunk: buang bagian yang sudah dibaca, lalu baca lanjutannya
+            if habis:
+                raise
+            tambahan = f.read(ukuran_chunk)
+            habis = not tambahan
+            buffer = buffer[posisi:] + tambahan
+            posisi = 0
+            continue
+        yield item
+
+
+class RiwayatBertahap(RiwayatKolom):
+    """
+    RiwayatKolom (terbaru di depan) yang diisi per halaman dari sebuah generator.
+    Halaman pertama dibaca saat dibuat; halaman berikutnya lewat `muat_berikutnya`.
+    """
+    UKURAN_HALAMAN = 200
+
+    def __init__(self, sumber):
+        super().__init__()
+        self._sumber = iter(sumber)
+        self.selesai = False
+        self.muat_berikutnya()
+
+    def muat_berikutnya(self, jumlah=None):
+        """Baca halaman berikutnya; kembalikan jumlah baris yang bertambah."""
+        if self.selesai:
+            return 0
+        awal = len(self)
+        for _ in range(jumlah or self.UKURAN_HALAMAN):
+            try:
+                self.tambah_lama(next(self._sumber))
+            except (StopIteration, ValueError, KeyError):
+                # ValueError/KeyError: sisa file rusak; baris yang sudah terbaca tetap dipakai
+                self.selesai = True
+                break
+        return len(self) - awal
+
+    def muat_semua(self):
+        while not self.selesai:
+            self.muat_berikutnya()
+
+    def __iter__(self):
+        # Iterasi penuh (mis. untuk ekspor atau laporan) membaca sisa file
+        self.muat_semua()
+        return super().__iter__()
+
+    def kolom(self, nama):
+        self.muat_semua()
+        return super().kolom(nama)
+
+    def cari_nopol(self, nopol, batas=None, muat=True):
+        """`muat=False`: hanya halaman yang sudah dibaca (tanpa membaca disk)."""
+        if muat:
+            self.muat_semua()
+        return super().cari_nopol(nopol, batas)
+
+
+def tulis_json_atomik(path, data, indent=4):
+    """Tulis ke file sementara lalu os.replace, agar file lama tidak pernah setengah tertulis."""
+    path_tmp = path + ".tmp"
+    with open(path_tmp, 'w') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path_tmp, path)
+
+
+class JurnalRiwayat:
+    """
+    Riwayat = snapshot JSON (terbaru di depan) + jurnal JSON Lines (satu baris per checkout).
+
+    Checkout hanya menambah satu baris ke jurnal, sehingga biayanya konstan berapapun
+    panjang riwayat. Setiap baris langsung di-flush ke OS; fsync ke disk dilakukan per
+    `fsync_setiap` baris (dan saat `tutup`); 0 berarti hanya saat `flush` dipanggil (mis. oleh PenulisLatar). Jika jurnal sudah `ambang_kompaksi` baris,
+    jurnal disegel lalu digabung ke snapshot oleh thread latar belakang.
+    """
+
+    def __init__(self, path_snapshot, fsync_setiap=20, ambang_kompaksi=5000):
+        self.path_snapshot = path_snapshot
+        self.path_jurnal = os.path.splitext(path_snapshot)[0] + ".jsonl"
+        self.path_segel = self.path_jurnal + ".1"
+        self.fsync_setiap = fsync_setiap
+        self.ambang_kompaksi = ambang_kompaksi
+        self._lock = threading.Lock()
+        self._file = None
+        self._belum_fsync = 0
+        self._baris_jurnal = 0
+        self._thread_kompaksi = None
+
+    def _baca_jurnal(self, path):
+        if not os.path.exists(path):
+            return []
+        hasil = []
+        with open(path, 'r') as f:
+            for baris in f:
+                baris = baris.strip()
+                if not baris:
+                    continue
+                try:
+                    hasil.append(json.loads(baris))
+                except json.JSONDecodeError:
+                    # Baris terakhir bisa terpotong jika aplikasi mati saat menulis
+                    break
+        return hasil
+
+    @staticmethod
+    def _hitung_baris(path):
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'r') as f:
+            return sum(1 for baris in f if baris.strip())
+
+    def _baca_snapshot(self):
+        if not os.path.exists(self.path_snapshot):
+            return []
+        with open(self.path_snapshot, 'r') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _segel_sudah_digabung(segel, depan):
+        """
+        Kompaksi menulis isi segel (terbalik) di depan snapshot, baru kemudian menghapus segel. Jika baris
+        terdepan snapshot persis segel terbalik, kompaksi terputus setelah snapshot ditulis dan segel
+        tinggal sisa. Tidak memakai id terbesar: dengan blok id beberapa gerbang, id di jurnal tidak naik monoton.
+        """
+        return bool(segel) and [item.get('id') for item in depan] == [item.get('id') for item in reversed(segel)]
+
+    def iter_riwayat(self):
+        """
+        Generator riwayat mentah (terbaru di depan): jurnal, segel, lalu snapshot dibaca bertahap.
+
+        Snapshot sudah dibuka sebelum baris pertama dihasilkan dan handle-nya dipegang sampai generator
+        selesai. Jika kompaksi atau rollover mengganti/menghapus snapshot saat halaman berikutnya belum
+        dibaca, pembaca tetap melihat snapshot lama (os.replace tidak mengubah file yang sudah terbuka),
+        bukan snapshot baru yang sudah berisi baris jurnal yang tadi dihasilkan.
+        """
+        # Di bawah kunci jurnal tidak bisa disegel di tengah pembacaan; urutan jurnal, segel, lalu snapshot
+        # membuat penggabungan segel yang selesai di antaranya tetap terdeteksi oleh _segel_sudah_digabung
+        with self._lock:
+            jurnal = self._baca_jurnal(self.path_jurnal)
+            segel = self._baca_jurnal(self.path_segel)
+            try:
+                berkas = open(self.path_snapshot, 'r')
+            except FileNotFoundError:
+                berkas = None
+        try:
+            snapshot = iter_array_berkas(berkas) if berkas is not None else iter(())
+            depan = list(itertools.islice(snapshot, len(segel)))
+            if self._segel_sudah_digabung(segel, depan):
+                segel = []
+            yield from reversed(jurnal)
+            yield from reversed(segel)
+            yield from depan
+            yield from snapshot
+        finally:
+            if berkas is not None:
+                berkas.close()
+
+    def muat(self):
+        """Muat riwayat secara bertahap ke dalam RiwayatKolom."""
+        return RiwayatBertahap(self.iter_riwayat())
+
+    def tambah(self, entry):
+        """Tambahkan satu transaksi ke jurnal."""
+        self.tambah_banyak((entry,))
+
+    def tambah_banyak(self, daftar_entry):
+        """Tambahkan beberapa transaksi ke jurnal dengan satu kali tulis."""
+        baris = [json.dumps(riwayat_ke_json(entry)) + "\n" for entry in daftar_entry]
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path_jurnal), exist_ok=True)
+                # Baris jurnal yang sudah ada dihitung di sini, bukan saat dibaca: iter_riwayat bisa
+                # berjalan di thread lain (mis. laporan) dan tidak boleh mengubah hitungan penulis
+                self._baris_jurnal = self._hitung_baris(self.path_jurnal)
+                self._file = open(self.path_jurnal, 'a')
+            self._file.write("".join(baris))
+            self._file.flush()
+            self._belum_fsync += len(baris)
+            self._baris_jurnal += len(baris)
+            if self.fsync_setiap and self._belum_fsync >= self.fsync_setiap:
+                self._fsync()
+            perlu_kompaksi = self._baris_jurnal >= self.ambang_kompaksi
+        if perlu_kompaksi:
+            self.kompaksi()
+
+    def sisipkan_batch(self, daftar_batch):
+        """
+        Tambahkan banyak baris (mis. hasil impor) dengan satu kali tulis ulang snapshot untuk semua batch, bukan lewat
+        jurnal yang akan dikompaksi berulang kali. `daftar_batch` menghasilkan list baris urut id naik
+        dengan id di atas semua baris yang ada. Setiap batch ditampung di file sementara, lalu snapshot
+        baru ditulis bertahap: batch dari yang terbaru (dibalik), disusul riwayat lama. Kembalikan jumlah baris.
+        """
+        self.tutup()
+        os.makedirs(os.path.dirname(self.path_snapshot) or ".", exist_ok=True)
+        # Jurnal dan segel digabung lewat kompaksi biasa dulu (paling banyak dua putaran: segel lama, lalu
+        # jurnal), agar snapshot baru hanya berisi impor + snapshot lama dan tidak ada jurnal yang tersisa
+        for _ in range(2):
+            if os.path.exists(self.path_jurnal) or os.path.exists(self.path_segel):
+                self.kompaksi(tunggu=True)
+        daftar_path = []
+        jumlah = 0
+        try:
+            for batch in daftar_batch:
+                path = f"{self.path_snapshot}.impor-{len(daftar_path)}.jsonl"
+                daftar_path.append(path)
+                with open(path, 'w') as f:
+                    f.writelines(json.dumps(riwayat_ke_json(item)) + "\n" for item in batch)
+                jumlah += len(batch)
+            if not jumlah:
+                return 0
+            path_tmp = self.path_snapshot + ".tmp"
+            with open(path_tmp, 'w') as f:
+                f.write("[")
+                pemisah = "\n"
+                for path in reversed(daftar_path):
+                    for item in reversed(self._baca_jurnal(path)):
+                        f.write(pemisah + json.dumps(item))
+                        pemisah = ",\n"
+                for item in self.iter_riwayat():
+                    f.write(pemisah + json.dumps(item))
+                    pemisah = ",\n"
+                f.write("\n]")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(path_tmp, self.path_snapshot)
+            # Jurnal dan segel sudah ikut tertulis di snapshot baru
+            for path in (self.path_jurnal, self.path_segel):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._baris_jurnal = 0
+            return jumlah
+        finally:
+            for path in daftar_path:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _fsync(self):
+        if self._file is not None and self._belum_fsync:
+            os.fsync(self._file.fileno())
+            self._belum_fsync = 0
+
+    def flush(self):
+        with self._lock:
+            self._fsync()
+
+    def kompaksi(self, tunggu=False):
+        """Segel jurnal aktif lalu gabungkan ke snapshot di thread latar belakang."""
+        with self._lock:
+            if self._thread_kompaksi is not None and self._thread_kompaksi.is_alive():
+                thread = self._thread_kompaksi
+            else:
+                # Segel lama (sisa kompaksi yang terputus) digabung dulu sebelum menyegel lagi
+                if not os.path.exists(self.path_segel) and os.path.exists(self.path_jurnal):
+                    self._fsync()
+                    if self._file is not None:
+                        self._file.close()
+                        self._file = None
+                    os.replace(self.path_jurnal, self.path_segel)
+                    self._baris_jurnal = 0
+                thread = threading.Thread(target=self._gabungkan_segel, daemon=True)
+                self._thread_kompaksi = thread
+                thread.start()
+        if tunggu:
+            thread.join()
+
+    def _gabungkan_segel(self):
+        if not os.path.exists(self.path_segel):
+            return
+        segel = self._baca_jurnal(self.path_segel)
+        snapshot = self._baca_snapshot()
+        if not self._segel_sudah_digabung(segel, snapshot[:len(segel)]):
+            segel.reverse()
+            try:
+                tulis_json_atomik(self.path_snapshot, segel + snapshot)
+            except PermissionError:
+                # Di Windows snapshot tidak bisa diganti selama masih dibaca bertahap;
+                # segel dibiarkan dan ikut dibaca saat start sampai kompaksi berikutnya berhasil
+                return
+        os.remove(self.path_segel)
+
+    def tutup(self):
+        with self._lock:
+            self._fsync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if self._thread_kompaksi is not None:
+            self._thread_kompaksi.join()
+
+
+class LogKendaraanAktif:
+    """
+    Kendaraan aktif = snapshot JSON + log JSON Lines ("masuk"/"keluar") yang diputar ulang saat start.
+
+    Setelah log lebih panjang dari max(`ambang_snapshot`, 2 x jumlah kendaraan aktif), snapshot
+    baru ditulis dan log dikosongkan. Jadi waktu pemulihan sebanding dengan ukuran snapshot,
+    bukan dengan jumlah seluruh event sejak aplikasi dipakai.
+    `fsync_setiap` = 0 berarti fsync hanya saat `flush` dipanggil (mis. oleh PenulisLatar).
+    """
+
+    def __init__(self, path_snapshot, fsync_setiap=1, ambang_snapshot=1000):
+        self.path_snapshot = path_snapshot
+        self.path_log = os.path.splitext(path_snapshot)[0] + ".log"
+        self.fsync_setiap = fsync_setiap
+        self.ambang_snapshot = ambang_snapshot
+        self._aktif = {}
+        self._file = None
+        self._belum_fsync = 0
+        self._baris_log = 0
+
+    def muat_aktif(self):
+        aktif = {}
+        if os.path.exists(self.path_snapshot):
+            with open(self.path_snapshot, 'r') as f:
+                for nopol, jenis, waktu_masuk in json.load(f):
+                    aktif[nopol] = {'jenis': jenis, 'waktu_masuk': waktu_masuk}
+        baris_log = 0
+        if os.path.exists(self.path_log):
+            with open(self.path_log, 'r') as f:
+                for baris in f:
+                    try:
+                        event = json.loads(baris)
+                    except json.JSONDecodeError:
+                        break
+                    baris_log += 1
+                    if event['op'] == "masuk":
+                        aktif[event['nopol']] = {'jenis': event['jenis'], 'waktu_masuk': event['waktu_masuk']}
+                    else:
+                        aktif.pop(event['nopol'], None)
+
+        # Pemutaran ulang bisa mengubah urutan dict; kembalikan ke urutan waktu masuk
+        for data in aktif.values():
+            data['waktu_masuk'] = datetime.datetime.fromisoformat(data['waktu_masuk'])
+        self._aktif = dict(sorted(aktif.items(), key=lambda item: item[1]['waktu_masuk']))
+        self._baris_log = baris_log
+        if baris_log:
+            self.tulis_snapshot()
+        return dict(self._aktif)
+
+    def _tulis_event(self, event):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path_log), exist_ok=True)
+            self._file = open(self.path_log, 'a')
+        self._file.write(json.dumps(event) + "\n")
+        self._file.flush()
+        self._belum_fsync += 1
+        if self.fsync_setiap and self._belum_fsync >= self.fsync_setiap:
+            self.flush()
+        self._baris_log += 1
+        if self._baris_log > max(self.ambang_snapshot, 2 * len(self._aktif)):
+            self.tulis_snapshot()
+
+    def catat_masuk(self, nopol, data):
+        self._aktif[nopol] = data
+        self._tulis_event({'op': "masuk", 'nopol': nopol, 'jenis': data['jenis'], 'waktu_masuk': data['waktu_masuk'].isoformat()})
+
+    def catat_keluar(self, nopol):
+        self._aktif.pop(nopol, None)
+        self._tulis_event({'op': "keluar", 'nopol': nopol})
+
+    def tulis_snapshot(self):
+        # Snapshot ditulis atomik dulu; jika crash sebelum log dikosongkan, log diputar ulang lagi tanpa efek ganda
+        os.makedirs(os.path.dirname(self.path_snapshot), exist_ok=True)
+        tulis_json_atomik(self.path_snapshot, [[nopol, data['jenis'], data['waktu_masuk'].isoformat()]
+                                               for nopol, data in self._aktif.items()], indent=None)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        open(self.path_log, 'w').close()
+        self._belum_fsync = 0
+        self._baris_log = 0
+
+    def flush(self):
+        if self._file is not None and self._belum_fsync:
+            os.fsync(self._file.fileno())
+            self._belum_fsync = 0
+
+    def tutup(self):
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+
+@contextlib.contextmanager
+def kunci_file(path):
+    """Kunci eksklusif antar-proses selama blok `with` berjalan."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'a+') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class UrutanID:
+    """
+    Penghitung id riwayat yang disimpan di file kecil di samping riwayat (mis. riwayat_parkir.seq).
+    Dibaca O(1) saat start, dan bisa membagikan blok id secara atomik ke beberapa gerbang
+    yang memakai penyimpanan yang sama.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.path_kunci = path + ".lock"
+
+    def _baca(self):
+        if not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, 'r') as f:
+                return int(json.load(f).get('id_terakhir', 0))
+        except (json.JSONDecodeError, ValueError, AttributeError):
+            return 0
+
+    def baca(self):
+        with kunci_file(self.path_kunci):
+            return self._baca()
+
+    def alokasi(self, jumlah=1, minimal=1):
+        """Pesan `jumlah` id berurutan; kembalikan id pertama. Id tidak pernah kurang dari `minimal`."""
+        with kunci_file(self.path_kunci):
+            awal = max(self._baca() + 1, minimal)
+            tulis_json_atomik(self.path, {'id_terakhir': awal + jumlah - 1}, indent=None)
+            return awal
+
+    def pastikan_minimal(self, id_terakhir):
+        """Majukan penghitung jika ada id yang sudah dipakai di luar alokasi (mis. riwayat lama)."""
+        with kunci_file(self.path_kunci):
+            if id_terakhir > self._baca():
+                tulis_json_atomik(self.path, {'id_terakhir': id_terakhir}, indent=None)
@@ -0,0 +1,387 @@
+# --- Server parkir: satu state parkir bersama untuk semua gerbang lewat HTTP/JSON lokal ---
+# Jalankan: python server_parkirin.py [--host 127.0.0.1] [--port 8765] [--data history] [--penyimpanan jurnal]
+import argparse # untuk membaca argumen baris perintah
+import asyncio # untuk melayani banyak koneksi gerbang dalam satu thread
+import datetime # untuk konversi waktu dari/ke string ISO
+import json # untuk badan permintaan dan respons
+import os # untuk path file penyimpanan
+import signal # untuk berhenti dengan rapi saat menerima SIGTERM
+import threading # untuk menjalankan server di thread terpisah (tes dan benchmark)
+from urllib.parse import parse_qsl, urlsplit # untuk memecah path dan query string
+
+from engine_parkirin import ParkingEngine, ParkirError, tarif_bawaan # logika parkir tanpa GUI
+from penulis_parkirin import MODE_GRUP, PenulisLatar # untuk menulis ke disk di luar event loop
+from biner_parkirin import RiwayatBiner # riwayat biner yang bisa dibaca proses lain lewat mmap
+from partisi_parkirin import RiwayatPartisi # riwayat per bulan dengan arsip gzip
+from penyimpanan_parkirin import JurnalRiwayat, LogKendaraanAktif, UrutanID # penyimpanan append-only
+from sqlite_parkirin import PenyimpananSQLite # penyimpanan SQLite
+from tarif_parkirin import TabelTarif # untuk membaca tarif dari tarif.json
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+HOST_BAWAAN = "127.0.0.1"
+PORT_BAWAAN = 8765
+# Baris riwayat maksimum dalam satu respons /riwayat
+BATAS_RIWAYAT = 500
+MAKS_BADAN = 1 << 20
+# Jumlah operasi tulis yang diantrekan ke PenulisLatar oleh satu permintaan
+OPERASI_TULIS = {("POST", "/checkin"): 1, ("POST", "/checkout"): 2}
+
+STATUS_HTTP = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 431: "Request Header Fields Too Large", 500: "Internal Server Error",
+               503: "Service Unavailable"}
+
+
+def waktu_dari_json(nilai):
+    return datetime.datetime.fromisoformat(nilai) if nilai else None
+
+
+def ke_json(data):
+    """Salin dict hasil engine dengan datetime menjadi string ISO dan timedelta menjadi detik."""
+    hasil = {}
+    for kunci, nilai in data.items():
+        if isinstance(nilai, datetime.datetime):
+            nilai = nilai.isoformat()
+        elif isinstance(nilai, datetime.timedelta):
+            nilai = nilai.total_seconds()
+        hasil[kunci] = nilai
+    return hasil
+
+
+def _bool(nilai):
+    return nilai in (True, 1, "1", "true", "ya")
+
+
+class LayananParkir:
+    """
+    Menerjemahkan permintaan (metode, path, badan JSON) menjadi panggilan ParkingEngine.
+    Tidak menyentuh jaringan, jadi bisa dites langsung; semua panggilan terjadi di satu thread
+    (event loop server), sehingga engine tidak perlu dikunci.
+    """
+
+    def __init__(self, engine, penulis=None):
+        self.engine = engine
+        self.penulis = penulis
+        self.jumlah_permintaan = 0
+        self.rute = {
+            ("GET", "/status"): self.status,
+            ("GET", "/kendaraan"): self.kendaraan,
+            ("POST", "/checkin"): self.checkin,
+            ("POST", "/quote"): self.quote,
+            ("POST", "/checkout"): self.checkout,
+            ("GET", "/riwayat"): self.riwayat,
+            ("GET", "/saran"): self.saran,
+            ("GET", "/biaya"): self.biaya,
+            ("GET", "/okupansi"): self.okupansi,
+        }
+        self._path = {path for _, path in self.rute}
+
+    def tangani(self, metode, target, badan=b""):
+        """Mengembalikan (status HTTP, dict hasil) untuk satu permintaan."""
+        self.jumlah_permintaan += 1
+        url = urlsplit(target)
+        fungsi = self.rute.get((metode, url.path))
+        if fungsi is None:
+            if url.path in self._path:
+                return 405, {"error": f"Metode {metode} tidak didukung untuk {url.path}"}
+            return 404, {"error": f"Alamat tidak dikenal: {url.path}"}
+        jumlah_tulis = OPERASI_TULIS.get((metode, url.path), 0)
+        if jumlah_tulis and self.penulis is not None and not self.penulis.bisa_menerima(jumlah_tulis):
+            # Antrian tulis penuh: tolak sebelum engine berubah, daripada menahan event loop sampai disk sempat menulis
+            return 503, {"error": "Server sedang sibuk menyimpan ke disk, coba lagi", "jenis": "ParkirError"}
+        try:
+            argumen = dict(parse_qsl(url.query))
+            if badan:
+                data = json.loads(badan)
+                if not isinstance(data, dict):
+                    raise ValueError("badan permintaan harus berupa objek JSON")
+                argumen.update(data)
+            return 200, fungsi(argumen)
+        except ParkirError as e:
+            # `jenis` dipakai klien untuk melempar ulang kelas error yang sama (mis. WaktuTidakValid)
+            return 400, {"error": str(e), "jenis": type(e).__name__}
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"error": f"Permintaan tidak valid: {e}", "jenis": "ParkirError"}
+
+    def status(self, argumen):
+        hasil = {"aktif": len(self.engine.kendaraan_terparkir), "riwayat": len(self.engine.riwayat_parkir),
+                 "id_terakhir": self.engine.last_parkir_id, "permintaan": self.jumlah_permintaan,
+                 "okupansi": self.engine.okupansi.ringkasan()}
+        if self.penulis is not None:
+            hasil["penulis"] = self.penulis.metrik()
+        return hasil
+
+    def kendaraan(self, argumen):
+        aktif = self.engine.kendaraan_terparkir
+        nopol = argumen.get("nopol")
+        daftar = [nopol] if nopol is not None else aktif
+        return {"kendaraan": [dict(ke_json(aktif[n]), nopol=n) for n in daftar if n in aktif]}
+
+    def checkin(self, argumen):
+        nopol = argumen.get("nopol")
+        data = self.engine.checkin(nopol, argumen.get("jenis"), waktu_dari_json(argumen.get("waktu_masuk")))
+        return dict(ke_json(data), nopol=nopol)
+
+    def quote(self, argumen):
+        return ke_json(self.engine.quote(argumen.get("nopol"), waktu_dari_json(argumen.get("waktu_keluar")),
+                                         _bool(argumen.get("tiket_hilang"))))
+
+    def checkout(self, argumen):
+        return ke_json(self.engine.checkout(argumen.get("nopol"), argumen.get("metode", "Cash"),
+                                            waktu_dari_json(argumen.get("waktu_keluar")), _bool(argumen.get("tiket_hilang"))))
+
+    def riwayat(self, argumen):
+        """Satu halaman riwayat (terbaru di depan); `nopol` menyaring riwayat satu kendaraan."""
+        offset = int(argumen.get("offset", 0))
+        batas = min(int(argumen.get("batas", 50)), BATAS_RIWAYAT)
+        if offset < 0 or batas < 0:
+            raise ValueError("offset dan batas tidak boleh negatif")
+        riwayat = self.engine.riwayat_parkir
+        nopol = argumen.get("nopol")
+        if nopol:
+            # Selama riwayat masih dimuat di latar belakang, hanya halaman yang sudah dibaca yang dicari
+            cocok = self.engine.riwayat_nopol(nopol, offset + batas, muat_semua=False)
+            return {"jumlah": len(cocok), "lengkap": len(cocok) < offset + batas and getattr(riwayat, "selesai", True),
+                    "riwayat": [ke_json(item) for item in cocok[offset:]]}
+        # Riwayat bertahap (mode jurnal) baru dibaca dari disk sampai halaman yang diminta
+        if hasattr(riwayat, "muat_berikutnya"):
+            while not riwayat.selesai and len(riwayat) < offset + batas:
+                if not riwayat.muat_berikutnya():
+                    break
+            self.engine.perbarui_indeks_riwayat()
+        akhir = min(offset + batas, len(riwayat))
+        return {"jumlah": len(riwayat), "lengkap": getattr(riwayat, "selesai", True),
+                "riwayat": [ke_json(riwayat[i]) for i in range(offset, akhir)]}
+
+    def saran(self, argumen):
+        teks, batas = argumen.get("teks", ""), int(argumen.get("batas", 5))
+        if argumen.get("sumber") == "riwayat":
+            # Indeks berisi nopol dari riwayat yang sudah dimuat (lihat muat_riwayat_bertahap)
+            return {"saran": self.engine.indeks_riwayat.saran(teks, batas)}
+        return {"saran": self.engine.saran_nopol(teks, batas)}
+
+    def biaya(self, argumen):
+        masuk = datetime.datetime.fromisoformat(argumen["masuk"])
+        return {"biaya": self.engine.hitung_biaya(argumen["jenis"], int(argumen["jam"]), masuk)}
+
+    def okupansi(self, argumen):
+        """Okupansi saat ini dan deret per menit untuk `menit` menit terakhir (dibaca dari ring buffer)."""
+        okupansi = self.engine.okupansi
+        deret = okupansi.deret(int(argumen.get("menit", 60)))
+        return {"terisi": okupansi.terisi, "kapasitas": okupansi.kapasitas,
+                "deret": [(waktu.isoformat(), nilai) for waktu, nilai in deret]}
+
+
+class ServerParkir:
+    """
+    Server HTTP/1.1 minimal di atas asyncio: koneksi keep-alive (dan pipelining), badan JSON
+    dengan Content-Length. Cukup untuk gerbang di jaringan lokal tanpa pustaka tambahan.
+    """
+
+    def __init__(self, layanan, host=HOST_BAWAAN, port=PORT_BAWAAN):
+        self.layanan = layanan
+        self.host = host
+        self.port = port
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    async def mulai(self):
+        self._server = await asyncio.start_server(self._layani, self.host, self.port)
+        # Port 0 berarti port dipilih sistem operasi
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    @property
+    def alamat(self):
+        return f"http://{self.host}:{self.port}"
+
+    @staticmethod
+    def _tulis(writer, status, hasil, tetap_hidup):
+        badan = json.dumps(hasil).encode()
+        kepala = (f"HTTP/1.1 {status} {STATUS_HTTP.get(status, '')}\r\n"
+                  f"Content-Type: application/json\r\n"
+                  f"Content-Length: {len(badan)}\r\n"
+                  f"Connection: {'keep-alive' if tetap_hidup else 'close'}\r\n\r\n")
+        writer.write(kepala.encode("latin-1") + badan)
+
+    async def _layani(self, reader, writer):
+        try:
+            while True:
+                try:
+                    kepala = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break # klien menutup koneksi
+                except asyncio.LimitOverrunError:
+                    self._tulis(writer, 431, {"error": "Header terlalu besar"}, False)
+                    break
+                baris = kepala.decode("latin-1").split("\r\n")
+                try:
+                    metode, target, versi = baris[0].split(" ", 2)
+                    header = {}
+                    for h in baris[1:]:
+                        if h:
+                            kunci, _, nilai = h.partition(":")
+                            header[kunci.strip().lower()] = nilai.strip()
+                    panjang = int(header.get("content-length", 0))
+                except ValueError:
+                    self._tulis(writer, 400, {"error": "Permintaan HTTP tidak valid"}, False)
+                    break
+                if panjang > MAKS_BADAN:
+                    self._tulis(writer, 413, {"error": "Badan permintaan terlalu besar"}, False)
+                    break
+                badan = await reader.readexactly(panjang) if panjang else b""
+
+                try:
+                    status, hasil = self.layanan.tangani(metode, target, badan)
+                except Exception as e:
+                    status, hasil = 500, {"error": f"Kesalahan server: {e}"}
+                koneksi = header.get("connection", "").lower()
+                tetap_hidup = koneksi != "close" if versi == "HTTP/1.1" else koneksi == "keep-alive"
+                self._tulis(writer, status, hasil, tetap_hidup)
+                if not tetap_hidup:
+                    break
+                # Respons cukup ditumpuk di buffer; tunggu hanya jika klien lambat membaca
+                if writer.transport.get_write_buffer_size() > 1 << 16:
+                    await writer.drain()
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def jalankan_di_thread(self):
+        """Jalankan server di thread baru dengan event loop sendiri; kembali setelah port siap."""
+        siap = threading.Event()
+
+        def jalan():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.mulai())
+            siap.set()
+            self._loop.run_forever()
+            self._server.close()
+            self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=jalan, daemon=True, name="server-parkirin")
+        self._thread.start()
+        siap.wait()
+        return self
+
+    def hentikan(self):
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+
+def baca_kapasitas(teks):
+    """'Mobil=200,Motor=500' -> {'Mobil': 200, 'Motor': 500}; jenis yang tidak disebut tidak dibatasi."""
+    kapasitas = {}
+    for bagian in filter(None, (b.strip() for b in teks.split(","))):
+        jenis, _, jumlah = bagian.partition("=")
+        kapasitas[jenis.strip()] = int(jumlah)
+    return kapasitas
+
+
+def buat_engine(direktori, mode_penyimpanan, penulis, path_tarif=None, kapasitas=None):
+    """
+    ParkingEngine dengan penyimpanan di `direktori` (nama file sama dengan aplikasi desktop).
+    Mengembalikan (engine, daftar penyimpanan yang harus ditutup saat server berhenti).
+    """
+    tarif = TabelTarif.dari_file(
+        path_tarif, tarif_bawaan(), saat_gagal=lambda pesan: print(pesan, flush=True)) if path_tarif else None
+    if mode_penyimpanan == "memori":
+        return ParkingEngine(tarif=tarif, kapasitas=kapasitas), []
+    if mode_penyimpanan == "sqlite":
+        penyimpanan = penyimpanan_aktif = PenyimpananSQLite(os.path.join(direktori, "parkirin.db"))
+        daftar_tutup = [penyimpanan]
+    elif mode_penyimpanan == "jurnal":
+        # fsync diatur oleh PenulisLatar
+        penyimpanan = JurnalRiwayat(os.path.join(direktori, "riwayat_parkir.json"), fsync_setiap=0)
+        penyimpanan_aktif = LogKendaraanAktif(os.path.join(direktori, "kendaraan_aktif.json"), fsync_setiap=0)
+        daftar_tutup = [penyimpanan, penyimpanan_aktif]
+    elif mode_penyimpanan == "partisi":
+        penyimpanan = RiwayatPartisi(os.path.join(direktori, "partisi"), fsync_setiap=0,
+                                     path_lama=os.path.join(direktori, "riwayat_parkir.json"))
+        penyimpanan_aktif = LogKendaraanAktif(os.path.join(direktori, "kendaraan_aktif.json"), fsync_setiap=0)
+        daftar_tutup = [penyimpanan, penyimpanan_aktif]
+    elif mode_penyimpanan == "biner":
+        penyimpanan = RiwayatBiner(os.path.join(direktori, "riwayat_parkir.bin"), fsync_setiap=0,
+                                   path_lama=os.path.join(direktori, "riwayat_parkir.json"))
+        penyimpanan_aktif = LogKendaraanAktif(os.path.join(direktori, "kendaraan_aktif.json"), fsync_setiap=0)
+        daftar_tutup = [penyimpanan, penyimpanan_aktif]
+    else:
+        raise ValueError(f"Mode penyimpanan tidak dikenal: {mode_penyimpanan}")
+    engine = ParkingEngine(penyimpanan.muat(), penyimpanan=penulis.bungkus(penyimpanan),
+                           penyimpanan_aktif=penulis.bungkus(penyimpanan_aktif),
+                           urutan_id=UrutanID(os.path.join(direktori, "riwayat_parkir.seq")), tarif=tarif,
+                           kapasitas=kapasitas)
+    return engine, daftar_tutup
+
+
+async def muat_riwayat_bertahap(engine):
+    """
+    Baca sisa riwayat bertahap per halaman di sela permintaan dan perbarui indeks nopol riwayat setiap halaman,
+    sehingga port langsung dibuka tanpa membaca seluruh riwayat dan event loop tidak tertahan lama.
+    """
+    riwayat = engine.riwayat_parkir
+    # Indeks dibangun dari halaman yang sudah ada (RiwayatSQLite: daftar nopol dari indeks database)
+    engine.indeks_riwayat
+    while hasattr(riwayat, "muat_berikutnya") and not riwayat.selesai:
+        riwayat.muat_berikutnya()
+        engine.perbarui_indeks_riwayat()
+        await asyncio.sleep(0)
+
+
+async def _laporkan_galat(penulis, interval=1.0):
+    # Error dari thread penulis dicetak di log server
+    while True:
+        await asyncio.sleep(interval)
+        for galat in penulis.jalankan_kabar():
+            print(f"Gagal menyimpan ke disk: {galat}", flush=True)
+
+
+async def jalankan(args):
+    penulis = PenulisLatar(mode=args.durabilitas, interval=args.interval_fsync)
+    engine, daftar_tutup = buat_engine(args.data, args.penyimpanan, penulis, args.tarif, args.kapasitas)
+    server = ServerParkir(LayananParkir(engine, penulis), args.host, args.port)
+    srv = await server.mulai()
+    print(f"Server parkir berjalan di {server.alamat}", flush=True)
+    tugas_galat = asyncio.ensure_future(_laporkan_galat(penulis))
+    tugas_muat = asyncio.ensure_future(muat_riwayat_bertahap(engine))
+    berhenti = asyncio.Event()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, berhenti.set)
+    except (NotImplementedError, AttributeError):
+        pass # Windows: cukup Ctrl+C
+    try:
+        await berhenti.wait()
+    finally:
+        tugas_galat.cancel()
+        tugas_muat.cancel()
+        srv.close()
+        engine.tutup()
+        penulis.tutup()
+        for penyimpanan in daftar_tutup:
+            penyimpanan.tutup()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Server parkir bersama untuk beberapa gerbang")
+    parser.add_argument("--host", default=HOST_BAWAAN)
+    parser.add_argument("--port", type=int, default=PORT_BAWAAN)
+    parser.add_argument("--data", default=os.path.join(BASE_DIR, "history"), help="folder penyimpanan")
+    parser.add_argument("--penyimpanan", choices=("jurnal", "partisi", "sqlite", "biner", "memori"), default="jurnal")
+    parser.add_argument("--durabilitas", choices=("grup", "setiap"), default=MODE_GRUP)
+    parser.add_argument("--interval-fsync", type=float, default=0.5)
+    parser.add_argument("--tarif", default=os.path.join(BASE_DIR, "tarif.json"))
+    parser.add_argument("--kapasitas", type=baca_kapasitas, help="kapasitas per jenis, mis. Mobil=200,Motor=500")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(jalankan(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
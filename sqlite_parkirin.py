@@ -0,0 +1,237 @@
+# --- Penyimpanan SQLite untuk riwayat dan kendaraan aktif ---
+import datetime # untuk konversi waktu masuk/keluar
+import os # untuk berinteraksi dengan sistem operasi
+import sqlite3 # database tertanam bawaan Python
+import threading # untuk mengunci koneksi yang dipakai bersama
+from kolom_parkirin import RiwayatKolom # untuk menyimpan checkout sesi ini secara ringkas
+
+# `id` adalah INTEGER PRIMARY KEY (alias rowid), jadi sudah terindeks tanpa indeks tambahan
+SKEMA = """
+CREATE TABLE IF NOT EXISTS riwayat (
+    id INTEGER PRIMARY KEY,
+    nopol TEXT NOT NULL,
+    jenis TEXT NOT NULL,
+    waktu_masuk TEXT NOT NULL,
+    waktu_keluar TEXT NOT NULL,
+    total_biaya INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    metode_bayar TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_riwayat_nopol ON riwayat(nopol);
+CREATE INDEX IF NOT EXISTS idx_riwayat_waktu_keluar ON riwayat(waktu_keluar);
+CREATE TABLE IF NOT EXISTS aktif (
+    nopol TEXT PRIMARY KEY,
+    jenis TEXT NOT NULL,
+    waktu_masuk TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_aktif_waktu_masuk ON aktif(waktu_masuk);
+"""
+
+KOLOM_RIWAYAT = ('id', 'nopol', 'jenis', 'waktu_masuk', 'waktu_keluar', 'total_biaya', 'status', 'metode_bayar')
+
+# SQL selalu berupa string konstan dengan parameter `?`, sehingga statement yang sudah
+# di-prepare dipakai ulang dari cache koneksi sqlite3 (cached_statements).
+SQL_TAMBAH = "INSERT INTO riwayat (id, nopol, jenis, waktu_masuk, waktu_keluar, total_biaya, status, metode_bayar) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+SQL_HAPUS_AKTIF = "DELETE FROM aktif WHERE nopol = ?"
+# Hanya sesi parkir yang sama (nopol + waktu masuk), agar impor riwayat lama tidak menghapus kendaraan yang sedang parkir
+SQL_HAPUS_AKTIF_SESI = "DELETE FROM aktif WHERE nopol = ? AND waktu_masuk = ?"
+SQL_MASUK = "INSERT OR REPLACE INTO aktif (nopol, jenis, waktu_masuk) VALUES (?, ?, ?)"
+# Halaman dibaca dengan keyset (id < id terakhir halaman sebelumnya) lewat primary key, bukan OFFSET
+SQL_HALAMAN = "SELECT * FROM riwayat WHERE id < ? ORDER BY id DESC LIMIT ?"
+# Lompat ke halaman jauh (mis. scrollbar ditarik): hanya melewati id di indeks rowid, tanpa membaca baris
+SQL_LEWATI_ID = "SELECT id FROM riwayat WHERE id < ? ORDER BY id DESC LIMIT 1 OFFSET ?"
+# LIMIT -1 = tanpa batas; baris dibaca dari idx_riwayat_nopol urut id turun dan berhenti setelah `batas` baris
+SQL_CARI_NOPOL = "SELECT * FROM riwayat WHERE nopol = ? AND id <= ? ORDER BY id DESC LIMIT ?"
+ID_MAKS = (1 << 63) - 1
+SQL_DAFTAR_NOPOL = "SELECT DISTINCT nopol FROM riwayat"
+SQL_RENTANG = "SELECT * FROM riwayat WHERE waktu_keluar >= ? AND waktu_keluar < ? ORDER BY waktu_keluar"
+
+
+def _ke_baris(entry):
+    return (entry['id'], entry['nopol'], entry['jenis'], entry['waktu_masuk'].isoformat(),
+            entry['waktu_keluar'].isoformat(), entry['total_biaya'], entry['status'], entry['metode_bayar'])
+
+
+def _dari_baris(baris):
+    item = dict(zip(KOLOM_RIWAYAT, baris))
+    item['waktu_masuk'] = datetime.datetime.fromisoformat(item['waktu_masuk'])
+    item['waktu_keluar'] = datetime.datetime.fromisoformat(item['waktu_keluar'])
+    return item
+
+
+class PenyimpananSQLite:
+    """
+    Riwayat dan kendaraan aktif dalam satu file SQLite (mode WAL).
+    Start tidak membaca seluruh riwayat; data diambil per halaman lewat RiwayatSQLite.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, cached_statements=64)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SKEMA)
+
+    # --- Riwayat ---
+    def muat(self):
+        return RiwayatSQLite(self)
+
+    def tambah(self, entry):
+        # Simpan riwayat dan hapus dari tabel aktif dalam satu transaksi
+        with self._lock, self.conn:
+            self.conn.execute(SQL_TAMBAH, _ke_baris(entry))
+            self.conn.execute(SQL_HAPUS_AKTIF, (entry['nopol'],))
+
+    def tambah_banyak(self, daftar_entry):
+        # Seperti `tambah`: checkout yang digabung PenulisLatar tetap menghapus kendaraan aktif di transaksi yang sama
+        baris = [_ke_baris(entry) for entry in daftar_entry]
+        with self._lock, self.conn:
+            self.conn.executemany(SQL_TAMBAH, baris)
+            self.conn.executemany(SQL_HAPUS_AKTIF_SESI, ((b[1], b[3]) for b in baris))
+
+    def id_terakhir(self):
+        with self._lock:
+            return self.conn.execute("SELECT MAX(id) FROM riwayat").fetchone()[0] or 0
+
+    def jumlah(self, id_maks=None):
+        with self._lock:
+            if id_maks is None:
+                return self.conn.execute("SELECT COUNT(*) FROM riwayat").fetchone()[0]
+            return self.conn.execute("SELECT COUNT(*) FROM riwayat WHERE id <= ?", (id_maks,)).fetchone()[0]
+
+    def halaman(self, sebelum_id, batas):
+        """`batas` baris riwayat terbaru yang id-nya < sebelum_id (terbaru di depan)."""
+        with self._lock:
+            return [_dari_baris(b) for b in self.conn.execute(SQL_HALAMAN, (sebelum_id, batas))]
+
+    def id_setelah(self, sebelum_id, lewati):
+        """Id baris ke-`lewati` (mulai 0) di antara baris dengan id < sebelum_id, urut id turun; None jika habis."""
+        with self._lock:
+            baris = self.conn.execute(SQL_LEWATI_ID, (sebelum_id, lewati)).fetchone()
+        return baris[0] if baris else None
+
+    def cari_nopol(self, nopol, id_maks=None, batas=None):
+        """Riwayat satu nopol (terbaru di depan) dengan id <= `id_maks`, paling banyak `batas` baris."""
+        parameter = (nopol, ID_MAKS if id_maks is None else id_maks, -1 if batas is None else batas)
+        with self._lock:
+            return [_dari_baris(b) for b in self.conn.execute(SQL_CARI_NOPOL, parameter)]
+
+    def daftar_nopol(self):
+        """Semua nopol di riwayat, dibaca dari indeks idx_riwayat_nopol tanpa membaca tabel."""
+        with self._lock:
+            return [nopol for nopol, in self.conn.execute(SQL_DAFTAR_NOPOL)]
+
+    def rentang_waktu(self, awal, akhir):
+        """Riwayat dengan awal <= waktu_keluar < akhir, memakai indeks waktu_keluar."""
+        with self._lock:
+            return [_dari_baris(b) for b in self.conn.execute(SQL_RENTANG, (awal.isoformat(), akhir.isoformat()))]
+
+    def iter_riwayat(self, ukuran_halaman=5000):
+        """
+        Generator riwayat mentah (waktu sebagai string ISO, terbaru di depan) per halaman id,
+        mis. untuk ekspor; kunci hanya dipegang selama satu halaman dibaca.
+        """
+        batas_id = float('inf')
+        while True:
+            with self._lock:
+                baris = self.conn.execute(SQL_HALAMAN, (batas_id, ukuran_halaman)).fetchall()
+            for b in baris:
+                yield dict(zip(KOLOM_RIWAYAT, b))
+            if len(baris) < ukuran_halaman:
+                return
+            batas_id = baris[-1][0]
+
+    # --- Kendaraan aktif ---
+    def catat_masuk(self, nopol, data):
+        with self._lock, self.conn:
+            self.conn.execute(SQL_MASUK, (nopol, data['jenis'], data['waktu_masuk'].isoformat()))
+
+    def catat_keluar(self, nopol):
+        with self._lock, self.conn:
+            self.conn.execute(SQL_HAPUS_AKTIF, (nopol,))
+
+    def muat_aktif(self):
+        with self._lock:
+            baris = self.conn.execute("SELECT nopol, jenis, waktu_masuk FROM aktif ORDER BY waktu_masuk").fetchall()
+        return {nopol: {'jenis': jenis, 'waktu_masuk': datetime.datetime.fromisoformat(waktu)} for nopol, jenis, waktu in baris}
+
+    def tutup(self):
+        with self._lock:
+            self.conn.close()
+
+
+class RiwayatSQLite:
+    """
+    Urutan riwayat (terbaru di depan) yang dibaca dari SQLite per halaman.
+    Baris dari sesi ini disimpan di `baru`; baris lama dibatasi `id_batas` agar indeks tetap stabil.
+    """
+    UKURAN_HALAMAN = 200
+    MAKS_HALAMAN_CACHE = 16
+
+    def __init__(self, db):
+        self.db = db
+        self.id_batas = db.id_terakhir()
+        self.jumlah_db = db.jumlah(self.id_batas)
+        self.baru = RiwayatKolom()
+        self._cache = {}
+        # nomor halaman -> batas keyset (id < batas); halaman 0 dimulai tepat di atas id_batas
+        self._batas = {0: self.id_batas + 1}
+
+    def id_terakhir(self):
+        return max(self.baru.id_terakhir(), self.id_batas)
+
+    def __len__(self):
+        return len(self.baru) + self.jumlah_db
+
+    def _batas_halaman(self, nomor):
+        if nomor not in self._batas:
+            # Mulai dari batas halaman terdekat yang sudah diketahui; id di antaranya dilewati lewat indeks
+            dasar = max(n for n in self._batas if n < nomor)
+            id_pertama = self.db.id_setelah(self._batas[dasar], (nomor - dasar) * self.UKURAN_HALAMAN)
+            self._batas[nomor] = id_pertama + 1 if id_pertama is not None else 0
+        return self._batas[nomor]
+
+    def _baca_halaman(self, nomor):
+        baris = self.db.halaman(self._batas_halaman(nomor), self.UKURAN_HALAMAN)
+        if len(baris) == self.UKURAN_HALAMAN:
+            self._batas[nomor + 1] = baris[-1]['id']
+        return baris
+
+    def _halaman(self, nomor):
+        if nomor not in self._cache:
+            if len(self._cache) >= self.MAKS_HALAMAN_CACHE:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[nomor] = self._baca_halaman(nomor)
+        return self._cache[nomor]
+
+    def __getitem__(self, indeks):
+        if indeks < 0:
+            indeks += len(self)
+        if not 0 <= indeks < len(self):
+            raise IndexError("indeks riwayat di luar jangkauan")
+        if indeks < len(self.baru):
+            return self.baru[indeks]
+        indeks -= len(self.baru)
+        nomor, sisa = divmod(indeks, self.UKURAN_HALAMAN)
+        return self._halaman(nomor)[sisa]
+
+    def __iter__(self):
+        yield from self.baru
+        for nomor in range((self.jumlah_db + self.UKURAN_HALAMAN - 1) // self.UKURAN_HALAMAN):
+            # Tidak lewat cache agar iterasi penuh tidak menyingkirkan halaman yang sedang tampil
+            yield from self._baca_halaman(nomor)
+
+    def cari_nopol(self, nopol, batas=None):
+        """Baris dengan nopol tertentu (terbaru di depan): checkout sesi ini, lalu SQL_CARI_NOPOL lewat idx_riwayat_nopol."""
+        hasil = self.baru.cari_nopol(nopol, batas)
+        if batas is not None and len(hasil) >= batas:
+            return hasil
+        # Hanya sisa kuota yang dibaca dari database
+        sisa = None if batas is None else batas - len(hasil)
+        hasil.extend(self.db.cari_nopol(nopol, self.id_batas, sisa))
+        return hasil
+
+    def insert(self, indeks, entry):
+        self.baru.insert(indeks, entry)
@@ -0,0 +1,205 @@
+# --- Tabel tarif parkir: tarif per jam, tarif per periode waktu, batas harian dan biaya inap ---
+import bisect # untuk mencari kelas offset dalam O(log k)
+import json # untuk membaca file konfigurasi tarif
+import math # untuk pembulatan jam ke atas
+import os # untuk memeriksa file konfigurasi
+
+# NumPy opsional: harga_batch dihitung sebagai operasi array. Modul ini selalu diimpor saat aplikasi
+# start, jadi NumPy baru diimpor saat harga_batch/harga_riwayat pertama kali dipanggil (muat_numpy).
+np = None
+_numpy_dicoba = False
+
+DETIK_JAM = 3600
+DETIK_HARI = 86400
+JAM_SEHARI = 24
+
+
+def detik_dari_jam(teks):
+    """'HH:MM' menjadi detik sejak tengah malam ('24:00' sama dengan '00:00')."""
+    jam, menit = teks.split(":")
+    return (int(jam) * 60 + int(menit)) * 60 % DETIK_HARI
+
+
+def muat_numpy():
+    """Modul numpy, atau None jika tidak terpasang."""
+    global np, _numpy_dicoba
+    if not _numpy_dicoba:
+        _numpy_dicoba = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            pass
+    return np
+
+
+class TarifJenis:
+    """
+    Tarif satu jenis kendaraan yang sudah dikompilasi.
+
+    Jam pertama selalu `jam_pertama`. Jam berikutnya dikenai tarif periode yang memuat waktu mulai
+    jam tersebut (atau `per_jam_berikutnya` jika tidak ada periode yang cocok). Biaya setiap 24 jam
+    sejak masuk dibatasi `maks_harian`, dan setiap kali melewati pukul 00:00 ditambah `tarif_inap`.
+
+    Karena awal jam ke-i adalah masuk + i jam, tarif per jam berulang setiap 24 jam dan hanya
+    bergantung pada (detik masuk mod 3600). Nilai itu dibagi menjadi beberapa kelas oleh batas periode;
+    untuk setiap kelas disimpan prefix sum tarif 24 slot jam (digandakan agar bisa melewati tengah malam).
+    Satu harga lalu cukup satu bisect ditambah beberapa pengurangan prefix sum.
+    """
+
+    def __init__(self, jam_pertama, per_jam_berikutnya, periode=(), maks_harian=None, tarif_inap=0):
+        self.jam_pertama = jam_pertama
+        self.per_jam_berikutnya = per_jam_berikutnya
+        self.maks_harian = maks_harian
+        self.tarif_inap = tarif_inap
+        self.periode = [(detik_dari_jam(p['mulai']), detik_dari_jam(p['selesai']), p['per_jam']) for p in periode]
+        batas = [detik for mulai, selesai, _ in self.periode for detik in (mulai, selesai)]
+        self.kelas_awal = sorted({0} | {detik % DETIK_JAM for detik in batas})
+        self.prefix = []
+        for offset in self.kelas_awal:
+            slot = [self.tarif_pada(offset + jam * DETIK_JAM) for jam in range(JAM_SEHARI)]
+            prefix = [0]
+            for tarif in slot + slot:
+                prefix.append(prefix[-1] + tarif)
+            self.prefix.append(prefix)
+        # Tanpa periode, batas harian dan biaya inap harga cukup jam_pertama + (jam - 1) * per_jam_berikutnya
+        self.datar = not self.periode and maks_harian is None and not tarif_inap
+
+    def tarif_pada(self, detik):
+        """Tarif untuk jam yang dimulai pada `detik` sejak tengah malam; periode pertama yang cocok dipakai."""
+        for mulai, selesai, per_jam in self.periode:
+            if mulai < selesai:
+                cocok = mulai <= detik < selesai
+            else:
+                # Periode melewati tengah malam (mis. 22:00-06:00); mulai == selesai berarti sepanjang hari
+                cocok = detik >= mulai or detik < selesai
+            if cocok:
+                return per_jam
+        return self.per_jam_berikutnya
+
+    def _batasi(self, biaya):
+        return biaya if self.maks_harian is None else min(biaya, self.maks_harian)
+
+    def harga_jam(self, fase, total_jam, malam=0):
+        """Harga untuk `total_jam` jam yang dimulai `fase` detik setelah tengah malam, melewati `malam` kali 00:00."""
+        if self.datar:
+            return self.jam_pertama + (total_jam - 1) * self.per_jam_berikutnya
+        prefix = self.prefix[bisect.bisect_right(self.kelas_awal, fase % DETIK_JAM) - 1]
+        jam_awal = fase // DETIK_JAM
+
+        # Blok 24 jam pertama: jam ke-0 memakai jam_pertama, jam ke-1.. memakai slot jam_awal+1..
+        jam_blok = min(total_jam, JAM_SEHARI)
+        slot = (jam_awal + 1) % JAM_SEHARI
+        total = self._batasi(self.jam_pertama + prefix[slot + jam_blok - 1] - prefix[slot])
+
+        # Blok penuh berikutnya selalu memuat ke-24 slot; sisa jam dimulai lagi dari slot jam_awal
+        penuh, sisa = divmod(max(total_jam - JAM_SEHARI, 0), JAM_SEHARI)
+        total += penuh * self._batasi(prefix[JAM_SEHARI])
+        if sisa:
+            total += self._batasi(prefix[jam_awal + sisa] - prefix[jam_awal])
+        return total + malam * self.tarif_inap
+
+    def harga_batch(self, fase, total_jam, malam):
+        """Versi harga_jam untuk array NumPy (int64) dengan panjang yang sama."""
+        prefix = np.asarray(self.prefix, dtype=np.int64)
+        prefix_rata = prefix.ravel()
+        basis = (np.searchsorted(np.asarray(self.kelas_awal), fase % DETIK_JAM, side='right') - 1) * prefix.shape[1]
+        jam_awal = fase // DETIK_JAM
+
+        jam_blok = np.minimum(total_jam, JAM_SEHARI)
+        slot = (jam_awal + 1) % JAM_SEHARI
+        pertama = self.jam_pertama + prefix_rata[basis + slot + jam_blok - 1] - prefix_rata[basis + slot]
+        penuh, sisa = np.divmod(np.maximum(total_jam - JAM_SEHARI, 0), JAM_SEHARI)
+        harian = prefix[:, JAM_SEHARI][basis // prefix.shape[1]]
+        terakhir = prefix_rata[basis + jam_awal + sisa] - prefix_rata[basis + jam_awal]
+        if self.maks_harian is not None:
+            pertama = np.minimum(pertama, self.maks_harian)
+            harian = np.minimum(harian, self.maks_harian)
+            terakhir = np.minimum(terakhir, self.maks_harian)
+        return pertama + penuh * harian + terakhir + malam * self.tarif_inap
+
+
+class TabelTarif:
+    """Tarif semua jenis kendaraan, dibaca dari dict {jenis: konfigurasi} atau file JSON."""
+
+    def __init__(self, konfigurasi):
+        self.jenis = {nama: TarifJenis(**cfg) for nama, cfg in konfigurasi.items()}
+
+    @classmethod
+    def dari_file(cls, path, bawaan, saat_gagal=None):
+        """
+        Baca tarif dari file JSON; jika file tidak ada, pakai konfigurasi `bawaan`.
+        Jika isinya tidak valid (JSON rusak, kunci kurang atau jam salah), `saat_gagal(pesan)` dipanggil
+        lalu tarif `bawaan` dipakai, sehingga aplikasi tetap bisa dibuka.
+        """
+        if not os.path.exists(path):
+            return cls(bawaan)
+        try:
+            with open(path, 'r') as f:
+                return cls(json.load(f))
+        except (ValueError, KeyError, TypeError) as e:
+            if saat_gagal is not None:
+                saat_gagal(f"{path} tidak valid ({type(e).__name__}: {e}). Tarif bawaan dipakai.")
+            return cls(bawaan)
+
+    def tarif(self, jenis):
+        try:
+            return self.jenis[jenis]
+        except KeyError:
+            raise KeyError(f"Tarif untuk jenis {jenis} tidak ada") from None
+
+    def harga(self, jenis, waktu_masuk, waktu_keluar):
+        tarif = self.tarif(jenis)
+        total_jam = max(1, math.ceil((waktu_keluar - waktu_masuk).total_seconds() / DETIK_JAM))
+        if tarif.datar:
+            return tarif.jam_pertama + (total_jam - 1) * tarif.per_jam_berikutnya
+        fase = waktu_masuk.hour * DETIK_JAM + waktu_masuk.minute * 60 + waktu_masuk.second
+        malam = (waktu_keluar.date() - waktu_masuk.date()).days
+        return tarif.harga_jam(fase, total_jam, malam)
+
+    def harga_batch(self, jenis, masuk, keluar):
+        """
+        Harga banyak parkir sekaligus. `jenis` berisi nama jenis, `masuk`/`keluar` berisi detik epoch
+        (lihat kolom_parkirin.ke_epoch). Hasilnya array int64 jika NumPy terpasang, selain itu list.
+        """
+        if muat_numpy() is None:
+            return [self._harga_epoch(j, m, k) for j, m, k in zip(jenis, masuk, keluar)]
+        jenis = np.asarray(jenis)
+        kode = np.full(len(jenis), -1, dtype=np.int64)
+        nama_jenis = list(self.jenis)
+        for i, nama in enumerate(nama_jenis):
+            kode[jenis == nama] = i
+        if (kode < 0).any():
+            self.tarif(jenis[kode < 0][0])
+        return self._harga_batch_kode(kode, [self.jenis[nama] for nama in nama_jenis], masuk, keluar)
+
+    def harga_riwayat(self, riwayat):
+        """Hitung ulang harga seluruh RiwayatKolom (urut dari terlama ke terbaru), mis. untuk simulasi tarif baru."""
+        nama_jenis = riwayat.kamus['jenis'].nilai
+        masuk, keluar = riwayat.kolom('waktu_masuk'), riwayat.kolom('waktu_keluar')
+        if muat_numpy() is None:
+            return [self._harga_epoch(nama_jenis[j], m, k) for j, m, k in zip(riwayat.kolom('jenis'), masuk, keluar)]
+        kode = np.frombuffer(riwayat.kolom('jenis'), dtype=np.uint8).astype(np.int64)
+        tarif = [self.jenis.get(nama) for nama in nama_jenis]
+        for i, t in enumerate(tarif):
+            if t is None and (kode == i).any():
+                self.tarif(nama_jenis[i])
+        return self._harga_batch_kode(kode, tarif, np.frombuffer(masuk, dtype=np.int64), np.frombuffer(keluar, dtype=np.int64))
+
+    def _harga_epoch(self, jenis, masuk, keluar):
+        total_jam = max(1, -(-(keluar - masuk) // DETIK_JAM))
+        return self.tarif(jenis).harga_jam(masuk % DETIK_HARI, total_jam, keluar // DETIK_HARI - masuk // DETIK_HARI)
+
+    @staticmethod
+    def _harga_batch_kode(kode, tarif, masuk, keluar):
+        masuk = np.asarray(masuk, dtype=np.int64)
+        keluar = np.asarray(keluar, dtype=np.int64)
+        total_jam = np.maximum(1, -((masuk - keluar) // DETIK_JAM))
+        fase = masuk % DETIK_HARI
+        malam = keluar // DETIK_HARI - masuk // DETIK_HARI
+        hasil = np.zeros(len(masuk), dtype=np.int64)
+        for i, t in enumerate(tarif):
+            pilih = kode == i
+            if t is not None and pilih.any():
+                hasil[pilih] = t.harga_batch(fase[pilih], total_jam[pilih], malam[pilih])
+        return hasil
@@ -3,9 +3,35 @@ from unittest.mock import patch, MagicMock, mock_open
 import datetime
 import json
 import os
+import tempfile
 import customtkinter as ctk
 
-from app_parkirin import App, TARIF_MOBIL, TARIF_MOTOR, DENDA_TIKET_HILANG, NAMA_FILE_RIWAYAT
+from app_parkirin import App, DialogPembayaran, DialogTiket, PATH_MOBIL, TARIF_MOBIL, TARIF_MOTOR, DENDA_TIKET_HILANG, NAMA_FILE_RIWAYAT, BATAS_WIDGET_AWAL, INTERVAL_LAPORAN_MS
+from penyimpanan_parkirin import JurnalRiwayat, LogKendaraanAktif, RiwayatBertahap, UrutanID, iter_array_json
+from engine_parkirin import ParkingEngine, ParkirError, ParkirPenuh, WaktuTidakValid, tarif_bawaan
+from kolom_parkirin import RiwayatKolom, ke_epoch
+from tarif_parkirin import TabelTarif
+from indeks_parkirin import IndeksNopol, jarak_edit
+from gambar_parkirin import CacheGambar
+from penulis_parkirin import PenulisLatar, MODE_SETIAP
+import threading
+import asyncio
+import http.client
+from PIL import Image
+import laporan_parkirin
+from laporan_parkirin import buat_laporan, format_laporan
+from sqlite_parkirin import PenyimpananSQLite, SQL_CARI_NOPOL, SQL_HALAMAN, SQL_RENTANG
+from server_parkirin import LayananParkir, ServerParkir, baca_kapasitas, buat_engine, muat_riwayat_bertahap
+from klien_parkirin import EngineJarak, KlienParkir
+from metrik_parkirin import METRIK, Histogram, PencatatMetrik
+from partisi_parkirin import RiwayatPartisi
+from okupansi_parkirin import Okupansi
+from alarm_parkirin import AlarmParkir
+import ekspor_parkirin
+import biner_parkirin
+from biner_parkirin import BacaBiner, RiwayatBiner, biner_ke_json, json_ke_biner
+from penjadwal_parkirin import PenjadwalRefresh
+from lalu_lintas_parkirin import PolaLaluLintas, buat_lalu_lintas, putar_ulang, urutan_event
 
 class TestAppGUI(unittest.TestCase):
 
@@ -42,14 +68,16 @@ class TestAppGUI(unittest.TestCase):
         self.app.destroy()
 
     def test_hitung_biaya_motor(self):
-        self.assertEqual(self.app.hitung_biaya('Motor', 1), TARIF_MOTOR['jam_pertama'])
+        waktu_masuk = datetime.datetime(2024, 6, 24, 10, 0, 0)
+        self.assertEqual(self.app.hitung_biaya('Motor', 1, waktu_masuk), TARIF_MOTOR['jam_pertama'])
         biaya_3_jam = TARIF_MOTOR['jam_pertama'] + (2 * TARIF_MOTOR['per_jam_berikutnya'])
-        self.assertEqual(self.app.hitung_biaya('Motor', 3), biaya_3_jam)
+        self.assertEqual(self.app.hitung_biaya('Motor', 3, waktu_masuk), biaya_3_jam)
 
     def test_hitung_biaya_mobil(self):
-        self.assertEqual(self.app.hitung_biaya('Mobil', 1), TARIF_MOBIL['jam_pertama'])
+        waktu_masuk = datetime.datetime(2024, 6, 24, 10, 0, 0)
+        self.assertEqual(self.app.hitung_biaya('Mobil', 1, waktu_masuk), TARIF_MOBIL['jam_pertama'])
         biaya_5_jam = TARIF_MOBIL['jam_pertama'] + (4 * TARIF_MOBIL['per_jam_berikutnya'])
-        self.assertEqual(self.app.hitung_biaya('Mobil', 5), biaya_5_jam)
+        self.assertEqual(self.app.hitung_biaya('Mobil', 5, waktu_masuk), biaya_5_jam)
 
     def test_get_nopol_from_entries(self):
         p1, p2, p3 = MagicMock(), MagicMock(), MagicMock()
@@ -77,6 +105,7 @@ class TestAppGUI(unittest.TestCase):
     def test_event_checkin_sukses(self, mock_dialog_sukses, mock_messagebox):
         nopol = "B 1234 TST"
         jenis = "Mobil"
+        self.app.show_checkin_view()
         self.app.entry_nopol_in_1.insert(0, "B")
         self.app.entry_nopol_in_2.insert(0, "1234")
         self.app.entry_nopol_in_3.insert(0, "TST")
@@ -91,6 +120,7 @@ class TestAppGUI(unittest.TestCase):
     def test_event_checkin_gagal_jika_sudah_parkir(self, mock_messagebox):
         nopol = "B 5678 ERR"
         self.app.kendaraan_terparkir[nopol] = {'jenis': 'Motor', 'waktu_masuk': datetime.datetime.now()}
+        self.app.show_checkin_view()
         self.app.entry_nopol_in_1.insert(0, "B")
         self.app.entry_nopol_in_2.insert(0, "5678")
         self.app.entry_nopol_in_3.insert(0, "ERR")
@@ -98,6 +128,98 @@ class TestAppGUI(unittest.TestCase):
         self.app.event_checkin()
         mock_messagebox.showerror.assert_called_once_with("Error", f"Kendaraan {nopol} sudah terparkir.")
 
+    @patch('app_parkirin.messagebox')
+    @patch('app_parkirin.App.buka_dialog_checkin_sukses_modern')
+    def test_event_checkin_ditolak_jika_penuh(self, mock_dialog_sukses, mock_messagebox):
+        self.app.engine.okupansi.kapasitas['Motor'] = 1
+        self.app.engine.checkin("B 1 PNH", "Motor")
+        self.app.update_okupansi()
+        self.assertIn("Motor 1/1 PENUH", self.app.label_okupansi.cget("text"))
+        self.app.show_checkin_view()
+        self.app.entry_nopol_in_1.insert(0, "B")
+        self.app.entry_nopol_in_2.insert(0, "2")
+        self.app.entry_nopol_in_3.insert(0, "PNH")
+        self.app.opsi_jenis.set("Motor")
+        self.app.event_checkin()
+        mock_messagebox.showwarning.assert_called_once_with("PENUH", "Parkir Motor PENUH (1/1).")
+        mock_dialog_sukses.assert_not_called()
+        self.assertNotIn("B 2 PNH", self.app.kendaraan_terparkir)
+
+    def test_dialog_tiket_dipakai_ulang(self):
+        self.app.buka_dialog_checkin_sukses_modern("   Nomor Polisi    : B 1 A", PATH_MOBIL)
+        dialog = self.app.dialog[DialogTiket]
+        dialog.sembunyikan()
+        self.app.buka_dialog_checkin_sukses_modern("   Nomor Polisi    : B 2 A", PATH_MOBIL)
+        self.assertIs(self.app.ambil_dialog(DialogTiket), dialog)
+        self.assertEqual(dialog.label_info.cget("text"), "   Nomor Polisi    : B 2 A")
+        self.assertEqual(dialog.state(), "normal")
+        dialog.sembunyikan()
+        self.assertEqual(dialog.state(), "withdrawn")
+
+    def test_dialog_pembayaran_memanggil_transaksi_terakhir(self):
+        waktu_masuk = datetime.datetime(2024, 6, 24, 10, 0, 0)
+        self.app.engine.checkin("B 1 BYR", "Motor", waktu_masuk)
+        self.app.engine.checkin("B 2 BYR", "Motor", waktu_masuk)
+        # Pembayaran selalu berasal dari form checkout
+        self.app.show_checkout_view()
+        self.app.buka_dialog_pembayaran("B 1 BYR", "rincian 1", 3000, "Lunas", waktu_masuk + datetime.timedelta(hours=1))
+        dialog = self.app.dialog[DialogPembayaran]
+        dialog.metode_bayar_var.set("E-Money")
+        dialog.sembunyikan()
+        self.app.buka_dialog_pembayaran("B 2 BYR", "rincian 2", 5000, "Lunas", waktu_masuk + datetime.timedelta(hours=2))
+        self.assertIs(self.app.dialog[DialogPembayaran], dialog)
+        self.assertEqual(dialog.metode_bayar_var.get(), "Cash")
+        with patch.object(self.app, 'simpan_riwayat_ke_json'):
+            dialog._on_konfirmasi()
+        self.assertIn("B 1 BYR", self.app.kendaraan_terparkir)
+        self.assertEqual((self.app.riwayat_parkir[0]['nopol'], self.app.riwayat_parkir[0]['total_biaya']), ("B 2 BYR", 5000))
+        self.assertEqual(dialog.state(), "withdrawn")
+
+    def test_checkout_beruntun_digabung_dalam_satu_refresh(self):
+        waktu_masuk = datetime.datetime(2024, 6, 24, 10, 0, 0)
+        for i in range(20):
+            self.app.engine.checkin(f"B {i} RFS", "Motor", waktu_masuk)
+        self.app.update_daftar_kendaraan()
+        self.app.show_checkout_view()
+        jumlah_refresh = METRIK.histogram["refresh"].jumlah if "refresh" in METRIK.histogram else 0
+        with patch.object(self.app, 'simpan_riwayat_ke_json'):
+            for i in range(20):
+                self.app.proses_pembayaran_final(f"B {i} RFS", 3000, 'Cash', 'Lunas', waktu_masuk + datetime.timedelta(hours=1))
+        # Model sudah berubah, tampilan belum digambar ulang
+        self.assertEqual(len(self.app.kendaraan_terparkir), 0)
+        self.assertEqual(len(self.app.baris_aktif), 20)
+        self.app.penjadwal.flush()
+        self.assertEqual(self.app.baris_aktif, {})
+        self.assertEqual(METRIK.histogram["refresh"].jumlah, jumlah_refresh + 1)
+        self.assertIn("B 19 RFS selesai", self.app.status_box.get("0.0", "end"))
+        self.assertEqual(self.app.daftar_riwayat.pool[0][2][1], "B 19 RFS")
+
+    def test_peringatan_parkir_lama_di_status_dan_tab(self):
+        sekarang = datetime.datetime.now()
+        self.app.engine.checkin("B 1 LMA", "Mobil", sekarang - datetime.timedelta(hours=13))
+        self.app.engine.checkin("B 2 LMA", "Motor", sekarang - datetime.timedelta(hours=1))
+        self.app.tabview.set("Peringatan")
+        self.app.on_ganti_tab()
+        self.app.periksa_alarm(sekarang)
+        self.app.penjadwal.flush()
+        self.assertIn("B 1 LMA (Mobil", self.app.status_box.get("0.0", "end"))
+        self.assertEqual([p.nopol for p in self.app.peringatan_tampil], ["B 1 LMA"])
+        self.assertEqual(self.app.daftar_alarm.pool[0][2][0], "B 1 LMA")
+
+    def test_font_dipakai_bersama(self):
+        self.assertIs(self.app.font(size=14, weight="bold"), self.app.font(size=14, weight="bold"))
+        self.assertIsNot(self.app.font(size=14), self.app.font(size=14, weight="bold"))
+
+    def test_tab_okupansi_dibangun_saat_dibuka(self):
+        self.assertFalse(hasattr(self.app, 'kanvas_okupansi'))
+        self.app.engine.checkin("B 1 OKU", "Mobil")
+        self.app.tabview.set("Okupansi")
+        self.app.on_ganti_tab()
+        self.app.rentang_okupansi.set("4 Jam")
+        self.app.update_idletasks()
+        self.app.gambar_okupansi()
+        self.assertTrue(self.app.kanvas_okupansi.find_all())
+
     def test_proses_pembayaran_final(self):
         waktu_masuk = datetime.datetime(2024, 6, 24, 10, 0, 0)
         waktu_keluar = datetime.datetime(2024, 6, 24, 12, 0, 0)
@@ -105,6 +227,8 @@ class TestAppGUI(unittest.TestCase):
         total_biaya = 13000
         self.app.kendaraan_terparkir[nopol] = {'jenis': 'Mobil', 'waktu_masuk': waktu_masuk}
         self.app.last_parkir_id = 5
+        self.app.show_checkout_view()
+        self.app.entry_nopol_out_1.insert(0, "D")
 
         with patch.object(self.app, 'simpan_riwayat_ke_json') as mock_simpan:
             self.app.proses_pembayaran_final(nopol, total_biaya, 'Cash', 'Lunas', waktu_keluar)
@@ -116,6 +240,8 @@ class TestAppGUI(unittest.TestCase):
         riwayat_terbaru = self.app.riwayat_parkir[0]
         self.assertEqual(riwayat_terbaru['id'], 6)
         self.assertEqual(riwayat_terbaru['status'], 'Lunas')
+        # Form checkout dikosongkan untuk kendaraan berikutnya
+        self.assertEqual(self.app.entry_nopol_out_1.get(), "")
 
     @patch("builtins.open", new_callable=mock_open)
     def test_simpan_riwayat_ke_json(self, mock_file):
@@ -127,5 +253,1439 @@ class TestAppGUI(unittest.TestCase):
         hasil_json = json.loads(written_data)
         self.assertEqual(hasil_json[0]['waktu_masuk'], waktu_sekarang.isoformat())
 
+    def test_daftar_aktif_diperbarui_per_baris(self):
+        waktu = datetime.datetime(2024, 6, 24, 10, 0, 0)
+        for i, nopol in enumerate(["B 1 AAA", "B 2 BBB"]):
+            self.app.kendaraan_terparkir[nopol] = {'jenis': 'Motor', 'waktu_masuk': waktu + datetime.timedelta(minutes=i)}
+            self.app.tambah_baris_aktif(nopol)
+        baris_lama = self.app.baris_aktif["B 1 AAA"]
+        urutan = self.app.scroll_aktif.pack_slaves()
+        self.assertLess(urutan.index(self.app.baris_aktif["B 2 BBB"]), urutan.index(baris_lama))
+
+        self.app.hapus_baris_aktif("B 2 BBB")
+        self.assertNotIn("B 2 BBB", self.app.baris_aktif)
+        self.assertIs(self.app.baris_aktif["B 1 AAA"], baris_lama)
+
+    def test_keluar_lalu_masuk_lagi_dalam_satu_refresh(self):
+        waktu = datetime.datetime(2024, 6, 24, 10, 0, 0)
+        for i, nopol in enumerate(["B 1 AAA", "B 2 BBB"]):
+            self.app.kendaraan_terparkir[nopol] = {'jenis': 'Motor', 'waktu_masuk': waktu + datetime.timedelta(minutes=i)}
+            self.app.tambah_baris_aktif(nopol)
+        baris_lama = self.app.baris_aktif["B 1 AAA"]
+
+        # B 1 AAA keluar lalu masuk lagi sebelum penjadwal sempat menggambar
+        self.app.kendaraan_terparkir["B 1 AAA"] = {'jenis': 'Mobil', 'waktu_masuk': waktu + datetime.timedelta(hours=1)}
+        self.app.refresh_aktif([("B 1 AAA", False), ("B 1 AAA", True)])
+
+        baris_baru = self.app.baris_aktif["B 1 AAA"]
+        self.assertIsNot(baris_baru, baris_lama)
+        self.assertFalse(baris_lama.winfo_exists())
+        teks = [label.cget("text") for label in baris_baru.winfo_children()]
+        self.assertEqual(teks, ["B 1 AAA", "Mobil", "24-Jun 11:00:00"])
+        urutan = self.app.scroll_aktif.pack_slaves()
+        self.assertLess(urutan.index(baris_baru), urutan.index(self.app.baris_aktif["B 2 BBB"]))
+
+    def test_update_riwayat_hanya_membuat_baris_terlihat(self):
+        waktu = datetime.datetime(2024, 6, 24, 10, 0, 0)
+        self.app.riwayat_parkir = [{'id': i, 'nopol': f'B {i} TST', 'jenis': 'Motor', 'waktu_masuk': waktu, 'waktu_keluar': waktu,
+                                    'total_biaya': 3000, 'status': 'Lunas', 'metode_bayar': 'Cash'} for i in range(5000, 0, -1)]
+        self.app.update_riwayat()
+        daftar = self.app.daftar_riwayat
+        self.assertLessEqual(len(daftar.pool), daftar.jumlah_terlihat)
+        self.assertEqual(daftar.pool[0][2][0], '5000')
+
+        self.app.riwayat_parkir.insert(0, {**self.app.riwayat_parkir[0], 'id': 5001})
+        daftar.sisip_di_atas()
+        self.assertLessEqual(len(daftar.pool), daftar.jumlah_terlihat)
+        self.assertEqual(daftar.pool[0][2][0], '5001')
+
+
+    def test_saran_checkout_mengisi_input(self):
+        for nopol in ["B 1234 XYZ", "B 1299 AB", "D 77 Q"]:
+            self.app.engine.checkin(nopol, "Motor")
+        self.app.show_checkout_view()
+        self.app.entry_nopol_out_1.insert(0, "b")
+        self.app.entry_nopol_out_2.insert(0, "12")
+        self.app.update_saran_checkout()
+        self.assertEqual(self.app.saran_checkout, ["B 1234 XYZ", "B 1299 AB"])
+
+        self.app.pilih_saran(0)
+        nopol = self.app.get_nopol_from_entries(self.app.entry_nopol_out_1, self.app.entry_nopol_out_2, self.app.entry_nopol_out_3)
+        self.assertEqual(nopol, "B 1234 XYZ")
+
+    def test_widget_sebelum_tampil_pertama_dalam_anggaran(self):
+        # Form check-in/checkout, spinbox waktu manual dan baris riwayat baru dibuat setelah jendela tampil
+        self.assertLessEqual(sum(self.app.hitung_widget().values()), BATAS_WIDGET_AWAL)
+        self.assertFalse(hasattr(self.app, 'entry_nopol_out_1'))
+
+        self.app.show_checkout_view()
+        self.assertFalse(hasattr(self.app, 'spin_tgl_out'))
+        self.app.manual_time_check.select()
+        self.app.toggle_manual_time_widgets()
+        self.assertEqual(self.app.spin_jam_out.entry.cget("state"), "normal")
+
+    def test_update_laporan_menulis_ringkasan(self):
+        self.app.riwayat_parkir = [{'id': 1, 'nopol': "B 1 A", 'jenis': "Motor", 'waktu_masuk': datetime.datetime.now() - datetime.timedelta(hours=1),
+                                    'waktu_keluar': datetime.datetime.now(), 'total_biaya': 3000, 'status': "Lunas", 'metode_bayar': "Cash"}]
+        self.app.rentang_laporan.set("Hari Ini")
+        self.app.update_laporan()
+        # Laporan dihitung di thread sendiri; hasilnya baru ditulis oleh periksa_laporan di thread Tk
+        self.assertIn("Menghitung laporan", self.app.box_laporan.get("0.0", "end"))
+        self.app.after.assert_called_with(INTERVAL_LAPORAN_MS, self.app.periksa_laporan)
+        self.app._thread_laporan.join(5)
+        self.app.periksa_laporan()
+        self.assertIn("Jumlah transaksi   : 1", self.app.box_laporan.get("0.0", "end"))
+
+    def test_tab_diagnostik_menampilkan_metrik(self):
+        self.app.update_riwayat()
+        self.app.tampilkan_diagnostik()
+        teks = self.app.box_diagnostik.get("0.0", "end")
+        self.assertIn("update_riwayat", teks)
+        self.assertIn("Widget          :", teks)
+        self.assertGreater(sum(self.app.hitung_widget().values()), 50)
+
+    def test_mode_gerbang_memakai_state_server(self):
+        engine_server = ParkingEngine()
+        server = ServerParkir(LayananParkir(engine_server), port=0).jalankan_di_thread()
+        waktu_masuk = datetime.datetime(2024, 6, 24, 10, 0, 0)
+        engine_server.checkin("B 9 SRV", "Mobil", waktu_masuk)
+        try:
+            with patch('app_parkirin.ALAMAT_SERVER', server.alamat):
+                gerbang = App()
+                gerbang.after = MagicMock()
+                self.assertIn("B 9 SRV", gerbang.baris_aktif)
+                gerbang.show_checkout_view()
+                gerbang.proses_pembayaran_final("B 9 SRV", 5000, 'Cash', 'Lunas', waktu_masuk + datetime.timedelta(hours=1))
+                gerbang.destroy()
+        finally:
+            server.hentikan()
+        self.assertEqual(engine_server.kendaraan_terparkir, {})
+        self.assertEqual(engine_server.riwayat_parkir[0]['total_biaya'], 5000)
+
+
+class TestParkingEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = ParkingEngine()
+        self.masuk = datetime.datetime(2024, 6, 24, 10, 0, 0)
+
+    def test_checkin_gagal_jika_sudah_parkir(self):
+        self.engine.checkin("B 1 TST", "Motor", self.masuk)
+        with self.assertRaisesRegex(ParkirError, "sudah terparkir"):
+            self.engine.checkin("B 1 TST", "Motor", self.masuk)
+
+    def test_quote_membulatkan_jam_ke_atas(self):
+        self.engine.checkin("B 1 TST", "Mobil", self.masuk)
+        rincian = self.engine.quote("B 1 TST", self.masuk + datetime.timedelta(hours=2, minutes=1))
+        self.assertEqual(rincian['total_jam'], 3)
+        self.assertEqual(rincian['total_biaya'], TARIF_MOBIL['jam_pertama'] + 2 * TARIF_MOBIL['per_jam_berikutnya'])
+        self.assertIn("B 1 TST", self.engine.kendaraan_terparkir)
+
+    def test_quote_tiket_hilang_dan_waktu_mundur(self):
+        self.engine.checkin("B 1 TST", "Motor", self.masuk)
+        self.assertEqual(self.engine.quote("B 1 TST", self.masuk, tiket_hilang=True)['total_biaya'], DENDA_TIKET_HILANG)
+        with self.assertRaises(WaktuTidakValid):
+            self.engine.quote("B 1 TST", self.masuk - datetime.timedelta(minutes=1))
+
+    def test_checkout_memindahkan_ke_riwayat_dan_menyimpan(self):
+        penyimpanan = MagicMock()
+        engine = ParkingEngine([{'id': 7}], penyimpanan=penyimpanan)
+        engine.checkin("B 1 TST", "Motor", self.masuk)
+        entry = engine.checkout("B 1 TST", "E-Money", self.masuk + datetime.timedelta(minutes=30))
+        self.assertEqual(entry['id'], 8)
+        self.assertEqual(entry['total_biaya'], TARIF_MOTOR['jam_pertama'])
+        self.assertIs(engine.riwayat_parkir[0], entry)
+        self.assertNotIn("B 1 TST", engine.kendaraan_terparkir)
+        penyimpanan.tambah.assert_called_once_with(entry)
+
+class TestOkupansi(unittest.TestCase):
+
+    def setUp(self):
+        self.waktu = datetime.datetime(2024, 6, 24, 10, 0, 0)
+
+    def test_penghitung_dan_kapasitas(self):
+        okupansi = Okupansi({'Motor': 2})
+        okupansi.masuk('Motor', self.waktu)
+        self.assertEqual((okupansi.sisa('Motor'), okupansi.penuh('Motor')), (1, False))
+        okupansi.masuk('Motor', self.waktu)
+        self.assertTrue(okupansi.penuh('Motor'))
+        self.assertIsNone(okupansi.sisa('Mobil'))
+        okupansi.keluar('Motor', self.waktu)
+        okupansi.keluar('Mobil', self.waktu)
+        self.assertEqual(okupansi.ringkasan(), {'Mobil': {'terisi': 0, 'kapasitas': None},
+                                                'Motor': {'terisi': 1, 'kapasitas': 2}})
+
+    def test_deret_menyimpan_puncak_dan_mengisi_menit_kosong(self):
+        okupansi = Okupansi()
+        okupansi.masuk('Mobil', self.waktu)
+        okupansi.masuk('Mobil', self.waktu + datetime.timedelta(seconds=10))
+        okupansi.keluar('Mobil', self.waktu + datetime.timedelta(seconds=20))
+        okupansi.keluar('Mobil', self.waktu + datetime.timedelta(minutes=3))
+        deret = okupansi.deret(5, sampai=self.waktu + datetime.timedelta(minutes=4))
+        self.assertEqual(deret[0][0], self.waktu)
+        self.assertEqual([nilai['Mobil'] for _, nilai in deret], [2, 1, 1, 1, 0])
+
+    def test_ring_buffer_berputar(self):
+        okupansi = Okupansi(menit_disimpan=10)
+        okupansi.masuk('Motor', self.waktu)
+        okupansi.masuk('Motor', self.waktu + datetime.timedelta(minutes=25))
+        deret = okupansi.deret(60, sampai=self.waktu + datetime.timedelta(minutes=25))
+        self.assertEqual(len(deret), 10)
+        self.assertEqual([nilai['Motor'] for _, nilai in deret], [1] * 9 + [2])
+
+    def test_waktu_masa_depan_dicatat_pada_jam_sekarang(self):
+        sekarang = self.waktu + datetime.timedelta(minutes=2)
+        okupansi = Okupansi(sekarang=lambda: sekarang)
+        okupansi.masuk('Mobil', self.waktu)
+        # Waktu keluar manual satu hari ke depan tidak boleh memindahkan menit terakhir ke besok
+        okupansi.keluar('Mobil', self.waktu + datetime.timedelta(days=1))
+        okupansi.masuk('Motor', sekarang)
+        deret = okupansi.deret(3)
+        self.assertEqual(deret[-1][0], sekarang)
+        self.assertEqual([(nilai['Mobil'], nilai['Motor']) for _, nilai in deret], [(1, 0), (1, 0), (1, 1)])
+        self.assertEqual(okupansi.terisi, {'Mobil': 0, 'Motor': 1})
+
+    def test_engine_menolak_checkin_saat_penuh(self):
+        engine = ParkingEngine(kapasitas={'Mobil': 1})
+        engine.checkin("B 1 A", "Mobil", self.waktu)
+        with self.assertRaisesRegex(ParkirPenuh, "PENUH"):
+            engine.checkin("B 2 A", "Mobil", self.waktu)
+        engine.checkin("B 3 A", "Motor", self.waktu)
+        engine.checkout("B 1 A", waktu_keluar=self.waktu + datetime.timedelta(hours=1))
+        engine.checkin("B 2 A", "Mobil", self.waktu + datetime.timedelta(hours=1))
+        self.assertEqual(engine.okupansi.terisi, {'Mobil': 1, 'Motor': 1})
+        engine.kendaraan_terparkir = {}
+        self.assertEqual(engine.okupansi.terisi, {'Mobil': 0, 'Motor': 0})
+
+
+class TestAlarmParkir(unittest.TestCase):
+
+    def setUp(self):
+        self.waktu = datetime.datetime(2024, 6, 24, 10, 0, 0)
+        jam = datetime.timedelta(hours=1)
+        self.alarm = AlarmParkir({"Mobil": ((2 * jam, "lama"), (5 * jam, "sangat lama")), "Motor": ((jam, "lama"),)})
+
+    def test_hanya_tenggat_yang_lewat_dan_naik_tingkat(self):
+        self.alarm.masuk("B 1 A", "Mobil", self.waktu)
+        self.alarm.masuk("B 2 A", "Motor", self.waktu + datetime.timedelta(minutes=30))
+        self.assertEqual(self.alarm.periksa(self.waktu + datetime.timedelta(minutes=59)), [])
+        hasil = self.alarm.periksa(self.waktu + datetime.timedelta(hours=2))
+        self.assertEqual([(p.nopol, p.pesan) for p in hasil], [("B 2 A", "lama"), ("B 1 A", "lama")])
+        self.assertEqual(self.alarm.periksa(self.waktu + datetime.timedelta(hours=3)), [])
+        hasil = self.alarm.periksa(self.waktu + datetime.timedelta(hours=5))
+        self.assertEqual([(p.nopol, p.pesan) for p in hasil], [("B 1 A", "sangat lama")])
+        self.assertEqual([p.nopol for p in self.alarm.daftar()], ["B 1 A", "B 2 A"])
+
+    def test_checkout_dan_masuk_ulang_tidak_memicu_tenggat_lama(self):
+        self.alarm.masuk("B 1 A", "Motor", self.waktu)
+        self.alarm.keluar("B 1 A")
+        self.alarm.masuk("B 1 A", "Motor", self.waktu + datetime.timedelta(minutes=50))
+        self.alarm.masuk("B 3 A", "Motor", self.waktu)
+        self.alarm.keluar("B 3 A")
+        hasil = self.alarm.periksa(self.waktu + datetime.timedelta(hours=1))
+        self.assertEqual(hasil, [])
+        self.assertEqual(len(self.alarm), 1)
+        hasil = self.alarm.periksa(self.waktu + datetime.timedelta(hours=2))
+        self.assertEqual([p.waktu_masuk for p in hasil], [self.waktu + datetime.timedelta(minutes=50)])
+
+    def test_reset_melompati_tingkat_dan_tidak_mengulang(self):
+        aktif = {"B 1 A": {'jenis': "Mobil", 'waktu_masuk': self.waktu}}
+        self.alarm.reset(aktif)
+        hasil = self.alarm.periksa(self.waktu + datetime.timedelta(hours=6))
+        self.assertEqual([p.pesan for p in hasil], ["sangat lama"])
+        self.alarm.reset(aktif)
+        self.assertEqual(self.alarm.periksa(self.waktu + datetime.timedelta(hours=7)), [])
+        self.assertEqual(len(self.alarm.daftar()), 1)
+
+    def test_engine_mencatat_tenggat(self):
+        engine = ParkingEngine()
+        engine.checkin("B 1 A", "Motor", self.waktu)
+        engine.checkin("B 2 A", "Mobil", self.waktu)
+        engine.checkout("B 2 A", waktu_keluar=self.waktu + datetime.timedelta(hours=1))
+        hasil = engine.alarm.periksa(self.waktu + datetime.timedelta(days=4))
+        self.assertEqual([(p.nopol, p.tingkat) for p in hasil], [("B 1 A", 1)])
+
+
+class _WidgetPalsu:
+    """Pengganti after/after_idle Tk: callback disimpan dan baru dijalankan saat `jalankan` dipanggil."""
+
+    def __init__(self):
+        self.jadwal = {}
+
+    def after(self, ms, fungsi):
+        self.jadwal[len(self.jadwal) + 1] = (ms, fungsi)
+        return len(self.jadwal)
+
+    def after_idle(self, fungsi):
+        return self.after(0, fungsi)
+
+    def after_cancel(self, id_jadwal):
+        self.jadwal.pop(id_jadwal, None)
+
+    def jalankan(self):
+        jadwal, self.jadwal = self.jadwal, {}
+        for _, fungsi in jadwal.values():
+            fungsi()
+
+
+class TestPenjadwalRefresh(unittest.TestCase):
+
+    def setUp(self):
+        self.widget = _WidgetPalsu()
+        self.penjadwal = PenjadwalRefresh(self.widget, maks_per_detik=10)
+        self.panggilan = []
+        self.penjadwal.daftar("aktif", lambda data: self.panggilan.append(("aktif", data)))
+        self.penjadwal.daftar("status", lambda data: self.panggilan.append(("status", data)))
+
+    def test_banyak_perubahan_digabung(self):
+        for i in range(100):
+            self.penjadwal.tandai("status", f"pesan {i}")
+            self.penjadwal.tandai("aktif", i)
+        self.assertEqual(len(self.widget.jadwal), 1)
+        self.assertEqual(self.panggilan, [])
+        self.widget.jalankan()
+        self.assertEqual([nama for nama, _ in self.panggilan], ["aktif", "status"])
+        self.assertEqual(self.panggilan[0][1], list(range(100)))
+        self.assertEqual(self.panggilan[1][1][-1], "pesan 99")
+        self.assertFalse(self.penjadwal.kotor)
+
+    def test_refresh_dibatasi_per_detik(self):
+        self.penjadwal.tandai("aktif", 1)
+        self.penjadwal.flush()
+        self.assertEqual(self.widget.jadwal, {})
+        self.penjadwal.tandai("aktif", 2)
+        (ms, _), = self.widget.jadwal.values()
+        self.assertTrue(0 < ms <= 100)
+        self.penjadwal.buang("aktif")
+        self.widget.jalankan()
+        self.assertEqual(self.panggilan, [("aktif", [1])])
+
+
+class TestTabelTarif(unittest.TestCase):
+
+    def setUp(self):
+        self.tarif = TabelTarif({
+            "Motor": {"jam_pertama": 3000, "per_jam_berikutnya": 2000, "maks_harian": 20000, "tarif_inap": 5000,
+                      "periode": [{"mulai": "22:30", "selesai": "06:00", "per_jam": 1000}]},
+            "Mobil": {"jam_pertama": 5000, "per_jam_berikutnya": 4000},
+        })
+        self.masuk = datetime.datetime(2024, 6, 24, 20, 30, 0)
+
+    def test_periode_malam_dan_biaya_inap(self):
+        # Jam mulai 20:30 (jam pertama), 21:30 (2000), 22:30, 23:30 dan 00:30 (1000), dan melewati 00:00 sekali
+        keluar = self.masuk + datetime.timedelta(hours=4, minutes=10)
+        self.assertEqual(self.tarif.harga("Motor", self.masuk, keluar), 3000 + 2000 + 3 * 1000 + 5000)
+
+    def test_batas_harian_per_24_jam(self):
+        keluar = self.masuk + datetime.timedelta(days=2, hours=1)
+        # Dua blok 24 jam penuh dibatasi 20000, satu jam sisa (20:30) bertarif 2000, melewati 00:00 dua kali
+        self.assertEqual(self.tarif.harga("Motor", self.masuk, keluar), 20000 + 20000 + 2000 + 2 * 5000)
+
+    def test_harga_batch_sama_dengan_per_panggilan(self):
+        jenis, masuk, keluar = [], [], []
+        for i in range(200):
+            waktu_masuk = self.masuk + datetime.timedelta(minutes=37 * i)
+            jenis.append("Motor" if i % 3 else "Mobil")
+            masuk.append(waktu_masuk)
+            keluar.append(waktu_masuk + datetime.timedelta(minutes=53 * i))
+        harapan = [self.tarif.harga(j, m, k) for j, m, k in zip(jenis, masuk, keluar)]
+        hasil = self.tarif.harga_batch(jenis, [ke_epoch(m) for m in masuk], [ke_epoch(k) for k in keluar])
+        self.assertEqual([int(h) for h in hasil], harapan)
+        riwayat = RiwayatKolom({'id': i, 'nopol': "B 1 A", 'jenis': j, 'waktu_masuk': m, 'waktu_keluar': k,
+                                'total_biaya': 0, 'status': "Lunas", 'metode_bayar': "Cash"}
+                               for i, (j, m, k) in reversed(list(enumerate(zip(jenis, masuk, keluar)))))
+        self.assertEqual([int(h) for h in self.tarif.harga_riwayat(riwayat)], harapan)
+
+    def test_engine_memakai_tabel_tarif(self):
+        engine = ParkingEngine(tarif=self.tarif)
+        engine.checkin("B 1 TST", "Motor", self.masuk)
+        rincian = engine.quote("B 1 TST", self.masuk + datetime.timedelta(hours=4, minutes=10))
+        self.assertEqual(rincian['total_biaya'], 13000)
+        self.assertEqual(rincian['total_jam'], 5)
+        # hitung_biaya (dan endpoint /biaya) memakai harga yang sama dengan checkout
+        self.assertEqual(engine.hitung_biaya("Motor", 5, self.masuk), 13000)
+
+    def test_file_tarif_tidak_valid_memakai_bawaan(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "tarif.json")
+            for isi in ('{"Motor": ', '{"Motor": {"jam_pertama": 3000}}',
+                        '{"Motor": {"jam_pertama": 3000, "per_jam_berikutnya": 2000, "periode": [{"mulai": "25:00"}]}}'):
+                with open(path, 'w') as f:
+                    f.write(isi)
+                pesan = []
+                tabel = TabelTarif.dari_file(path, tarif_bawaan(), saat_gagal=pesan.append)
+                self.assertEqual(tabel.harga("Mobil", self.masuk, self.masuk), TARIF_MOBIL['jam_pertama'])
+                self.assertEqual(len(pesan), 1)
+                self.assertIn(path, pesan[0])
+
+class TestIndeksNopol(unittest.TestCase):
+
+    def setUp(self):
+        self.indeks = IndeksNopol(["B 1234 XYZ", "B 1299 AB", "D 77 Q", "AB 1234 CD"])
+
+    def test_awalan_tanpa_spasi_dan_huruf_kecil(self):
+        self.assertEqual(self.indeks.awalan("b12"), ["B 1234 XYZ", "B 1299 AB"])
+        self.assertEqual(self.indeks.awalan("AB 1"), ["AB 1234 CD"])
+
+    def test_mirip_menemukan_salah_ketik(self):
+        self.assertEqual(self.indeks.mirip("B 1243 XYZ"), ["B 1234 XYZ"])
+        self.assertEqual(self.indeks.mirip("B 1234 XYY")[0], "B 1234 XYZ")
+        self.assertEqual(self.indeks.mirip("Z 9 QQQ"), [])
+        self.assertEqual(jarak_edit("B1234XYZ", "B1243XYZ"), 2)
+
+    def test_mirip_tidak_terpotong_kandidat_lain(self):
+        # Empat puluh nopol panjang berbagi 7 trigram dengan teks, nopol yang benar hanya 5
+        self.indeks.tambah_banyak(f"B 1234 XYZ{i:04d}" for i in range(40))
+        self.indeks.tambah("B 1284 XYZ")
+        self.assertEqual(self.indeks.mirip("B 1234 XYZ"), ["B 1234 XYZ", "B 1284 XYZ"])
+
+    def test_hapus_lalu_tambah_lagi(self):
+        self.indeks.hapus("B 1234 XYZ")
+        self.assertNotIn("B 1234 XYZ", self.indeks)
+        self.assertEqual(self.indeks.mirip("B 1234 XYZ"), [])
+        self.indeks.tambah("B 1234 XYZ")
+        self.assertEqual(self.indeks.saran("B1234XYZ"), ["B 1234 XYZ"])
+
+    def test_engine_menjaga_indeks_aktif_dan_riwayat(self):
+        engine = ParkingEngine(RiwayatKolom([{'id': 1, 'nopol': "F 5 LAMA", 'jenis': "Mobil", 'waktu_masuk': datetime.datetime(2024, 1, 1),
+                                              'waktu_keluar': datetime.datetime(2024, 1, 1, 2), 'total_biaya': 9000, 'status': "Lunas", 'metode_bayar': "Cash"}]))
+        engine.checkin("B 1234 XYZ", "Motor")
+        self.assertEqual(engine.saran_nopol("B 1234 XZY"), ["B 1234 XYZ"])
+        engine.checkout("B 1234 XYZ")
+        self.assertEqual(engine.saran_nopol("B 1234"), [])
+        self.assertEqual(engine.cari_nopol_riwayat("b1234"), ["B 1234 XYZ"])
+        self.assertEqual(engine.cari_nopol_riwayat("F 5 LAMA"), ["F 5 LAMA"])
+
+class TestPenulisLatar(unittest.TestCase):
+
+    class PenyimpananPalsu:
+        def __init__(self, tahan=None):
+            self.tahan = tahan
+            self.entry = []
+            self.jumlah_flush = 0
+
+        def tambah(self, entry):
+            if self.tahan is not None and not self.entry:
+                self.tahan.wait(5)
+            if entry == "rusak":
+                raise OSError("disk penuh")
+            self.entry.append(entry)
+
+        def flush(self):
+            self.jumlah_flush += 1
+
+    def test_mode_grup_menggabungkan_fsync(self):
+        tahan = threading.Event()
+        palsu = self.PenyimpananPalsu(tahan)
+        penulis = PenulisLatar(interval=60)
+        proksi = penulis.bungkus(palsu)
+        for i in range(50):
+            proksi.tambah(i)
+        tahan.set()
+        penulis.tutup()
+        self.assertEqual(palsu.entry, list(range(50)))
+        self.assertEqual(palsu.jumlah_flush, 1)
+        metrik = penulis.metrik()
+        self.assertEqual(metrik['operasi'], 50)
+        self.assertGreaterEqual(metrik['antrian_maks'], 48)
+        self.assertLessEqual(metrik['batch'], 3)
+
+    def test_mode_grup_memakai_tambah_banyak(self):
+        urutan = []
+
+        class PenyimpananBatch(self.PenyimpananPalsu):
+            def __init__(self, tahan):
+                super().__init__(tahan)
+                self.panggilan = []
+
+            def tambah_banyak(self, daftar_entry):
+                self.panggilan.append(len(daftar_entry))
+                for entry in daftar_entry:
+                    self.tambah(entry)
+                    urutan.append(('tambah', entry))
+
+            def catat_keluar(self, nopol):
+                urutan.append(('keluar', nopol))
+
+        tahan = threading.Event()
+        palsu = PenyimpananBatch(tahan)
+        penulis = PenulisLatar(interval=60)
+        proksi = penulis.bungkus(palsu)
+        hasil = []
+        # Seperti checkout di aplikasi: riwayat ditambah lalu kendaraan dihapus dari catatan aktif
+        for i in range(50):
+            penulis.kirim(palsu, 'tambah', i, selesai=hasil.append)
+            proksi.catat_keluar(i)
+        penulis.kirim(palsu, 'flush')
+        proksi.tambah(50)
+        tahan.set()
+        penulis.tutup()
+        self.assertEqual(palsu.entry, list(range(51)))
+        # Antrian yang menumpuk ditulis dalam beberapa pemanggilan tambah_banyak, bukan 51 kali tambah
+        self.assertLessEqual(len(palsu.panggilan), 4)
+        self.assertEqual(sum(palsu.panggilan), 51)
+        for i in range(50):
+            self.assertLess(urutan.index(('tambah', i)), urutan.index(('keluar', i)))
+        self.assertEqual(penulis.jalankan_kabar(), [])
+        self.assertEqual(hasil, [None] * 50)
+        self.assertEqual(penulis.metrik()['operasi'], 102)
+
+    def test_mode_setiap_dan_kabar_error(self):
+        palsu = self.PenyimpananPalsu()
+        penulis = PenulisLatar(mode=MODE_SETIAP)
+        hasil = []
+        penulis.kirim(palsu, 'tambah', 1, selesai=hasil.append)
+        penulis.bungkus(palsu).tambah("rusak")
+        penulis.bungkus(palsu).tambah(2)
+        penulis.tutup()
+        self.assertEqual(palsu.entry, [1, 2])
+        self.assertEqual(palsu.jumlah_flush, 3)
+        galat = penulis.jalankan_kabar()
+        self.assertEqual(hasil, [None])
+        self.assertEqual([str(g) for g in galat], ["disk penuh"])
+        self.assertEqual(penulis.metrik()['gagal'], 1)
+
+    def test_jurnal_lewat_penulis(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            jurnal = JurnalRiwayat(os.path.join(tmpdir, "riwayat_parkir.json"), fsync_setiap=0)
+            penulis = PenulisLatar()
+            engine = ParkingEngine(penyimpanan=penulis.bungkus(jurnal))
+            waktu = datetime.datetime(2024, 6, 24, 10, 0, 0)
+            for i in range(5):
+                engine.checkin(f"B {i} TST", "Motor", waktu)
+                engine.checkout(f"B {i} TST", waktu_keluar=waktu + datetime.timedelta(hours=1))
+            penulis.tutup()
+            jurnal.tutup()
+            self.assertEqual([item['id'] for item in JurnalRiwayat(jurnal.path_snapshot).muat()], [5, 4, 3, 2, 1])
+
+class TestServer(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = ParkingEngine()
+        self.server = ServerParkir(LayananParkir(self.engine), port=0).jalankan_di_thread()
+        self.klien = KlienParkir(self.server.alamat)
+        self.waktu = datetime.datetime(2024, 6, 24, 10, 0, 0)
+
+    def tearDown(self):
+        self.klien.tutup()
+        self.server.hentikan()
+
+    def test_checkin_quote_checkout(self):
+        data = self.klien.checkin("B 1234 XYZ", "Mobil", self.waktu)
+        self.assertEqual(data, {'jenis': 'Mobil', 'waktu_masuk': self.waktu})
+        rincian = self.klien.quote("B 1234 XYZ", self.waktu + datetime.timedelta(hours=2, minutes=1))
+        self.assertEqual((rincian['total_jam'], rincian['total_biaya']), (3, 13000))
+        self.assertEqual(rincian['durasi'], datetime.timedelta(hours=2, minutes=1))
+        entry = self.klien.checkout("B 1234 XYZ", "E-Money", self.waktu + datetime.timedelta(hours=1))
+        self.assertEqual((entry['id'], entry['total_biaya'], entry['metode_bayar']), (1, 5000, 'E-Money'))
+        self.assertEqual(self.engine.kendaraan_terparkir, {})
+        hasil = self.klien.riwayat()
+        self.assertEqual((hasil['jumlah'], hasil['lengkap']), (1, True))
+        self.assertEqual(hasil['riwayat'][0]['waktu_keluar'], self.waktu + datetime.timedelta(hours=1))
+
+    def test_error_dikirim_ulang_sebagai_parkir_error(self):
+        self.klien.checkin("B 1 A", "Motor", self.waktu)
+        with self.assertRaisesRegex(ParkirError, "sudah terparkir"):
+            self.klien.checkin("B 1 A", "Motor")
+        with self.assertRaises(WaktuTidakValid):
+            self.klien.quote("B 1 A", self.waktu - datetime.timedelta(hours=1))
+        with self.assertRaisesRegex(ParkirError, "tidak ditemukan"):
+            self.klien.checkout("B 2 A")
+        with self.assertRaisesRegex(ParkirError, "Alamat tidak dikenal"):
+            self.klien._minta("GET", "/tidak-ada")
+
+    def test_layanan_menolak_permintaan_rusak(self):
+        layanan = LayananParkir(self.engine)
+        self.assertEqual(layanan.tangani("POST", "/checkin", b"[1, 2]")[0], 400)
+        self.assertEqual(layanan.tangani("POST", "/checkin", b"{bukan json")[0], 400)
+        self.assertEqual(layanan.tangani("GET", "/checkin")[0], 405)
+        self.assertEqual(layanan.tangani("GET", "/riwayat?offset=-1")[0], 400)
+        self.assertEqual(layanan.tangani("GET", "/biaya?jenis=Motor&jam=3&masuk=2024-06-24T10:00:00"), (200, {'biaya': 7000}))
+        # Tanpa waktu masuk harga tidak bisa dihitung sesuai periode tarif
+        self.assertEqual(layanan.tangani("GET", "/biaya?jenis=Motor&jam=3")[0], 400)
+
+    def test_dua_gerbang_berbagi_state(self):
+        gerbang_masuk = EngineJarak(KlienParkir(self.server.alamat))
+        gerbang_keluar = EngineJarak(KlienParkir(self.server.alamat))
+        gerbang_masuk.checkin("D 4 VNL", "Motor", self.waktu)
+        self.assertIn("D 4 VNL", gerbang_keluar.kendaraan_terparkir)
+        self.assertEqual(gerbang_keluar.saran_nopol("d4v"), ["D 4 VNL"])
+        entry = gerbang_keluar.checkout("D 4 VNL", waktu_keluar=self.waktu + datetime.timedelta(minutes=30))
+        self.assertEqual(entry['total_biaya'], 3000)
+        self.assertEqual(gerbang_keluar.riwayat_parkir[0]['nopol'], "D 4 VNL")
+        self.assertTrue(gerbang_masuk.segarkan())
+        self.assertNotIn("D 4 VNL", gerbang_masuk.kendaraan_terparkir)
+        self.assertEqual(len(gerbang_masuk.riwayat_parkir), 1)
+        self.assertEqual(gerbang_masuk.cari_nopol_riwayat("D 4 VNL"), ["D 4 VNL"])
+        gerbang_masuk.tutup()
+        gerbang_keluar.tutup()
+
+    def test_kapasitas_dan_okupansi_lewat_server(self):
+        self.assertEqual(baca_kapasitas("Mobil=2, Motor=5"), {'Mobil': 2, 'Motor': 5})
+        self.engine.okupansi.kapasitas['Mobil'] = 1
+        gerbang = EngineJarak(KlienParkir(self.server.alamat))
+        self.assertEqual(gerbang.okupansi.kapasitas, {'Mobil': 1, 'Motor': None})
+        gerbang.checkin("B 1 A", "Mobil")
+        with self.assertRaises(ParkirPenuh):
+            gerbang.checkin("B 2 A", "Mobil")
+        self.assertTrue(gerbang.okupansi.penuh('Mobil'))
+        hasil = self.klien.okupansi(menit=5)
+        self.assertEqual(hasil['terisi'], {'Mobil': 1, 'Motor': 0})
+        self.assertEqual(len(hasil['deret']), 5)
+        self.assertEqual(hasil['deret'][-1][1]['Mobil'], 1)
+        gerbang.tutup()
+
+    def test_riwayat_jurnal_dibaca_per_halaman(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            penulis = PenulisLatar()
+            engine, daftar_tutup = buat_engine(tmpdir, "jurnal", penulis)
+            for i in range(30):
+                engine.checkin(f"B {i} TST", "Motor", self.waktu)
+                engine.checkout(f"B {i} TST", waktu_keluar=self.waktu + datetime.timedelta(hours=1))
+            engine.tutup()
+            penulis.tutup()
+            for penyimpanan in daftar_tutup:
+                penyimpanan.tutup()
+
+            penulis = PenulisLatar()
+            engine, daftar_tutup = buat_engine(tmpdir, "jurnal", penulis)
+            layanan = LayananParkir(engine)
+            status, hasil = layanan.tangani("GET", "/riwayat?offset=25&batas=10")
+            self.assertEqual([item['id'] for item in hasil['riwayat']], [5, 4, 3, 2, 1])
+            status, hasil = layanan.tangani("GET", "/riwayat?nopol=B+7+TST")
+            self.assertEqual([item['id'] for item in hasil['riwayat']], [8])
+            self.assertEqual(engine.checkin("B 99 BARU", "Mobil")['jenis'], "Mobil")
+            self.assertEqual(engine.checkout("B 99 BARU")['id'], 31)
+            penulis.tutup()
+            for penyimpanan in daftar_tutup:
+                penyimpanan.tutup()
+
+    def test_riwayat_nopol_lewat_indeks(self):
+        for mode in ("jurnal", "sqlite"):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                penulis = PenulisLatar()
+                engine, daftar_tutup = buat_engine(tmpdir, mode, penulis)
+                for i in range(1, 13):
+                    nopol = "B 7 TST" if i % 3 == 0 else f"B {i} LAIN"
+                    engine.checkin(nopol, "Motor", self.waktu)
+                    engine.checkout(nopol, waktu_keluar=self.waktu + datetime.timedelta(hours=i))
+                engine.tutup()
+                penulis.tutup()
+                for penyimpanan in daftar_tutup:
+                    penyimpanan.tutup()
+
+                penulis = PenulisLatar()
+                engine, daftar_tutup = buat_engine(tmpdir, mode, penulis)
+                engine.siapkan_pencarian_riwayat()
+                engine.checkin("B 7 TST", "Motor", self.waktu)
+                engine.checkout("B 7 TST", waktu_keluar=self.waktu + datetime.timedelta(days=1))
+                layanan = LayananParkir(engine)
+                status, hasil = layanan.tangani("GET", "/riwayat?nopol=B+7+TST")
+                self.assertEqual([item['id'] for item in hasil['riwayat']], [13, 12, 9, 6, 3], mode)
+                status, hasil = layanan.tangani("GET", "/riwayat?nopol=B+7+TST&offset=1&batas=2")
+                self.assertEqual([item['id'] for item in hasil['riwayat']], [12, 9], mode)
+                self.assertFalse(hasil['lengkap'])
+                status, hasil = layanan.tangani("GET", "/riwayat?nopol=Z+0+TIDAK")
+                self.assertEqual(hasil['riwayat'], [])
+                penulis.tutup()
+                for penyimpanan in daftar_tutup:
+                    penyimpanan.tutup()
+
+    def test_riwayat_dimuat_bertahap_setelah_port_dibuka(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            penulis = PenulisLatar()
+            engine, daftar_tutup = buat_engine(tmpdir, "jurnal", penulis)
+            for i in range(1, 501):
+                nopol = "B 1 LAMA" if i == 1 else f"B {i} TST"
+                engine.checkin(nopol, "Motor", self.waktu)
+                engine.checkout(nopol, waktu_keluar=self.waktu + datetime.timedelta(minutes=i))
+            penulis.tutup()
+            for penyimpanan in daftar_tutup:
+                penyimpanan.tutup()
+
+            penulis = PenulisLatar()
+            engine, daftar_tutup = buat_engine(tmpdir, "jurnal", penulis)
+            layanan = LayananParkir(engine)
+            # Sebelum riwayat selesai dimuat, permintaan tidak membaca seluruh file
+            status, hasil = layanan.tangani("GET", "/riwayat?nopol=B+1+LAMA")
+            self.assertEqual((status, hasil['riwayat'], hasil['lengkap']), (200, [], False))
+            self.assertEqual(layanan.tangani("GET", "/saran?teks=B+1+LAMA&sumber=riwayat"), (200, {'saran': []}))
+            self.assertFalse(engine.riwayat_parkir.selesai)
+
+            asyncio.run(muat_riwayat_bertahap(engine))
+            self.assertTrue(engine.riwayat_parkir.selesai)
+            status, hasil = layanan.tangani("GET", "/riwayat?nopol=B+1+LAMA")
+            self.assertEqual(([item['id'] for item in hasil['riwayat']], hasil['lengkap']), ([1], True))
+            self.assertEqual(layanan.tangani("GET", "/saran?teks=B+1+LAMA&sumber=riwayat")[1]['saran'][0], "B 1 LAMA")
+            penulis.tutup()
+            for penyimpanan in daftar_tutup:
+                penyimpanan.tutup()
+
+    def test_tulis_ditolak_saat_antrian_penulis_penuh(self):
+        mulai, lepas = threading.Event(), threading.Event()
+        penulis = PenulisLatar(maks_antrian=2)
+        target = MagicMock()
+        target.tahan.side_effect = lambda: (mulai.set(), lepas.wait(5))
+        penulis.kirim(target, 'tahan')
+        # Operasi pertama sedang ditulis, dua berikutnya memenuhi antrian
+        mulai.wait(5)
+        penulis.kirim(target, 'tambah', {})
+        penulis.kirim(target, 'tambah', {})
+        with tempfile.TemporaryDirectory() as tmpdir:
+            aktif = LogKendaraanAktif(os.path.join(tmpdir, "kendaraan_aktif.json"))
+            engine = ParkingEngine(penyimpanan_aktif=penulis.bungkus(aktif))
+            layanan = LayananParkir(engine, penulis)
+            self.assertFalse(penulis.bisa_menerima())
+            badan = json.dumps({'nopol': "B 1 A", 'jenis': "Motor"}).encode()
+            self.assertEqual(layanan.tangani("POST", "/checkin", badan)[0], 503)
+            self.assertEqual(engine.kendaraan_terparkir, {})
+            lepas.set()
+            penulis.tunggu()
+            self.assertEqual(layanan.tangani("POST", "/checkin", badan)[0], 200)
+            penulis.tutup()
+            aktif.tutup()
+
+    def test_klien_tidak_mengirim_ulang_checkout_saat_koneksi_putus(self):
+        with patch("klien_parkirin.http.client.HTTPConnection") as koneksi:
+            koneksi.return_value.getresponse.side_effect = http.client.RemoteDisconnected("putus")
+            klien = KlienParkir("http://127.0.0.1:1")
+            with self.assertRaisesRegex(ParkirError, "tidak dikirim ulang"):
+                klien.checkout("B 1 A")
+            self.assertEqual(koneksi.return_value.request.call_count, 1)
+            # GET tidak mengubah apa pun, jadi boleh disambung ulang sekali
+            koneksi.return_value.request.reset_mock()
+            with self.assertRaisesRegex(ParkirError, "terputus"):
+                klien.status()
+            self.assertEqual(koneksi.return_value.request.call_count, 2)
+
+class TestMetrik(unittest.TestCase):
+
+    def test_persentil_histogram(self):
+        histogram = Histogram()
+        for i in range(1, 1001):
+            histogram.catat(i / 1000)
+        self.assertEqual(histogram.jumlah, 1000)
+        self.assertAlmostEqual(histogram.persentil(0.5), 0.5, delta=0.5 / 8)
+        self.assertAlmostEqual(histogram.persentil(0.99), 0.99, delta=0.99 / 8)
+        self.assertEqual(histogram.persentil(1.0), 1.0)
+        self.assertEqual(Histogram().persentil(0.5), 0.0)
+
+    def test_dekorator_dan_context_manager(self):
+        metrik = PencatatMetrik()
+
+        @metrik.diukur()
+        def kerja(x):
+            return x * 2
+
+        self.assertEqual(kerja(3), 6)
+        self.assertEqual(kerja.__name__, "kerja")
+        with metrik.ukur("blok"):
+            pass
+        metrik.tambah("dialog", 2)
+        ringkasan = metrik.ringkasan()
+        self.assertEqual(ringkasan["kerja"]["jumlah"], 1)
+        self.assertEqual(ringkasan["blok"]["jumlah"], 1)
+        self.assertIn("dialog", metrik.format_ringkasan())
+
+    def test_simpan_jejak_dan_profil(self):
+        metrik = PencatatMetrik()
+        self.assertFalse(metrik.simpan_profil("tidak_dipakai.prof"))
+        metrik.mulai_profil()
+        metrik.mulai_jejak()
+        with metrik.ukur("operasi"):
+            sum(range(1000))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.assertTrue(metrik.simpan_profil(os.path.join(tmpdir, "profil.prof")))
+            metrik.hentikan_profil()
+            metrik.simpan_jejak(os.path.join(tmpdir, "trace.json"))
+            with open(os.path.join(tmpdir, "trace.json")) as f:
+                event = json.load(f)["traceEvents"]
+            self.assertTrue(os.path.getsize(os.path.join(tmpdir, "profil.prof")) > 0)
+        self.assertEqual([e["name"] for e in event], ["operasi"])
+        self.assertEqual(event[0]["ph"], "X")
+
+class TestLaluLintas(unittest.TestCase):
+
+    def test_seed_sama_menghasilkan_data_sama(self):
+        self.assertEqual(buat_lalu_lintas(500, seed=3), buat_lalu_lintas(500, seed=3))
+        self.assertNotEqual(buat_lalu_lintas(500, seed=3), buat_lalu_lintas(500, seed=4))
+
+    def test_campuran_dan_jam_sibuk(self):
+        kunjungan = buat_lalu_lintas(20000, PolaLaluLintas(peluang_tiket_hilang=0.01))
+        porsi_motor = sum(k.jenis == "Motor" for k in kunjungan) / len(kunjungan)
+        self.assertAlmostEqual(porsi_motor, 0.65, delta=0.02)
+        self.assertAlmostEqual(sum(k.tiket_hilang for k in kunjungan) / len(kunjungan), 0.01, delta=0.003)
+        per_jam = [0] * 24
+        for k in kunjungan:
+            per_jam[k.waktu_masuk.hour] += 1
+        self.assertGreater(per_jam[8], 5 * per_jam[2])
+
+    def test_putar_ulang_tanpa_nopol_ganda(self):
+        kunjungan = buat_lalu_lintas(3000, PolaLaluLintas(kendaraan_per_hari=1500))
+        self.assertLess(len({k.nopol for k in kunjungan}), len(kunjungan))
+        self.assertEqual(len(urutan_event(kunjungan)), 6000)
+        engine = ParkingEngine(RiwayatKolom())
+        putar_ulang(engine, kunjungan)
+        self.assertEqual(len(engine.riwayat_parkir), 3000)
+        self.assertEqual(engine.kendaraan_terparkir, {})
+
+class TestCacheGambar(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "cctv.png")
+        Image.new("RGB", (800, 500), "red").save(self.path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_gambar_didekode_di_latar_dan_dipakai_ulang(self):
+        cache = CacheGambar(skala=2.0)
+        cache.muat_latar([(self.path, (400, 250))])
+        cache.tunggu()
+        with patch('gambar_parkirin.dekode_gambar') as dekode:
+            gambar = cache.ambil(self.path, (400, 250))
+            self.assertIs(cache.ambil(self.path, (400, 250)), gambar)
+            dekode.assert_not_called()
+        self.assertEqual(gambar.cget("light_image").size, (800, 500))
+        self.assertEqual(gambar.cget("size"), (400, 250))
+
+    def test_lru_dan_gambar_hilang(self):
+        cache = CacheGambar(maks=1)
+        pertama = cache.ambil(self.path, (40, 25))
+        cache.ambil(self.path, (20, 10))
+        self.assertIsNot(cache.ambil(self.path, (40, 25)), pertama)
+        cache.muat_latar([(os.path.join(self.tmpdir.name, "tidak_ada.jpg"), (40, 25))])
+        cache.tunggu()
+        with self.assertRaises(OSError):
+            cache.ambil(os.path.join(self.tmpdir.name, "tidak_ada.jpg"), (40, 25))
+
+class TestJurnalRiwayat(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "riwayat_parkir.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def buat_entry(self, id_parkir):
+        waktu = datetime.datetime(2024, 6, 24, 10, 0, 0)
+        return {'id': id_parkir, 'nopol': f'B {id_parkir} TST', 'jenis': 'Motor', 'waktu_masuk': waktu,
+                'waktu_keluar': waktu + datetime.timedelta(hours=1), 'total_biaya': 3000, 'status': 'Lunas', 'metode_bayar': 'Cash'}
+
+    def test_tambah_lalu_muat_terbaru_di_depan(self):
+        jurnal = JurnalRiwayat(self.path)
+        for i in range(1, 4):
+            jurnal.tambah(self.buat_entry(i))
+        jurnal.tutup()
+        riwayat = JurnalRiwayat(self.path).muat()
+        self.assertEqual([item['id'] for item in riwayat], [3, 2, 1])
+        self.assertIsInstance(riwayat[0]['waktu_masuk'], datetime.datetime)
+
+    def test_kompaksi_menggabungkan_jurnal_ke_snapshot(self):
+        jurnal = JurnalRiwayat(self.path, ambang_kompaksi=3)
+        for i in range(1, 5):
+            jurnal.tambah(self.buat_entry(i))
+        jurnal.tutup()
+        with open(self.path) as f:
+            self.assertEqual([item['id'] for item in json.load(f)], [3, 2, 1])
+        self.assertEqual([item['id'] for item in JurnalRiwayat(self.path).muat()], [4, 3, 2, 1])
+
+    def test_membaca_tidak_mengubah_hitungan_baris_penulis(self):
+        jurnal = JurnalRiwayat(self.path, ambang_kompaksi=3)
+        jurnal.tambah(self.buat_entry(1))
+        jurnal.tutup()
+        # Penulis baru (mis. setelah restart) melanjutkan hitungan dari baris jurnal yang sudah ada
+        jurnal = JurnalRiwayat(self.path, ambang_kompaksi=3)
+        jurnal.tambah(self.buat_entry(2))
+        # Pembaca di thread lain (laporan) membaca jurnal yang sama di antara dua checkout
+        self.assertEqual(len(list(jurnal.iter_riwayat())), 2)
+        jurnal.tambah(self.buat_entry(3))
+        jurnal.tutup()
+        self.assertFalse(os.path.exists(jurnal.path_jurnal))
+        with open(self.path) as f:
+            self.assertEqual([item['id'] for item in json.load(f)], [3, 2, 1])
+
+    def test_sisa_jurnal_yang_sudah_masuk_snapshot_diabaikan(self):
+        jurnal = JurnalRiwayat(self.path)
+        jurnal.tambah(self.buat_entry(1))
+        jurnal.tutup()
+        # Seolah-olah aplikasi mati setelah segel digabung ke snapshot tetapi sebelum segel dihapus
+        os.replace(jurnal.path_jurnal, jurnal.path_segel)
+        with open(self.path, 'w') as f:
+            json.dump([{**self.buat_entry(1), 'waktu_masuk': '2024-06-24T10:00:00', 'waktu_keluar': '2024-06-24T11:00:00'}], f)
+        self.assertEqual(len(JurnalRiwayat(self.path).muat()), 1)
+        jurnal = JurnalRiwayat(self.path)
+        jurnal.kompaksi(tunggu=True)
+        self.assertFalse(os.path.exists(jurnal.path_segel))
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)), 1)
+
+    def test_blok_id_beberapa_gerbang_tidak_ada_baris_hilang(self):
+        urutan_id = UrutanID(os.path.join(self.tmpdir.name, "riwayat_parkir.seq"))
+        gerbang = [ParkingEngine(penyimpanan=JurnalRiwayat(self.path, ambang_kompaksi=4), urutan_id=urutan_id, ukuran_blok_id=5)
+                   for _ in range(2)]
+        masuk = datetime.datetime(2024, 6, 24, 10, 0, 0)
+        for i in range(6):
+            engine = gerbang[i % 2]
+            nopol = f"B {i} TST"
+            engine.checkin(nopol, "Motor", masuk)
+            engine.checkout(nopol, "Cash", masuk + datetime.timedelta(hours=1))
+        for engine in gerbang:
+            engine.penyimpanan.tutup()
+        # Id berselang-seling antar gerbang; jurnal sudah sekali dikompaksi (ambang 4)
+        self.assertEqual([item['id'] for item in JurnalRiwayat(self.path).muat()], [8, 3, 7, 2, 6, 1])
+        self.assertEqual(ParkingEngine(JurnalRiwayat(self.path).muat(), urutan_id=urutan_id).last_parkir_id, 10)
+        with self.assertRaises(ValueError):
+            ParkingEngine(ukuran_blok_id=5)
+    def test_iter_array_json_membaca_per_objek(self):
+        data = [{'id': i, 'nopol': f'B {i} "X"', 'waktu_masuk': '2024-06-24T10:00:00'} for i in range(50, 0, -1)]
+        with open(self.path, 'w') as f:
+            json.dump(data, f, indent=4)
+        self.assertEqual(list(iter_array_json(self.path, ukuran_chunk=7)), data)
+        # Tanpa spasi, dengan chunk 1 karakter dan chunk yang memuat seluruh file
+        with open(self.path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        for ukuran in (1, 1 << 20):
+            self.assertEqual(list(iter_array_json(self.path, ukuran_chunk=ukuran)), data)
+
+    def test_riwayat_dibaca_per_halaman_dengan_waktu_malas(self):
+        jurnal = JurnalRiwayat(self.path)
+        for i in range(1, 501):
+            jurnal.tambah(self.buat_entry(i))
+        jurnal.tutup()
+        jurnal.kompaksi(tunggu=True)
+
+        riwayat = JurnalRiwayat(self.path).muat()
+        self.assertEqual(len(riwayat), RiwayatBertahap.UKURAN_HALAMAN)
+        self.assertFalse(riwayat.selesai)
+        self.assertEqual(riwayat.id_terakhir(), 500)
+        self.assertEqual(riwayat[0]['waktu_keluar'], self.buat_entry(500)['waktu_keluar'])
+
+        self.assertEqual(len(list(riwayat)), 500)
+        self.assertTrue(riwayat.selesai)
+        self.assertEqual(riwayat[499]['id'], 1)
+
+    def test_kompaksi_di_antara_halaman_tidak_menggandakan_baris(self):
+        jurnal = JurnalRiwayat(self.path, ambang_kompaksi=10)
+        for i in range(1, 11):
+            jurnal.tambah(self.buat_entry(i))
+        jurnal.kompaksi(tunggu=True)
+        jurnal.ambang_kompaksi = 1000
+        for i in range(11, 311):
+            jurnal.tambah(self.buat_entry(i))
+
+        riwayat = JurnalRiwayat(self.path).muat()
+        self.assertEqual(len(riwayat), RiwayatBertahap.UKURAN_HALAMAN)
+        # Kompaksi menulis ulang snapshot (sudah berisi baris jurnal tadi) sebelum halaman berikutnya dibaca
+        for i in range(311, 411):
+            jurnal.tambah(self.buat_entry(i))
+        jurnal.kompaksi(tunggu=True)
+        jurnal.tutup()
+        riwayat.muat_semua()
+        self.assertEqual([item['id'] for item in riwayat], list(range(310, 0, -1)))
+
+class TestRiwayatPartisi(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.tmpdir.name, "partisi")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def buat_entry(self, id_parkir, bulan):
+        waktu = datetime.datetime(2024, bulan, 10, 8, 0, 0) + datetime.timedelta(hours=id_parkir)
+        return {'id': id_parkir, 'nopol': f'B {id_parkir} TST', 'jenis': 'Mobil', 'waktu_masuk': waktu,
+                'waktu_keluar': waktu + datetime.timedelta(hours=1), 'total_biaya': 5000, 'status': 'Lunas', 'metode_bayar': 'Cash'}
+
+    def isi_tiga_bulan(self):
+        partisi = RiwayatPartisi(self.folder, sekarang=lambda: datetime.datetime(2024, 1, 1))
+        for i, bulan in enumerate((1, 1, 2, 2, 3), 1):
+            partisi.tambah(self.buat_entry(i, bulan))
+        partisi.tutup()
+        return partisi
+
+    def test_rollover_mengarsipkan_bulan_yang_lewat(self):
+        partisi = self.isi_tiga_bulan()
+        self.assertEqual(partisi.kunci_aktif, "2024-03")
+        self.assertEqual([(a['kunci'], a['jumlah'], a['id_min'], a['id_maks']) for a in partisi.daftar_arsip()],
+                         [("2024-02", 2, 3, 4), ("2024-01", 2, 1, 2)])
+        self.assertTrue(os.path.exists(os.path.join(self.folder, "riwayat-2024-01.json.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.folder, "riwayat-2024-01.jsonl")))
+
+        # Setelah restart, halaman pertama hanya dari partisi aktif; arsip dibaca saat digulir
+        riwayat = RiwayatPartisi(self.folder).muat()
+        self.assertEqual([item['id'] for item in riwayat], [5, 4, 3, 2, 1])
+        self.assertIsInstance(riwayat[4]['waktu_keluar'], datetime.datetime)
+
+    def test_tambah_banyak_sama_dengan_tambah(self):
+        partisi = RiwayatPartisi(self.folder, sekarang=lambda: datetime.datetime(2024, 1, 1))
+        partisi.tambah_banyak([self.buat_entry(i, bulan) for i, bulan in enumerate((1, 1, 2, 2, 3), 1)])
+        partisi.tutup()
+        self.assertEqual(partisi.kunci_aktif, "2024-03")
+        self.assertEqual([(a['kunci'], a['jumlah']) for a in partisi.daftar_arsip()], [("2024-02", 2), ("2024-01", 2)])
+        self.assertEqual([item['id'] for item in RiwayatPartisi(self.folder).muat()], [5, 4, 3, 2, 1])
+
+    def test_rollover_di_antara_halaman_tetap_terbaca(self):
+        partisi = RiwayatPartisi(self.folder, sekarang=lambda: datetime.datetime(2024, 1, 1))
+        for i in range(1, 301):
+            partisi.tambah(self.buat_entry(i, 1))
+            if i == 10:
+                # 10 baris di snapshot, sisanya di jurnal: halaman pertama belum menyentuh snapshot
+                partisi.aktif.kompaksi(tunggu=True)
+
+        riwayat = partisi.muat()
+        self.assertEqual(len(riwayat), RiwayatBertahap.UKURAN_HALAMAN)
+        # Rollover menghapus snapshot partisi lama sebelum halaman berikutnya dibaca
+        partisi.tambah(self.buat_entry(301, 2))
+        partisi.tutup()
+        riwayat.muat_semua()
+        self.assertEqual([item['id'] for item in riwayat], list(range(300, 0, -1)))
+
+    def test_rentang_hanya_membuka_partisi_yang_beririsan(self):
+        partisi = self.isi_tiga_bulan()
+        self.assertEqual(partisi.partisi_untuk(datetime.datetime(2024, 3, 1)), [])
+        self.assertEqual([a['kunci'] for a in partisi.partisi_untuk(datetime.datetime(2024, 2, 1), datetime.datetime(2024, 3, 1))],
+                         ["2024-02"])
+        riwayat = partisi.rentang(datetime.datetime(2024, 2, 1), datetime.datetime(2024, 3, 1))
+        self.assertEqual([item['id'] for item in riwayat], [4, 3])
+        self.assertEqual(buat_laporan(riwayat)['total_pendapatan'], 10000)
+
+    def test_riwayat_lama_dipindahkan_ke_partisi(self):
+        path_lama = os.path.join(self.tmpdir.name, "riwayat_parkir.json")
+        jurnal = JurnalRiwayat(path_lama)
+        for i, bulan in enumerate((4, 4, 5, 6, 6), 1):
+            jurnal.tambah(self.buat_entry(i, bulan))
+        jurnal.tutup()
+
+        partisi = RiwayatPartisi(self.folder, path_lama=path_lama)
+        self.assertEqual(partisi.kunci_aktif, "2024-06")
+        self.assertEqual([a['kunci'] for a in partisi.daftar_arsip()], ["2024-05", "2024-04"])
+        self.assertEqual([item['id'] for item in partisi.muat()], [5, 4, 3, 2, 1])
+        # Transaksi baru di bulan yang sama tetap di partisi aktif
+        partisi.tambah(self.buat_entry(6, 6))
+        partisi.tutup()
+        self.assertEqual([item['id'] for item in RiwayatPartisi(self.folder).muat()], [6, 5, 4, 3, 2, 1])
+
+class TestEkspor(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.folder = self.tmpdir.name
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def buat_entry(self, id_parkir):
+        waktu = datetime.datetime(2024, 6, 1, 8, 0, 0) + datetime.timedelta(days=id_parkir)
+        return {'id': id_parkir, 'nopol': f'B {id_parkir} TST', 'jenis': 'Mobil' if id_parkir % 2 else 'Motor', 'waktu_masuk': waktu,
+                'waktu_keluar': waktu + datetime.timedelta(hours=2), 'total_biaya': 1000 * id_parkir, 'status': 'Lunas', 'metode_bayar': 'Cash'}
+
+    def isi_jurnal(self, jumlah):
+        jurnal = JurnalRiwayat(os.path.join(self.folder, "riwayat_parkir.json"), ambang_kompaksi=4)
+        for i in range(1, jumlah + 1):
+            jurnal.tambah(self.buat_entry(i))
+        jurnal.tutup()
+        return jurnal
+
+    def test_ekspor_impor_csv_dan_jsonl_dengan_filter(self):
+        jurnal = self.isi_jurnal(10)
+        for nama in ("riwayat.csv", "riwayat.jsonl.gz"):
+            path = os.path.join(self.folder, nama)
+            jumlah = ekspor_parkirin.ekspor(jurnal.iter_riwayat(), path, ukuran_chunk=2, jenis="Mobil",
+                                            awal=datetime.datetime(2024, 6, 3), akhir=datetime.datetime(2024, 6, 10))
+            self.assertEqual(jumlah, 3)
+            baris = [ekspor_parkirin.validasi(b) for b in ekspor_parkirin.baca_file(path)]
+            self.assertEqual([b['nopol'] for b in baris], ["B 7 TST", "B 5 TST", "B 3 TST"])
+            self.assertEqual(baris[0]['waktu_keluar'], self.buat_entry(7)['waktu_keluar'])
+            self.assertEqual(baris[0]['total_biaya'], 7000)
+
+    def test_validasi_menolak_baris_rusak_tanpa_menulis(self):
+        path = os.path.join(self.folder, "impor.jsonl")
+        with open(path, 'w') as f:
+            f.write(json.dumps({'nopol': ' b 1 aaa ', 'jenis': 'mobil', 'waktu_masuk': '2024-06-01T08:00:00',
+                                'waktu_keluar': '2024-06-01T10:00:00', 'total_biaya': '5000'}) + "\n")
+            f.write(json.dumps({'nopol': 'B 2 BBB', 'jenis': 'Truk', 'waktu_masuk': '2024-06-01T08:00:00',
+                                'waktu_keluar': '2024-06-01T10:00:00', 'total_biaya': 5000}) + "\n")
+            f.write(json.dumps({'nopol': 'B 3 CCC', 'jenis': 'Motor', 'waktu_masuk': '2024-06-01T10:00:00',
+                                'waktu_keluar': '2024-06-01T08:00:00', 'total_biaya': 5000}) + "\n")
+            f.write("{rusak\n")
+        jurnal = JurnalRiwayat(os.path.join(self.folder, "riwayat_parkir.json"))
+        with self.assertRaisesRegex(ValueError, "3 baris tidak valid"):
+            ekspor_parkirin.impor(path, jurnal)
+        self.assertEqual(list(jurnal.iter_riwayat()), [])
+
+        hasil = ekspor_parkirin.impor(path, jurnal, lewati_galat=True)
+        self.assertEqual((hasil['diimpor'], hasil['dilewati']), (1, 3))
+        self.assertIn("baris 2: jenis tidak dikenal", hasil['galat'][0])
+        item = next(jurnal.iter_riwayat())
+        self.assertEqual((item['nopol'], item['jenis'], item['status'], item['metode_bayar']), ("B 1 AAA", "Mobil", "Lunas", "Cash"))
+
+    def test_impor_jurnal_id_per_batch_dan_satu_tulis_ulang_snapshot(self):
+        jurnal = self.isi_jurnal(6)
+        path = os.path.join(self.folder, "lama.csv")
+        ekspor_parkirin.ekspor((self.buat_entry(i) for i in range(1, 6)), path)
+        urutan_id = UrutanID(os.path.join(self.folder, "riwayat_parkir.seq"))
+        urutan_id.pastikan_minimal(6)
+
+        hasil = ekspor_parkirin.impor(path, jurnal, urutan_id, ukuran_batch=2)
+        self.assertEqual((hasil['diimpor'], hasil['id_awal'], hasil['id_akhir']), (5, 7, 11))
+        self.assertEqual(urutan_id.baca(), 11)
+        self.assertFalse(os.path.exists(jurnal.path_jurnal))
+        with open(jurnal.path_snapshot) as f:
+            self.assertEqual([item['id'] for item in json.load(f)], list(range(11, 0, -1)))
+        riwayat = JurnalRiwayat(jurnal.path_snapshot).muat()
+        self.assertEqual((riwayat[0]['nopol'], riwayat[4]['nopol'], riwayat[5]['nopol']), ("B 5 TST", "B 1 TST", "B 6 TST"))
+
+    def test_impor_ke_sqlite_dan_partisi(self):
+        path = os.path.join(self.folder, "lama.jsonl")
+        ekspor_parkirin.ekspor((self.buat_entry(i) for i in range(1, 6)), path)
+        db, urutan_id = ekspor_parkirin.buka_penyimpanan(self.folder, "sqlite")
+        db.tambah(self.buat_entry(1))
+        hasil = ekspor_parkirin.impor(path, db, urutan_id, ukuran_batch=3)
+        self.assertEqual((hasil['id_awal'], hasil['id_akhir']), (2, 6))
+        self.assertEqual([item['id'] for item in db.iter_riwayat(ukuran_halaman=2)], [6, 5, 4, 3, 2, 1])
+        db.tutup()
+
+        partisi = RiwayatPartisi(os.path.join(self.folder, "partisi"), sekarang=lambda: datetime.datetime(2024, 5, 1))
+        ekspor_parkirin.impor(path, partisi, ukuran_batch=2)
+        self.assertEqual(partisi.kunci_aktif, "2024-06")
+        self.assertEqual([item['nopol'] for item in RiwayatPartisi(partisi.folder).muat()], [f"B {i} TST" for i in range(5, 0, -1)])
+
+class TestRiwayatBiner(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "riwayat_parkir.bin")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def buat_entry(self, id_parkir, status='Lunas'):
+        waktu = datetime.datetime(2024, 6, 24, 10, 0, 0) + datetime.timedelta(minutes=id_parkir)
+        return {'id': id_parkir, 'nopol': f'B {id_parkir % 3} TST', 'jenis': 'Motor', 'waktu_masuk': waktu,
+                'waktu_keluar': waktu + datetime.timedelta(hours=1), 'total_biaya': 3000 + id_parkir, 'status': status, 'metode_bayar': 'Cash'}
+
+    def test_record_lebar_tetap_dan_tabel_string(self):
+        riwayat = RiwayatBiner(self.path)
+        for i in range(1, 6):
+            riwayat.tambah(self.buat_entry(i, status='Voucher' if i == 5 else 'Lunas'))
+        riwayat.tutup()
+        self.assertEqual(os.path.getsize(self.path), biner_parkirin.HEADER.size + 5 * biner_parkirin.RECORD.size)
+        # Hanya nopol baru dan status di luar kode awal yang masuk tabel string
+        with open(biner_parkirin.path_string(self.path)) as f:
+            self.assertEqual([json.loads(b) for b in f], [["nopol", "B 1 TST"], ["nopol", "B 2 TST"], ["nopol", "B 0 TST"], ["status", "Voucher"]])
+
+        hasil = RiwayatBiner(self.path).muat()
+        self.assertEqual([item['id'] for item in hasil], [5, 4, 3, 2, 1])
+        self.assertEqual(hasil[0]['status'], 'Voucher')
+        self.assertEqual(hasil[4]['waktu_keluar'], self.buat_entry(1)['waktu_keluar'])
+        self.assertEqual(RiwayatBiner(self.path).id_terakhir(), 5)
+
+    def test_pembaca_mmap_melihat_record_baru_dan_abaikan_record_terpotong(self):
+        riwayat = RiwayatBiner(self.path, fsync_setiap=0)
+        riwayat.tambah(self.buat_entry(1))
+        with BacaBiner(self.path) as baca:
+            self.assertEqual(len(baca), 1)
+            riwayat.tambah_banyak([self.buat_entry(2), self.buat_entry(3)])
+            self.assertEqual(baca.segarkan(), 3)
+            self.assertEqual(list(baca.kolom('total_biaya')), [3001, 3002, 3003])
+            self.assertEqual(baca.kamus['nopol'].nilai[baca.kolom('nopol')[2]], 'B 0 TST')
+            riwayat.tutup()
+            # Seolah-olah aplikasi mati di tengah menulis record
+            with open(self.path, 'ab') as f:
+                f.write(b"\x01" * 10)
+            self.assertEqual(baca.segarkan(), 3)
+        riwayat = RiwayatBiner(self.path)
+        riwayat.tambah(self.buat_entry(4))
+        riwayat.tutup()
+        self.assertEqual([item['id'] for item in RiwayatBiner(self.path).iter_riwayat()], [4, 3, 2, 1])
+
+    @unittest.skipIf(biner_parkirin.np is None, "numpy tidak terpasang")
+    def test_kolom_numpy_tanpa_salinan(self):
+        riwayat = RiwayatBiner(self.path)
+        riwayat.tambah_banyak(self.buat_entry(i) for i in range(1, 101))
+        riwayat.tutup()
+        with BacaBiner(self.path) as baca:
+            tabel = baca.tabel()
+            self.assertEqual(tabel.dtype.itemsize, biner_parkirin.RECORD.size)
+            biaya = baca.kolom('total_biaya')
+            self.assertFalse(biaya.flags['OWNDATA'])
+            self.assertEqual(int(biaya.sum()), sum(3000 + i for i in range(1, 101)))
+
+    def test_konversi_dari_dan_ke_json(self):
+        path_json = os.path.join(self.tmpdir.name, "riwayat_parkir.json")
+        jurnal = JurnalRiwayat(path_json, ambang_kompaksi=4)
+        for i in range(1, 11):
+            jurnal.tambah(self.buat_entry(i))
+        jurnal.tutup()
+        with patch.object(biner_parkirin, 'RECORD_PER_BLOK', 3):
+            self.assertEqual(json_ke_biner(path_json, self.path), 10)
+        with BacaBiner(self.path) as baca:
+            self.assertEqual([item['id'] for item in baca.iter_terbaru()], list(range(10, 0, -1)))
+
+        path_balik = os.path.join(self.tmpdir.name, "balik.json")
+        self.assertEqual(biner_ke_json(self.path, path_balik), 10)
+        with open(path_balik) as f:
+            self.assertEqual(json.load(f), list(JurnalRiwayat(path_json).iter_riwayat()))
+        # Mode biner mengonversi riwayat_parkir.json lama saat pertama kali dibuka
+        path_baru = os.path.join(self.tmpdir.name, "baru.bin")
+        self.assertEqual(len(list(RiwayatBiner(path_baru, path_lama=path_json).iter_riwayat())), 10)
+
+    def test_mikrodetik_waktu_tidak_hilang(self):
+        path_json = os.path.join(self.tmpdir.name, "riwayat_parkir.json")
+        entry = dict(self.buat_entry(1), waktu_masuk=datetime.datetime(2024, 6, 1, 8, 0, 0, 123456),
+                     waktu_keluar=datetime.datetime(2024, 6, 1, 9, 30, 0, 654321))
+        jurnal = JurnalRiwayat(path_json)
+        jurnal.tambah(entry)
+        jurnal.tutup()
+        json_ke_biner(path_json, self.path)
+        hasil = RiwayatBiner(self.path).muat()
+        self.assertEqual((hasil[0]['waktu_masuk'], hasil[0]['waktu_keluar']), (entry['waktu_masuk'], entry['waktu_keluar']))
+        with BacaBiner(self.path) as baca:
+            self.assertEqual(list(baca.kolom('mikro_keluar')), [654321])
+
+        path_balik = os.path.join(self.tmpdir.name, "balik.json")
+        biner_ke_json(self.path, path_balik)
+        with open(path_balik) as f:
+            self.assertEqual(json.load(f)[0]['waktu_masuk'], '2024-06-01T08:00:00.123456')
+
+    def test_file_versi_lama_ditolak(self):
+        with open(self.path, 'wb') as f:
+            f.write(biner_parkirin.HEADER.pack(biner_parkirin.MAGIC, 1, 40, 0))
+        with self.assertRaises(ValueError):
+            RiwayatBiner(self.path).tambah(self.buat_entry(1))
+        self.assertEqual(os.path.getsize(self.path), biner_parkirin.HEADER.size)
+
+class TestUrutanID(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.urutan = UrutanID(os.path.join(self.tmpdir.name, "riwayat_parkir.seq"))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_alokasi_blok_tidak_tumpang_tindih(self):
+        self.assertEqual(self.urutan.baca(), 0)
+        self.assertEqual(self.urutan.alokasi(10), 1)
+        self.assertEqual(self.urutan.alokasi(10), 11)
+        self.assertEqual(self.urutan.alokasi(1, minimal=100), 100)
+        self.assertEqual(self.urutan.baca(), 100)
+
+    def test_dua_gerbang_berbagi_urutan(self):
+        masuk = datetime.datetime(2024, 6, 24, 10, 0, 0)
+        gerbang_a = ParkingEngine(urutan_id=self.urutan, ukuran_blok_id=5)
+        gerbang_b = ParkingEngine(urutan_id=self.urutan, ukuran_blok_id=5)
+        id_terpakai = []
+        for i in range(7):
+            for nama, gerbang in (("A", gerbang_a), ("B", gerbang_b)):
+                gerbang.checkin(f"{nama} {i} TST", "Motor", masuk)
+                id_terpakai.append(gerbang.checkout(f"{nama} {i} TST", "Cash", masuk)['id'])
+        self.assertEqual(len(set(id_terpakai)), len(id_terpakai))
+
+    def test_id_terakhir_dibaca_dari_urutan_saat_start(self):
+        engine = ParkingEngine(urutan_id=self.urutan)
+        engine.last_parkir_id = 42
+        engine.tutup()
+        self.assertEqual(ParkingEngine(urutan_id=self.urutan).last_parkir_id, 42)
+
+class TestRiwayatKolom(unittest.TestCase):
+
+    def buat_entry(self, id_parkir, status='Lunas'):
+        masuk = datetime.datetime(2024, 6, 24, 10, 0, 0) + datetime.timedelta(hours=id_parkir)
+        return {'id': id_parkir, 'nopol': f'B {id_parkir % 3} TST', 'jenis': 'Mobil', 'waktu_masuk': masuk,
+                'waktu_keluar': masuk + datetime.timedelta(minutes=90), 'total_biaya': 9000, 'status': status, 'metode_bayar': 'E-Money'}
+
+    def test_baris_terbaca_kembali_seperti_dict(self):
+        riwayat = RiwayatKolom([self.buat_entry(3), self.buat_entry(2, status='Denda Tiket Hilang')])
+        riwayat.insert(0, self.buat_entry(4))
+        self.assertEqual([item['id'] for item in riwayat], [4, 3, 2])
+        self.assertEqual(riwayat[0].copy(), self.buat_entry(4))
+        self.assertEqual(riwayat[-1]['status'], 'Denda Tiket Hilang')
+        self.assertEqual(riwayat[1].get('metode_bayar'), 'E-Money')
+        self.assertEqual(riwayat.id_terakhir(), 4)
+
+    def test_mikrodetik_waktu_tidak_hilang(self):
+        # Mode "json" menulis ulang seluruh riwayat dari RiwayatKolom; waktu asli harus tetap utuh
+        entry = self.buat_entry(1)
+        entry['waktu_masuk'] = datetime.datetime(2024, 6, 24, 10, 0, 0, 123456)
+        entry['waktu_keluar'] = datetime.datetime(1969, 12, 31, 23, 59, 59, 999999)
+        riwayat = RiwayatKolom([{**entry, 'waktu_masuk': entry['waktu_masuk'].isoformat()}])
+        self.assertEqual(riwayat[0].copy(), entry)
+        self.assertEqual(list(riwayat.kolom('waktu_masuk')), [ke_epoch(entry['waktu_masuk'])])
+
+    def test_nopol_di_intern_dan_kolom_urut_kronologis(self):
+        riwayat = RiwayatKolom(self.buat_entry(i) for i in range(30, 0, -1))
+        self.assertEqual(len(riwayat.kamus['nopol']), 3)
+        self.assertEqual(list(riwayat.kolom('id')), list(range(1, 31)))
+        with self.assertRaises(IndexError):
+            riwayat[30]
+
+    def test_salin_tidak_ikut_berubah(self):
+        riwayat = RiwayatKolom(self.buat_entry(i) for i in range(3, 0, -1))
+        salinan = riwayat.salin()
+        riwayat.insert(0, {**self.buat_entry(4), 'nopol': 'Z 9 BARU', 'metode_bayar': 'QRIS'})
+        self.assertEqual([item['id'] for item in salinan], [3, 2, 1])
+        self.assertEqual([item.copy() for item in salinan], [self.buat_entry(i) for i in range(3, 0, -1)])
+        self.assertNotIn('Z 9 BARU', salinan.kamus['nopol'].kode)
+        self.assertEqual(len(riwayat), 4)
+
+class TestLaporan(unittest.TestCase):
+
+    def setUp(self):
+        awal = datetime.datetime(2024, 6, 24, 8, 0, 0)
+        self.riwayat = []
+        for i in range(48):
+            masuk = awal + datetime.timedelta(hours=i)
+            self.riwayat.insert(0, {'id': i + 1, 'nopol': f'B {i} TST', 'jenis': 'Mobil' if i % 2 else 'Motor',
+                                    'waktu_masuk': masuk, 'waktu_keluar': masuk + datetime.timedelta(minutes=30 + i),
+                                    'total_biaya': 50000 if i % 10 == 0 else 3000 + i, 'status': 'Denda Tiket Hilang' if i % 10 == 0 else 'Lunas',
+                                    'metode_bayar': 'Cash' if i % 3 else 'E-Money'})
+
+    def test_ringkasan_harian(self):
+        laporan = buat_laporan(RiwayatKolom(self.riwayat))
+        self.assertEqual(laporan['jumlah_transaksi'], 48)
+        self.assertEqual(laporan['tiket_hilang'], 5)
+        self.assertEqual(laporan['total_pendapatan'], sum(item['total_biaya'] for item in self.riwayat))
+        self.assertEqual([hari['tanggal'] for hari in laporan['harian']],
+                         [datetime.date(2024, 6, 24), datetime.date(2024, 6, 25), datetime.date(2024, 6, 26)])
+        hari_pertama = laporan['harian'][0]
+        self.assertEqual(hari_pertama['pendapatan'], sum(hari_pertama['per_jenis'].values()))
+        self.assertEqual(hari_pertama['pendapatan'], sum(hari_pertama['per_metode'].values()))
+        self.assertAlmostEqual(laporan['rata_durasi_menit'], 30 + 47 / 2)
+
+    def test_pendapatan_per_jam_per_jenis_dan_metode(self):
+        laporan = buat_laporan(RiwayatKolom(self.riwayat))
+        harapan_jenis, harapan_metode = [{} for _ in range(24)], [{} for _ in range(24)]
+        for item in self.riwayat:
+            jam = item['waktu_keluar'].hour
+            harapan_jenis[jam][item['jenis']] = harapan_jenis[jam].get(item['jenis'], 0) + item['total_biaya']
+            harapan_metode[jam][item['metode_bayar']] = harapan_metode[jam].get(item['metode_bayar'], 0) + item['total_biaya']
+        self.assertEqual(laporan['per_jam_jenis'], harapan_jenis)
+        self.assertEqual(laporan['per_jam_metode'], harapan_metode)
+        for jam in range(24):
+            self.assertEqual(laporan['per_jam'][jam], sum(laporan['per_jam_jenis'][jam].values()))
+        with patch.object(laporan_parkirin, 'np', None):
+            self.assertEqual(buat_laporan(self.riwayat)['per_jam_metode'], harapan_metode)
+        self.assertIn("Cash Rp", format_laporan(laporan).split("Pendapatan harian")[0])
+
+    def test_rentang_tanggal_dan_cadangan_tanpa_numpy_sama(self):
+        awal, akhir = datetime.datetime(2024, 6, 25), datetime.datetime(2024, 6, 26)
+        hasil_numpy = buat_laporan(RiwayatKolom(self.riwayat), awal, akhir)
+        with patch.object(laporan_parkirin, 'np', None):
+            hasil_python = buat_laporan(self.riwayat, awal, akhir)
+        self.assertEqual(hasil_numpy, hasil_python)
+        self.assertEqual(len(hasil_numpy['harian']), 1)
+
+class TestLogKendaraanAktif(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "kendaraan_aktif.json")
+        self.masuk = datetime.datetime(2024, 6, 24, 10, 0, 0)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_kendaraan_aktif_dipulihkan_setelah_restart(self):
+        log = LogKendaraanAktif(self.path)
+        engine = ParkingEngine(penyimpanan_aktif=log)
+        engine.checkin("B 1 AAA", "Mobil", self.masuk)
+        engine.checkin("B 2 BBB", "Motor", self.masuk + datetime.timedelta(minutes=1))
+        engine.checkout("B 1 AAA", "Cash", self.masuk + datetime.timedelta(hours=1))
+        # Tanpa tutup(): seolah-olah aplikasi mati mendadak
+
+        engine = ParkingEngine(penyimpanan_aktif=LogKendaraanAktif(self.path))
+        self.assertEqual(list(engine.kendaraan_terparkir), ["B 2 BBB"])
+        self.assertEqual(engine.kendaraan_terparkir["B 2 BBB"]['waktu_masuk'], self.masuk + datetime.timedelta(minutes=1))
+
+    def test_log_dipotong_menjadi_snapshot(self):
+        log = LogKendaraanAktif(self.path, ambang_snapshot=10)
+        log.catat_masuk("B 1 AAA", {'jenis': 'Mobil', 'waktu_masuk': self.masuk})
+        for i in range(100):
+            log.catat_masuk(f"X {i} CHR", {'jenis': 'Motor', 'waktu_masuk': self.masuk})
+            log.catat_keluar(f"X {i} CHR")
+        log.tutup()
+        with open(log.path_log) as f:
+            self.assertLessEqual(len(f.readlines()), 11)
+        self.assertEqual(list(LogKendaraanAktif(self.path).muat_aktif()), ["B 1 AAA"])
+
+class TestPenyimpananSQLite(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "parkirin.db")
+        self.db = PenyimpananSQLite(self.path)
+        self.masuk = datetime.datetime(2024, 6, 24, 10, 0, 0)
+
+    def tearDown(self):
+        self.db.tutup()
+        self.tmpdir.cleanup()
+
+    def buat_entry(self, id_parkir, nopol=None):
+        return {'id': id_parkir, 'nopol': nopol or f'B {id_parkir} TST', 'jenis': 'Motor', 'waktu_masuk': self.masuk,
+                'waktu_keluar': self.masuk + datetime.timedelta(hours=id_parkir), 'total_biaya': 3000, 'status': 'Lunas', 'metode_bayar': 'Cash'}
+
+    def test_riwayat_dibaca_per_halaman_terbaru_di_depan(self):
+        self.db.tambah_banyak(self.buat_entry(i) for i in range(1, 451))
+        riwayat = self.db.muat()
+        self.assertEqual(len(riwayat), 450)
+        self.assertEqual(riwayat.id_terakhir(), 450)
+        self.assertEqual(riwayat[0]['id'], 450)
+        self.assertEqual(riwayat[449]['id'], 1)
+
+        riwayat.insert(0, self.buat_entry(451))
+        self.assertEqual([item['id'] for item in list(riwayat)[:3]], [451, 450, 449])
+
+    def test_halaman_dibaca_dengan_keyset_juga_saat_melompat(self):
+        # Id berlubang (mis. blok id beberapa gerbang) tidak boleh menggeser isi halaman
+        self.db.tambah_banyak(self.buat_entry(i) for i in range(3, 1501, 3))
+        riwayat = self.db.muat()
+        riwayat.UKURAN_HALAMAN = 50
+        self.assertEqual(riwayat[420]['id'], 1500 - 3 * 420)
+        self.assertEqual(riwayat[120]['id'], 1500 - 3 * 120)
+        self.assertEqual(riwayat[499]['id'], 3)
+        self.assertEqual([item['id'] for item in riwayat], list(range(1500, 2, -3)))
+        rencana = " ".join(str(b) for b in self.db.conn.execute("EXPLAIN QUERY PLAN " + SQL_HALAMAN, (10, 5)).fetchall())
+        self.assertIn("INTEGER PRIMARY KEY", rencana)
+
+    def test_pencarian_memakai_indeks(self):
+        self.db.tambah_banyak(self.buat_entry(i, nopol="D 4 VNL" if i % 2 else None) for i in range(1, 11))
+        self.assertEqual([item['id'] for item in self.db.cari_nopol("D 4 VNL")], [9, 7, 5, 3, 1])
+        self.assertEqual([item['id'] for item in self.db.cari_nopol("D 4 VNL", id_maks=7, batas=2)], [7, 5])
+        hasil = self.db.rentang_waktu(self.masuk + datetime.timedelta(hours=3), self.masuk + datetime.timedelta(hours=5))
+        self.assertEqual([item['id'] for item in hasil], [3, 4])
+
+        rencana_nopol = " ".join(str(b) for b in self.db.conn.execute("EXPLAIN QUERY PLAN " + SQL_CARI_NOPOL, ("x", 10, 5)).fetchall())
+        rencana_waktu = " ".join(str(b) for b in self.db.conn.execute("EXPLAIN QUERY PLAN " + SQL_RENTANG, ("a", "b")).fetchall())
+        self.assertIn("idx_riwayat_nopol", rencana_nopol)
+        # Urutan id diambil dari indeks, jadi LIMIT menghentikan pembacaan tanpa mengurutkan semua baris nopol
+        self.assertNotIn("TEMP B-TREE", rencana_nopol)
+        self.assertIn("idx_riwayat_waktu_keluar", rencana_waktu)
+        self.assertEqual(sorted(self.db.daftar_nopol()), sorted(["D 4 VNL"] + [f"B {i} TST" for i in range(2, 11, 2)]))
+
+    def test_tambah_banyak_menghapus_sesi_aktif_yang_sama(self):
+        self.db.catat_masuk("B 1 TST", {'jenis': 'Motor', 'waktu_masuk': self.masuk})
+        self.db.catat_masuk("B 2 TST", {'jenis': 'Motor', 'waktu_masuk': self.masuk + datetime.timedelta(days=1)})
+        # Checkout B 1 (sesi yang sama) hilang dari aktif; B 2 sedang parkir lagi sehingga riwayat lamanya tidak menghapusnya
+        self.db.tambah_banyak([self.buat_entry(1), self.buat_entry(2)])
+        self.assertEqual(list(self.db.muat_aktif()), ["B 2 TST"])
+
+    def test_kendaraan_aktif_bertahan_setelah_restart(self):
+        engine = ParkingEngine(self.db.muat(), penyimpanan=self.db, penyimpanan_aktif=self.db)
+        engine.checkin("B 1 AAA", "Mobil", self.masuk)
+        engine.checkin("B 2 BBB", "Motor", self.masuk + datetime.timedelta(minutes=5))
+        engine.checkout("B 1 AAA", "Cash", self.masuk + datetime.timedelta(hours=1))
+        self.db.tutup()
+
+        self.db = PenyimpananSQLite(self.path)
+        engine = ParkingEngine(self.db.muat(), penyimpanan=self.db, penyimpanan_aktif=self.db)
+        self.assertEqual(list(engine.kendaraan_terparkir), ["B 2 BBB"])
+        self.assertEqual(engine.kendaraan_terparkir["B 2 BBB"]['waktu_masuk'], self.masuk + datetime.timedelta(minutes=5))
+        self.assertEqual(engine.last_parkir_id, 1)
+
 if __name__ == '__main__':
     unittest.main(argv=['first-arg-is-ignored'], exit=False)
\ No newline at end of file